@@ -4,22 +4,64 @@
 Module of the main benchmark class, parent of all benchkit benchmarks.
 """
 
+import hashlib
 import inspect
 import itertools
 import json
+import multiprocessing
+import multiprocessing.connection
 import os
 import pathlib
+import signal
+import sys
+import uuid
+from collections import deque
+from contextlib import contextmanager, nullcontext
 from multiprocessing import Barrier
 from subprocess import CalledProcessError
-from typing import IO, Any, Dict, Iterable, List, Optional, Protocol, Tuple
+from typing import (
+    IO,
+    Any,
+    Awaitable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Protocol,
+    Tuple,
+)
 
 from benchkit.commandwrappers import CommandWrapper
+from benchkit.communication.transfer import ArtifactTransfer, TransferQueue
 from benchkit.dependencies import check_dependencies
 from benchkit.dependencies.packages import PackageDependency
-from benchkit.platforms import get_current_platform
+from benchkit.platforms import Platform, get_current_platform
+from benchkit.platforms.slots import SLOT_PINNINGS, CpuSlot, get_cpu_slots
+from benchkit.results.adaptive import AdaptiveRuns
+from benchkit.results.cache import ResultCache, str_param
+from benchkit.results.durations import RUN_DURATION_COLUMN, DurationModel, load_duration_history
+from benchkit.results.journal import (
+    CampaignJournal,
+    JournalReplay,
+    journal_path,
+    seed_journal,
+)
+from benchkit.results.sink import FSYNC_POLICIES, ResultSink
+from benchkit.results.store import ResultStore, table_name
+from benchkit.results.streamparser import StreamParser, shell_streamed
+from benchkit.results.threads import (
+    RUN_ID_COLUMN,
+    THREAD_COLUMNS_LAYOUTS,
+    THREADS_COLUMNS,
+    split_thread_columns,
+    threads_csv_path,
+)
+from benchkit.search import SEARCH_ROUND_COLUMN, SearchStrategy
 from benchkit.sharedlibs import SharedLib
 from benchkit.sharedlibs.tiltlib import TiltLib
-from benchkit.shell.shellasync import AsyncProcess, shell_async
+from benchkit.shell.shellasync import AsyncProcess, run_concurrently, shell_async
+from benchkit.utils.buildcache import BUILD_ENV_VARS, DEFAULT_MAX_SIZE_BYTES, BuildCache
 from benchkit.utils.gdb import generate_gdb_script_from_cmd
 from benchkit.utils.misc import (
     CSV_SEPARATOR,
@@ -28,8 +70,8 @@ from benchkit.utils.misc import (
     get_benchkit_temp_folder_str,
     seconds2pretty,
 )
+from benchkit.utils.ordering import SwitchCosts, order_records, total_transition_cost
 from benchkit.utils.system import get_boot_args
-from benchkit.utils.tee import teeprint
 from benchkit.utils.types import (
     Command,
     Constants,
@@ -38,7 +80,7 @@ from benchkit.utils.types import (
     Pretty,
     SplitCommand,
 )
-from benchkit.utils.variables import list_groupby
+from benchkit.utils.variables import RecordSpace, list_groupby
 
 RecordKey = str
 RecordValue = Any
@@ -88,13 +130,15 @@ class PostRunHook(Protocol):
 class CommandAttachment(Protocol):
     """
     Callback for a command that will be attached to the benchmark command (asynchronously).
+    An attachment may return an awaitable (e.g. be a coroutine function): the awaitables of all the
+    attachments of a run are then driven concurrently by one event loop.
     """
 
     def __call__(
         self,
         process: AsyncProcess,
         record_data_dir: PathType,
-    ) -> None: ...
+    ) -> Optional[Awaitable[None]]: ...
 
 
 class Benchmark:
@@ -142,6 +186,45 @@ class Benchmark:
         self._nb_runs_done = 0
         self._first_line_is_printed = False
 
+        self._parallel_slots = None
+        self._cpus_per_slot = 1
+        self._slot_pinning = "taskset"
+        self._stop_on_first_finish = False
+        self._current_slot: Optional[CpuSlot] = None
+        self._stream_parser: Optional[StreamParser] = None
+        self._slot_async_processes: List[AsyncProcess] = []
+        self._csv_lock = None
+        self._csv_header_printed = None
+
+        self._fsync_policy = "run"
+        self._fsync_rows = 100
+        self._result_sink: Optional[ResultSink] = None
+        self._thread_columns = "wide"
+        self._threads_sink: Optional[ResultSink] = None
+        self._journal: Optional[CampaignJournal] = None
+        self._journal_enabled = True
+
+        self._build_cache: Optional[BuildCache] = None
+        self._build_cache_base_identity: Optional[Dict[str, Any]] = None
+
+        self._adaptive_runs: Optional[AdaptiveRuns] = None
+        self._search: Optional[SearchStrategy] = None
+
+        self._duration_history: Optional[List[PathType]] = None
+        self._duration_model: Optional[DurationModel] = None
+        self._record_run_durations = True
+        self._expected_total_seconds = None
+        self._predicted_seconds_done = 0.0
+
+        self._switch_costs: SwitchCosts = {}
+
+        self._fleet: Optional[List[Platform]] = None
+        self._results_store: Optional[ResultStore] = None
+        self._store_index_columns: List[str] = []
+
+        self._artifact_transfer: Optional[ArtifactTransfer] = None
+        self._transfer_queue: Optional[TransferQueue] = None
+
         self._debug = False
         self._gdb = False
         self._flamegraph_path: Optional[PathType] = None
@@ -200,9 +283,35 @@ class Benchmark:
         with open(output_path, "w") as output_file:
             output_file.write(file_content)
 
+    def _log_build_cache_stats(
+        self,
+        output_file: IO[str] | ResultSink,
+    ) -> None:
+        def log_line(line: str) -> None:
+            print(f"# {line}", file=output_file)
+            output_file.flush()
+
+        log_line(f"build_cache_dir: {self._build_cache.cache_dir}")
+        log_line(f"build_cache_hits: {self._build_cache.hits}")
+        log_line(f"build_cache_misses: {self._build_cache.misses}")
+
+    def _log_transfer_stats(
+        self,
+        output_file: IO[str] | ResultSink,
+    ) -> None:
+        def log_line(line: str) -> None:
+            print(f"# {line}", file=output_file)
+            output_file.flush()
+
+        metrics = self._transfer_queue.metrics()
+        log_line(f"artifact_transfer_directories: {metrics['nb_directories']}")
+        log_line(f"artifact_transfer_batches: {metrics['nb_batches']}")
+        log_line(f"artifact_transfer_seconds: {metrics['transfer_seconds']}")
+        log_line(f"artifact_transfer_wait_seconds: {metrics['wait_seconds']}")
+
     @staticmethod
     def _log_footers(
-        output_file: IO[str],
+        output_file: IO[str] | ResultSink,
         total_duration_seconds: float,
     ) -> None:
         def log_line(line: str) -> None:
@@ -215,7 +324,7 @@ class Benchmark:
 
     @staticmethod
     def _log_prebuild_time(
-        output_file: IO[str],
+        output_file: IO[str] | ResultSink,
         prebuild_seconds: float,
     ) -> None:
         def log_line(line: str) -> None:
@@ -238,13 +347,12 @@ class Benchmark:
     def _log_current_time_info(
         total_nb_runs: int,
         nb_runs_done: int,
-        bench_duration: int,
+        remaining_seconds: int | None,
         other_campaigns_seconds: int,
     ) -> None:
         time_suffix = ""
         full_time_str = ""
-        if bench_duration is not None:
-            remaining_seconds = (total_nb_runs - nb_runs_done) * bench_duration
+        if remaining_seconds is not None:
             remaining_time = seconds2pretty(remaining_seconds)
             time_suffix = (
                 f", current campaign expected remaining time: "
@@ -304,6 +412,24 @@ class Benchmark:
         pretty_variables: Pretty,
         debug: bool,
         gdb: bool,
+        parallel_slots: int | None = None,
+        cpus_per_slot: int = 1,
+        slot_pinning: str = "taskset",
+        stop_on_first_finish: bool = False,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+        build_cache_dir: Optional[PathType] = None,
+        build_cache_max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
+        search: Optional[SearchStrategy] = None,
+        duration_history: Optional[Iterable[PathType]] = None,
+        record_run_durations: bool = True,
+        switch_costs: Optional[SwitchCosts] = None,
+        fleet: Optional[Iterable[Platform]] = None,
+        results_store: Optional[PathType] = None,
+        thread_columns: str = "wide",
+        artifact_transfer: Optional[ArtifactTransfer] = None,
+        journal: bool = True,
     ) -> None:
         """
         Configure the benchmark variables once they are associated with a campaign.
@@ -333,6 +459,94 @@ class Benchmark:
                 whether to enable debug.
             gdb (bool):
                 whether to enable gdb.
+            parallel_slots (int | None, optional):
+                if not None, run the records in parallel on at most this number of CPU slots
+                (0 means as many slots as the platform can host). If None, the records are run
+                sequentially.
+                Defaults to None.
+            cpus_per_slot (int, optional):
+                number of CPUs reserved to each benchmark instance in parallel mode.
+                Defaults to 1.
+            slot_pinning (str, optional):
+                utility used to pin each instance on the CPUs of its slot in parallel mode, one of
+                "taskset", "numactl" or "none".
+                Defaults to "taskset".
+            stop_on_first_finish (bool, optional):
+                in parallel mode, whether to stop all the running instances and to skip the
+                queued ones as soon as the first instance finishes.
+                Defaults to False.
+            fsync_policy (str, optional):
+                when to synchronize the CSV output file to the storage device, one of "run" (after
+                each run), "rows" (every `fsync_rows` rows) or "exit" (at the end of the campaign).
+                Defaults to "run".
+            fsync_rows (int, optional):
+                number of rows between two synchronizations with the "rows" fsync policy.
+                Defaults to 100.
+            build_cache_dir (Optional[PathType], optional):
+                if not None, directory of the build cache where the artifacts of the builds are
+                stored and restored from, instead of rebuilding identical builds. Only used by
+                benchmarks that declare their build artifacts, on local platforms.
+                Defaults to None.
+            build_cache_max_size_bytes (int, optional):
+                maximum size of the build cache, the least recently used builds are evicted above.
+                Defaults to DEFAULT_MAX_SIZE_BYTES (10 GiB).
+            adaptive_runs (Optional[AdaptiveRuns], optional):
+                if not None, each record is repeated until the confidence interval of the given
+                metric is tight enough, `nb_runs` being the maximum number of runs. The interval
+                and the number of repetitions are added as columns to the results.
+                Defaults to None.
+            search (Optional[SearchStrategy], optional):
+                if not None, the records to run are proposed round by round by this search
+                strategy, from the results of the previous rounds, instead of running all the
+                given variables.
+                Defaults to None.
+            duration_history (Optional[Iterable[PathType]], optional):
+                previous results (CSV files, `experiment_results.json` files or directories of CSV
+                files) the duration of a run of each record is learned from, when
+                `benchmark_duration_seconds` is not set. The learned durations are used to estimate
+                the remaining time and to run the longest records first in the parallel runner.
+                If None, the previous CSV files of the directory of the CSV output file are used.
+                Defaults to None.
+            record_run_durations (bool, optional):
+                whether to add the wall-clock time of each run to its result rows, in the
+                `run_duration_seconds` column the durations of the next campaigns are learned from.
+                Defaults to True.
+            switch_costs (Optional[SwitchCosts], optional):
+                cost of changing the value of each variable between two consecutive records (e.g.
+                the time to restart a server or to reboot), added to the ones declared by the
+                benchmark in `switch_costs()`. When some costs are given, the records are reordered
+                to minimize the total cost of the transitions.
+                Defaults to None.
+            fleet (Optional[Iterable[Platform]], optional):
+                if not None, the records are run on these (identical) platforms instead of the
+                platform of the benchmark, each platform running one record at a time. The
+                `hostname` constant column records the platform that ran each record.
+                Defaults to None.
+            results_store (Optional[PathType], optional):
+                if not None, path of a SQLite database where the result rows are also written, in
+                a table named after the CSV output file and indexed on the variables.
+                Defaults to None.
+            thread_columns (str, optional):
+                layout of the per-thread result columns (`thread_0`, `thread_1`, ...), "wide" for
+                columns of the result rows, padded up to the maximum number of threads, or "long"
+                for a separate table with one row per thread, keyed by the `run_id` and
+                `run_line` columns of the result rows (see `benchkit.results.threads`).
+                Defaults to "wide".
+            artifact_transfer (Optional[ArtifactTransfer], optional):
+                if not None and the platform is remote, the record data of each run is copied back
+                to the host in the background while the next runs execute, batched in tar streams
+                (see `benchkit.communication.transfer`), and all the copies are checked at the end
+                of the campaign. Since the files of a run are not on the host when it is parsed,
+                post-run hooks are not supported and `parse_output_to_results` receives no record
+                data directory. If None, the record data is copied back after each run.
+                Defaults to None.
+            journal (bool, optional):
+                whether to record the progress of the campaign in a write-ahead journal next to
+                the CSV output file (`<csv>.journal`, see `benchkit.results.journal`). The journal
+                is the exact record of the finished runs when the campaign is continued, and the
+                CSV output file can be regenerated from it (see `Campaign.regenerate_csv`). If
+                False, continuing the campaign parses the CSV output file instead.
+                Defaults to True.
 
         Raises:
             ValueError: if the benchmark is already configured.
@@ -340,6 +554,44 @@ class Benchmark:
         if self._configured:
             raise ValueError("Benchmark already configured")
 
+        if slot_pinning not in SLOT_PINNINGS:
+            raise ValueError(f"Unknown slot pinning: {slot_pinning}")
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        if thread_columns not in THREAD_COLUMNS_LAYOUTS:
+            raise ValueError(f"Unknown layout of the thread columns: {thread_columns}")
+        if parallel_slots is not None and gdb:
+            raise ValueError("Debugging with gdb is not supported by the parallel runner")
+        if search is not None and parallel_slots is not None:
+            raise ValueError("Search campaigns are not supported by the parallel runner")
+        if fleet is not None:
+            if parallel_slots is not None or search is not None or gdb:
+                raise ValueError(
+                    "Fleet campaigns are not supported with the parallel runner, search or gdb"
+                )
+            fleet = list(fleet)
+            if not fleet:
+                raise ValueError("Fleet campaigns require at least one platform")
+        if artifact_transfer is not None and (parallel_slots is not None or fleet is not None):
+            raise ValueError(
+                "Pipelined artifact transfers are not supported by the parallel and fleet runners"
+            )
+        if artifact_transfer is not None and self._post_run_hooks:
+            raise ValueError(
+                "Pipelined artifact transfers are not supported with post-run hooks, which read "
+                "the record data of the run before it is transferred"
+            )
+        if adaptive_runs is not None:
+            if parallel_slots is not None or fleet is not None:
+                raise ValueError(
+                    "Adaptive runs are not supported by the parallel and fleet runners"
+                )
+            if adaptive_runs.min_runs > nb_runs:
+                raise ValueError(
+                    f"Adaptive runs: minimum number of runs ({adaptive_runs.min_runs}) "
+                    f"greater than nb_runs ({nb_runs})"
+                )
+
         self._configured = True
         self._experiment_name = experiment_name
         self._benchmark_name = benchmark_name
@@ -357,6 +609,40 @@ class Benchmark:
         self._debug = debug
         self._gdb = gdb
 
+        self._parallel_slots = parallel_slots
+        self._cpus_per_slot = cpus_per_slot
+        self._slot_pinning = slot_pinning
+        self._stop_on_first_finish = stop_on_first_finish
+
+        self._fsync_policy = fsync_policy
+        self._fsync_rows = fsync_rows
+
+        self._adaptive_runs = adaptive_runs
+        self._search = search
+
+        if duration_history is None:
+            duration_history = [self._csv_output_path.parent]
+        self._duration_history = list(duration_history)
+        self._record_run_durations = record_run_durations
+
+        self._switch_costs = dict(self.switch_costs())
+        if switch_costs is not None:
+            self._switch_costs.update(switch_costs)
+
+        self._fleet = fleet
+
+        if results_store is not None:
+            self._results_store = ResultStore(path=results_store)
+        self._thread_columns = thread_columns
+        self._artifact_transfer = artifact_transfer
+        self._journal_enabled = journal
+
+        if build_cache_dir is not None:
+            self._build_cache = BuildCache(
+                cache_dir=build_cache_dir,
+                max_size_bytes=build_cache_max_size_bytes,
+            )
+
     def valid_experiment_parameters(
         self,
         **kwargs,
@@ -393,30 +679,42 @@ class Benchmark:
         if self._total_nb_runs is None:
             nb_runs = self._nb_runs
 
-            nb_cases = 0
-
-            for record_params in self._variables:
-                build_variables, run_variables, _, _ = self._group_record_parameters(
-                    record_parameters=record_params,
+            if self._search is not None:
+                nb_cases = self._search.max_nb_records()
+            elif isinstance(self._variables, RecordSpace):
+                # validity only depends on build and run variables, no need to enumerate the others
+                nb_cases = self._variables.count(
+                    predicate=self._is_valid_point,
+                    variables_names=list(self.get_build_var_names())
+                    + list(self.get_run_var_names()),
+                )
+            else:
+                nb_cases = sum(
+                    1 for record_params in self._variables if self._is_valid_point(record_params)
                 )
-
-                experiment_point = {}
-                experiment_point.update(build_variables)
-                experiment_point.update(run_variables)
-
-                is_valid_point = self.valid_experiment_parameters(**experiment_point)
-                if is_valid_point:
-                    nb_cases += 1
 
             result = nb_cases * nb_runs
             self._total_nb_runs = result
 
         return self._total_nb_runs
 
+    def _is_valid_point(self, record_params: RecordParameters) -> bool:
+        build_variables, run_variables, _, _ = self._group_record_parameters(
+            record_parameters=record_params,
+        )
+
+        experiment_point = {}
+        experiment_point.update(build_variables)
+        experiment_point.update(run_variables)
+
+        return self.valid_experiment_parameters(**experiment_point)
+
     def expected_total_duration_seconds(self) -> int | None:
         """
         Compute the expected total time (in seconds) of this benchmark once configured.
-        If benchmark_duration_seconds is not set, it returns None.
+        If benchmark_duration_seconds is not set, the time is predicted by the duration model
+        learned from the previous results of the benchmark, and it returns None if there is no
+        such result.
 
         Returns:
             int | None:
@@ -424,83 +722,216 @@ class Benchmark:
         """
         self._check_config()
 
-        if self._benchmark_duration_seconds is None:
+        if self._benchmark_duration_seconds is not None:
+            bds = self._benchmark_duration_seconds
+            result = self.total_nb_runs() * bds
+            return result
+
+        if self._expected_total_seconds is None:
+            duration_model = self._get_duration_model()
+            if duration_model is None or self._search is not None:
+                return None
+
+            def predicted_seconds(record_params: RecordParameters) -> float:
+                if not self._is_valid_point(record_params):
+                    return 0.0
+                return duration_model.predict(record=record_params)
+
+            if isinstance(self._variables, RecordSpace):
+                # the prediction only depends on the informative variables and the validity on the
+                # build and run variables, the records sharing them are predicted once
+                record_seconds = self._variables.total(
+                    value=predicted_seconds,
+                    variables_names=list(self.get_build_var_names())
+                    + list(self.get_run_var_names())
+                    + duration_model.informative_variable_names(),
+                )
+            else:
+                record_seconds = sum(
+                    predicted_seconds(record_params) for record_params in self._variables
+                )
+            self._expected_total_seconds = round(record_seconds * self._nb_runs)
+
+        return self._expected_total_seconds
+
+    def _variable_names(self) -> List[str]:
+        """
+        Return the names of the variables of the records of the campaign.
+
+        Returns:
+            List[str]: the names of the variables, in order of appearance.
+        """
+        if isinstance(self._variables, RecordSpace):
+            return list(self._variables.variable_names())
+        return list({key: None for record in self._variables for key in record})
+
+    def _get_duration_model(self) -> Optional[DurationModel]:
+        """
+        Return the model of the duration of a run, learned from the previous results of the
+        benchmark, loading them on the first call.
+
+        Returns:
+            Optional[DurationModel]:
+                the duration model, None if there are no previous results with run durations.
+        """
+        if self._duration_model is None:
+            self._duration_model = DurationModel(variable_names=self._variable_names())
+            self._duration_model.add_results_lines(
+                results_lines=load_duration_history(
+                    paths=self._duration_history,
+                    benchmark_name=self._benchmark_name,
+                ),
+            )
+            if self._duration_model.nb_samples > 0:
+                print(
+                    f"[INFO] Duration model learned from "
+                    f"{self._duration_model.nb_samples} previous runs"
+                )
+
+        if self._duration_model.nb_samples == 0:
             return None
+        return self._duration_model
 
-        bds = self._benchmark_duration_seconds
-        result = self.total_nb_runs() * bds
-        return result
+    def _predicted_run_seconds(self, record_parameters: RecordParameters) -> Optional[float]:
+        if self._benchmark_duration_seconds is not None:
+            return self._benchmark_duration_seconds
+        duration_model = self._get_duration_model()
+        if duration_model is None:
+            return None
+        return duration_model.predict(record=record_parameters)
 
-    def get_execution_set(
+    def _remaining_seconds(self) -> Optional[int]:
+        """
+        Return the expected remaining time of the campaign, from the runs done so far.
+
+        Returns:
+            Optional[int]: the expected remaining time in seconds, None if it cannot be estimated.
+        """
+        if self._benchmark_duration_seconds is not None:
+            return (self.total_nb_runs() - self._nb_runs_done) * self._benchmark_duration_seconds
+        expected_total_seconds = self.expected_total_duration_seconds()
+        if expected_total_seconds is None:
+            return None
+        return max(0, round(expected_total_seconds - self._predicted_seconds_done))
+
+    def _count_run_done(self, record_parameters: RecordParameters) -> None:
+        self._nb_runs_done += 1
+        if self._benchmark_duration_seconds is None and self._duration_model is not None:
+            predicted_seconds = self._predicted_run_seconds(record_parameters=record_parameters)
+            if predicted_seconds is not None:
+                self._predicted_seconds_done += predicted_seconds
+
+    def _skip_runs(
         self,
-        continuing: bool,
-    ) -> Tuple[List[Dict[str, str]], bool]:
+        record_parameters: RecordParameters,
+        nb_runs: int,
+    ) -> None:
         """
-        Return the set of executions.
+        Remove the runs of a record that will not be executed, e.g. because its adaptive
+        repetitions converged before `nb_runs`, from the total number of runs and the expected
+        duration of the campaign.
 
         Args:
-            continuing (bool): whether caching of the results is enabled.
+            record_parameters (RecordParameters): parameters of the record.
+            nb_runs (int): number of runs of the record that will not be executed.
+        """
+        if nb_runs <= 0:
+            return
+        self._total_nb_runs = self.total_nb_runs() - nb_runs
+        if self._benchmark_duration_seconds is None and self._expected_total_seconds is not None:
+            predicted_seconds = self._predicted_run_seconds(record_parameters=record_parameters)
+            if predicted_seconds is not None:
+                self._expected_total_seconds = max(
+                    0, round(self._expected_total_seconds - predicted_seconds * nb_runs)
+                )
 
-        Returns:
-            Tuple[List[Dict[str, str]], bool]:
-                the execution set and whether to print comments (in the CSV header).
+    def pin_to_cpu_partition(
+        self,
+        partition: CpuSlot,
+        pinning: str = "taskset",
+    ) -> None:
         """
-        if not continuing or not self._csv_output_path.exists():
-            return [], True
+        Pin all the runs of the benchmark on the CPUs of the given partition of the platform, e.g.
+        when campaigns run in parallel on disjoint partitions. The partition is recorded in the
+        `cpu_partition` and `cpu_partition_cpus` constant columns of the results.
 
-        with open(self._csv_output_path, "r") as csv_output_file:
-            output_executions = [
-                line.strip()
-                for line in csv_output_file.readlines()
-                if not line.strip().startswith("#")
-            ]
+        Args:
+            partition (CpuSlot):
+                partition of the platform to run on.
+            pinning (str, optional):
+                utility used to pin the runs on the CPUs of the partition, one of "taskset",
+                "numactl" (that also binds the memory to the NUMA nodes of the partition) or
+                "none".
+                Defaults to "taskset".
 
-            if len(output_executions) > 0:
-                print_comments = False
-                header = output_executions[0]
-                records_lines = output_executions[1:]
+        Raises:
+            ValueError: if the parallel runner is enabled or the pinning utility is unknown.
+        """
+        self._check_config()
 
-                keys = header.split(";")
-                records = [dict(zip(keys, record_line.split(";"))) for record_line in records_lines]
-            else:
-                print_comments = True
-                records = []
+        if self._parallel_slots is not None:
+            raise ValueError("The parallel runner cannot run in a CPU partition")
+        if pinning not in SLOT_PINNINGS:
+            raise ValueError(f"Unknown slot pinning: {pinning}")
+
+        self._current_slot = partition
+        self._slot_pinning = pinning
 
-        return records, print_comments
+        constants = dict(self._constants) if self._constants is not None else {}
+        constants["cpu_partition"] = partition.slot_id
+        constants["cpu_partition_cpus"] = partition.cpu_list_str()
+        self._constants = constants
 
-    def filter_result_execution_set(
+    def get_execution_set(
         self,
-        record_params: Dict[str, Any],
-        executions_dict: List[Dict[str, str]],
-    ) -> List[Dict[str, str]]:
+        continuing: bool,
+    ) -> Tuple[ResultCache, bool]:
         """
-        Remove from executions_dict keys that are not parameters. I.e., remove result keys.
+        Return the set of executions already recorded in the CSV output file, indexed by their
+        parameters and repetition number.
 
         Args:
-            record_params (Dict[str, Any]):
-                parameters of the current record.
-            executions_dict (List[Dict[str, str]]):
-                currently recorded results of executions.
+            continuing (bool): whether caching of the results is enabled.
 
         Returns:
-            List[Dict[str, str]]:
-                the filtered executions_dict.
+            Tuple[ResultCache, bool]:
+                the execution set and whether to print comments (in the CSV header).
         """
-        if executions_dict:
-            for execution in executions_dict:
-                results_keys = execution.keys() - record_params.keys()
-                results_keys = results_keys - self._constants.keys()
-                results_keys = results_keys - {"experiment_name", "rep"}
-
-                pretty_keys = [k for k in results_keys if k.endswith("_pretty")]
-                for pretty_key in pretty_keys:
-                    results_keys.remove(pretty_key)
-
-                for key in results_keys:
-                    if key in execution:
-                        execution.pop(key)
+        constant_names = list(self._constants) if self._constants is not None else []
+        key_columns = ["experiment_name"] + constant_names + self._variable_names() + ["rep"]
+        if self._search is not None:
+            key_columns.insert(-1, SEARCH_ROUND_COLUMN)
+        if self._fleet is not None:
+            # a record is done whatever the platform of the fleet that ran it
+            key_columns = [c for c in key_columns if "hostname" != c]
+
+        result_cache = ResultCache(
+            csv_path=self._csv_output_path,
+            key_columns=key_columns,
+            value_column=self._adaptive_runs.metric if self._adaptive_runs is not None else None,
+        )
+        if not continuing:
+            return result_cache, True
+
+        journal = journal_path(csv_path=self._csv_output_path)
+        if self._journal_enabled and journal.is_file():
+            # the journal is the exact record of the finished runs, no need to parse the CSV
+            replay = JournalReplay.load(path=journal)
+            result_cache.load_runs(
+                columns=replay.columns,
+                runs=replay.finished_runs,
+                run_rows=replay.run_rows.values(),
+            )
+            nb_interrupted = sum(1 for run in replay.interrupted_runs if run not in result_cache)
+            if nb_interrupted:
+                print(f"[CONTINUING] {nb_interrupted} interrupted executions will be run again")
+        else:
+            result_cache.load()
+        print_comments = not result_cache.has_header
+        if not print_comments:
+            print(f"[CONTINUING] {len(result_cache)} executions already recorded")
 
-        return executions_dict
+        return result_cache, print_comments
 
     def run(
         self,
@@ -521,6 +952,15 @@ class Benchmark:
         """
         self._check_config()
 
+        if self._parallel_slots is not None and barrier is not None:
+            raise ValueError("The parallel runner cannot be synchronized with other campaigns")
+        if self._adaptive_runs is not None and barrier is not None:
+            raise ValueError("Adaptive runs cannot be synchronized with other campaigns")
+        if self._search is not None and barrier is not None:
+            raise ValueError("Search campaigns cannot be synchronized with other campaigns")
+        if self._fleet is not None and barrier is not None:
+            raise ValueError("Fleet campaigns cannot be synchronized with other campaigns")
+
         self._other_campaigns_seconds = other_campaigns_seconds
 
         self._configure_shared_libs()
@@ -534,9 +974,12 @@ class Benchmark:
             for tilt_variables, _ in tilt_gb:
                 self.build_tilt(**tilt_variables)
 
-        prebuild_seconds = self.prebuild_bench(
-            benchmark_duration_seconds=self._benchmark_duration_seconds,
-        )
+        prebuild_seconds = None
+        if self._fleet is None:
+            # each platform of a fleet is prebuilt by its own worker
+            prebuild_seconds = self.prebuild_bench(
+                benchmark_duration_seconds=self._benchmark_duration_seconds,
+            )
 
         expected_total_seconds = self.expected_total_duration_seconds()
 
@@ -545,13 +988,52 @@ class Benchmark:
             total_seconds=expected_total_seconds,
         )
 
-        with TimeMeasure() as run_duration:
-            executions_dict, print_comments_header = self.get_execution_set(continuing)
+        if self._journal_enabled:
+            # the rows of a CSV file written without journal are recorded in the new journal, the
+            # journal being the source of truth of the runs already done
+            seed_journal(
+                journal=journal_path(csv_path=self._csv_output_path),
+                csv_path=self._csv_output_path,
+            )
+            self._journal = CampaignJournal(
+                path=journal_path(csv_path=self._csv_output_path),
+                fsync_policy=self._fsync_policy,
+                fsync_rows=self._fsync_rows,
+            )
+        journal = self._journal if self._journal is not None else nullcontext()
+        self._result_sink = ResultSink(
+            path=self._csv_output_path,
+            fsync_policy=self._fsync_policy,
+            fsync_rows=self._fsync_rows,
+            comment_callback=self._journal.comment if self._journal is not None else None,
+        )
+        if "long" == self._thread_columns:
+            self._threads_sink = ResultSink(
+                path=threads_csv_path(csv_path=self._csv_output_path),
+                fsync_policy=self._fsync_policy,
+                fsync_rows=self._fsync_rows,
+            )
+        threads_sink = self._threads_sink if self._threads_sink is not None else nullcontext()
+        if self._results_store is not None:
+            # enumerating the variables of the records is linear in their number, done once
+            self._store_index_columns = self._variable_names() + ["rep"]
+        if self._artifact_transfer is not None and not self.platform.comm.is_local:
+            self._transfer_queue = TransferQueue(
+                comm=self.platform.comm,
+                policy=self._artifact_transfer,
+            )
+        transfer_queue = self._transfer_queue if self._transfer_queue is not None else nullcontext()
+        with journal, self._result_sink as result_sink, threads_sink, transfer_queue:
+            if self._threads_sink is not None and not self._threads_sink.path.stat().st_size:
+                self._threads_sink.write_line(line=CSV_SEPARATOR.join(THREADS_COLUMNS))
+                self._threads_sink.end_run()
 
-            if print_comments_header:
-                with open(self._csv_output_path, "a") as csv_output_file:
+            with TimeMeasure() as run_duration:
+                result_cache, print_comments_header = self.get_execution_set(continuing)
+
+                if print_comments_header:
                     self._log_headers(
-                        output_file=csv_output_file,
+                        output_file=result_sink,
                         experiment_name=self._experiment_name,
                         benchmark_duration_seconds=self._benchmark_duration_seconds,
                         nb_runs=self._nb_runs,
@@ -560,50 +1042,47 @@ class Benchmark:
                     )
                     if prebuild_seconds is not None:
                         self._log_prebuild_time(
-                            output_file=csv_output_file,
+                            output_file=result_sink,
                             prebuild_seconds=prebuild_seconds,
                         )
-
-            self._nb_runs_done = 0
-            self._first_line_is_printed = False
-
-            build_gb = list_groupby(
-                variables_names=self.get_build_var_names(),
-                bench_variables=self._variables,
-            )
-
-            for build_variables, build_run_variables in build_gb:
-                example_build_run_variables = build_run_variables[0]
-                actual_build_variables = {
-                    var_name: var_value
-                    for var_name, var_value in build_variables.items()
-                    if (
-                        var_name in example_build_run_variables
-                        and var_value == example_build_run_variables[var_name]
+                    result_sink.flush()
+
+                self._nb_runs_done = 0
+                self._predicted_seconds_done = 0.0
+                self._first_line_is_printed = False
+
+                if self._search is not None:
+                    # the search proposes its own records, round by round
+                    self._run_search(result_cache=result_cache, continuing=continuing)
+                elif self._fleet is not None:
+                    self._run_fleet(result_cache=result_cache, continuing=continuing)
+                else:
+                    self._run_all_records(
+                        result_cache=result_cache,
+                        continuing=continuing,
+                        barrier=barrier,
                     )
-                }
-                valid = self._build_one_bench(actual_build_variables)
-                if valid:
-                    for record_params in build_run_variables:
-                        executions_dict = self.filter_result_execution_set(
-                            record_params,
-                            executions_dict,
-                        )
-
-                        self._run_single_run(
-                            record_parameters=record_params,
-                            executions_dict=executions_dict,
-                            continuing=continuing,
-                            barrier=barrier,
-                        )
 
-        actual_total_seconds = run_duration.duration_seconds
+            actual_total_seconds = run_duration.duration_seconds
 
-        with open(self._csv_output_path, "a") as csv_output_file:
+            if self._build_cache is not None:
+                self._log_build_cache_stats(output_file=result_sink)
+            if self._transfer_queue is not None:
+                # waits for the last transfers, raising if some record data was not copied back
+                self._transfer_queue.close()
+                self._log_transfer_stats(output_file=result_sink)
             self._log_footers(
-                output_file=csv_output_file,
+                output_file=result_sink,
                 total_duration_seconds=actual_total_seconds,
             )
+        self._result_sink = None
+        self._threads_sink = None
+        self._journal = None
+        if self._transfer_queue is not None:
+            # the run directories are removed once transferred, only their parents remain
+            if self.platform.comm.isdir(self._temp_record_prefix()):
+                self.platform.comm.remove(self._temp_record_prefix(), recursive=True)
+            self._transfer_queue = None
 
         print(f"[INFO] Benchmark done. " f'Results are stored in: "{self._csv_output_path}"')
 
@@ -642,6 +1121,84 @@ class Benchmark:
         """
         raise NotImplementedError
 
+    def build_artifacts(self) -> List[PathType]:
+        """
+        Return the paths (files or directories) produced by `build_bench`, that the build cache
+        stores and restores. The build cache is not used for benchmarks that return no path.
+
+        Returns:
+            List[PathType]: the paths of the build artifacts.
+        """
+        return []
+
+    def build_cache_identity(
+        self,
+        build_variables: RecordParameters,
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Return everything that determines the artifacts built with the given build variables, from
+        which the key of the build in the build cache is computed: benchmark class, build
+        variables, constants, source revision (git commit and local changes), compiler, build
+        environment variables and paths of the artifacts. Benchmarks whose build depends on other
+        inputs should extend it.
+
+        Args:
+            build_variables (RecordParameters): variables given to `build_bench`.
+
+        Returns:
+            Optional[Dict[str, Any]]:
+                the identity of the build, or None if it cannot be determined (e.g. the source
+                directory is not a git repository), in which case the build is not cached.
+        """
+        if self._build_cache_base_identity is None:
+            src_sha = self._bench_src_git_command("git rev-parse HEAD")
+            src_changes = self._bench_src_git_command(
+                "git diff HEAD"
+            ) + self._bench_src_git_command("git status --porcelain")
+            try:
+                compiler = self.platform.comm.shell(
+                    command="cc --version",
+                    print_input=False,
+                    print_output=False,
+                ).splitlines()[0]
+            except (CalledProcessError, OSError, IndexError):
+                compiler = "N/A"
+
+            self._build_cache_base_identity = {
+                "benchmark": f"{type(self).__module__}.{type(self).__qualname__}",
+                "source_git_sha": src_sha,
+                "source_changes": hashlib.sha256(src_changes.encode()).hexdigest(),
+                "compiler": compiler,
+                "environment": {var: os.environ.get(var) for var in BUILD_ENV_VARS},
+            }
+
+        if "N/A" == self._build_cache_base_identity["source_git_sha"]:
+            return None
+
+        identity = dict(self._build_cache_base_identity)
+        identity.update(
+            {
+                "build_variables": {k: str_param(v) for k, v in build_variables.items()},
+                "constants": self._constants,
+                "benchmark_duration_seconds": self._benchmark_duration_seconds,
+                "artifacts": [str(pathlib.Path(a)) for a in self.build_artifacts()],
+            }
+        )
+        return identity
+
+    def switch_costs(self) -> SwitchCosts:
+        """
+        Return the cost (e.g. in seconds) of changing the value of each variable between two
+        consecutive records, such as restarting the server of a database benchmark when one of its
+        server-side variables changes. Rebuilding is accounted for automatically: build variables
+        without a declared cost are considered more expensive than all the declared ones.
+        No record is reordered when no cost is declared.
+
+        Returns:
+            SwitchCosts: the switch cost of each variable.
+        """
+        return {}
+
     def single_run(
         self,
         **kwargs,
@@ -689,6 +1246,30 @@ class Benchmark:
         """
         raise NotImplementedError
 
+    def get_stream_parser(
+        self,
+        build_variables: Dict[str, Any],
+        run_variables: Dict[str, Any],
+        **kwargs,
+    ) -> Optional[StreamParser]:
+        """
+        Return a new stream parser for the output of a run, or None to parse the complete output
+        with `parse_output_to_results`.
+        The stream parser is fed with each line of the output of the synchronous benchmark
+        commands (run with `run_bench_command`) while they run, and the records of the run are
+        `stream_parser.records()`; `parse_output_to_results` is then not called.
+
+        Args:
+            build_variables (Dict[str, Any]):
+                build variables and their values.
+            run_variables (Dict[str, Any]):
+                run variables and their values.
+
+        Returns:
+            Optional[StreamParser]: the stream parser of the run, or None.
+        """
+        return None
+
     def run_bench_command(
         self,
         run_command: SplitCommand,
@@ -736,6 +1317,11 @@ class Benchmark:
                 environment=environment,
             )
             return ""  # unreachable
+        if self._current_slot is not None:
+            wrapped_run_command = (
+                self._current_slot.command_prefix(pinning=self._slot_pinning) + wrapped_run_command
+            )
+
         if self._command_is_async():
             process = self._run_async_bench_command(
                 wrapped_run_command=wrapped_run_command,
@@ -746,15 +1332,22 @@ class Benchmark:
             return process
 
         # Synchronous case where the benchmark returns the output string:
-        output = self.platform.comm.shell(
-            command=wrapped_run_command,
-            current_dir=current_dir,
-            environment=wrapped_environment,
-            print_output=print_output,
-            timeout=timeout,
-            ignore_ret_codes=ignore_ret_codes,
-            ignore_any_error_code=ignore_any_error_code,
-        )
+        shell_kwargs = {
+            "command": wrapped_run_command,
+            "current_dir": current_dir,
+            "environment": wrapped_environment,
+            "print_output": print_output,
+            "timeout": timeout,
+            "ignore_ret_codes": ignore_ret_codes,
+            "ignore_any_error_code": ignore_any_error_code,
+        }
+        if self._stream_parser is not None:
+            return shell_streamed(
+                shell_fun=self.platform.comm.shell,
+                stream_parser=self._stream_parser,
+                **shell_kwargs,
+            )
+        output = self.platform.comm.shell(**shell_kwargs)
         return output
 
     def must_debug(self) -> bool:
@@ -873,6 +1466,192 @@ class Benchmark:
 
         return wrapped_command, wrapped_environment
 
+    def _run_all_records(
+        self,
+        result_cache: ResultCache,
+        continuing: bool,
+        barrier: Optional[Barrier],
+    ) -> None:
+        """
+        Run all the records of the campaign, grouped by build variables.
+
+        Args:
+            result_cache (ResultCache):
+                index of the executions already recorded.
+            continuing (bool):
+                whether caching of the results is enabled.
+            barrier (Optional[Barrier]):
+                if applicable, the barrier for the benchmark to wait.
+        """
+        if self._switch_costs:
+            build_gb = self._ordered_build_groups()
+        else:
+            build_gb = list_groupby(
+                variables_names=self.get_build_var_names(),
+                bench_variables=self._variables,
+            )
+
+        for build_variables, build_run_variables in build_gb:
+            valid = self._build_group(
+                build_variables=build_variables,
+                build_run_variables=build_run_variables,
+            )
+            if valid and self._parallel_slots is not None:
+                stopped = self._run_parallel_records(
+                    records=build_run_variables,
+                    result_cache=result_cache,
+                    continuing=continuing,
+                )
+                if stopped:
+                    break
+            elif valid:
+                for record_params in build_run_variables:
+                    self._run_single_run(
+                        record_parameters=record_params,
+                        result_cache=result_cache,
+                        continuing=continuing,
+                        barrier=barrier,
+                    )
+
+    def _ordered_build_groups(self) -> List[Tuple[RecordParameters, List[RecordParameters]]]:
+        """
+        Reorder the records to minimize the total cost of the transitions between consecutive
+        records, and group the consecutive records that share the same build variables. The
+        predicted saving compared to the default order is reported.
+
+        Returns:
+            List[Tuple[RecordParameters, List[RecordParameters]]]:
+                the build variables and records of each group, in running order.
+        """
+        build_var_names = self.get_build_var_names()
+        switch_costs = dict(self._switch_costs)
+        rebuild_cost = sum(switch_costs.values()) + 1.0
+        for var_name in build_var_names:
+            switch_costs.setdefault(var_name, rebuild_cost)
+
+        default_gb = list(
+            list_groupby(
+                variables_names=build_var_names,
+                bench_variables=self._variables,
+            )
+        )
+        default_order = [
+            record_params
+            for _, build_run_variables in default_gb
+            for record_params in build_run_variables
+        ]
+        records = order_records(records=default_order, switch_costs=switch_costs)
+
+        result = []
+        for _, group in itertools.groupby(
+            records,
+            key=lambda r: tuple(repr(r.get(var_name)) for var_name in build_var_names),
+        ):
+            group = list(group)
+            build_variables = {var_name: group[0].get(var_name) for var_name in build_var_names}
+            result.append((build_variables, group))
+
+        # the rebuild cost above is only a priority, the saving is reported with declared costs
+        default_cost = total_transition_cost(records=default_order, switch_costs=self._switch_costs)
+        cost = total_transition_cost(records=records, switch_costs=self._switch_costs)
+        saving_percent = 100.0 * (default_cost - cost) / default_cost if default_cost else 0.0
+        print(
+            f"[ORDERING] {len(result)} builds and a transition cost of {cost:g}, "
+            f"instead of {len(default_gb)} builds and {default_cost:g} "
+            f"(predicted saving: {default_cost - cost:g}, {saving_percent:.1f}%)"
+        )
+        return result
+
+    def _build_group(
+        self,
+        build_variables: RecordParameters,
+        build_run_variables: Iterable[RecordParameters],
+    ) -> bool:
+        """
+        Build the benchmark for a group of records sharing the same build variables.
+
+        Args:
+            build_variables (RecordParameters): build variables of the group.
+            build_run_variables (Iterable[RecordParameters]): records of the group.
+
+        Returns:
+            bool: if the build variables are valid to generate a benchmark.
+        """
+        actual_build_variables = self._actual_build_variables(
+            build_variables=build_variables,
+            example_record=next(iter(build_run_variables)),
+        )
+        return self._build_one_bench(actual_build_variables)
+
+    @staticmethod
+    def _actual_build_variables(
+        build_variables: RecordParameters,
+        example_record: RecordParameters,
+    ) -> RecordParameters:
+        # only keep the build variables that are actually set in the records of the group
+        return {
+            var_name: var_value
+            for var_name, var_value in build_variables.items()
+            if var_name in example_record and var_value == example_record[var_name]
+        }
+
+    def _run_search(
+        self,
+        result_cache: ResultCache,
+        continuing: bool,
+    ) -> None:
+        """
+        Run the records proposed by the search strategy, round by round, reporting the results of
+        each record to the strategy. The duration of the runs can change from one round to the
+        other.
+
+        Args:
+            result_cache (ResultCache):
+                index of the executions already recorded.
+            continuing (bool):
+                whether caching of the results is enabled.
+        """
+        search = self._search
+        default_duration_seconds = self._benchmark_duration_seconds
+        try:
+            records = search.next_records()
+            while records:
+                self._benchmark_duration_seconds = search.benchmark_duration_seconds(
+                    default=default_duration_seconds,
+                )
+                print(
+                    f"[SEARCH] Round {records[0][SEARCH_ROUND_COLUMN]}: {len(records)} records, "
+                    f"duration {self._benchmark_duration_seconds}s"
+                )
+
+                build_gb = list_groupby(
+                    variables_names=self.get_build_var_names(),
+                    bench_variables=records,
+                )
+                for build_variables, build_run_variables in build_gb:
+                    if not self._build_group(
+                        build_variables=build_variables,
+                        build_run_variables=build_run_variables,
+                    ):
+                        continue
+                    for record_params in build_run_variables:
+                        results_lines = self._run_single_run(
+                            record_parameters=record_params,
+                            result_cache=result_cache,
+                            continuing=continuing,
+                            barrier=None,
+                        )
+                        search.report(record=record_params, results_lines=results_lines)
+
+                records = search.next_records()
+        finally:
+            self._benchmark_duration_seconds = default_duration_seconds
+
+        best = search.best()
+        if best is not None:
+            best_record, best_value = best
+            print(f"[SEARCH] Best record: {best_record} ({search.metric}: {best_value})")
+
     def _build_one_bench(
         self,
         build_variables: Dict[str, Any],
@@ -889,12 +1668,26 @@ class Benchmark:
         if not self.valid_experiment_parameters(**build_variables):
             return False
 
+        artifacts = self.build_artifacts() if self._build_cache is not None else []
+        identity = None
+        if artifacts and self.platform.comm.is_local:
+            identity = self.build_cache_identity(build_variables=build_variables)
+
+        if identity is not None:
+            key = BuildCache.compute_key(identity=identity)
+            if self._build_cache.restore(key=key, artifacts=artifacts):
+                print(f"[BUILD CACHE] Restored build {key[:12]} for {build_variables}")
+                return True
+
         self.clean_bench()
         self.build_bench(
             benchmark_duration_seconds=self._benchmark_duration_seconds,
             constants=self._constants,
             **build_variables,
         )
+
+        if identity is not None:
+            self._build_cache.store(key=key, artifacts=artifacts, identity=identity)
         return True
 
     def _group_record_parameters(
@@ -929,25 +1722,10 @@ class Benchmark:
         }
         return build_variables, run_variables, tilt_variables, other_variables
 
-    def _is_result_cached(
-        self,
-        record_to_run: Dict[str, Any],
-        cached_records: Iterable[Dict[str, Any]],
-    ) -> bool:
-        for cached_record in cached_records:
-            same_record = True
-            for key in record_to_run:
-                if key in cached_record:
-                    if cached_record[key] != record_to_run[key]:
-                        same_record = False
-                        break
-            if same_record:
-                return True
-
     def _temp_record_prefix(self) -> pathlib.Path:
-        # TODO warning, does not support concurrent execution
-        # for this, need a unique record path for each benchmark run
-        return pathlib.Path(f"{get_benchkit_temp_folder_str()}/benchkit_record")
+        # The pid makes the prefix unique for each benchmark instance running concurrently, either
+        # in the parallel runner or in the campaigns of a parallel suite.
+        return pathlib.Path(f"{get_benchkit_temp_folder_str()}/benchkit_record-{os.getpid()}")
 
     def _temp_record_data_dir(self, record_data_dir: pathlib.Path):
         # The ./ prefix is necessary since pathlib ignores the first
@@ -959,22 +1737,32 @@ class Benchmark:
     def _run_single_run(
         self,
         record_parameters: Dict[str, Any],
-        executions_dict: Iterable[Dict[str, str]],
+        result_cache: ResultCache,
         continuing: bool,
         barrier: Optional[Barrier],
-    ) -> None:
+        run_ids: Optional[Iterable[int]] = None,
+    ) -> List[RecordResult]:
         """
         Run `nb_runs` times a single instance of the benchmark using the given record parameters.
+        With adaptive runs, the repetitions stop as soon as the confidence interval of the target
+        metric is tight enough.
 
         Args:
             record_parameters (Dict[str, Any]):
                 input parameters for the current record run.
-            executions_dict (Iterable[Dict[str, str]]):
-                current information that need to be stored in the record.
+            result_cache (ResultCache):
+                index of the executions already recorded.
             continuing (bool):
                 whether caching of the results is enabled.
             barrier (Optional[Barrier]):
                 if applicable, the barrier for the benchmark to wait.
+            run_ids (Optional[Iterable[int]], optional):
+                identifiers of the runs (repetitions) to execute. If None, all the `nb_runs` runs
+                are executed.
+                Defaults to None.
+
+        Returns:
+            List[RecordResult]: the result lines of all the runs executed.
         """
         (
             build_variables,
@@ -983,7 +1771,13 @@ class Benchmark:
             other_variables,
         ) = self._group_record_parameters(record_parameters=record_parameters)
 
-        for run_id in range(1, self._nb_runs + 1):
+        if run_ids is None:
+            run_ids = range(1, self._nb_runs + 1)
+        run_ids = list(run_ids)
+
+        adaptive_values = []
+        all_results_lines = []
+        for run_index, run_id in enumerate(run_ids):
             record_data_dir = self._record_data_dir(
                 record_parameters=record_parameters,
                 run_id=run_id,
@@ -1014,28 +1808,43 @@ class Benchmark:
             self._log_current_time_info(
                 total_nb_runs=self.total_nb_runs(),
                 nb_runs_done=self._nb_runs_done,
-                bench_duration=self._benchmark_duration_seconds,
+                remaining_seconds=self._remaining_seconds(),
                 other_campaigns_seconds=self._other_campaigns_seconds,
             )
 
-            def str_param(value: List[str] | str) -> str:
-                if isinstance(value, list):
-                    return f'[{", ".join(map(str, value))}]'
-                return str(value)
-
             execution_parameters = {k: str_param(v) for k, v in experiment_results.items()}
 
             # If this execution has already been done and continuing option is activated,
             # then skip
-            if continuing and self._is_result_cached(execution_parameters, executions_dict):
+            if continuing and execution_parameters in result_cache:
                 print("[CONTINUING] This execution has already been done. Skipping it")
-                self._nb_runs_done += 1
-                if not self._first_line_is_printed:
-                    self._first_line_is_printed = True
-                    with open(self._csv_output_path, "a") as csv_output_file:
-                        teeprint(content="# Continuing campaign execution", file=csv_output_file)
+                self._count_run_done(record_parameters=record_parameters)
+                with self._csv_output_lock():
+                    if not self._first_line_is_printed:
+                        self._first_line_is_printed = True
+                        self._tee_result_line(line="# Continuing campaign execution")
+                        self._result_sink.flush()
+                if self._adaptive_runs is not None and self._seed_adaptive_runs(
+                    cached_values=result_cache.values(execution_parameters=execution_parameters),
+                    values=adaptive_values,
+                ):
+                    print(
+                        "[ADAPTIVE] Confidence interval already reached after "
+                        f"{len(adaptive_values)} runs"
+                    )
+                    self._skip_runs(
+                        record_parameters=record_parameters,
+                        nb_runs=len(run_ids) - run_index - 1,
+                    )
+                    break
                 continue
 
+            journal_run_id = None
+            if self._journal is not None:
+                journal_run_id = self._journal.run_started(
+                    execution_parameters=execution_parameters
+                )
+
             # Replace record_data_dir with a temporary data directory for the
             # wrapper to write their files to. (Only if the host is remote)
             temp_record_data_dir = record_data_dir
@@ -1063,44 +1872,68 @@ class Benchmark:
                 if barrier_ret == 0:
                     barrier.reset()
 
-            single_run_return = self.single_run(
-                platform=self.platform,
-                benchmark_duration_seconds=self._benchmark_duration_seconds,
-                constants=self._constants,
+            self._stream_parser = self.get_stream_parser(
                 build_variables=build_variables,
-                record_data_dir=temp_record_data_dir,
-                other_variables=other_variables,
-                write_record_file_fun=wrdr,
-                **run_variables,
+                run_variables=run_variables,
             )
+            with TimeMeasure() as run_time:
+                single_run_return = self.single_run(
+                    platform=self.platform,
+                    benchmark_duration_seconds=self._benchmark_duration_seconds,
+                    constants=self._constants,
+                    build_variables=build_variables,
+                    record_data_dir=temp_record_data_dir,
+                    other_variables=other_variables,
+                    write_record_file_fun=wrdr,
+                    **run_variables,
+                )
 
-            if self._command_is_async():
-                single_run_process: AsyncProcess = single_run_return
-                for attachment in self._command_attachments:
-                    attachment(
-                        process=single_run_process,
-                        record_data_dir=record_data_dir,
-                    )
-                single_run_output = single_run_process.output()
-            else:
-                single_run_output: str = single_run_return
+                if self._command_is_async():
+                    single_run_process: AsyncProcess = single_run_return
+                    attached = [
+                        attachment(
+                            process=single_run_process,
+                            record_data_dir=record_data_dir,
+                        )
+                        for attachment in self._command_attachments
+                    ]
+                    run_concurrently(awaitables=[a for a in attached if inspect.isawaitable(a)])
+                    single_run_output = single_run_process.output()
+                else:
+                    single_run_output: str = single_run_return
 
             # If the host was remote, all the wrappers generated files on the remote machine and
             # these need to be copied back to the host machine.
-            if not self.platform.comm.is_local:
+            if self._transfer_queue is not None and record_data_dir is not None:
+                # copied in the background while the next runs execute, the record data directory
+                # is absolute
+                self._transfer_queue.submit(
+                    source_root=self._temp_record_prefix(),
+                    relative_path=temp_record_data_dir.relative_to(self._temp_record_prefix()),
+                    destination_root="/",
+                )
+            elif not self.platform.comm.is_local:
                 self.platform.comm.copy_to_host(f"{temp_record_data_dir}/", f"{record_data_dir}/")
                 # Clean up nicely after ourselves
                 self.platform.comm.remove(self._temp_record_prefix(), recursive=True)
 
-            single_run_results = self.parse_output_to_results(
-                command_output=single_run_output,
-                build_variables=build_variables,
-                run_variables=run_variables,
-                benchmark_duration_seconds=self._benchmark_duration_seconds,
-                record_data_dir=record_data_dir,
-            )
+            stream_parser, self._stream_parser = self._stream_parser, None
+            if stream_parser is None:
+                single_run_results = self.parse_output_to_results(
+                    command_output=single_run_output,
+                    build_variables=build_variables,
+                    run_variables=run_variables,
+                    benchmark_duration_seconds=self._benchmark_duration_seconds,
+                    # the record data of the run is still being transferred, parsing it must fail
+                    # rather than read an incomplete directory
+                    record_data_dir=record_data_dir if self._transfer_queue is None else None,
+                )
+            else:
+                if self._command_is_async():
+                    stream_parser.feed(output=single_run_output)
+                single_run_results = stream_parser.records()
 
-            self._nb_runs_done += 1
+            self._count_run_done(record_parameters=record_parameters)
             experiment_results_header = experiment_results
 
             if isinstance(single_run_results, list):
@@ -1113,6 +1946,10 @@ class Benchmark:
                 record_params_results = dict_union(experiment_results_header, single_run_results)
                 experiment_results_lines = [record_params_results]
 
+            if self._record_run_durations:
+                for xrline in experiment_results_lines:
+                    xrline[RUN_DURATION_COLUMN] = run_time.duration_seconds
+
             for post_run_hook in self._post_run_hooks:
                 hook_dict = post_run_hook(
                     experiment_results_lines=experiment_results_lines,
@@ -1123,47 +1960,598 @@ class Benchmark:
                     for xrline in experiment_results_lines:
                         xrline.update(hook_dict)
 
+            converged = False
+            if self._adaptive_runs is not None:
+                converged = self._update_adaptive_runs(
+                    experiment_results_lines=experiment_results_lines,
+                    values=adaptive_values,
+                )
+
             wrdr(
-                file_content=json.dumps(experiment_results_lines, indent=4).strip() + "\n",
+                file_content=json.dumps(experiment_results_lines) + "\n",
                 filename="experiment_results.json",
             )
 
-            with open(self._csv_output_path, "a") as csv_output_file:
-                for experiment_results_line in experiment_results_lines:
-                    sep = CSV_SEPARATOR
-                    if not self._first_line_is_printed:
-                        header_list = list(experiment_results_line.keys())
-                        current_thread_columns = [
-                            int(c.split("thread_")[-1])
-                            for c in header_list
-                            if c.startswith("thread_")
-                        ]
+            self._write_results_lines(
+                experiment_results_lines=experiment_results_lines,
+                journal_run_id=journal_run_id,
+            )
+            all_results_lines.extend(experiment_results_lines)
 
-                        thread_list = []
-                        if len(current_thread_columns) > 0:
-                            current_max_thread = max(current_thread_columns)
-                            thread_list = [
-                                f"thread_{t}"
-                                for t in range(current_max_thread + 1, self._max_nb_threads())
-                            ]
-                        header_unsorted = header_list + thread_list
-                        header_left = [e for e in header_unsorted if not e.startswith("thread_")]
-                        header_right = [e for e in header_unsorted if e.startswith("thread_")]
-                        header = sep.join(header_left + header_right)
-
-                        teeprint(content=header, file=csv_output_file)
-                        self._first_line_is_printed = True
-                        self._first_line_list = header_list
+            if converged:
+                print(f"[ADAPTIVE] Confidence interval reached after {len(adaptive_values)} runs")
+                self._skip_runs(
+                    record_parameters=record_parameters,
+                    nb_runs=len(run_ids) - run_index - 1,
+                )
+                break
 
-                    line_keys_left = [
-                        k for k in experiment_results_line.keys() if not k.startswith("thread_")
-                    ]
-                    line_keys_right = [
-                        k for k in experiment_results_line.keys() if k.startswith("thread_")
+        return all_results_lines
+
+    def _update_adaptive_runs(
+        self,
+        experiment_results_lines: List[RecordResult],
+        values: List[float],
+    ) -> bool:
+        """
+        Add the value of the target metric of the run that just finished to the values of the
+        record, and add the confidence interval and number of repetitions so far to the result
+        lines of the run. For multi-line records, the value of the run is the mean over its lines.
+
+        Args:
+            experiment_results_lines (List[RecordResult]): result lines of the run.
+            values (List[float]): values of the target metric of the previous runs of the record.
+
+        Raises:
+            ValueError: if the target metric is missing or not numeric in the result lines.
+
+        Returns:
+            bool: whether the record can stop being repeated.
+        """
+        adaptive_runs = self._adaptive_runs
+        values.append(
+            self._adaptive_value(
+                line_values=[line.get(adaptive_runs.metric) for line in experiment_results_lines]
+            )
+        )
+
+        ci_low, ci_high, ci_rel_width = adaptive_runs.evaluate(values=values)
+        low_column, high_column, rel_width_column = adaptive_runs.column_names()
+        for line in experiment_results_lines:
+            line[low_column] = ci_low
+            line[high_column] = ci_high
+            line[rel_width_column] = ci_rel_width
+            line["nb_reps"] = len(values)
+
+        return adaptive_runs.is_converged(nb_runs_done=len(values), relative_width=ci_rel_width)
+
+    def _seed_adaptive_runs(
+        self,
+        cached_values: List[str],
+        values: List[float],
+    ) -> bool:
+        """
+        Add the value of the target metric of a run already recorded in a continued campaign to the
+        values of the record, so that the record does not start its repetitions over.
+
+        Args:
+            cached_values (List[str]): recorded values of the target metric of the run.
+            values (List[float]): values of the target metric of the previous runs of the record.
+
+        Raises:
+            ValueError: if the target metric is missing or not numeric in the recorded results.
+
+        Returns:
+            bool: whether the record can stop being repeated.
+        """
+        adaptive_runs = self._adaptive_runs
+        values.append(self._adaptive_value(line_values=cached_values))
+        _, _, ci_rel_width = adaptive_runs.evaluate(values=values)
+        return adaptive_runs.is_converged(nb_runs_done=len(values), relative_width=ci_rel_width)
+
+    def _adaptive_value(self, line_values: List[Any]) -> float:
+        """
+        Return the value of the target metric of a run: the mean over its result lines.
+
+        Args:
+            line_values (List[Any]): values of the target metric in the result lines of the run.
+
+        Raises:
+            ValueError: if the target metric is missing or not numeric.
+
+        Returns:
+            float: the value of the target metric of the run.
+        """
+        metric = self._adaptive_runs.metric
+        try:
+            floats = [float(value) for value in line_values]
+        except (TypeError, ValueError) as err:
+            raise ValueError(
+                f'Adaptive runs: metric "{metric}" missing or not numeric in the results'
+            ) from err
+        if not floats:
+            raise ValueError(f'Adaptive runs: metric "{metric}" missing in the results')
+        return sum(floats) / len(floats)
+
+    def _write_results_lines(
+        self,
+        experiment_results_lines: List[RecordResult],
+        journal_run_id: Optional[str] = None,
+    ) -> None:
+        """
+        Append the result lines of a single run to the CSV output file, printing the CSV header
+        first if it is not already printed. The lines are written at once, when the run ends,
+        after they are recorded in the journal of the campaign.
+
+        Args:
+            experiment_results_lines (List[RecordResult]):
+                result lines to append.
+            journal_run_id (Optional[str], optional):
+                identifier of the run in the journal, if it was journaled.
+                Defaults to None.
+        """
+        with self._csv_output_lock():
+            if journal_run_id is not None:
+                self._journal.run_finished(run_id=journal_run_id, rows=experiment_results_lines)
+
+            thread_lines = []
+            if self._threads_sink is not None:
+                experiment_results_lines, thread_lines = split_thread_columns(
+                    rows=experiment_results_lines,
+                    run_id=journal_run_id if journal_run_id is not None else uuid.uuid4().hex,
+                )
+                for thread_line in thread_lines:
+                    self._threads_sink.write_line(
+                        line=CSV_SEPARATOR.join(str(thread_line[c]) for c in THREADS_COLUMNS)
+                    )
+                self._threads_sink.end_run()
+
+            if self._results_store is not None:
+                table = table_name(csv_path=self._csv_output_path)
+                self._results_store.insert_rows(
+                    table=table,
+                    rows=experiment_results_lines,
+                    index_columns=self._store_index_columns,
+                )
+                self._results_store.insert_rows(
+                    table=f"{table}_threads",
+                    rows=thread_lines,
+                    index_columns=[RUN_ID_COLUMN],
+                    register=False,
+                )
+
+            for experiment_results_line in experiment_results_lines:
+                sep = CSV_SEPARATOR
+                if not self._first_line_is_printed:
+                    header_list = list(experiment_results_line.keys())
+                    current_thread_columns = [
+                        int(c.split("thread_")[-1]) for c in header_list if c.startswith("thread_")
                     ]
-                    line_keys = line_keys_left + line_keys_right
-                    current_line = sep.join(str(experiment_results_line[key]) for key in line_keys)
-                    teeprint(content=current_line, file=csv_output_file)
+
+                    thread_list = []
+                    if len(current_thread_columns) > 0:
+                        current_max_thread = max(current_thread_columns)
+                        thread_list = [
+                            f"thread_{t}"
+                            for t in range(current_max_thread + 1, self._max_nb_threads())
+                        ]
+                    header_unsorted = header_list + thread_list
+                    header_left = [e for e in header_unsorted if not e.startswith("thread_")]
+                    header_right = [e for e in header_unsorted if e.startswith("thread_")]
+                    header = sep.join(header_left + header_right)
+
+                    self._tee_result_line(line=header)
+                    self._first_line_is_printed = True
+                    self._first_line_list = header_list
+
+                line_keys_left = [
+                    k for k in experiment_results_line.keys() if not k.startswith("thread_")
+                ]
+                line_keys_right = [
+                    k for k in experiment_results_line.keys() if k.startswith("thread_")
+                ]
+                line_keys = line_keys_left + line_keys_right
+                current_line = sep.join(str(experiment_results_line[key]) for key in line_keys)
+                self._tee_result_line(line=current_line)
+            self._result_sink.end_run()
+
+    def _tee_result_line(self, line: str) -> None:
+        print(line)
+        self._result_sink.write_line(line=line)
+
+    @contextmanager
+    def _csv_output_lock(self) -> Iterator[None]:
+        """
+        Serialize the accesses to the CSV output file between the instances of the parallel
+        runner. The "header is printed" flag is shared between instances while the lock is held.
+        It does nothing in sequential mode.
+        """
+        if self._csv_lock is None:
+            yield
+            return
+
+        with self._csv_lock:
+            self._first_line_is_printed = bool(self._csv_header_printed.value)
+            try:
+                yield
+            finally:
+                self._csv_header_printed.value = self._first_line_is_printed
+
+    def _run_parallel_records(
+        self,
+        records: Iterable[RecordParameters],
+        result_cache: ResultCache,
+        continuing: bool,
+    ) -> bool:
+        """
+        Run the given records (that share the same build) in parallel, each run being executed in
+        its own process, pinned on its own CPU slot. Runs are queued until a slot is free, the
+        runs predicted to be the longest by the duration model being started first.
+
+        Args:
+            records (Iterable[RecordParameters]):
+                records to run.
+            result_cache (ResultCache):
+                index of the executions already recorded.
+            continuing (bool):
+                whether caching of the results is enabled.
+
+        Raises:
+            RuntimeError: if some of the runs failed.
+
+        Returns:
+            bool: whether the runner was stopped because the first instance finished.
+        """
+        slots = get_cpu_slots(
+            platform=self.platform,
+            cpus_per_slot=self._cpus_per_slot,
+            nb_slots=self._parallel_slots if self._parallel_slots > 0 else None,
+        )
+        free_slots = deque(slots)
+
+        pending = deque()
+        for record_params in records:
+            for run_id in range(1, self._nb_runs + 1):
+                pending.append((record_params, run_id))
+
+        if self._benchmark_duration_seconds is None and self._get_duration_model() is not None:
+            # longest runs first, so that the last runs to finish are short ones
+            pending = deque(
+                sorted(
+                    pending,
+                    key=lambda run: self._predicted_run_seconds(record_parameters=run[0]),
+                    reverse=True,
+                )
+            )
+
+        print(f"[INFO] Parallel runner: {len(pending)} runs queued on {len(slots)} slots")
+
+        # Nothing must remain buffered in the sink when the instances are forked.
+        self._result_sink.flush()
+        mp_context = multiprocessing.get_context("fork")
+        self._csv_lock = mp_context.Lock()
+        self._csv_header_printed = mp_context.Value("b", self._first_line_is_printed)
+
+        running = {}
+        failed = []
+        stopped = False
+        while pending or running:
+            while pending and free_slots and not stopped and not failed:
+                record_params, run_id = pending.popleft()
+                slot = free_slots.popleft()
+                sys.stdout.flush()
+                sys.stderr.flush()
+                process = mp_context.Process(
+                    target=self._slot_worker,
+                    kwargs={
+                        "slot": slot,
+                        "record_parameters": record_params,
+                        "run_id": run_id,
+                        "result_cache": result_cache,
+                        "continuing": continuing,
+                    },
+                )
+                process.start()
+                running[process.sentinel] = (process, slot, record_params, run_id)
+
+            if not running:
+                break
+
+            for sentinel in multiprocessing.connection.wait(list(running)):
+                process, slot, record_params, run_id = running.pop(sentinel)
+                process.join()
+                free_slots.append(slot)
+                self._count_run_done(record_parameters=record_params)
+
+                if stopped:
+                    continue
+                if 0 != process.exitcode:
+                    failed.append((record_params, run_id, process.exitcode))
+                elif self._stop_on_first_finish:
+                    stopped = True
+                    pending.clear()
+                    print("[INFO] Parallel runner: first instance finished, stopping the others")
+                    for other_process, _, _, _ in running.values():
+                        self._kill_slot_worker(process=other_process)
+
+        self._first_line_is_printed = bool(self._csv_header_printed.value)
+        self._csv_lock = None
+        self._csv_header_printed = None
+
+        if failed:
+            failed_str = "\n".join(
+                f"  {record_params} (run {run_id}): exit code {exitcode}"
+                for record_params, run_id, exitcode in failed
+            )
+            raise RuntimeError(f"Parallel runner: some runs failed:\n{failed_str}")
+
+        return stopped
+
+    def _slot_worker(
+        self,
+        slot: CpuSlot,
+        record_parameters: RecordParameters,
+        run_id: int,
+        result_cache: ResultCache,
+        continuing: bool,
+    ) -> None:
+        # New session, so that the whole process tree of the instance can be stopped at once.
+        os.setsid()
+        signal.signal(signal.SIGTERM, self._slot_worker_sigterm)
+
+        self._current_slot = slot
+        self._slot_async_processes = []
+        print(f"[INFO] Slot {slot.slot_id} (CPUs {slot.cpu_list_str()}): run {run_id}")
+
+        # the exit handlers do not run in the worker processes, the connections it started to the
+        # platform are stopped explicitly
+        try:
+            self._run_single_run(
+                record_parameters=record_parameters,
+                result_cache=result_cache,
+                continuing=continuing,
+                barrier=None,
+                run_ids=[run_id],
+            )
+        finally:
+            self.platform.comm.close_session()
+
+    def _slot_worker_sigterm(self, signum: int, _frame) -> None:
+        # Asynchronous commands are started in their own session, stop them explicitly.
+        for process in self._slot_async_processes:
+            if not process.is_finished():
+                process.kill()
+        os._exit(128 + signum)
+
+    @staticmethod
+    def _kill_slot_worker(process: multiprocessing.Process) -> None:
+        try:
+            os.killpg(process.pid, signal.SIGTERM)
+        except ProcessLookupError:
+            pass
+
+    def _run_fleet(
+        self,
+        result_cache: ResultCache,
+        continuing: bool,
+    ) -> None:
+        """
+        Run all the records of the campaign on the platforms of the fleet, one worker process per
+        platform, each worker executing one run at a time and building the benchmark when the
+        build variables change.
+        The runs are first split into contiguous shards, one per platform, so that each platform
+        builds as few times as possible. A platform that finished its shard steals the last runs
+        of the largest remaining shard. The run in progress on a platform that becomes unreachable
+        is re-queued to the other platforms.
+
+        Args:
+            result_cache (ResultCache):
+                index of the executions already recorded.
+            continuing (bool):
+                whether caching of the results is enabled.
+
+        Raises:
+            RuntimeError: if some runs failed, or could not be executed as all platforms were lost.
+        """
+        if self._switch_costs:
+            build_gb = self._ordered_build_groups()
+        else:
+            build_gb = list_groupby(
+                variables_names=self.get_build_var_names(),
+                bench_variables=self._variables,
+            )
+        tasks = []
+        for build_variables, build_run_variables in build_gb:
+            build_run_variables = list(build_run_variables)
+            actual_build_variables = self._actual_build_variables(
+                build_variables=build_variables,
+                example_record=build_run_variables[0],
+            )
+            if self.valid_experiment_parameters(**actual_build_variables):
+                tasks.extend(
+                    (actual_build_variables, record, run_id)
+                    for record in build_run_variables
+                    for run_id in range(1, self._nb_runs + 1)
+                )
+
+        fleet = self._fleet
+        shard_size = -(-len(tasks) // len(fleet))
+        shards = [deque(tasks[i * shard_size : (i + 1) * shard_size]) for i in range(len(fleet))]
+        orphans = deque()
+
+        print(f"[FLEET] {len(tasks)} runs on {len(fleet)} platforms")
+
+        # Nothing must remain buffered in the sink when the workers are forked.
+        self._result_sink.flush()
+        mp_context = multiprocessing.get_context("fork")
+        self._csv_lock = mp_context.Lock()
+        self._csv_header_printed = mp_context.Value("b", self._first_line_is_printed)
+
+        workers = {}
+        for index, platform in enumerate(fleet):
+            connection, worker_connection = mp_context.Pipe()
+            sys.stdout.flush()
+            sys.stderr.flush()
+            process = mp_context.Process(
+                target=self._fleet_worker,
+                kwargs={
+                    "platform": platform,
+                    "connection": worker_connection,
+                    "result_cache": result_cache,
+                    "continuing": continuing,
+                },
+            )
+            process.start()
+            worker_connection.close()
+            # process, platform index, record in progress
+            workers[connection] = [process, index, None]
+
+        def next_task(index: int):
+            # re-queued runs first, unless they require a rebuild and the worker has its own runs
+            for task in orphans:
+                if task[0] == workers_build[index]:
+                    orphans.remove(task)
+                    return task
+            if shards[index]:
+                return shards[index].popleft()
+            if orphans:
+                return orphans.popleft()
+            # steal from the largest shard, preferably a run that does not require a rebuild
+            victims = sorted((shard for shard in shards if shard), key=len, reverse=True)
+            same_build = [v for v in victims if v[-1][0] == workers_build[index]]
+            victims = same_build + victims
+            return victims[0].pop() if victims else None
+
+        def stop_worker(connection) -> None:
+            process = workers.pop(connection)[0]
+            connection.close()
+            process.join()
+
+        failed = []
+        lost = []
+        idle = deque()
+        workers_build = [None for _ in fleet]
+        while workers:
+            for connection in multiprocessing.connection.wait(list(workers)):
+                _, index, task = workers[connection]
+                hostname = fleet[index].hostname
+                try:
+                    status, detail = connection.recv()
+                except EOFError:
+                    status, detail = "lost", "worker process exited"
+
+                if "lost" == status:
+                    print(f"[FLEET] Platform {hostname} lost ({detail})", file=sys.stderr)
+                    lost.append(hostname)
+                    if task is not None:
+                        orphans.append(task)
+                    stop_worker(connection)
+                    continue
+                if "failed" == status:
+                    failed.append((task, hostname, detail))
+                elif "done" == status:
+                    self._nb_runs_done += 1
+                workers[connection][2] = None
+                idle.append(connection)
+
+            # dispatch the records to the idle workers, or stop them when there is nothing left
+            while idle and not failed:
+                task = next_task(index=workers[idle[0]][1])
+                if task is None:
+                    break
+                connection = idle.popleft()
+                workers[connection][2] = task
+                workers_build[workers[connection][1]] = task[0]
+                connection.send(task)
+            if failed or all(w[2] is None for w in workers.values()):
+                while idle:
+                    connection = idle.popleft()
+                    connection.send(None)
+                    stop_worker(connection)
+
+        self._first_line_is_printed = bool(self._csv_header_printed.value)
+        self._csv_lock = None
+        self._csv_header_printed = None
+
+        if failed:
+            failed_str = "\n".join(
+                (
+                    f"  {task[1]} (run {task[2]}) on {hostname}: {detail}"
+                    if task is not None
+                    else f"  {hostname}: {detail}"
+                )
+                for task, hostname, detail in failed
+            )
+            raise RuntimeError(f"Fleet: some runs failed:\n{failed_str}")
+        nb_remaining = len(orphans) + sum(len(shard) for shard in shards)
+        if nb_remaining:
+            raise RuntimeError(
+                f"Fleet: all the platforms were lost ({', '.join(lost)}), "
+                f"{nb_remaining} runs were not executed"
+            )
+
+    def _fleet_worker(
+        self,
+        platform: Platform,
+        connection: multiprocessing.connection.Connection,
+        result_cache: ResultCache,
+        continuing: bool,
+    ) -> None:
+        self.platform = platform
+        constants = dict(self._constants) if self._constants is not None else {}
+        constants["hostname"] = platform.hostname
+        self._constants = constants
+
+        def fail(err: Exception) -> Tuple[str, str]:
+            status = "failed" if self._platform_is_reachable() else "lost"
+            return status, f"{type(err).__name__}: {err}"
+
+        # the exit handlers do not run in the worker processes, the connections it started to the
+        # platform are stopped explicitly
+        try:
+            try:
+                self.prebuild_bench(benchmark_duration_seconds=self._benchmark_duration_seconds)
+                message = ("ready", None)
+            except Exception as err:  # pylint: disable=broad-exception-caught
+                message = fail(err)
+
+            current_build_variables = None
+            while "lost" != message[0]:
+                connection.send(message)
+                task = connection.recv()
+                if task is None:
+                    return
+                build_variables, record_params, run_id = task
+                try:
+                    if build_variables != current_build_variables:
+                        current_build_variables = None
+                        self._build_one_bench(build_variables)
+                        current_build_variables = build_variables
+                    self._run_single_run(
+                        record_parameters=record_params,
+                        result_cache=result_cache,
+                        continuing=continuing,
+                        barrier=None,
+                        run_ids=[run_id],
+                    )
+                    message = ("done", None)
+                except Exception as err:  # pylint: disable=broad-exception-caught
+                    message = fail(err)
+            connection.send(message)
+        finally:
+            platform.comm.close_session()
+
+    def _platform_is_reachable(self) -> bool:
+        try:
+            self.platform.comm.shell(
+                command="true",
+                print_input=False,
+                print_output=False,
+                timeout=30,
+            )
+        except Exception:  # pylint: disable=broad-exception-caught
+            return False
+        return True
 
     def _record_data_dir(
         self,
@@ -1199,21 +2587,6 @@ class Benchmark:
             dashes_str = "#" * nb_dashes
             print(f"{dashes_str} {line}", file=output_file)
 
-        def git_command(command):
-            output = "N/A"
-            try:
-                if self.platform.comm.path_exists(path=self.bench_src_path):
-                    output = self.platform.comm.shell(
-                        command=command,
-                        current_dir=self.bench_src_path,
-                        print_input=False,
-                        print_output=False,
-                    )
-            except CalledProcessError:
-                pass
-            result = output.strip()
-            return result
-
         log_line(f"benchmark_campaign_name: {experiment_name}")
         log_line(f"benchmark_duration_seconds: {benchmark_duration_seconds}")
         log_line(f"nb_runs: {nb_runs}")
@@ -1222,15 +2595,23 @@ class Benchmark:
         log_line(f"date: {start_time}")
         log_line(f"date_val: {date_val}")
 
-        branch = git_command("git rev-parse --abbrev-ref HEAD")
-        sha = git_command("git rev-parse HEAD")
+        # both in a single command: "--abbrev-ref" only applies to the revisions after it
+        git_state = self._bench_src_git_command("git rev-parse HEAD --abbrev-ref HEAD")
+        sha, branch = (git_state.splitlines() + ["N/A", "N/A"])[:2]
         log_line(f"git_branch: {branch}")
         log_line(f"git_sha: {sha}")
 
-        kernel_full = self.platform.comm.shell(command="uname -a").strip()
+        facts = self.platform.facts(revalidate=True)
+        if facts is not None and facts.kernel:
+            kernel_full = facts.kernel
+        else:
+            kernel_full = self.platform.comm.shell(command="uname -a").strip()
         log_line(f"kernel: {kernel_full}")
 
-        boot_args = get_boot_args()
+        if facts is not None and facts.boot_args:
+            boot_args = facts.boot_args
+        else:
+            boot_args = get_boot_args()
         log_line(f"kernel_boot_args: {boot_args}")
 
         if self.tilt is not None:
@@ -1244,6 +2625,21 @@ class Benchmark:
             log_line(f"expected_duration_seconds: {expected_duration_seconds}")
             log_line(f"expected_duration_pretty: {expected_duration_pretty}")
 
+    def _bench_src_git_command(self, command: str) -> str:
+        output = "N/A"
+        try:
+            if self.platform.comm.path_exists(path=self.bench_src_path):
+                output = self.platform.comm.shell(
+                    command=command,
+                    current_dir=self.bench_src_path,
+                    print_input=False,
+                    print_output=False,
+                )
+        except CalledProcessError:
+            pass
+        result = output.strip()
+        return result
+
     def _command_is_async(self) -> bool:
         return len(self._command_attachments) > 0
 
@@ -1271,6 +2667,9 @@ class Benchmark:
             environment=wrapped_environment,
         )
 
+        if self._current_slot is not None:
+            self._slot_async_processes.append(current_process)
+
         return current_process
 
     def _get_run_variable_default(
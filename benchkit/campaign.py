@@ -18,19 +18,29 @@ from collections import defaultdict
 from typing import Any, Callable, Dict, Iterable, List, Optional
 
 from benchkit.benchmark import Benchmark
+from benchkit.communication.transfer import ArtifactTransfer
 from benchkit.lwchart import (
     DataframeProcessor,
     generate_chart_from_multiple_csvs,
     generate_chart_from_multiple_jsons,
     generate_chart_from_single_csv,
+    generate_chart_from_store,
     generate_global_csv_file,
     identical_dataframe,
 )
 from benchkit.platforms import Platform, get_current_platform
+from benchkit.platforms.slots import CpuSlot, get_cpu_partitions
+from benchkit.results.adaptive import AdaptiveRuns
+from benchkit.results.journal import JOURNAL_SUFFIX, journal_path, regenerate_csv
+from benchkit.results.store import table_name
+from benchkit.results.threads import THREADS_CSV_SUFFIX
+from benchkit.search import SearchStrategy
+from benchkit.utils.buildcache import DEFAULT_MAX_SIZE_BYTES
 from benchkit.utils.dir import parentdir
 from benchkit.utils.misc import get_benchkit_temp_folder_str, seconds2pretty
+from benchkit.utils.ordering import SwitchCosts
 from benchkit.utils.types import Constants, PathType, Pretty
-from benchkit.utils.variables import cartesian_product
+from benchkit.utils.variables import RecordSpace
 
 _BENCHKIT_CAMPAIGN_CMD_FILE = f"{get_benchkit_temp_folder_str()}/benchkit-campaign.sh"
 
@@ -80,6 +90,26 @@ class Campaign:
             pretty_variables=params.get("pretty"),
             debug=debug,
             gdb=gdb,
+            parallel_slots=params.get("parallel_slots"),
+            cpus_per_slot=params.get("cpus_per_slot", 1),
+            slot_pinning=params.get("slot_pinning", "taskset"),
+            stop_on_first_finish=params.get("stop_on_first_finish", False),
+            fsync_policy=params.get("fsync_policy", "run"),
+            fsync_rows=params.get("fsync_rows", 100),
+            build_cache_dir=params.get("build_cache_dir"),
+            build_cache_max_size_bytes=params.get(
+                "build_cache_max_size_bytes", DEFAULT_MAX_SIZE_BYTES
+            ),
+            adaptive_runs=params.get("adaptive_runs"),
+            search=params.get("search"),
+            duration_history=params.get("duration_history"),
+            record_run_durations=params.get("record_run_durations", True),
+            switch_costs=params.get("switch_costs"),
+            fleet=params.get("fleet"),
+            results_store=params.get("results_store"),
+            thread_columns=params.get("thread_columns", "wide"),
+            artifact_transfer=params.get("artifact_transfer"),
+            journal=params.get("journal", True),
         )
 
     def csv_file(
@@ -138,7 +168,17 @@ class Campaign:
         if self._continuing:
             # Remove date from csv_output_file and search if any file already exists
             csv_output_file_no_date = "_".join(str(csv_output_file).split("_")[:-2])
-            csv_output_cur_files = glob.glob(f"{csv_output_file_no_date}*.csv")
+            # prefer the campaigns that have a journal, the exact record of their progress
+            csv_output_cur_files = [
+                path[: -len(JOURNAL_SUFFIX)]
+                for path in glob.glob(f"{csv_output_file_no_date}*.csv{JOURNAL_SUFFIX}")
+            ]
+            if not csv_output_cur_files:
+                csv_output_cur_files = [
+                    path
+                    for path in glob.glob(f"{csv_output_file_no_date}*.csv")
+                    if not path.endswith(THREADS_CSV_SUFFIX)
+                ]
 
             if csv_output_cur_files:
                 # Note: Sort of output files is likely unnecessary
@@ -152,6 +192,28 @@ class Campaign:
         csv_output_path = csv_output_file.resolve()
         return csv_output_path
 
+    def regenerate_csv(self) -> int:
+        """
+        Rewrite the CSV output file of this campaign from its journal, e.g. after the CSV file was
+        truncated or corrupted by an interrupted campaign. The runs that were interrupted are not
+        included.
+
+        Raises:
+            FileNotFoundError: if the campaign has no journal (it was run with `journal=False`).
+
+        Returns:
+            int: the number of result rows written.
+        """
+        csv_path = self.csv_output_abs_path()
+        journal = journal_path(csv_path=csv_path)
+        if not journal.is_file():
+            raise FileNotFoundError(f"No journal to regenerate the CSV file from: {journal}")
+        return regenerate_csv(
+            journal=journal,
+            csv_path=csv_path,
+            thread_columns=self.parameters.get("thread_columns", "wide"),
+        )
+
     def base_data_dir(self) -> Optional[PathType]:
         """
         Return the path of the base data directory where the data associated to each run of this
@@ -250,6 +312,7 @@ class Campaign:
         self,
         plot_name: str | List[str],
         prefix: str = "",
+        pivot_threads: bool = True,
         **kwargs,
     ) -> None:
         """
@@ -260,6 +323,10 @@ class Campaign:
                 name of the (seaborn) plot.
             prefix (str, optional):
                 prefix for the filename of the chart to generate. Defaults to "".
+            pivot_threads (bool, optional):
+                whether to add back the per-thread columns of a campaign with the long layout of
+                the thread columns, read from its per-thread table.
+                Defaults to True.
         """
         base_data_dir = self.base_data_dir()
         if base_data_dir is None:
@@ -271,11 +338,25 @@ class Campaign:
 
         result_csv_path = os.path.abspath(self.parameters.get("result_csv_path"))
 
+        results_store = self.parameters.get("results_store")
+        if results_store is not None:
+            generate_chart_from_store(
+                store_path=results_store,
+                tables=[table_name(csv_path=result_csv_path)],
+                output_dir=base_data_dir,
+                plot_name=plot_name,
+                prefix=prefix,
+                pivot_threads=pivot_threads,
+                **kwargs,
+            )
+            return
+
         generate_chart_from_single_csv(
             csv_pathname=result_csv_path,
             output_dir=base_data_dir,
             plot_name=plot_name,
             prefix=prefix,
+            pivot_threads=pivot_threads,
             **kwargs,
         )
 
@@ -304,6 +385,17 @@ class Campaign:
             shutil.move(_BENCHKIT_CAMPAIGN_CMD_FILE, dst_path)
 
 
+def _campaign_run_in_partition(
+    campaign: Campaign,
+    partition: CpuSlot,
+    pinning: str,
+    barrier: Optional[multiprocessing.Barrier],
+) -> None:
+    # runs in the process of the campaign, so that campaigns sharing a benchmark are not affected
+    campaign._benchmark.pin_to_cpu_partition(partition=partition, pinning=pinning)
+    campaign.campaign_run(other_campaigns_seconds=0, barrier=barrier)
+
+
 class CampaignSuite:
     """
     Represent a sequential suite of campaigns.
@@ -340,6 +432,8 @@ class CampaignSuite:
     def run_suite(
         self,
         parallel: bool = False,
+        partition_domain: Optional[str] = None,
+        partition_pinning: str = "taskset",
     ) -> None:
         """
         Run the suite of campaign, running sequentially or in parallel each campaign in the suite.
@@ -347,10 +441,43 @@ class CampaignSuite:
         Args:
             parallel (bool, optional):
                 whether to run campaigns in the suite in parallel. Defaults to False.
+            partition_domain (Optional[str], optional):
+                if not None, when running in parallel, the platform is split into one disjoint
+                partition of CPUs per campaign, aligned on this topology domain ("numa", "cache"
+                or "cpu"), and each campaign runs pinned on its own partition.
+                Defaults to None.
+            partition_pinning (str, optional):
+                utility used to pin the campaigns on their partition, one of "taskset",
+                "numactl" (that also binds the memory to the NUMA nodes of the partition) or
+                "none".
+                Defaults to "taskset".
+
+        Raises:
+            ValueError:
+                if a partition domain is given for a sequential suite, or for campaigns that do not
+                run on the same platform.
         """
         for campaign in self._campaigns:
             campaign._benchmark.check_dependencies()
 
+        partitions = None
+        if partition_domain is not None:
+            if not parallel:
+                raise ValueError("Partitioning the platform requires a parallel suite")
+            platforms = {c._benchmark.platform.hostname for c in self._campaigns}
+            if len(platforms) > 1:
+                raise ValueError("Partitioned campaigns must all run on the same platform")
+            partitions = get_cpu_partitions(
+                platform=self._campaigns[0]._benchmark.platform,
+                nb_partitions=len(self._campaigns),
+                domain=partition_domain,
+            )
+            for campaign, partition in zip(self._campaigns, partitions):
+                print(
+                    f"[INFO] Campaign {campaign.parameters['experiment_name']}: "
+                    f"partition {partition.slot_id} (CPUs {partition.cpu_list_str()})"
+                )
+
         durations = self.durations()
 
         if None in durations:  # if benchmark_duration_seconds is not used in campaign
@@ -364,6 +491,14 @@ class CampaignSuite:
         if not parallel:
             for campaign, remaining_seconds in zip(self._campaigns, remaining):
                 campaign.campaign_run(other_campaigns_seconds=remaining_seconds, barrier=None)
+        elif partitions is not None:
+            for campaign, partition in zip(self._campaigns, partitions):
+                p = multiprocessing.Process(
+                    target=_campaign_run_in_partition,
+                    args=(campaign, partition, partition_pinning, barrier),
+                )
+                process_list.append(p)
+                p.start()
         else:
             for campaign in self._campaigns:
                 p = multiprocessing.Process(
@@ -403,6 +538,7 @@ class CampaignSuite:
         plot_name: str | List[str],
         process_dataframe: DataframeProcessor = identical_dataframe,
         use_json=False,
+        pivot_threads: bool = True,
         **kwargs,
     ) -> None:
         """Generate a global graph for all the campaigns in the suite.
@@ -413,6 +549,10 @@ class CampaignSuite:
             process_dataframe (DataframeProcessor, optional):
                 callback function to process the dataframe before it is plotted.
                 Defaults to identical_dataframe.
+            pivot_threads (bool, optional):
+                whether to add back the per-thread columns of the campaigns with the long layout
+                of the thread columns, read from their per-thread tables (not for JSON files).
+                Defaults to True.
         """
         campaign_paths = [bdd for c in self._campaigns if (bdd := c.base_data_dir()) is not None]
         suite_path_tentative = os.path.commonprefix(campaign_paths)
@@ -436,15 +576,43 @@ class CampaignSuite:
                 process_dataframe=process_dataframe,
                 **kwargs,
             )
+        elif (results_store := self._common_results_store()) is not None:
+            generate_chart_from_store(
+                store_path=results_store,
+                tables=[table_name(csv_path=p) for p in self.result_csv_paths],
+                plot_name=plot_name,
+                output_dir=suite_path,
+                process_dataframe=process_dataframe,
+                pivot_threads=pivot_threads,
+                **kwargs,
+            )
         else:
             generate_chart_from_multiple_csvs(
                 csv_pathnames=self.result_csv_paths,
                 plot_name=plot_name,
                 output_dir=suite_path,
                 process_dataframe=process_dataframe,
+                pivot_threads=pivot_threads,
                 **kwargs,
             )
 
+    def _common_results_store(self) -> Optional[PathType]:
+        """
+        Return the results store shared by all the campaigns of the suite, if any.
+
+        Returns:
+            Optional[PathType]: the path of the results store, None if the campaigns do not all
+                                write their results in the same store.
+        """
+        stores = {
+            pathlib.Path(store).resolve() if store is not None else None
+            for c in self._campaigns
+            for store in [c.parameters.get("results_store")]
+        }
+        if 1 != len(stores):
+            return None
+        return stores.pop()
+
     def generate_graphs(
         self,
         **kwargs,
@@ -511,6 +679,24 @@ class CampaignTemplate(Campaign):
         results_dir: Optional[PathType] = None,
         pretty: Pretty | None = None,
         symlink_latest: bool = False,
+        parallel_slots: int | None = None,
+        cpus_per_slot: int = 1,
+        slot_pinning: str = "taskset",
+        stop_on_first_finish: bool = False,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+        build_cache_dir: Optional[PathType] = None,
+        build_cache_max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
+        search: Optional[SearchStrategy] = None,
+        duration_history: Optional[Iterable[PathType]] = None,
+        record_run_durations: bool = True,
+        switch_costs: Optional[SwitchCosts] = None,
+        fleet: Optional[Iterable[Platform]] = None,
+        results_store: Optional[PathType] = None,
+        thread_columns: str = "wide",
+        artifact_transfer: Optional[ArtifactTransfer] = None,
+        journal: bool = True,
     ):
         csv_filename = self.csv_file(
             campaign_name="benchmark",
@@ -531,9 +717,13 @@ class CampaignTemplate(Campaign):
         if constants is not None:
             all_constants.update(constants)
 
-        list_variables = list(variables)
-
-        variable_names = {key for record in list_variables for key in record}
+        if isinstance(variables, RecordSpace):
+            # keep the record space lazy, records are generated when the benchmark iterates them
+            list_variables = variables
+            variable_names = set(variables.variable_names())
+        else:
+            list_variables = list(variables)
+            variable_names = {key for record in list_variables for key in record}
         constant_names = set(all_constants)
         common_names = constant_names.intersection(variable_names)
 
@@ -559,6 +749,43 @@ class CampaignTemplate(Campaign):
         if pretty is not None:
             self.parameters["pretty"] = pretty
 
+        if parallel_slots is not None:
+            self.parameters["parallel_slots"] = parallel_slots
+            self.parameters["cpus_per_slot"] = cpus_per_slot
+            self.parameters["slot_pinning"] = slot_pinning
+            self.parameters["stop_on_first_finish"] = stop_on_first_finish
+
+        self.parameters["fsync_policy"] = fsync_policy
+        self.parameters["fsync_rows"] = fsync_rows
+        self.parameters["record_run_durations"] = record_run_durations
+        self.parameters["thread_columns"] = thread_columns
+        self.parameters["journal"] = journal
+
+        if build_cache_dir is not None:
+            self.parameters["build_cache_dir"] = build_cache_dir
+            self.parameters["build_cache_max_size_bytes"] = build_cache_max_size_bytes
+
+        if adaptive_runs is not None:
+            self.parameters["adaptive_runs"] = adaptive_runs
+
+        if search is not None:
+            self.parameters["search"] = search
+
+        if duration_history is not None:
+            self.parameters["duration_history"] = duration_history
+
+        if switch_costs is not None:
+            self.parameters["switch_costs"] = switch_costs
+
+        if fleet is not None:
+            self.parameters["fleet"] = fleet
+
+        if results_store is not None:
+            self.parameters["results_store"] = results_store
+
+        if artifact_transfer is not None:
+            self.parameters["artifact_transfer"] = artifact_transfer
+
         super().__init__(
             debug=debug,
             gdb=gdb,
@@ -589,6 +816,23 @@ class CampaignIterateVariables(CampaignTemplate):
         results_dir: Optional[PathType] = None,
         pretty: Pretty | None = None,
         symlink_latest: bool = False,
+        parallel_slots: int | None = None,
+        cpus_per_slot: int = 1,
+        slot_pinning: str = "taskset",
+        stop_on_first_finish: bool = False,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+        build_cache_dir: Optional[PathType] = None,
+        build_cache_max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
+        duration_history: Optional[Iterable[PathType]] = None,
+        record_run_durations: bool = True,
+        switch_costs: Optional[SwitchCosts] = None,
+        fleet: Optional[Iterable[Platform]] = None,
+        results_store: Optional[PathType] = None,
+        thread_columns: str = "wide",
+        artifact_transfer: Optional[ArtifactTransfer] = None,
+        journal: bool = True,
     ):
         super().__init__(
             name=name,
@@ -604,6 +848,23 @@ class CampaignIterateVariables(CampaignTemplate):
             results_dir=results_dir,
             pretty=pretty,
             symlink_latest=symlink_latest,
+            parallel_slots=parallel_slots,
+            cpus_per_slot=cpus_per_slot,
+            slot_pinning=slot_pinning,
+            stop_on_first_finish=stop_on_first_finish,
+            fsync_policy=fsync_policy,
+            fsync_rows=fsync_rows,
+            build_cache_dir=build_cache_dir,
+            build_cache_max_size_bytes=build_cache_max_size_bytes,
+            adaptive_runs=adaptive_runs,
+            duration_history=duration_history,
+            record_run_durations=record_run_durations,
+            switch_costs=switch_costs,
+            fleet=fleet,
+            results_store=results_store,
+            thread_columns=thread_columns,
+            artifact_transfer=artifact_transfer,
+            journal=journal,
         )
 
 
@@ -630,11 +891,25 @@ class CampaignCartesianProduct(CampaignTemplate):
         pretty: Pretty | None = None,
         filter_func: Optional[Callable[[Dict[str, Any]], bool]] = None,
         symlink_latest: bool = False,
+        parallel_slots: int | None = None,
+        cpus_per_slot: int = 1,
+        slot_pinning: str = "taskset",
+        stop_on_first_finish: bool = False,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+        build_cache_dir: Optional[PathType] = None,
+        build_cache_max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
+        duration_history: Optional[Iterable[PathType]] = None,
+        record_run_durations: bool = True,
+        switch_costs: Optional[SwitchCosts] = None,
+        fleet: Optional[Iterable[Platform]] = None,
+        results_store: Optional[PathType] = None,
+        thread_columns: str = "wide",
+        artifact_transfer: Optional[ArtifactTransfer] = None,
+        journal: bool = True,
     ):
-        records_gen = cartesian_product(variables)
-
-        if filter_func:
-            records_gen = filter(filter_func, records_gen)
+        records_gen = RecordSpace(variables=variables, filter_func=filter_func)
 
         super().__init__(
             name=name,
@@ -650,4 +925,82 @@ class CampaignCartesianProduct(CampaignTemplate):
             results_dir=results_dir,
             pretty=pretty,
             symlink_latest=symlink_latest,
+            parallel_slots=parallel_slots,
+            cpus_per_slot=cpus_per_slot,
+            slot_pinning=slot_pinning,
+            stop_on_first_finish=stop_on_first_finish,
+            fsync_policy=fsync_policy,
+            fsync_rows=fsync_rows,
+            build_cache_dir=build_cache_dir,
+            build_cache_max_size_bytes=build_cache_max_size_bytes,
+            adaptive_runs=adaptive_runs,
+            duration_history=duration_history,
+            record_run_durations=record_run_durations,
+            switch_costs=switch_costs,
+            fleet=fleet,
+            results_store=results_store,
+            thread_columns=thread_columns,
+            artifact_transfer=artifact_transfer,
+            journal=journal,
+        )
+
+
+class CampaignSearch(CampaignTemplate):
+    """
+    Campaign where the space of the variables is explored by a search strategy (e.g. successive
+    halving or a tree-structured Parzen estimator) to find the best records, instead of running all
+    the combinations. Every evaluated record is written to the CSV output file, with the round of
+    the search in the `search_round` column.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        benchmark: Benchmark,
+        nb_runs: int,
+        search: SearchStrategy,
+        constants: Constants,
+        debug: bool,
+        gdb: bool,
+        enable_data_dir: bool,
+        benchmark_duration_seconds: Optional[int] = None,
+        results_dir: Optional[PathType] = None,
+        pretty: Pretty | None = None,
+        symlink_latest: bool = False,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+        build_cache_dir: Optional[PathType] = None,
+        build_cache_max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+        adaptive_runs: Optional[AdaptiveRuns] = None,
+        record_run_durations: bool = True,
+        results_store: Optional[PathType] = None,
+        thread_columns: str = "wide",
+        artifact_transfer: Optional[ArtifactTransfer] = None,
+        journal: bool = True,
+    ):
+        super().__init__(
+            name=name,
+            benchmark=benchmark,
+            nb_runs=nb_runs,
+            variables=RecordSpace(variables=search.variables()),
+            constants=constants,
+            debug=debug,
+            gdb=gdb,
+            enable_data_dir=enable_data_dir,
+            continuing=False,
+            benchmark_duration_seconds=benchmark_duration_seconds,
+            results_dir=results_dir,
+            pretty=pretty,
+            symlink_latest=symlink_latest,
+            fsync_policy=fsync_policy,
+            fsync_rows=fsync_rows,
+            build_cache_dir=build_cache_dir,
+            build_cache_max_size_bytes=build_cache_max_size_bytes,
+            adaptive_runs=adaptive_runs,
+            search=search,
+            record_run_durations=record_run_durations,
+            results_store=results_store,
+            thread_columns=thread_columns,
+            artifact_transfer=artifact_transfer,
+            journal=journal,
         )
@@ -8,6 +8,7 @@ from typing import Any, Dict
 
 import pandas as pd
 
+from benchkit.results.threads import pivot_thread_columns, threads_csv_path
 from benchkit.utils.types import PathType
 
 
@@ -29,11 +30,17 @@ def fairness_factor(row: Dict[str, Any]) -> float:
     return result
 
 
-def get_dataframe(csv_path: PathType) -> pd.DataFrame:
+def get_dataframe(
+    csv_path: PathType,
+    pivot_threads: bool = True,
+) -> pd.DataFrame:
     """Get dataframe from CSV file, filtering the comment and assuming the "comma" is a ";".
 
     Args:
         csv_path (PathType): path to the CSV file containing the results.
+        pivot_threads (bool, optional): whether to add back the per-thread columns of a campaign
+            with the long layout of the thread columns, read from its per-thread table.
+            Defaults to True.
 
     Returns:
         pd.DataFrame: dataframe holding the results.
@@ -44,6 +51,10 @@ def get_dataframe(csv_path: PathType) -> pd.DataFrame:
         comment="#",
         engine="python",
     )
+    threads_path = threads_csv_path(csv_path=csv_path)
+    if pivot_threads and threads_path.is_file():
+        df = pivot_thread_columns(df=df, threads_df=pd.read_csv(threads_path, sep=";"))
+
     if "global_count" in df.columns and "duration" in df.columns:
         df["throughput"] = df["global_count"] / df["duration"]
 
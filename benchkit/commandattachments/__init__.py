@@ -14,7 +14,8 @@ def wait_for_output(
     max_iterations = max_wait_s * poll_rate_rate
 
     for _ in range(max_iterations):
-        if any((platform.comm.file_size(file) > 0) for file in output_files):
+        stats = platform.comm.stat_paths(paths=output_files)
+        if any(stat.size > 0 for stat in stats.values()):
             break
         time.sleep(1 / poll_rate_rate)
     else:
@@ -0,0 +1,81 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Command wrapper running each run of the benchmark in its own transient cgroup v2 (see
+`benchkit.helpers.linux.cgroup`), with the CPU and memory limits given by the `cgroup_cpu_max` and
+`cgroup_memory_max` run variables, and adding the resource accounting of the cgroup to the results
+with its post-run hook.
+
+Put the wrapper first in the list of wrappers to also account the other wrappers (e.g. perf), or
+last to only account the benchmark command.
+"""
+
+from typing import List, Optional
+
+from benchkit.benchmark import RecordResult, WriteRecordFileFunction
+from benchkit.helpers.linux.cgroup import DEFAULT_PARENT, CgroupSandbox, RunCgroup
+from benchkit.platforms import Platform, get_current_platform
+from benchkit.utils.types import PathType
+
+from . import CommandWrapper
+
+
+class CgroupWrap(CommandWrapper):
+    """Command wrapper running the benchmark command in a transient cgroup."""
+
+    def __init__(
+        self,
+        platform: Platform | None = None,
+        parent: str = DEFAULT_PARENT,
+        privileged: bool = False,
+    ):
+        super().__init__()
+        self.platform = platform if platform is not None else get_current_platform()
+        self._sandbox = CgroupSandbox(
+            comm=self.platform.comm,
+            parent=parent,
+            privileged=privileged,
+        )
+        self._run_cgroup: Optional[RunCgroup] = None
+
+    def command_prefix(  # pylint: disable=arguments-differ
+        self,
+        cgroup_cpu_max: Optional[float] = None,
+        cgroup_memory_max: Optional[int | str] = None,
+        **kwargs,
+    ) -> List[str]:
+        cmd_prefix = super().command_prefix(**kwargs)
+
+        if self._run_cgroup is not None:
+            # left by a run that failed before its post-run hook
+            self._run_cgroup.finish()
+        self._run_cgroup = self._sandbox.create(
+            cpu_max=cgroup_cpu_max,
+            memory_max=cgroup_memory_max,
+        )
+
+        return self._run_cgroup.command_prefix() + cmd_prefix
+
+    def kill(self) -> None:
+        """
+        Kill everything the current run spawned, on the local or remote host.
+        """
+        if self._run_cgroup is not None:
+            self._run_cgroup.kill()
+
+    def post_run_hook_update_results(
+        self,
+        experiment_results_lines: List[RecordResult],
+        record_data_dir: PathType,
+        write_record_file_fun: WriteRecordFileFunction,
+    ) -> RecordResult:
+        """
+        Post run hook killing the remaining processes of the run and extending the record results
+        with the resource accounting of its cgroup.
+        """
+        assert experiment_results_lines  # to remove the "unused" warning
+
+        if self._run_cgroup is None:
+            return {}
+        run_cgroup, self._run_cgroup = self._run_cgroup, None
+        return run_cgroup.finish()
@@ -9,9 +9,8 @@ This wrapper is used when using perf on the JVM
 
 import pathlib
 import re
-import time
 from threading import Thread
-from typing import Dict, List, Optional
+from typing import Dict, List
 
 from benchkit.benchmark import RecordResult, WriteRecordFileFunction
 from benchkit.commandwrappers.perf import (
@@ -54,67 +53,13 @@ class JavaPerfStatWrap(PerfStatWrap):
 
     def __init__(self, **kwargs):
         super().__init__(**kwargs)
-        self.attachment_thread: Optional[Thread] = None
 
         perf_version_output = shell_out(command=f"{self._perf_bin} --version", print_output=False)
         self._perf_version = perf_version_output.split(" ")[2].strip()
 
-    def attach_every_thread(self, **kwargs):
-        self.attachment_thread = Thread(target=self.attach_every_thread_worker, kwargs=kwargs)
-        self.attachment_thread.start()
-
-    def attach_every_thread_worker(
-        self,
-        process: AsyncProcess,
-        platform: Platform,
-        record_data_dir: pathlib.Path,
-        poll_ms: int = 10,
-    ):
-        """Command attachment that will attach to every thread of the wrapped process.
-
-        Args:
-            process (AsyncProcess): the process to attach perf-stat to.
-            platform (Platform): the platform where the process is running.
-            record_data_dir (pathlib.Path): the path to the record data directory of the benchmark.
-            poll_ms (int, optional): the period at which to poll the process to detect newly created
-                                     threads. Defaults to 10.
-        """
-        perf_prefix = _perf_command_prefix(perf_bin=self._perf_bin, platform=platform)
-        prefix = perf_prefix + ["stat"] + self.perf_stat_options + ["--per-thread", "-t"]
-
-        tids2perf_cmd = {}
-
-        while not process.is_finished():
-            current_tids = ps.get_threads_of_process_with_names(pid=process.pid)
-            for name, tid in current_tids:
-                if not _is_jvm_thread(name):
-                    if tid not in tids2perf_cmd:
-                        value_pathname = record_data_dir / f"perf-stat-val-tid{tid}.txt"
-                        cmd = prefix + [f"{tid}", "--output", f"{value_pathname}"]
-                        tids2perf_cmd[tid] = AsyncProcess(
-                            platform=platform,
-                            arguments=cmd,
-                            stdout_path=record_data_dir / f"perf-stat-out-tid{tid}.txt",
-                            stderr_path=record_data_dir / f"perf-stat-err-tid{tid}.txt",
-                        )
-
-            time.sleep(poll_ms / 1000)
-
-        for current_process in tids2perf_cmd.values():
-            try:
-                current_process.wait()
-            except AsyncProcess.AsyncProcessError:
-                pass
-        self._every_thread_cleanup(record_data_dir=record_data_dir)
-
-    def post_run_hook_update_results(self, **kwargs) -> RecordResult:
-        """
-        Post run hook to generate extension to record results dict with the captured perf values.
-        """
-        assert self.attachment_thread is not None
-
-        self.attachment_thread.join()
-        return super().post_run_hook_update_results(**kwargs)
+    def _threads_to_attach(self, process: AsyncProcess) -> List[int]:
+        current_tids = ps.get_threads_of_process_with_names(pid=process.pid)
+        return [tid for name, tid in current_tids if not _is_jvm_thread(name)]
 
     # TODO: Look into different version of perf. This might not be needed.
     # Remove this fix when #231 is merged.
@@ -139,9 +84,10 @@ class JavaPerfStatWrap(PerfStatWrap):
     def _results_per_thread(
         self,
         perf_stat_pathname: PathType,
+        perf_stat_content: str,
     ) -> RecordResult:
         counter_rows = self._parse_csv(  # TODO adapt for json
-            perf_stat_pathname=perf_stat_pathname,
+            perf_stat_content=perf_stat_content,
             field_names=["taskname-pid"] + self._perf_stat_csv_field_names,
         )
 
@@ -180,9 +126,10 @@ class JavaPerfStatWrap(PerfStatWrap):
     def _results_global(
         self,
         perf_stat_pathname: PathType,
+        perf_stat_content: str,
     ) -> RecordResult:
         counter_rows = self._parse(
-            perf_stat_pathname=perf_stat_pathname,
+            perf_stat_content=perf_stat_content,
             field_names=self._perf_stat_csv_field_names,
         )
 
@@ -13,13 +13,12 @@ import pathlib
 import re
 import subprocess
 import sys
-import time
 from functools import cache
 from typing import Any, Callable, Dict, List, Optional, Tuple
 
 from benchkit.benchmark import RecordResult, WriteRecordFileFunction
 from benchkit.commandwrappers import CommandWrapper, PackageDependency
-from benchkit.communication import CommunicationLayer
+from benchkit.communication import CommunicationLayer, LocalCommLayer
 from benchkit.helpers.linux import ps, sysctl
 from benchkit.platforms import Platform, get_current_platform
 from benchkit.shell.shell import shell_interactive, shell_out
@@ -408,7 +407,10 @@ class PerfStatWrap(CommandWrapper):
         # Force locale to avoid confusion with "," and "." in json output:
         return environment | {"LC_NUMERIC": "en_US.UTF-8"}
 
-    def attach_every_thread(
+    def _threads_to_attach(self, process: AsyncProcess) -> List[int]:
+        return ps.get_threads_of_process(pid=process.pid)
+
+    async def attach_every_thread(
         self,
         process: AsyncProcess,
         platform: Platform,
@@ -416,6 +418,7 @@ class PerfStatWrap(CommandWrapper):
         poll_ms: int = 10,
     ):
         """Command attachment that will attach to every thread of the wrapped process.
+        It is a coroutine, run by the event loop of the attachments of the benchmark.
 
         Args:
             process (AsyncProcess): the process to attach perf-stat to.
@@ -430,7 +433,7 @@ class PerfStatWrap(CommandWrapper):
         tids2perf_cmd = {}
 
         while not process.is_finished():
-            current_tids = ps.get_threads_of_process(pid=process.pid)
+            current_tids = self._threads_to_attach(process=process)
             for tid in current_tids:
                 if tid not in tids2perf_cmd:
                     value_pathname = record_data_dir / f"perf-stat-val-tid{tid}.txt"
@@ -442,11 +445,11 @@ class PerfStatWrap(CommandWrapper):
                         stderr_path=record_data_dir / f"perf-stat-err-tid{tid}.txt",
                     )
 
-            time.sleep(poll_ms / 1000)
+            await process.wait_finished(timeout=poll_ms / 1000)
 
         for current_process in tids2perf_cmd.values():
             try:
-                current_process.wait()
+                await current_process.wait_async()
             except AsyncProcess.AsyncProcessError:
                 pass
         self._every_thread_cleanup(record_data_dir=record_data_dir)
@@ -463,6 +466,9 @@ class PerfStatWrap(CommandWrapper):
         assert experiment_results_lines  # to remove the "unused" warning
         assert write_record_file_fun  # to remove the "unused" warning
 
+        # the record data directory is on the host (copied back from remote platforms)
+        host_comm = LocalCommLayer()
+
         # version without --per-thread
         global_perf_stat_pathname = os.path.join(record_data_dir, self._output_filename)
 
@@ -471,28 +477,36 @@ class PerfStatWrap(CommandWrapper):
         perf_stat_pathnames = sorted(
             [global_perf_stat_pathname]
             + [
-                os.path.join(record_data_dir, f)
-                for f in os.listdir(record_data_dir)
-                if f.startswith(output_filename_prefix)
+                str(path)
+                for path in host_comm.glob(
+                    pattern=os.path.join(record_data_dir, f"{output_filename_prefix}*")
+                )
+                if "err-tid" not in path.name
             ]
         )
+        perf_stat_contents = host_comm.read_files(paths=perf_stat_pathnames)
 
         output_dict = {}
         for perf_stat_pathname in perf_stat_pathnames:
-            if not os.path.exists(perf_stat_pathname):
-                continue
-            if "err-tid" in perf_stat_pathname:
+            perf_stat_content = perf_stat_contents[perf_stat_pathname]
+            if perf_stat_content is None:
                 continue
             if "val-tid" in perf_stat_pathname:
-                output_dict |= self._results_per_thread(perf_stat_pathname=perf_stat_pathname)
+                output_dict |= self._results_per_thread(
+                    perf_stat_pathname=perf_stat_pathname,
+                    perf_stat_content=perf_stat_content,
+                )
             else:
-                output_dict |= self._results_global(perf_stat_pathname=perf_stat_pathname)
+                output_dict |= self._results_global(
+                    perf_stat_pathname=perf_stat_pathname,
+                    perf_stat_content=perf_stat_content,
+                )
 
         return output_dict
 
     def _align_field_names(
         self,
-        perf_stat_pathname: PathType,
+        perf_stat_content: str,
         events: List[str],
         field_names: List[str],
     ) -> Optional[List[str]]:
@@ -504,59 +518,57 @@ class PerfStatWrap(CommandWrapper):
         # then align the field_names to that. Inferring this location is as easy as trying to
         # find the name of an event we were looking for in the row, since the event_name column
         # should contain the name of one of these events.
-        with open(perf_stat_pathname, "r") as perf_stat_file:
-            first_line_filter = filter(
-                lambda row: not row.strip().startswith("#") and row.strip() != "",
-                perf_stat_file,
-            )
-            row = next(first_line_filter, None)
-            if row is None:
-                return None
-            fields = row.split(self._separator)
-
-            event_idxes = [fields.index(event) for event in events if event in fields]
-
-            # If we did not find an event in the row, we return the field names as we got
-            # them because we cannot align the fields.
-            if len(event_idxes) == 0:
-                return field_names
-
-            # We take the lowest index of the event indexes. In practice we should
-            # only ever find one index here, but in theory it is possible that one
-            # of the other fields (maybe a comment field) in the CSV contains a string
-            # that matches the event name.
-            idx_in_row = sorted(event_idxes)[0]
-            idx_in_fieldnames = field_names.index("event")
-            padding_events = [f"bogus-column{i}" for i in range(idx_in_row - idx_in_fieldnames)]
-            return [*padding_events, *field_names]
+        first_line_filter = filter(
+            lambda row: not row.strip().startswith("#") and row.strip() != "",
+            perf_stat_content.splitlines(keepends=True),
+        )
+        row = next(first_line_filter, None)
+        if row is None:
+            return None
+        fields = row.split(self._separator)
+
+        event_idxes = [fields.index(event) for event in events if event in fields]
+
+        # If we did not find an event in the row, we return the field names as we got
+        # them because we cannot align the fields.
+        if len(event_idxes) == 0:
+            return field_names
+
+        # We take the lowest index of the event indexes. In practice we should
+        # only ever find one index here, but in theory it is possible that one
+        # of the other fields (maybe a comment field) in the CSV contains a string
+        # that matches the event name.
+        idx_in_row = sorted(event_idxes)[0]
+        idx_in_fieldnames = field_names.index("event")
+        padding_events = [f"bogus-column{i}" for i in range(idx_in_row - idx_in_fieldnames)]
+        return [*padding_events, *field_names]
 
     def _parse(
         self,
-        perf_stat_pathname: PathType,
+        perf_stat_content: str,
         field_names: List[str],
     ) -> List[Dict[str, str]]:
         if self._use_json:
-            return self._parse_json(perf_stat_pathname=perf_stat_pathname, field_names=field_names)
+            return self._parse_json(perf_stat_content=perf_stat_content, field_names=field_names)
         else:
-            return self._parse_csv(perf_stat_pathname=perf_stat_pathname, field_names=field_names)
+            return self._parse_csv(perf_stat_content=perf_stat_content, field_names=field_names)
 
     def _parse_json(
         self,
-        perf_stat_pathname: PathType,
+        perf_stat_content: str,
         field_names: List[str],
     ) -> List[Dict[str, str]]:
-        with open(perf_stat_pathname, "r") as perf_stat_file:
-            lines = [line.strip() for line in perf_stat_file]
+        lines = [line.strip() for line in perf_stat_content.splitlines()]
         json_lines = [json.loads(line) for line in lines]
         return json_lines
 
     def _parse_csv(
         self,
-        perf_stat_pathname: PathType,
+        perf_stat_content: str,
         field_names: List[str],
     ) -> List[Dict[str, str]]:
         field_names = self._align_field_names(
-            perf_stat_pathname=perf_stat_pathname,
+            perf_stat_content=perf_stat_content,
             events=self._events,
             field_names=field_names,
         )
@@ -564,27 +576,27 @@ class PerfStatWrap(CommandWrapper):
         if field_names is None:
             return []
 
-        with open(perf_stat_pathname, "r") as perf_stat_file:
-            comments_filtered_file = filter(
-                lambda row: not row.strip().startswith("#"),
-                perf_stat_file,
-            )
-            reader = csv.DictReader(
-                comments_filtered_file,
-                fieldnames=field_names,
-                delimiter=self._separator,
-            )
-            rows = [dict(row) for row in reader]
+        comments_filtered_file = filter(
+            lambda row: not row.strip().startswith("#"),
+            perf_stat_content.splitlines(keepends=True),
+        )
+        reader = csv.DictReader(
+            comments_filtered_file,
+            fieldnames=field_names,
+            delimiter=self._separator,
+        )
+        rows = [dict(row) for row in reader]
 
         return rows
 
     def _results_per_thread(
         self,
         perf_stat_pathname: PathType,
+        perf_stat_content: str,
     ) -> RecordResult:
 
         counter_rows = self._parse_csv(  # TODO adapt for json
-            perf_stat_pathname=perf_stat_pathname,
+            perf_stat_content=perf_stat_content,
             field_names=["taskname-pid"] + self._perf_stat_csv_field_names,
         )
 
@@ -617,9 +629,10 @@ class PerfStatWrap(CommandWrapper):
     def _results_global(
         self,
         perf_stat_pathname: PathType,
+        perf_stat_content: str,
     ) -> RecordResult:
         counter_rows = self._parse(
-            perf_stat_pathname=perf_stat_pathname,
+            perf_stat_content=perf_stat_content,
             field_names=self._perf_stat_csv_field_names,
         )
 
@@ -12,14 +12,36 @@ while the client code can remain the same for any scenario.
 import getpass
 import os
 import os.path
+import shlex
 import subprocess
+import threading
+import uuid
+from contextlib import contextmanager
 from functools import lru_cache
 from pathlib import Path
 from shutil import which
-from typing import Dict, Iterable, List, Optional
-
+from signal import SIGTERM
+from typing import Dict, Iterable, Iterator, List, Optional
+
+from benchkit.communication.agent import AgentError, RemoteAgent, agent_argv
+from benchkit.communication.batch import (
+    PathStat,
+    glob_script,
+    local_glob,
+    local_read_files,
+    local_stat_paths,
+    parse_glob_output,
+    parse_read_files_output,
+    parse_stat_output,
+    read_files_script,
+    stat_script,
+)
+from benchkit.communication.session import SessionError, ShellSession
+from benchkit.communication.sshmux import SSHMasterPool
+from benchkit.communication.transfer import archive_command, extract_archive_stream
 from benchkit.communication.utils import command_with_env, remote_shell_command
-from benchkit.shell.shell import pipe_shell_out, shell_out
+from benchkit.shell.shell import pipe_shell_out, shell_capture, shell_out
+from benchkit.shell.streaming import LineCallback, StreamedOutput
 from benchkit.utils.types import Command, Environment, PathType, SplitCommand
 
 
@@ -27,7 +49,10 @@ class CommunicationLayer:
     """Base class for any communication layer."""
 
     def __init__(self):
-        pass
+        self._session: ShellSession | None = None
+        self._session_failed = False
+        self._agent: RemoteAgent | None = None
+        self._agent_failed = False
 
     @property
     def remote_host(self) -> str | None:
@@ -81,6 +106,7 @@ class CommunicationLayer:
         output_is_log: bool = False,
         ignore_ret_codes: Iterable[int] = (),
         ignore_any_error_code: bool = False,
+        output_callback: LineCallback | None = None,
     ) -> str:
         """Run a shell command on the target host.
 
@@ -114,12 +140,65 @@ class CommunicationLayer:
                 Defaults to () (empty collection).
             ignore_any_error_code (bool, optional):
                 whether to error any error code returned by the command.
+            output_callback (LineCallback | None, optional):
+                if not None, function called with each line of the output while the command runs.
+                The output is then only given to the callback, and not returned.
+                Defaults to None.
 
         Returns:
             str: the output of the command.
         """
         raise NotImplementedError()
 
+    def shell_capture(
+        self,
+        command: Command,
+        std_input: str | None = None,
+        current_dir: PathType | None = None,
+        environment: Environment = None,
+        print_input: bool = True,
+        print_output: bool = True,
+        timeout: int | None = None,
+        output_is_log: bool = False,
+        output_callback: LineCallback | None = None,
+        keep_output: bool = True,
+    ) -> StreamedOutput:
+        """Run a shell command on the target host and capture its standard output and error
+        separately and its return code, without raising an error on a non-zero return code.
+        The resources used by the command are collected when it runs as a child process of
+        benchkit (local host).
+
+        Args:
+            command (Command):
+                command to run on the target host.
+            std_input (str | None, optional):
+                input to pipe into the command to run, None if there is no input to provide.
+                Defaults to None.
+            current_dir (PathType | None, optional):
+                directory where to run the command. Defaults to None.
+            environment (Environment, optional):
+                environment to pass to the command to run. Defaults to None.
+            print_input (bool, optional):
+                whether to print the command on benchkit logs. Defaults to True.
+            print_output (bool, optional):
+                whether to print the command output on benchkit logs. Defaults to True.
+            timeout (int | None, optional):
+                number of seconds to wait for the command to complete, or None for no timeout.
+                Defaults to None.
+            output_is_log (bool, optional):
+                whether to print the output lines while the command runs. Defaults to False.
+            output_callback (LineCallback | None, optional):
+                if not None, function called with each line of the output while the command runs.
+                Defaults to None.
+            keep_output (bool, optional):
+                whether to keep the standard output to return it. Defaults to True.
+
+        Returns:
+            StreamedOutput: the return code, the standard output and error and, if collected, the
+                            resource usage of the command.
+        """
+        raise NotImplementedError()
+
     def shell_succeed(
         self,
         command: Command,
@@ -228,6 +307,9 @@ class CommunicationLayer:
             pid (int): pid of the process to send the signal to.
             signal_code (int): code of the signal to send.
         """
+        if (agent := self.remote_agent()) is not None:
+            agent.signal(pid=pid, signal_code=signal_code)
+            return
         self.shell(command=f"kill -{signal_code} {pid}")
 
     def get_process_nb_threads(
@@ -264,6 +346,24 @@ class CommunicationLayer:
             "(I don't know how to do it now)"
         )
 
+    def kill_remote_process(
+        self,
+        process_handle: subprocess.Popen,
+        signal_code: int = SIGTERM,
+    ) -> bool:
+        """Send a signal to the remote command started by `background_subprocess` and to all its
+        descendants, on the target host.
+
+        Args:
+            process_handle (subprocess.Popen): local handle of the background process.
+            signal_code (int, optional): code of the signal to send. Defaults to SIGTERM.
+
+        Returns:
+            bool: whether the remote process tree is handled by the communication layer, False if
+                  the caller has to find the remote process itself.
+        """
+        return False
+
     def path_exists(
         self,
         path: PathType,
@@ -401,17 +501,59 @@ class CommunicationLayer:
         """
         raise NotImplementedError("Copy to host is not implemented for this communication layer")
 
+    def copy_archive_to_host(
+        self,
+        source_root: PathType,
+        relative_paths: List[str],
+        destination_root: PathType,
+        compression_level: int | None = None,
+    ) -> None:
+        """Copy directories of the target machine to the host as a single archive stream, i.e. a
+           single round trip, instead of one copy per directory.
+           The layers that cannot stream archives copy the directories one by one.
+
+        Args:
+            source_root (PathType): The directory of the target the paths are relative to.
+            relative_paths (List[str]): The paths of the directories to copy.
+            destination_root (PathType): The directory of the host the paths are copied relative
+                                         to.
+            compression_level (int | None, optional): If not None, zstd compression level of
+                                                      the archive. Defaults to None.
+        """
+        compressed = compression_level is not None
+        producer = self._archive_producer(
+            source_root=source_root,
+            relative_paths=relative_paths,
+            compression_level=compression_level,
+        )
+        if producer is None:
+            for relative_path in relative_paths:
+                destination = Path(destination_root) / relative_path
+                destination.mkdir(parents=True, exist_ok=True)
+                self.copy_to_host(f"{source_root}/{relative_path}/", f"{destination}/")
+            return
+
+        extract_archive_stream(
+            producer=producer,
+            destination_root=destination_root,
+            compressed=compressed,
+        )
+
+    def _archive_producer(
+        self,
+        source_root: PathType,
+        relative_paths: List[str],
+        compression_level: int | None,
+    ) -> SplitCommand | None:
+        return None
+
     def hostname(self) -> str:
         """Get hostname of the target host.
 
         Returns:
             str: hostname of the target host.
         """
-        result = self.shell(
-            command="hostname",
-            print_input=False,
-            print_output=False,
-        ).strip()
+        result = self._helper_shell(command="hostname").strip()
         return result
 
     def current_user(self) -> str:
@@ -420,11 +562,7 @@ class CommunicationLayer:
         Returns:
             str: current user in the target host.
         """
-        result = self.shell(
-            command="whoami",
-            print_input=False,
-            print_output=False,
-        ).strip()
+        result = self._helper_shell(command="whoami").strip()
         return result
 
     def realpath(self, path: PathType) -> Path:
@@ -437,11 +575,7 @@ class CommunicationLayer:
         Returns:
             pathlib.Path: absolute and real path.
         """
-        output = self.shell(
-            command=f"readlink -fm {path}",
-            print_input=False,
-            print_output=False,
-        ).strip()
+        output = self._helper_shell(command=f"readlink -fm {path}").strip()
         result = Path(output)
         return result
 
@@ -455,6 +589,8 @@ class CommunicationLayer:
         Returns:
             bool: whether the given path is a file on the target host.
         """
+        if (agent := self.remote_agent()) is not None:
+            return agent.stat_paths(paths=[path])[str(path)].is_file
         return self._bracket_test(path=path, opt="-f")
 
     def makedirs(self, path: PathType, exist_ok: bool) -> None:
@@ -465,12 +601,11 @@ class CommunicationLayer:
             path (PathType): path of the new directory to create on the target host.
             exist_ok (bool): whether to ignore the fact that directory might already exist.
         """
+        if (agent := self.remote_agent()) is not None:
+            agent.makedirs(path=path, exist_ok=exist_ok)
+            return
         exist_opt = " -p " if exist_ok else ""
-        self.shell(
-            command=f"mkdir{exist_opt} {path}",
-            print_input=False,
-            print_output=False,
-        )
+        self._helper_shell(command=f"mkdir{exist_opt} {path}")
 
     def remove(self, path: PathType, recursive: bool) -> None:
         """Remove a file or directory on the target host.
@@ -479,12 +614,11 @@ class CommunicationLayer:
             path (PathType): path of file or directory that needs to be removed on the target host.
             recursive (bool): whether to recursively delete everything in this path.
         """
+        if (agent := self.remote_agent()) is not None:
+            agent.remove(path=path, recursive=recursive)
+            return
         command = ["rm"] + (["-r"] if recursive else []) + [str(path)]
-        self.shell(
-            command=command,
-            print_input=False,
-            print_output=False,
-        )
+        self._helper_shell(command=command)
 
     def isdir(self, path: PathType) -> bool:
         """Return whether the given path is a file on the target host.
@@ -496,6 +630,8 @@ class CommunicationLayer:
         Returns:
             bool: whether the given path is a directory on the target host.
         """
+        if (agent := self.remote_agent()) is not None:
+            return agent.stat_paths(paths=[path])[str(path)].is_dir
         return self._bracket_test(path=path, opt="-d")
 
     def which(self, cmd: str) -> Path | None:
@@ -508,28 +644,73 @@ class CommunicationLayer:
             pathlib.Path | None: the absolute path to the command executable or None if the command
                                  is not found.
         """
-        command = f"which {cmd}"
-        which_succeed = self.shell_succeed(
-            command=command,
-            print_input=False,
-            print_output=False,
-        )
-
-        if not which_succeed:
+        if (agent := self.remote_agent()) is not None:
+            path = agent.which(cmd=cmd)
+            return None if path is None else Path(path)
+        try:
+            path = self._helper_shell(command=f"which {cmd}").strip()
+        except subprocess.CalledProcessError:
             return None
 
-        path = self.shell(
-            command=command,
-            print_input=False,
-            print_output=False,
-        ).strip()
-
         if not path:
             return None
 
         result = Path(path)
         return result
 
+    def stat_paths(self, paths: Iterable[PathType]) -> Dict[str, PathStat]:
+        """Get the status (existence, type, size, modification time) of many paths on the target
+        host at once, in a single round trip.
+
+        Args:
+            paths (Iterable[PathType]): the paths to get the status of.
+
+        Returns:
+            Dict[str, PathStat]: the status of each path, by path (as a string).
+        """
+        paths = [str(path) for path in paths]
+        if not paths:
+            return {}
+        if (agent := self.remote_agent()) is not None:
+            return agent.stat_paths(paths=paths)
+        output = self._helper_shell(command=stat_script(paths=paths))
+        return parse_stat_output(paths=paths, output=output)
+
+    def read_files(self, paths: Iterable[PathType]) -> Dict[str, str | None]:
+        """Read many (small) files on the target host at once, in a single round trip.
+
+        Args:
+            paths (Iterable[PathType]): the paths of the files to read.
+
+        Returns:
+            Dict[str, str | None]: the content of each file, by path (as a string), None if the
+                                   file does not exist or cannot be read.
+        """
+        paths = [str(path) for path in paths]
+        if not paths:
+            return {}
+        if (agent := self.remote_agent()) is not None:
+            return agent.read_files(paths=paths)
+        script, token = read_files_script(paths=paths)
+        output = self._helper_shell(command=script)
+        return parse_read_files_output(paths=paths, output=output, token=token)
+
+    def glob(self, pattern: PathType) -> List[Path]:
+        """List the paths matching the given pattern on the target host, in a single round trip.
+        Communication-aware equivalent of `glob.glob()`, with wildcards in the last component of
+        the pattern only.
+
+        Args:
+            pattern (PathType): the pattern of the paths.
+
+        Returns:
+            List[Path]: the sorted matching paths.
+        """
+        if (agent := self.remote_agent()) is not None:
+            return [Path(path) for path in agent.glob(pattern=pattern)]
+        output = self._helper_shell(command=glob_script(pattern=str(pattern)))
+        return [Path(path) for path in parse_glob_output(output=output)]
+
     def _bracket_test(
         self,
         path: PathType,
@@ -537,13 +718,102 @@ class CommunicationLayer:
     ) -> bool:
         succeed = True
         try:
-            self.shell(command=f"[ {opt} {path} ]", print_input=False, print_output=False)
+            self._helper_shell(command=f"[ {opt} {path} ]")
         except subprocess.CalledProcessError as cpe:
             if 1 != cpe.returncode:
                 raise cpe
             succeed = False
         return succeed
 
+    def _session_argv(self) -> List[str] | None:
+        """Return the command starting the persistent shell session that runs the helper commands
+        of the communication layer, or None if each helper command is run with `shell()`.
+
+        Returns:
+            List[str] | None: the command starting the session, or None.
+        """
+        return None
+
+    def _agent_argv(self) -> List[str] | None:
+        """Return the command starting the remote agent of the communication layer (see
+        `benchkit.communication.agent`), or None if the communication layer has no agent.
+
+        Returns:
+            List[str] | None: the command starting the agent, or None.
+        """
+        return None
+
+    def remote_agent(self) -> RemoteAgent | None:
+        """Return the remote agent of the communication layer, started on first use, which performs
+        the filesystem operations natively and signals, kills and samples processes by their pid on
+        the target host.
+        When the agent cannot be started, the operations are run as shell commands.
+
+        Returns:
+            RemoteAgent | None: the agent, or None if the communication layer has no agent or if it
+                                could not be started.
+        """
+        if self._agent is None and not self._agent_failed:
+            argv = self._agent_argv()
+            if argv is not None:
+                agent = RemoteAgent(argv=argv)
+                try:
+                    agent.ping()
+                except AgentError as err:
+                    print(f"[WARNING] {err}, falling back to shell commands")
+                    self._agent_failed = True
+                else:
+                    self._agent = agent
+        return self._agent
+
+    def _helper_shell(
+        self,
+        command: Command,
+    ) -> str:
+        """Run a helper command (e.g., a test on a path) silently, through the persistent shell
+        session of the communication layer if it has one, otherwise with `shell()`.
+        When the session fails, the helper commands are run with `shell()`.
+
+        Args:
+            command (Command): the helper command to run.
+
+        Raises:
+            subprocess.CalledProcessError: if the command exited with a non-zero exit code.
+
+        Returns:
+            str: the output of the command.
+        """
+        if self._session is None and not self._session_failed:
+            argv = self._session_argv()
+            if argv is not None:
+                self._session = ShellSession(argv=argv)
+
+        if self._session is not None:
+            try:
+                returncode, output = self._session.run(command=command)
+            except SessionError as err:
+                print(f"[WARNING] {err}, falling back to one command per helper")
+                self._session = None
+                self._session_failed = True
+            else:
+                if 0 != returncode:
+                    raise subprocess.CalledProcessError(returncode, command, output=output)
+                return output
+
+        return self.shell(
+            command=command,
+            print_input=False,
+            print_output=False,
+        )
+
+    def close_session(self) -> None:
+        """Stop the persistent shell session and the remote agent of the communication layer, if
+        they are running."""
+        if self._session is not None:
+            self._session.close()
+        if self._agent is not None:
+            self._agent.close()
+
 
 class LocalCommLayer(CommunicationLayer):
     """
@@ -601,6 +871,7 @@ class LocalCommLayer(CommunicationLayer):
         output_is_log: bool = False,
         ignore_ret_codes: Iterable[int] = (),
         ignore_any_error_code: bool = False,
+        output_callback: LineCallback | None = None,
     ) -> str:
         return shell_out(
             command=command,
@@ -615,6 +886,33 @@ class LocalCommLayer(CommunicationLayer):
             output_is_log=output_is_log,
             ignore_ret_codes=ignore_ret_codes,
             ignore_any_error_code=ignore_any_error_code,
+            output_callback=output_callback,
+        )
+
+    def shell_capture(
+        self,
+        command: Command,
+        std_input: str | None = None,
+        current_dir: PathType | None = None,
+        environment: Environment = None,
+        print_input: bool = True,
+        print_output: bool = True,
+        timeout: int | None = None,
+        output_is_log: bool = False,
+        output_callback: LineCallback | None = None,
+        keep_output: bool = True,
+    ) -> StreamedOutput:
+        return shell_capture(
+            command=command,
+            std_input=std_input,
+            current_dir=current_dir,
+            environment=environment,
+            print_input=print_input,
+            print_output=print_output,
+            timeout=timeout,
+            output_is_log=output_is_log,
+            output_callback=output_callback,
+            keep_output=keep_output,
         )
 
     def background_subprocess(
@@ -724,6 +1022,21 @@ class LocalCommLayer(CommunicationLayer):
     ) -> None:
         self.shell(["rsync", "-azPv", str(source), str(destination)])
 
+    def _archive_producer(
+        self,
+        source_root: PathType,
+        relative_paths: List[str],
+        compression_level: int | None,
+    ) -> SplitCommand | None:
+        command = archive_command(
+            source_root=source_root,
+            relative_paths=relative_paths,
+            compressed=compression_level is not None,
+        )
+        if compression_level is None:
+            return command
+        return ["env", f"ZSTD_CLEVEL={compression_level}"] + command
+
     def current_user(self) -> str:
         return getpass.getuser()
 
@@ -751,6 +1064,15 @@ class LocalCommLayer(CommunicationLayer):
 
         return Path(result)
 
+    def stat_paths(self, paths: Iterable[PathType]) -> Dict[str, PathStat]:
+        return local_stat_paths(paths=[str(path) for path in paths])
+
+    def read_files(self, paths: Iterable[PathType]) -> Dict[str, str | None]:
+        return local_read_files(paths=[str(path) for path in paths])
+
+    def glob(self, pattern: PathType) -> List[Path]:
+        return [Path(path) for path in local_glob(pattern=pattern)]
+
 
 class SSHCommLayer(CommunicationLayer):
     """Communication layer to handle a remote host over SSH."""
@@ -759,14 +1081,102 @@ class SSHCommLayer(CommunicationLayer):
         self,
         host: str,
         environment: Environment,
+        multiplexing: bool = True,
+        agent: bool = False,
     ):
+        """
+        Args:
+            host (str):
+                the remote host, as given to ssh.
+            environment (Environment):
+                environment variables added to all the commands run on the host.
+            multiplexing (bool, optional):
+                whether to run the commands as channels of master connections owned by benchkit
+                (see `benchkit.communication.sshmux`), instead of one connection per command.
+                Defaults to True.
+            agent (bool, optional):
+                whether to perform the filesystem operations and the signals through a remote
+                agent (see `benchkit.communication.agent`) run by the Python interpreter of the
+                host, instead of shell commands. Failed operations then raise `OSError`.
+                Defaults to False.
+        """
         super().__init__()
         self._host = host
         self._additional_environment = environment if environment is not None else {}
+        self._ssh_pool = SSHMasterPool(host=host) if multiplexing else None
+        self._use_agent = agent
+        # pid files of the background commands, by pid of their local ssh process
+        self._remote_pid_files: Dict[int, str] = {}
+        self._remote_pids: Dict[int, int] = {}
 
         self._ssh_host_info = self._get_ssh_info(host=host)
         self._in_ssh_config = self._is_in_ssh_config(host=host)
 
+    def _session_argv(self) -> List[str] | None:
+        env_args = [shlex.quote(f"{k}={v}") for k, v in self._additional_environment.items()]
+        return (
+            ["ssh"]
+            + self._ssh_options()
+            + ["-T", self._host]
+            + (["env"] + env_args if env_args else [])
+            + ["sh"]
+        )
+
+    def _agent_argv(self) -> List[str] | None:
+        if not self._use_agent:
+            return None
+        env_args = [shlex.quote(f"{k}={v}") for k, v in self._additional_environment.items()]
+        *python_argv, bootstrap = agent_argv()
+        return (
+            ["ssh"]
+            + self._ssh_options()
+            + ["-T", self._host]
+            + (["env"] + env_args if env_args else [])
+            + python_argv
+            + [shlex.quote(bootstrap)]
+        )
+
+    def connection_metrics(self) -> Dict[str, float]:
+        """Get the metrics of the SSH connections to the host (see `SSHMasterPool.metrics()`).
+
+        Returns:
+            Dict[str, float]: the metrics of the connections, empty without multiplexing.
+        """
+        return {} if self._ssh_pool is None else self._ssh_pool.metrics()
+
+    def close_session(self) -> None:
+        """Stop the persistent shell session, the remote agent and the SSH master connections of
+        the communication layer, if they are running."""
+        super().close_session()
+        if self._ssh_pool is not None:
+            self._ssh_pool.close()
+
+    def _ssh_options(self) -> List[str]:
+        # reserves a channel for a long-lived command, given back by the pool when it is closed
+        return [] if self._ssh_pool is None else self._ssh_pool.options()
+
+    @contextmanager
+    def _ssh_channel(self) -> Iterator[List[str]]:
+        if self._ssh_pool is None:
+            yield []
+        else:
+            with self._ssh_pool.channel() as ssh_options:
+                yield ssh_options
+
+    def _release_on_exit(self, process: subprocess.Popen, ssh_options: List[str]) -> None:
+        if self._ssh_pool is None or not ssh_options:
+            return
+
+        def wait_exit() -> None:
+            # waits without reaping the process, which is left to the owner of its handle
+            try:
+                os.waitid(os.P_PID, process.pid, os.WEXITED | os.WNOWAIT)
+            except ChildProcessError:
+                pass  # already reaped
+            self._ssh_pool.release(ssh_options=ssh_options)
+
+        threading.Thread(target=wait_exit, daemon=True).start()
+
     @property
     def remote_host(self) -> str | None:
         return self._host
@@ -793,21 +1203,52 @@ class SSHCommLayer(CommunicationLayer):
         env: dict | None,
         establish_new_connection: bool = False,
     ) -> subprocess.Popen:
+        pid_file = None
+        if self.remote_agent() is not None:
+            # the remote shell records its pid, then is replaced by the command (through env, which
+            # also accepts leading variable assignments) or by a shell running the command line,
+            # for the agent to sample it
+            pid_file = f"/tmp/benchkit-{uuid.uuid4().hex}.pid"
+            if isinstance(command, str):
+                command = f"sh -c {shlex.quote(command)}"
+            else:
+                command = remote_shell_command(remote_command=["env"] + list(command))
+            command = f"echo $$ > {pid_file} && exec {command}"
+
+        ssh_options = [] if establish_new_connection else self._ssh_options()
         full_command = self._remote_shell_command(
             remote_command=command,
             remote_current_dir=cwd,
             establish_new_connection=establish_new_connection,
+            ssh_options=ssh_options,
         )
 
         # Create background process in its own group id using os.setsid
         # This allows to easily kill all children of this background process
-        return subprocess.Popen(
+        process = subprocess.Popen(
             full_command,
             stdout=stdout,
             stderr=stderr,
             env=env,
             preexec_fn=os.setsid,
         )
+        self._release_on_exit(process=process, ssh_options=ssh_options)
+        if pid_file is not None:
+            self._remote_pid_files[process.pid] = pid_file
+        return process
+
+    def _remote_pid(self, process_handle: subprocess.Popen) -> int | None:
+        local_pid = process_handle.pid
+        if local_pid not in self._remote_pids and local_pid in self._remote_pid_files:
+            agent = self.remote_agent()
+            pid_file = self._remote_pid_files[local_pid]
+            content = agent.read_files(paths=[pid_file])[pid_file]
+            if content is None or not content.strip():
+                return None  # the remote command is not started yet
+            self._remote_pids[local_pid] = int(content)
+            del self._remote_pid_files[local_pid]
+            agent.remove(path=pid_file, recursive=False)
+        return self._remote_pids.get(local_pid)
 
     def pipe_shell(
         self,
@@ -833,18 +1274,20 @@ class SSHCommLayer(CommunicationLayer):
         else:
             env_command = remote_env_lst + command
 
-        full_command = self._remote_shell_command(
-            remote_command=env_command,
-            remote_current_dir=current_dir,
-        )
+        with self._ssh_channel() as ssh_options:
+            full_command = self._remote_shell_command(
+                remote_command=env_command,
+                remote_current_dir=current_dir,
+                ssh_options=ssh_options,
+            )
 
-        output = pipe_shell_out(
-            command=full_command,
-            current_dir=None,
-            shell=shell,
-            print_command=print_command,
-            ignore_ret_codes=ignore_ret_codes,
-        )
+            output = pipe_shell_out(
+                command=full_command,
+                current_dir=None,
+                shell=shell,
+                print_command=print_command,
+                ignore_ret_codes=ignore_ret_codes,
+            )
 
         return output
 
@@ -862,39 +1305,118 @@ class SSHCommLayer(CommunicationLayer):
         output_is_log: bool = False,
         ignore_ret_codes: Iterable[int] = (),
         ignore_any_error_code: bool = False,
+        output_callback: LineCallback | None = None,
     ) -> str:
         env_command = command_with_env(
             command=command,
             environment=environment,
             additional_environment=self._additional_environment,
         )
-        full_command = self._remote_shell_command(
-            remote_command=env_command,
-            remote_current_dir=current_dir,
-        )
+        with self._ssh_channel() as ssh_options:
+            full_command = self._remote_shell_command(
+                remote_command=env_command,
+                remote_current_dir=current_dir,
+                ssh_options=ssh_options,
+            )
 
-        output = shell_out(
-            command=full_command,
-            std_input=std_input,
-            current_dir=None,
-            print_input=print_input,
-            print_output=print_output,
-            timeout=timeout,
-            output_is_log=output_is_log,
-            ignore_ret_codes=ignore_ret_codes,
-            ignore_any_error_code=ignore_any_error_code,
-        )
+            output = shell_out(
+                command=full_command,
+                std_input=std_input,
+                current_dir=None,
+                print_input=print_input,
+                print_output=print_output,
+                timeout=timeout,
+                output_is_log=output_is_log,
+                ignore_ret_codes=ignore_ret_codes,
+                ignore_any_error_code=ignore_any_error_code,
+                output_callback=output_callback,
+            )
 
         return output
 
+    def shell_capture(
+        self,
+        command: Command,
+        std_input: str | None = None,
+        current_dir: PathType | None = None,
+        environment: Environment = None,
+        print_input: bool = True,
+        print_output: bool = True,
+        timeout: int | None = None,
+        output_is_log: bool = False,
+        output_callback: LineCallback | None = None,
+        keep_output: bool = True,
+    ) -> StreamedOutput:
+        env_command = command_with_env(
+            command=command,
+            environment=environment,
+            additional_environment=self._additional_environment,
+        )
+        with self._ssh_channel() as ssh_options:
+            full_command = self._remote_shell_command(
+                remote_command=env_command,
+                remote_current_dir=current_dir,
+                ssh_options=ssh_options,
+            )
+
+            # ssh gives the return code and standard error of the remote command, but the
+            # resources used by the local ssh client are not the ones of the remote command
+            return shell_capture(
+                command=full_command,
+                std_input=std_input,
+                current_dir=None,
+                print_input=print_input,
+                print_output=print_output,
+                timeout=timeout,
+                output_is_log=output_is_log,
+                output_callback=output_callback,
+                keep_output=keep_output,
+                collect_rusage=False,
+            )
+
     def get_process_nb_threads(self, process_handle: subprocess.Popen) -> int:
-        raise NotImplementedError("TODO")
+        """
+        With the remote agent, the number of threads of the remote command started by
+        `background_subprocess`.
+        """
+        remote_pid = self._remote_pid(process_handle=process_handle)
+        if remote_pid is None:
+            raise NotImplementedError(
+                "The threads of a remote process are only known with the remote agent, once the "
+                "process is started"
+            )
+        sample = self.remote_agent().sample(pids=[remote_pid])[remote_pid]
+        if sample is None:
+            raise ProcessLookupError(f"Remote process {remote_pid} exited")
+        return sample["nb_threads"]
+
+    def kill_remote_process(
+        self,
+        process_handle: subprocess.Popen,
+        signal_code: int = SIGTERM,
+    ) -> bool:
+        """
+        With the remote agent, the remote command and its descendants are killed exactly from its
+        pid. If the command is not started yet, ending its SSH process is enough.
+        """
+        if self.remote_agent() is None:
+            return False
+        remote_pid = self._remote_pid(process_handle=process_handle)
+        if remote_pid is not None:
+            self.remote_agent().kill_tree(pid=remote_pid, signal_code=signal_code)
+        return True
 
     def get_process_status(self, process_handle: subprocess.Popen) -> str:
         """
-        Add simple implementation of `get_process_status` which uses the status of the SSH process
-        and not of the `async process` in order to detect its termination
+        With the remote agent, the state of the remote command started by `background_subprocess`
+        ("X" once it exited). Otherwise, the status of the SSH process and not of the
+        `async process`, in order to detect its termination.
         """
+        remote_pid = self._remote_pid(process_handle=process_handle)
+        if remote_pid is not None:
+            sample = self.remote_agent().sample(pids=[remote_pid])[remote_pid]
+            return "X" if sample is None else sample["state"]
+
         pid = process_handle.pid
         status = shell_out(
             f"ps -q {pid} -o state --no-headers",
@@ -907,35 +1429,27 @@ class SSHCommLayer(CommunicationLayer):
         return status.strip()
 
     def path_exists(self, path: PathType) -> bool:
-        try:
-            self.shell(command=f"[ -e {path} ]", print_input=False, print_output=False)
-        except subprocess.CalledProcessError as cpe:
-            if 1 == cpe.returncode:
-                return False
-            raise cpe
-        return True
+        if (agent := self.remote_agent()) is not None:
+            return agent.stat_paths(paths=[path])[str(path)].exists
+        return self._bracket_test(path=path, opt="-e")
 
     def read_file(self, path: PathType) -> str:
-        return self.shell(
-            command=f"cat {path}",
-            print_input=False,
-            print_output=False,
-        )
+        if (agent := self.remote_agent()) is not None:
+            return b"".join(agent.stream_file(path=path)).decode()
+        return self._helper_shell(command=f"cat {path}")
 
     def file_size(
         self,
         path: PathType,
     ) -> int:
-        ret = self.shell(
-            command=f"stat -c '%s' '{path}'",
-            print_input=False,
-            print_output=False,
-            ignore_any_error_code=True,
-        )
-
+        if (agent := self.remote_agent()) is not None:
+            stat = agent.stat_paths(paths=[path])[str(path)]
+            if not stat.exists:
+                raise FileNotFoundError(path)
+            return stat.size
         try:
-            return int(ret)
-        except ValueError:
+            return int(self._helper_shell(command=f"stat -c '%s' '{path}'"))
+        except (subprocess.CalledProcessError, ValueError):
             raise FileNotFoundError(path)
 
     def write_content_to_file(
@@ -944,6 +1458,9 @@ class SSHCommLayer(CommunicationLayer):
         output_filename: PathType,
         privileged: bool = False,
     ):
+        if not privileged and (agent := self.remote_agent()) is not None:
+            agent.write_file(path=output_filename, content=content)
+            return
         prefix = "sudo " if privileged else ""
         self.shell(
             command=f"{prefix}tee {output_filename}",
@@ -956,6 +1473,9 @@ class SSHCommLayer(CommunicationLayer):
         output_filename: PathType,
         privileged: bool = False,
     ) -> None:
+        if not privileged and (agent := self.remote_agent()) is not None:
+            agent.write_file(path=output_filename, content=line + "\n", append=True)
+            return
         prefix = "sudo " if privileged else ""
         self.shell(
             command=f"{prefix}tee -a {output_filename}",
@@ -963,48 +1483,101 @@ class SSHCommLayer(CommunicationLayer):
         )
 
     def copy_from_host(self, source: PathType, destination: PathType) -> None:
-        if self._in_ssh_config:
-            command = ["rsync", "-azPv", str(source), f"{self._host}:{destination}"]
-        else:
-            user = self._ssh_host_info["user"]
-            hostname = self._ssh_host_info["hostname"]
-            port = self._ssh_host_info["port"]
-            command = [
-                "rsync",
-                "-av",
-                "--progress",
-                "-e",
-                f"ssh -p {port}",
-                str(source),
-                f"{user}@{hostname}:{destination}",
-            ]
-
-        shell_out(command=command)
+        with self._ssh_channel() as ssh_channel_options:
+            ssh_options = " ".join(ssh_channel_options)
+            if self._in_ssh_config:
+                command = ["rsync", "-azPv", "-e", f"ssh {ssh_options}".strip()]
+                command += [str(source), f"{self._host}:{destination}"]
+            else:
+                user = self._ssh_host_info["user"]
+                hostname = self._ssh_host_info["hostname"]
+                port = self._ssh_host_info["port"]
+                command = [
+                    "rsync",
+                    "-av",
+                    "--progress",
+                    "-e",
+                    f"ssh -p {port} {ssh_options}".strip(),
+                    str(source),
+                    f"{user}@{hostname}:{destination}",
+                ]
+
+            shell_out(command=command)
 
     def copy_to_host(self, source: PathType, destination: PathType) -> None:
-        if self._in_ssh_config:
-            command = ["rsync", "-azPv", f"{self._host}:{source}", str(destination)]
-        else:
-            user = self._ssh_host_info["user"]
-            hostname = self._ssh_host_info["hostname"]
-            port = self._ssh_host_info["port"]
-            command = [
-                "rsync",
-                "-a",
-                "--progress",
-                "-e",
-                f"ssh -p {port}",
-                f"{user}@{hostname}:{source}",
-                str(destination),
-            ]
+        with self._ssh_channel() as ssh_channel_options:
+            ssh_options = " ".join(ssh_channel_options)
+            if self._in_ssh_config:
+                command = ["rsync", "-azPv", "-e", f"ssh {ssh_options}".strip()]
+                command += [f"{self._host}:{source}", str(destination)]
+            else:
+                user = self._ssh_host_info["user"]
+                hostname = self._ssh_host_info["hostname"]
+                port = self._ssh_host_info["port"]
+                command = [
+                    "rsync",
+                    "-a",
+                    "--progress",
+                    "-e",
+                    f"ssh -p {port} {ssh_options}".strip(),
+                    f"{user}@{hostname}:{source}",
+                    str(destination),
+                ]
+
+            shell_out(command=command)
+
+    def copy_archive_to_host(
+        self,
+        source_root: PathType,
+        relative_paths: List[str],
+        destination_root: PathType,
+        compression_level: int | None = None,
+    ) -> None:
+        with self._ssh_channel() as ssh_options:
+            extract_archive_stream(
+                producer=self._archive_producer(
+                    source_root=source_root,
+                    relative_paths=relative_paths,
+                    compression_level=compression_level,
+                    ssh_options=ssh_options,
+                ),
+                destination_root=destination_root,
+                compressed=compression_level is not None,
+            )
 
-        shell_out(command=command)
+    def _archive_producer(
+        self,
+        source_root: PathType,
+        relative_paths: List[str],
+        compression_level: int | None,
+        ssh_options: List[str] = (),
+    ) -> SplitCommand | None:
+        environment = None
+        if compression_level is not None:
+            environment = {"ZSTD_CLEVEL": compression_level}
+        env_command = command_with_env(
+            command=archive_command(
+                source_root=source_root,
+                relative_paths=relative_paths,
+                compressed=compression_level is not None,
+            ),
+            environment=environment,
+            additional_environment=self._additional_environment,
+        )
+        # the archive is binary, no terminal must be allocated for it
+        return self._remote_shell_command(
+            remote_command=env_command,
+            ssh_options=ssh_options,
+            tty=False,
+        )
 
     def _remote_shell_command(
         self,
         remote_command: Command,
         remote_current_dir: PathType | None = None,
         establish_new_connection: bool = False,
+        ssh_options: List[str] = (),
+        tty: bool = True,
     ) -> SplitCommand:
         remote_command = remote_shell_command(
             remote_command=remote_command,
@@ -1012,12 +1585,16 @@ class SSHCommLayer(CommunicationLayer):
         )
 
         full_command = ["ssh"] + (["-oControlPath=none"] if establish_new_connection else [])
-
-        full_command = full_command + [
-            "-t",
-            self._host,
-            remote_command,
-        ]
+        full_command += list(ssh_options)
+
+        full_command = (
+            full_command
+            + (["-t"] if tty else [])
+            + [
+                self._host,
+                remote_command,
+            ]
+        )
 
         return full_command
 
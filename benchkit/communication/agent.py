@@ -0,0 +1,321 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Client of the remote agent of the communication layers.
+
+The agent (`benchkit.communication.agentserver`) is a single-file Python program pushed to the
+target host on its standard input when it starts, so that nothing has to be installed there but a
+Python interpreter. The communication layer then speaks to it with length-prefixed JSON messages,
+over a single long-lived channel (e.g. one SSH connection):
+- the filesystem operations are performed natively, without building, quoting and parsing shell
+  commands, nor spawning one process per operation;
+- the processes on the target are signaled by their pid, and killed with their whole process tree
+  exactly;
+- the state of processes is sampled from /proc, and files are streamed by chunks.
+
+Like the shell session (`benchkit.communication.session`), the agent is started on first use, and
+started again in a process forked from the one that started it.
+"""
+
+import base64
+import os
+import subprocess
+import threading
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional
+
+from benchkit.communication import agentserver
+from benchkit.communication.batch import PathStat
+from benchkit.utils.types import PathType
+
+# reads the agent source, preceded by its length, on the standard input and runs it
+BOOTSTRAP = (
+    "import sys;"
+    "n=int.from_bytes(sys.stdin.buffer.read(4),'big');"
+    "exec(compile(sys.stdin.buffer.read(n),'benchkit-agent','exec'))"
+)
+DEFAULT_CHUNK_SIZE = 1024 * 1024
+
+
+class AgentError(OSError):
+    """The agent process exited or could not be reached."""
+
+
+class AgentCallError(RuntimeError):
+    """An operation of the agent failed on the target with an error that is not an `OSError`."""
+
+
+def agent_argv(python: str = "python3") -> List[str]:
+    """
+    Get the command starting the agent with the given Python interpreter.
+
+    Args:
+        python (str, optional):
+            the Python interpreter of the target host.
+            Defaults to "python3".
+
+    Returns:
+        List[str]: the command, the last argument being the Python code of the bootstrap.
+    """
+    return [python, "-u", "-c", BOOTSTRAP]
+
+
+class RemoteAgent:
+    """
+    Connection to an agent process, running operations one at a time.
+    """
+
+    def __init__(self, argv: List[str]) -> None:
+        """
+        Args:
+            argv (List[str]): command starting the agent, e.g.
+                              `["ssh", "-T", "host", "python3", "-u", "-c", "<bootstrap>"]`.
+        """
+        self._argv = argv
+        self._process: Optional[subprocess.Popen] = None
+        self._pid: Optional[int] = None
+        self._next_id = 0
+        self._lock = threading.Lock()
+
+    def _started(self) -> subprocess.Popen:
+        if self._process is not None and self._pid == os.getpid():
+            if self._process.poll() is None:
+                return self._process
+            self._process = None
+        if self._pid != os.getpid():
+            # the agent of the parent process is left to the parent
+            self._process = None
+        if self._process is None:
+            self._process = subprocess.Popen(
+                self._argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._pid = os.getpid()
+            source = Path(agentserver.__file__).read_bytes()
+            self._process.stdin.write(len(source).to_bytes(4, "big") + source)
+        return self._process
+
+    def call(self, operation: str, **kwargs) -> Any:
+        """
+        Run an operation of the agent.
+
+        Args:
+            operation (str): the name of the operation (see `agentserver.OPERATIONS`).
+            **kwargs: the arguments of the operation.
+
+        Raises:
+            AgentError: if the agent process exited or could not be reached.
+            OSError: if the operation failed on the target with an `OSError` (with its errno, e.g.
+                     `FileNotFoundError`).
+            AgentCallError: if the operation failed on the target with another error.
+
+        Returns:
+            Any: the result of the operation.
+        """
+        with self._lock:
+            self._next_id += 1
+            request = {"id": self._next_id, "op": operation, "args": kwargs}
+            try:
+                process = self._started()
+                agentserver.write_message(process.stdin, request)
+                response = agentserver.read_message(process.stdout)
+            except (OSError, ValueError) as err:
+                self._close()
+                raise AgentError(f"agent {self._argv[0]} failed: {err}") from err
+            if response is None or response.get("id") != request["id"]:
+                self._close()
+                raise AgentError(f"agent {self._argv[0]} exited")
+
+        if response["ok"]:
+            return response["result"]
+        error = response["error"]
+        if error.get("errno") is not None:
+            raise OSError(error["errno"], error["strerror"], error["filename"])
+        raise AgentCallError(f"{operation}: {error['type']}: {error['message']}")
+
+    def ping(self) -> Dict[str, int]:
+        """
+        Check that the agent is running.
+
+        Returns:
+            Dict[str, int]: the version of the protocol and the pid of the agent on the target.
+        """
+        return self.call("ping")
+
+    def stat_paths(self, paths: Iterable[PathType]) -> Dict[str, PathStat]:
+        """
+        Get the status of the given paths (following symlinks).
+
+        Args:
+            paths (Iterable[PathType]): the paths.
+
+        Returns:
+            Dict[str, PathStat]: the status of each path, by path (as a string).
+        """
+        stats = self.call("stat", paths=[str(path) for path in paths])
+        return {stat["path"]: PathStat(**stat) for stat in stats}
+
+    def read_files(self, paths: Iterable[PathType]) -> Dict[str, str | None]:
+        """
+        Read the given (small) text files.
+
+        Args:
+            paths (Iterable[PathType]): the paths of the files.
+
+        Returns:
+            Dict[str, str | None]: the content of each file, None if it does not exist or cannot be
+                                   read.
+        """
+        return self.call("read_files", paths=[str(path) for path in paths])
+
+    def read_bytes(self, path: PathType, offset: int = 0, size: int = DEFAULT_CHUNK_SIZE) -> bytes:
+        """
+        Read a chunk of the given file.
+
+        Args:
+            path (PathType): the path of the file.
+            offset (int, optional): the position of the chunk in the file. Defaults to 0.
+            size (int, optional): the maximum size of the chunk. Defaults to DEFAULT_CHUNK_SIZE.
+
+        Returns:
+            bytes: the chunk, empty at the end of the file.
+        """
+        result = self.call("read_bytes", path=str(path), offset=offset, size=size)
+        return base64.b64decode(result["data"])
+
+    def stream_file(
+        self,
+        path: PathType,
+        offset: int = 0,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ) -> Iterator[bytes]:
+        """
+        Stream the given file by chunks, until its current end.
+
+        Args:
+            path (PathType): the path of the file.
+            offset (int, optional): the position to start from. Defaults to 0.
+            chunk_size (int, optional): the size of the chunks. Defaults to DEFAULT_CHUNK_SIZE.
+
+        Yields:
+            Iterator[bytes]: the chunks of the file.
+        """
+        while chunk := self.read_bytes(path=path, offset=offset, size=chunk_size):
+            offset += len(chunk)
+            yield chunk
+
+    def write_file(self, path: PathType, content: str, append: bool = False) -> None:
+        """
+        Write the given text to a file.
+
+        Args:
+            path (PathType): the path of the file.
+            content (str): the text.
+            append (bool, optional): whether to append to the file. Defaults to False.
+        """
+        self.call("write_file", path=str(path), content=content, append=append)
+
+    def makedirs(self, path: PathType, exist_ok: bool) -> None:
+        """
+        Create a directory, with all the path leading to it.
+
+        Args:
+            path (PathType): the path of the directory.
+            exist_ok (bool): whether to ignore that the directory already exists.
+        """
+        self.call("makedirs", path=str(path), exist_ok=exist_ok)
+
+    def remove(self, path: PathType, recursive: bool) -> None:
+        """
+        Remove a file or a directory.
+
+        Args:
+            path (PathType): the path to remove.
+            recursive (bool): whether to remove the content of the directory.
+        """
+        self.call("remove", path=str(path), recursive=recursive)
+
+    def glob(self, pattern: PathType) -> List[str]:
+        """
+        List the paths matching the given pattern.
+
+        Args:
+            pattern (PathType): the pattern.
+
+        Returns:
+            List[str]: the sorted matching paths.
+        """
+        return self.call("glob", pattern=str(pattern))
+
+    def which(self, cmd: str) -> str | None:
+        """
+        Find an executable in the path of the agent.
+
+        Args:
+            cmd (str): the executable.
+
+        Returns:
+            str | None: the path of the executable, None if it is not found.
+        """
+        return self.call("which", cmd=cmd)
+
+    def signal(self, pid: int, signal_code: int) -> None:
+        """
+        Send a signal to a process.
+
+        Args:
+            pid (int): the pid of the process.
+            signal_code (int): the code of the signal.
+        """
+        self.call("signal", pid=pid, signal_code=signal_code)
+
+    def kill_tree(self, pid: int, signal_code: int) -> List[int]:
+        """
+        Send a signal to a process, to all its descendants and, if it leads one, to its process
+        group.
+
+        Args:
+            pid (int): the pid of the process.
+            signal_code (int): the code of the signal.
+
+        Returns:
+            List[int]: the pids of the process tree the signal was sent to.
+        """
+        return self.call("kill_tree", pid=pid, signal_code=signal_code)
+
+    def sample(self, pids: Iterable[int]) -> Dict[int, Dict[str, Any] | None]:
+        """
+        Sample the state of processes from /proc: state letter, parent pid, number of threads,
+        user and system CPU time in seconds, resident memory in bytes.
+
+        Args:
+            pids (Iterable[int]): the pids of the processes.
+
+        Returns:
+            Dict[int, Dict[str, Any] | None]: the sample of each process, None if it does not exist.
+        """
+        return {int(pid): sample for pid, sample in self.call("sample", pids=list(pids)).items()}
+
+    def _close(self) -> None:
+        process, self._process = self._process, None
+        if process is None or self._pid != os.getpid():
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def close(self) -> None:
+        """
+        Stop the agent process. A new agent is started if it is used again.
+        """
+        with self._lock:
+            self._close()
@@ -0,0 +1,255 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Remote agent of the communication layers, the server side of `benchkit.communication.agent`.
+
+This file is sent as is to the target host and executed by its Python interpreter: it must only
+depend on the standard library, and must not import benchkit.
+
+The agent reads requests on its standard input and writes one response per request on its standard
+output. Each message is a JSON object preceded by its length (4 bytes, big endian):
+- request: `{"id": <int>, "op": <name>, "args": {...}}`;
+- response: `{"id": <int>, "ok": true, "result": ...}` or
+  `{"id": <int>, "ok": false, "error": {"type": ..., "errno": ..., "message": ..., ...}}`.
+"""
+
+import base64
+import glob
+import json
+import os
+import shutil
+import struct
+import sys
+
+PROTOCOL_VERSION = 1
+
+_HEADER = struct.Struct(">I")
+
+
+def _stat(path):
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return {"path": path, "exists": False}
+    return {
+        "path": path,
+        "exists": True,
+        "is_file": os.path.isfile(path),
+        "is_dir": os.path.isdir(path),
+        "size": stat.st_size,
+        "mtime": stat.st_mtime,
+    }
+
+
+def op_ping():
+    return {"version": PROTOCOL_VERSION, "pid": os.getpid()}
+
+
+def op_stat(paths):
+    return [_stat(path) for path in paths]
+
+
+def op_read_files(paths):
+    result = {}
+    for path in paths:
+        try:
+            with open(path, "r") as file:
+                result[path] = file.read()
+        except (OSError, UnicodeDecodeError):
+            result[path] = None
+    return result
+
+
+def op_read_bytes(path, offset, size):
+    with open(path, "rb") as file:
+        file.seek(offset)
+        data = file.read(size)
+        file_size = os.fstat(file.fileno()).st_size
+    return {"data": base64.b64encode(data).decode(), "file_size": file_size}
+
+
+def op_write_file(path, content, append):
+    with open(path, "a" if append else "w") as file:
+        file.write(content)
+
+
+def op_makedirs(path, exist_ok):
+    os.makedirs(path, exist_ok=exist_ok)
+
+
+def op_remove(path, recursive):
+    if recursive and os.path.isdir(path) and not os.path.islink(path):
+        shutil.rmtree(path)
+    else:
+        os.remove(path)
+
+
+def op_glob(pattern):
+    return sorted(glob.glob(pattern))
+
+
+def op_which(cmd):
+    return shutil.which(cmd)
+
+
+def op_signal(pid, signal_code):
+    os.kill(pid, signal_code)
+
+
+def _proc_stat(pid):
+    with open(f"/proc/{pid}/stat", "r") as file:
+        content = file.read()
+    # the command name, between parentheses, may contain spaces and parentheses
+    return content[content.rindex(")") + 2 :].split()
+
+
+def _children_map():
+    children = {}
+    for entry in os.listdir("/proc"):
+        if not entry.isdigit():
+            continue
+        try:
+            ppid = int(_proc_stat(entry)[1])
+        except (OSError, ValueError, IndexError):
+            continue
+        children.setdefault(ppid, []).append(int(entry))
+    return children
+
+
+def _process_tree(pid):
+    children = _children_map()
+    tree = []
+    pending = [pid]
+    while pending:
+        current = pending.pop()
+        tree.append(current)
+        pending.extend(children.get(current, []))
+    return tree
+
+
+def op_kill_tree(pid, signal_code):
+    # the descendants that left the process group (e.g. daemons) are found through their parents,
+    # the ones that were reparented through the process group the process leads, if any; the
+    # parents are signaled first so that they cannot react to the exit of their children
+    tree = _process_tree(pid)
+    for member in tree:
+        try:
+            os.kill(member, signal_code)
+        except ProcessLookupError:
+            pass
+    try:
+        if os.getpgid(pid) == pid:
+            os.killpg(pid, signal_code)
+    except ProcessLookupError:
+        pass
+    return tree
+
+
+def op_sample(pids):
+    clock_ticks = os.sysconf("SC_CLK_TCK")
+    page_size = os.sysconf("SC_PAGE_SIZE")
+    result = {}
+    for pid in pids:
+        try:
+            fields = _proc_stat(pid)
+        except OSError:
+            result[str(pid)] = None
+            continue
+        result[str(pid)] = {
+            "state": fields[0],
+            "ppid": int(fields[1]),
+            "nb_threads": int(fields[17]),
+            "utime_s": int(fields[11]) / clock_ticks,
+            "stime_s": int(fields[12]) / clock_ticks,
+            "rss_bytes": int(fields[21]) * page_size,
+        }
+    return result
+
+
+OPERATIONS = {
+    "ping": op_ping,
+    "stat": op_stat,
+    "read_files": op_read_files,
+    "read_bytes": op_read_bytes,
+    "write_file": op_write_file,
+    "makedirs": op_makedirs,
+    "remove": op_remove,
+    "glob": op_glob,
+    "which": op_which,
+    "signal": op_signal,
+    "kill_tree": op_kill_tree,
+    "sample": op_sample,
+}
+
+
+def _read_exactly(stream, size):
+    data = b""
+    while len(data) < size:
+        chunk = stream.read(size - len(data))
+        if not chunk:
+            return None
+        data += chunk
+    return data
+
+
+def read_message(stream):
+    """
+    Read a message from the given binary stream.
+
+    Args:
+        stream: the stream.
+
+    Returns:
+        the decoded message, None at the end of the stream.
+    """
+    header = _read_exactly(stream, _HEADER.size)
+    if header is None:
+        return None
+    body = _read_exactly(stream, _HEADER.unpack(header)[0])
+    if body is None:
+        return None
+    return json.loads(body.decode())
+
+
+def write_message(stream, message):
+    """
+    Write a message to the given binary stream.
+
+    Args:
+        stream: the stream.
+        message: the message, serializable to JSON.
+    """
+    body = json.dumps(message).encode()
+    stream.write(_HEADER.pack(len(body)) + body)
+    stream.flush()
+
+
+def _handle(request):
+    try:
+        operation = OPERATIONS[request["op"]]
+        result = operation(**request.get("args", {}))
+    except Exception as err:  # pylint: disable=broad-exception-caught
+        error = {"type": type(err).__name__, "message": str(err)}
+        if isinstance(err, OSError):
+            error.update({"errno": err.errno, "strerror": err.strerror, "filename": err.filename})
+        return {"id": request.get("id"), "ok": False, "error": error}
+    return {"id": request.get("id"), "ok": True, "result": result}
+
+
+def main():
+    """
+    Serve the requests read on the standard input until its end.
+    """
+    stdin = sys.stdin.buffer
+    stdout = sys.stdout.buffer
+    # the operations must not write on the channel of the responses
+    sys.stdout = sys.stderr
+    while True:
+        request = read_message(stdin)
+        if request is None:
+            break
+        write_message(stdout, _handle(request))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,230 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Batched filesystem operations of the communication layers: stat many paths, read many small files
+or list the files matching a pattern with a single shell script, i.e. a single round trip to a
+remote host, instead of one command per path.
+
+This module builds the scripts and parses their outputs; the local communication layer performs the
+same operations in-process.
+"""
+
+import glob
+import os
+import re
+import shlex
+import uuid
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from benchkit.utils.types import PathType
+
+
+@dataclass(frozen=True)
+class PathStat:
+    """
+    Status of a path on the target host (following symlinks).
+    """
+
+    path: str
+    exists: bool
+    is_file: bool = False
+    is_dir: bool = False
+    size: int = 0
+    mtime: Optional[float] = None
+
+
+def stat_script(paths: List[str]) -> str:
+    """
+    Build the script printing the status of the given paths, one line per path.
+
+    Args:
+        paths (List[str]): the paths.
+
+    Returns:
+        str: the script.
+    """
+    return "; ".join(
+        f"stat -L -c '%F|%s|%Y' -- {shlex.quote(path)} 2>/dev/null || echo -" for path in paths
+    )
+
+
+def parse_stat_output(paths: List[str], output: str) -> Dict[str, PathStat]:
+    """
+    Parse the output of the script built by `stat_script`.
+
+    Args:
+        paths (List[str]): the paths given to `stat_script`.
+        output (str): the output of the script.
+
+    Raises:
+        ValueError: if the output does not have one line per path.
+
+    Returns:
+        Dict[str, PathStat]: the status of each path.
+    """
+    lines = output.splitlines()
+    if len(lines) != len(paths):
+        raise ValueError(f"Expected {len(paths)} stat lines, got: {output!r}")
+
+    result = {}
+    for path, line in zip(paths, lines):
+        fields = line.strip().split("|")
+        if 3 != len(fields):
+            result[path] = PathStat(path=path, exists=False)
+            continue
+        file_type, size, mtime = fields
+        result[path] = PathStat(
+            path=path,
+            exists=True,
+            is_file=file_type.startswith("regular"),
+            is_dir="directory" == file_type,
+            size=int(size),
+            mtime=float(mtime),
+        )
+    return result
+
+
+def read_files_script(paths: List[str]) -> Tuple[str, str]:
+    """
+    Build the script printing the content of the given files, each preceded by a marker line.
+
+    Args:
+        paths (List[str]): the paths of the files.
+
+    Returns:
+        Tuple[str, str]: the script and the token of its markers, to give to
+                         `parse_read_files_output`.
+    """
+    token = f"@@benchkit-file-{uuid.uuid4().hex}"
+    script = "; ".join(
+        f"printf '\\n{token} {index} '; "
+        f"if [ -f {(q := shlex.quote(path))} ] && [ -r {q} ]; "
+        f"then echo ok; cat -- {q}; else echo missing; fi"
+        for index, path in enumerate(paths)
+    )
+    return script, token
+
+
+def parse_read_files_output(
+    paths: List[str],
+    output: str,
+    token: str,
+) -> Dict[str, Optional[str]]:
+    """
+    Parse the output of the script built by `read_files_script`.
+
+    Args:
+        paths (List[str]): the paths given to `read_files_script`.
+        output (str): the output of the script.
+        token (str): the token returned by `read_files_script`.
+
+    Returns:
+        Dict[str, Optional[str]]: the content of each file, None if it does not exist or cannot be
+                                  read.
+    """
+    pieces = re.split(rf"\r?\n{re.escape(token)} (\d+) (ok|missing)\r?\n", output)
+    result: Dict[str, Optional[str]] = {path: None for path in paths}
+    for index, status, content in zip(pieces[1::3], pieces[2::3], pieces[3::3]):
+        if "ok" == status:
+            result[paths[int(index)]] = content
+    return result
+
+
+def _split_pattern(pattern: str) -> Tuple[str, str]:
+    directory, name = os.path.split(pattern)
+    if glob.has_magic(directory):
+        raise ValueError(f"Only the last component of the pattern may have wildcards: {pattern}")
+    return directory or ".", name
+
+
+def glob_script(pattern: str) -> str:
+    """
+    Build the script listing the paths matching the given pattern.
+
+    Args:
+        pattern (str): the pattern, with wildcards in its last component only.
+
+    Returns:
+        str: the script.
+    """
+    directory, name = _split_pattern(pattern=pattern)
+    return (
+        f"find {shlex.quote(directory)} -mindepth 1 -maxdepth 1 -name {shlex.quote(name)} "
+        "2>/dev/null || true"
+    )
+
+
+def parse_glob_output(output: str) -> List[str]:
+    """
+    Parse the output of the script built by `glob_script`.
+
+    Args:
+        output (str): the output of the script.
+
+    Returns:
+        List[str]: the sorted matching paths.
+    """
+    return sorted(line.rstrip("\r") for line in output.splitlines() if line.strip())
+
+
+def local_stat_paths(paths: List[str]) -> Dict[str, PathStat]:
+    """
+    Get the status of the given paths of the local host.
+
+    Args:
+        paths (List[str]): the paths.
+
+    Returns:
+        Dict[str, PathStat]: the status of each path.
+    """
+    result = {}
+    for path in paths:
+        try:
+            stat = os.stat(path)
+        except OSError:
+            result[path] = PathStat(path=path, exists=False)
+            continue
+        result[path] = PathStat(
+            path=path,
+            exists=True,
+            is_file=os.path.isfile(path),
+            is_dir=os.path.isdir(path),
+            size=stat.st_size,
+            mtime=stat.st_mtime,
+        )
+    return result
+
+
+def local_read_files(paths: List[str]) -> Dict[str, Optional[str]]:
+    """
+    Read the given files of the local host.
+
+    Args:
+        paths (List[str]): the paths of the files.
+
+    Returns:
+        Dict[str, Optional[str]]: the content of each file, None if it does not exist or cannot be
+                                  read.
+    """
+    result: Dict[str, Optional[str]] = {}
+    for path in paths:
+        try:
+            with open(path, "r") as file:
+                result[path] = file.read()
+        except (OSError, UnicodeDecodeError):
+            result[path] = None
+    return result
+
+
+def local_glob(pattern: PathType) -> List[str]:
+    """
+    List the paths of the local host matching the given pattern.
+
+    Args:
+        pattern (PathType): the pattern.
+
+    Returns:
+        List[str]: the sorted matching paths.
+    """
+    return sorted(glob.glob(str(pattern)))
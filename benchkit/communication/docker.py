@@ -11,6 +11,7 @@ from pythainer.runners import ConcreteDockerRunner
 from benchkit.communication import CommunicationLayer
 from benchkit.communication.utils import command_with_env, remote_shell_command
 from benchkit.shell.shell import shell_out
+from benchkit.shell.streaming import LineCallback
 from benchkit.utils.types import Command, Environment, PathType, SplitCommand
 
 
@@ -86,6 +87,7 @@ class DockerCommLayer(CommunicationLayer):
         output_is_log: bool = False,
         ignore_ret_codes: Iterable[int] = (),
         ignore_any_error_code: bool = False,
+        output_callback: LineCallback | None = None,
     ) -> str:
         env_command = command_with_env(
             command=command,
@@ -106,6 +108,7 @@ class DockerCommLayer(CommunicationLayer):
             timeout=timeout,
             output_is_log=output_is_log,
             ignore_ret_codes=ignore_ret_codes,
+            output_callback=output_callback,
         )
 
         return output
@@ -0,0 +1,162 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Persistent shell session, used by the communication layers to run their small helper commands
+(`path_exists`, `isfile`, `read_file`, `which`, ...) without starting a new process, or a new SSH
+connection, for each of them.
+
+The session is a long-lived `sh` process reading commands on its standard input. Each command runs
+in a subshell (so that it cannot change the state of the session) with its standard input closed,
+and is followed by a marker, unique to the session, giving its return code.
+"""
+
+import os
+import re
+import select
+import shlex
+import subprocess
+import threading
+import time
+import uuid
+from typing import List, Optional, Tuple
+
+from benchkit.utils.types import Command, PathType
+
+_READ_SIZE = 64 * 1024
+
+
+class SessionError(OSError):
+    """The session process exited or could not be reached."""
+
+
+class ShellSession:
+    """
+    Long-lived shell process running commands one at a time.
+    The process is started on first use, and started again in a process forked from the one that
+    started it, so that forked workers never share the pipes of a session.
+    """
+
+    def __init__(self, argv: List[str]) -> None:
+        """
+        Args:
+            argv (List[str]): command starting the shell, e.g. `["ssh", "-T", "host", "sh"]`.
+        """
+        self._argv = argv
+        self._process: Optional[subprocess.Popen] = None
+        self._pid: Optional[int] = None
+        self._marker = f"__benchkit_session_{uuid.uuid4().hex}_rc="
+        self._end_re = re.compile(re.escape(self._marker.encode()) + rb"(\d+)\n")
+        self._lock = threading.Lock()
+
+    def _started(self) -> subprocess.Popen:
+        if self._process is not None and self._pid == os.getpid():
+            if self._process.poll() is None:
+                return self._process
+            self._process = None
+        if self._pid != os.getpid():
+            # the session of the parent process is left to the parent
+            self._process = None
+        if self._process is None:
+            self._process = subprocess.Popen(
+                self._argv,
+                stdin=subprocess.PIPE,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+            )
+            self._pid = os.getpid()
+        return self._process
+
+    def run(
+        self,
+        command: Command,
+        current_dir: Optional[PathType] = None,
+        timeout: Optional[float] = None,
+    ) -> Tuple[int, str]:
+        """
+        Run a command in the session.
+
+        Args:
+            command (Command):
+                the command to run, a list of arguments is quoted for the shell.
+            current_dir (Optional[PathType], optional):
+                directory where to run the command.
+                Defaults to None.
+            timeout (Optional[float], optional):
+                if not None, number of seconds to wait for the command to complete.
+                Defaults to None.
+
+        Raises:
+            SessionError: if the session process exited or could not be reached.
+            subprocess.TimeoutExpired: if the command did not complete before the timeout, the
+                                       session is then closed.
+
+        Returns:
+            Tuple[int, str]: the return code and the standard output of the command.
+        """
+        if not isinstance(command, str):
+            command = shlex.join(str(arg) for arg in command)
+        if current_dir is not None:
+            command = f"cd {shlex.quote(str(current_dir))} && {command}"
+        script = f"( {command}\n) </dev/null; printf '%s%d\\n' '{self._marker}' $?\n"
+
+        with self._lock:
+            process = self._started()
+            try:
+                process.stdin.write(script.encode())
+                process.stdin.flush()
+                return self._read_result(process=process, command=command, timeout=timeout)
+            except (SessionError, subprocess.TimeoutExpired):
+                self._close()
+                raise
+            except (OSError, ValueError) as err:
+                self._close()
+                raise SessionError(f"shell session {self._argv} failed: {err}") from err
+
+    def _read_result(
+        self,
+        process: subprocess.Popen,
+        command: str,
+        timeout: Optional[float],
+    ) -> Tuple[int, str]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        fd = process.stdout.fileno()
+        data = bytearray()
+        search_from = 0
+        while True:
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                raise subprocess.TimeoutExpired(cmd=command, timeout=timeout)
+            readable, _, _ = select.select([fd], [], [], remaining)
+            if not readable:
+                continue
+            chunk = os.read(fd, _READ_SIZE)
+            if not chunk:
+                raise SessionError(f"shell session {self._argv} exited")
+            data += chunk
+            match = self._end_re.search(data, search_from)
+            if match is not None:
+                output = data[: match.start()].decode(errors="replace")
+                return int(match.group(1)), output
+            search_from = max(0, len(data) - len(self._marker) - 8)
+
+    def _close(self) -> None:
+        process, self._process = self._process, None
+        if process is None or self._pid != os.getpid():
+            return
+        try:
+            process.stdin.close()
+        except OSError:
+            pass
+        try:
+            process.wait(timeout=1)
+        except subprocess.TimeoutExpired:
+            process.kill()
+            process.wait()
+        process.stdout.close()
+
+    def close(self) -> None:
+        """
+        Stop the session process, a new one is started if the session is used again.
+        """
+        with self._lock:
+            self._close()
@@ -0,0 +1,310 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+SSH connection multiplexing owned by benchkit.
+
+Instead of relying on the `ControlMaster` configuration of each user, the SSH communication layer
+starts its own master connections (`ssh -M`) on a control socket in the benchkit temporary folder,
+and runs its commands as multiplexed channels of these connections, so that the SSH handshake is
+paid once per connection instead of once per command.
+
+The master connections are started lazily, health-checked before being used (at most every
+`check_period_seconds`), and stopped when the Python process exits. Every command using a master
+connection is counted against its `max_channels` channels, the long-lived ones (persistent
+sessions, background commands) until they give their channel back with `release()`. A new master
+connection is started when all the channels of the existing ones are used, up to `max_masters`,
+above which the commands wait for a free channel, or the long-lived ones use their own connection.
+If a master connection cannot be started, commands use plain SSH connections.
+
+The connections are started and checked without holding the lock of the pool, so that a slow or
+unreachable host does not block the commands using the other connections, and a connection that
+cannot be established within `connect_timeout_seconds` is reported as failed.
+
+"""
+
+import atexit
+import hashlib
+import os
+import subprocess
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional
+
+from benchkit.utils.misc import get_benchkit_temp_folder_str
+
+# below the default MaxSessions (10) of sshd, leaving room for the persistent session
+DEFAULT_MAX_CHANNELS = 8
+DEFAULT_MAX_MASTERS = 4
+DEFAULT_CHECK_PERIOD_SECONDS = 30.0
+DEFAULT_CONTROL_PERSIST_SECONDS = 60
+DEFAULT_CONNECT_TIMEOUT_SECONDS = 10
+
+
+@dataclass
+class _Master:
+    control_path: str
+    started: bool = False
+    last_check: float = 0.0
+    nb_channels: int = 0
+    connecting: bool = False
+
+    @property
+    def options(self) -> List[str]:
+        return [f"-oControlPath={self.control_path}", "-oControlMaster=no"]
+
+
+class SSHMasterPool:
+    """
+    Pool of SSH master connections to a host, each carrying up to `max_channels` concurrent
+    commands.
+    """
+
+    def __init__(
+        self,
+        host: str,
+        max_channels: int = DEFAULT_MAX_CHANNELS,
+        max_masters: int = DEFAULT_MAX_MASTERS,
+        check_period_seconds: float = DEFAULT_CHECK_PERIOD_SECONDS,
+        control_persist_seconds: int = DEFAULT_CONTROL_PERSIST_SECONDS,
+        connect_timeout_seconds: int = DEFAULT_CONNECT_TIMEOUT_SECONDS,
+    ) -> None:
+        """
+        Args:
+            host (str):
+                the remote host, as given to ssh.
+            max_channels (int, optional):
+                number of concurrent commands carried by one master connection.
+                Defaults to DEFAULT_MAX_CHANNELS.
+            max_masters (int, optional):
+                maximum number of master connections to the host.
+                Defaults to DEFAULT_MAX_MASTERS.
+            check_period_seconds (float, optional):
+                minimum number of seconds between two health checks of a master connection.
+                Defaults to DEFAULT_CHECK_PERIOD_SECONDS.
+            control_persist_seconds (int, optional):
+                number of seconds an idle master connection stays open.
+                Defaults to DEFAULT_CONTROL_PERSIST_SECONDS.
+            connect_timeout_seconds (int, optional):
+                number of seconds after which starting a master connection fails if the host
+                cannot be reached.
+                Defaults to DEFAULT_CONNECT_TIMEOUT_SECONDS.
+        """
+        self._host = host
+        self._max_channels = max_channels
+        self._max_masters = max_masters
+        self._check_period_seconds = check_period_seconds
+        self._control_persist_seconds = control_persist_seconds
+        self._connect_timeout_seconds = connect_timeout_seconds
+        self._lock = threading.Lock()
+        self._channel_released = threading.Condition(self._lock)
+        self._masters: List[_Master] = []
+        self._pid = os.getpid()
+        self._failed = False
+        self._exit_registered = False
+        self._metrics = {
+            "nb_connections": 0,
+            "nb_failed_connections": 0,
+            "nb_health_checks": 0,
+            "nb_reconnections": 0,
+            "nb_channels": 0,
+            "nb_fallback_channels": 0,
+            "connection_setup_seconds": 0.0,
+            "last_connection_setup_seconds": 0.0,
+        }
+
+    def _control_path(self, index: int) -> str:
+        # unix socket paths are limited to ~100 characters, the host is hashed
+        digest = hashlib.sha1(self._host.encode()).hexdigest()[:12]
+        control_dir = os.path.join(get_benchkit_temp_folder_str(), "ssh")
+        os.makedirs(control_dir, mode=0o700, exist_ok=True)
+        return os.path.join(control_dir, f"{digest}-{self._pid}-{index}.sock")
+
+    def _ssh_control(self, master: _Master, operation: str) -> bool:
+        result = subprocess.run(
+            ["ssh", f"-oControlPath={master.control_path}", "-O", operation, self._host],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        return 0 == result.returncode
+
+    def _start_master(self, master: _Master) -> bool:
+        result = subprocess.run(
+            [
+                "ssh",
+                "-M",
+                "-N",
+                "-f",
+                f"-oControlPath={master.control_path}",
+                f"-oControlPersist={self._control_persist_seconds}s",
+                f"-oConnectTimeout={self._connect_timeout_seconds}",
+                "-oServerAliveInterval=30",
+                self._host,
+            ],
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            check=False,
+        )
+        return 0 == result.returncode
+
+    def _connect(self, master: _Master) -> bool:
+        # called without the lock, the master being marked as connecting by the caller
+        if master.started:
+            with self._lock:
+                self._metrics["nb_health_checks"] += 1
+            if self._ssh_control(master=master, operation="check"):
+                return True
+            with self._lock:
+                self._metrics["nb_reconnections"] += 1
+
+        start = time.monotonic()
+        started = self._start_master(master=master)
+        duration = time.monotonic() - start
+        with self._lock:
+            if not started:
+                self._metrics["nb_failed_connections"] += 1
+                return False
+            self._metrics["nb_connections"] += 1
+            self._metrics["connection_setup_seconds"] += duration
+            self._metrics["last_connection_setup_seconds"] = duration
+            if not self._exit_registered:
+                atexit.register(self.close)
+                self._exit_registered = True
+        return True
+
+    def _pick_master(self, reserve: bool) -> Optional[_Master]:
+        if os.getpid() != self._pid:
+            # forked worker: its own masters, the ones of the parent are left to the parent
+            self._pid = os.getpid()
+            self._masters = []
+            self._exit_registered = False
+        while True:
+            if self._failed:
+                return None
+            candidates = [m for m in self._masters if m.nb_channels < self._max_channels]
+            if candidates:
+                return min(candidates, key=lambda m: m.nb_channels)
+            if len(self._masters) < self._max_masters:
+                master = _Master(control_path=self._control_path(index=len(self._masters)))
+                self._masters.append(master)
+                return master
+            if not reserve:
+                # a long-lived command would hold the channel indefinitely, it is not waited for
+                return None
+            # all the channels are used, overloading a master would exceed MaxSessions
+            self._channel_released.wait()
+
+    def _checkout(self, reserve: bool) -> Optional[_Master]:
+        connect = False
+        with self._lock:
+            master = self._pick_master(reserve=reserve)
+            if master is not None:
+                # counted before connecting, for the concurrent commands to use the other masters
+                master.nb_channels += 1
+                while master.connecting:
+                    self._channel_released.wait()
+                now = time.monotonic()
+                connect = (
+                    not master.started or now - master.last_check >= self._check_period_seconds
+                )
+                master.connecting = connect
+
+        if master is not None and connect:
+            started = self._connect(master=master)
+            with self._lock:
+                master.started = started
+                master.last_check = time.monotonic()
+                master.connecting = False
+                if not started:
+                    self._failed = True
+                self._channel_released.notify_all()
+
+        with self._lock:
+            if master is not None and (self._failed or not master.started):
+                master.nb_channels -= 1
+                master = None
+            if master is None:
+                self._metrics["nb_fallback_channels"] += 1
+            else:
+                self._metrics["nb_channels"] += 1
+        return master
+
+    def _release(self, master: _Master) -> None:
+        with self._lock:
+            if master.nb_channels > 0:
+                master.nb_channels -= 1
+            self._channel_released.notify()
+
+    @contextmanager
+    def channel(self) -> Iterator[List[str]]:
+        """
+        Reserve a channel of a master connection for one command, waiting for a channel to be
+        released if all the channels of `max_masters` connections are used.
+
+        Yields:
+            Iterator[List[str]]: the ssh options making the command use the reserved channel, empty
+                                 if the command must use its own connection.
+        """
+        master = self._checkout(reserve=True)
+        try:
+            yield [] if master is None else master.options
+        finally:
+            if master is not None:
+                self._release(master=master)
+
+    def options(self) -> List[str]:
+        """
+        Reserve a channel of a master connection for a long-lived command, e.g. a persistent
+        session or a background command, without waiting for a free channel. The channel stays
+        reserved until it is given back with `release()`, or until the master connections are
+        stopped.
+
+        Returns:
+            List[str]: the ssh options making the command use the reserved channel, empty if the
+                       command must use its own connection.
+        """
+        master = self._checkout(reserve=False)
+        return [] if master is None else master.options
+
+    def release(self, ssh_options: List[str]) -> None:
+        """
+        Give back the channel reserved with `options()`.
+
+        Args:
+            ssh_options (List[str]): the ssh options returned by `options()`.
+        """
+        with self._lock:
+            master = next((m for m in self._masters if m.options == list(ssh_options)), None)
+        if master is not None:
+            self._release(master=master)
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Get the metrics of the connections of the pool: number of connections, of failed
+        connections, of health checks and reconnections, of multiplexed channels and of commands
+        that could not use a master connection, total and last connection setup time.
+
+        Returns:
+            Dict[str, float]: the metrics of the pool.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def close(self) -> None:
+        """
+        Stop the master connections started by this process.
+        """
+        with self._lock:
+            if os.getpid() != self._pid:
+                return
+            masters = [m for m in self._masters if m.started]
+            for master in masters:
+                master.started = False
+            self._masters = []
+            self._channel_released.notify_all()
+        for master in masters:
+            self._ssh_control(master=master, operation="exit")
@@ -0,0 +1,333 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Pipelined transfer of the record data of remote runs back to the host.
+
+Instead of copying the data directory of each run back with its own rsync once the run is finished,
+the runs submit their directory to a `TransferQueue`: a background thread copies it while the next
+runs execute. The directories waiting in the queue are sent together as a single tar stream, i.e.
+one round trip to the remote host, optionally compressed with zstd, which pays off for large
+traces (perf.data, ftrace, ...).
+
+The directories are removed from the target once they are extracted on the host. Failed transfers
+are kept on the target and reported when the queue is closed, at the end of the campaign.
+"""
+
+from __future__ import annotations
+
+import queue
+import shutil
+import subprocess
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from benchkit.utils.types import PathType, SplitCommand
+
+if TYPE_CHECKING:
+    from benchkit.communication import CommunicationLayer
+
+DEFAULT_MAX_BATCH = 16
+DEFAULT_MAX_PENDING = 8
+
+
+class TransferError(Exception):
+    """Raised when some record data could not be transferred back to the host."""
+
+
+@dataclass(frozen=True)
+class ArtifactTransfer:
+    """
+    Policy of the transfer of the record data of remote runs back to the host.
+
+    Attributes:
+        compression_level (Optional[int]): if not None, zstd compression level of the transferred
+                                           archives (1-19), disabled if zstd is not installed on
+                                           both hosts.
+        max_batch (int): maximum number of run directories sent in one archive.
+        max_pending (int): maximum number of run directories waiting for their transfer, the next
+                           run waits for a slot above.
+    """
+
+    compression_level: Optional[int] = None
+    max_batch: int = DEFAULT_MAX_BATCH
+    max_pending: int = DEFAULT_MAX_PENDING
+
+    def __post_init__(self) -> None:
+        if self.compression_level is not None and not 1 <= self.compression_level <= 19:
+            raise ValueError(f"Invalid zstd compression level: {self.compression_level}")
+        if self.max_batch < 1:
+            raise ValueError(f"Invalid maximum batch size: {self.max_batch}")
+        if self.max_pending < 1:
+            raise ValueError(f"Invalid maximum number of pending transfers: {self.max_pending}")
+
+
+def archive_command(
+    source_root: PathType,
+    relative_paths: List[str],
+    compressed: bool,
+) -> SplitCommand:
+    """
+    Build the tar command writing the archive of the given paths on its standard output.
+
+    Args:
+        source_root (PathType): the directory the paths are relative to.
+        relative_paths (List[str]): the paths to archive.
+        compressed (bool): whether to compress the archive with zstd (the level is given by the
+                           `ZSTD_CLEVEL` environment variable).
+
+    Returns:
+        SplitCommand: the command.
+    """
+    return (
+        ["tar"]
+        + (["--zstd"] if compressed else [])
+        + ["-C", str(source_root), "-cf", "-", "--"]
+        + relative_paths
+    )
+
+
+def extract_archive_stream(
+    producer: SplitCommand,
+    destination_root: PathType,
+    compressed: bool,
+) -> None:
+    """
+    Run the given command producing an archive and extract its standard output on the host.
+
+    Args:
+        producer (SplitCommand): the command writing the archive on its standard output.
+        destination_root (PathType): the directory to extract the archive in.
+        compressed (bool): whether the archive is compressed with zstd.
+
+    Raises:
+        subprocess.CalledProcessError: if the production or the extraction of the archive fails.
+    """
+    Path(destination_root).mkdir(parents=True, exist_ok=True)
+    extractor = (
+        ["tar"]
+        + (["--zstd"] if compressed else [])
+        + ["--no-overwrite-dir", "-C", str(destination_root), "-xf", "-"]
+    )
+    with subprocess.Popen(
+        producer,
+        stdin=subprocess.DEVNULL,
+        stdout=subprocess.PIPE,
+    ) as producer_process:
+        extractor_process = subprocess.run(
+            extractor,
+            stdin=producer_process.stdout,
+            check=False,
+        )
+        producer_process.stdout.close()
+        producer_process.wait()
+
+    if 0 != producer_process.returncode:
+        raise subprocess.CalledProcessError(producer_process.returncode, producer)
+    if 0 != extractor_process.returncode:
+        raise subprocess.CalledProcessError(extractor_process.returncode, extractor)
+
+
+@dataclass(frozen=True)
+class _Transfer:
+    source_root: str
+    relative_path: str
+    destination_root: str
+
+
+_STOP = _Transfer(source_root="", relative_path="", destination_root="")
+
+
+class TransferQueue:
+    """
+    Queue of directories of the target host copied to the host by a background thread.
+    """
+
+    def __init__(
+        self,
+        comm: CommunicationLayer,
+        policy: ArtifactTransfer = ArtifactTransfer(),
+    ) -> None:
+        """
+        Args:
+            comm (CommunicationLayer):
+                communication layer of the target host the directories are copied from.
+            policy (ArtifactTransfer, optional):
+                compression and batching of the transfers.
+                Defaults to ArtifactTransfer().
+        """
+        self._comm = comm
+        self._policy = policy
+        self._compression_level = policy.compression_level
+        if self._compression_level is not None and (
+            shutil.which("zstd") is None or comm.which("zstd") is None
+        ):
+            print("[WARNING] zstd not found, record data transferred without compression")
+            self._compression_level = None
+
+        self._queue: queue.Queue[_Transfer] = queue.Queue(maxsize=policy.max_pending)
+        self._errors: List[Tuple[List[_Transfer], Exception]] = []
+        self._metrics = {
+            "nb_directories": 0,
+            "nb_batches": 0,
+            "nb_failed_batches": 0,
+            "transfer_seconds": 0.0,
+            "wait_seconds": 0.0,
+        }
+        self._lock = threading.Lock()
+        self._closed = False
+        self._worker = threading.Thread(target=self._work, name="benchkit-transfer", daemon=True)
+        self._worker.start()
+
+    def __enter__(self) -> "TransferQueue":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        # an error of the campaign has precedence over the ones of the transfers
+        self.close(check=exc_type is None)
+
+    def submit(
+        self,
+        source_root: PathType,
+        relative_path: PathType,
+        destination_root: PathType,
+    ) -> None:
+        """
+        Queue the copy of a directory of the target host to the host, waiting for a slot if
+        `max_pending` directories are already waiting.
+
+        Args:
+            source_root (PathType): directory of the target host the path is relative to.
+            relative_path (PathType): path of the directory to copy, relative to `source_root`.
+            destination_root (PathType): directory of the host the path is copied relative to.
+
+        Raises:
+            ValueError: if the queue is closed.
+        """
+        if self._closed:
+            raise ValueError("Transfer queue already closed")
+        transfer = _Transfer(
+            source_root=str(source_root),
+            relative_path=str(relative_path),
+            destination_root=str(destination_root),
+        )
+        start = time.monotonic()
+        self._queue.put(transfer)
+        with self._lock:
+            self._metrics["wait_seconds"] += time.monotonic() - start
+
+    def wait(self, check: bool = True) -> None:
+        """
+        Wait until all the submitted directories are transferred.
+
+        Args:
+            check (bool, optional):
+                whether to raise an error if some transfers failed.
+                Defaults to True.
+
+        Raises:
+            TransferError: if some transfers failed.
+        """
+        start = time.monotonic()
+        self._queue.join()
+        with self._lock:
+            self._metrics["wait_seconds"] += time.monotonic() - start
+            errors, self._errors = self._errors, []
+
+        if check and errors:
+            failed = [f"{t.source_root}/{t.relative_path}" for batch, _ in errors for t in batch]
+            raise TransferError(
+                f"{len(failed)} record data directories not transferred, kept on the target: "
+                f"{', '.join(failed)} (first error: {errors[0][1]})"
+            )
+
+    def close(self, check: bool = True) -> None:
+        """
+        Wait until all the submitted directories are transferred and stop the background thread.
+
+        Args:
+            check (bool, optional):
+                whether to raise an error if some transfers failed.
+                Defaults to True.
+
+        Raises:
+            TransferError: if some transfers failed.
+        """
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(_STOP)
+        try:
+            self.wait(check=check)
+        finally:
+            self._worker.join()
+
+    def metrics(self) -> Dict[str, float]:
+        """
+        Get the metrics of the transfers: number of directories and of archives transferred, of
+        failed archives, time spent transferring and time the runs waited for the transfers.
+
+        Returns:
+            Dict[str, float]: the metrics of the queue.
+        """
+        with self._lock:
+            return dict(self._metrics)
+
+    def _next_batch(self, first: _Transfer) -> Tuple[List[_Transfer], Optional[_Transfer]]:
+        batch = [first]
+        while len(batch) < self._policy.max_batch:
+            try:
+                transfer = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if (
+                transfer is _STOP
+                or transfer.source_root != first.source_root
+                or transfer.destination_root != first.destination_root
+            ):
+                return batch, transfer
+            batch.append(transfer)
+        return batch, None
+
+    def _transfer(self, batch: List[_Transfer]) -> None:
+        source_root = batch[0].source_root
+        relative_paths = [transfer.relative_path for transfer in batch]
+        start = time.monotonic()
+        try:
+            self._comm.copy_archive_to_host(
+                source_root=source_root,
+                relative_paths=relative_paths,
+                destination_root=batch[0].destination_root,
+                compression_level=self._compression_level,
+            )
+            self._comm.shell(
+                command=["rm", "-rf", "--"] + [f"{source_root}/{p}" for p in relative_paths],
+                print_input=False,
+                print_output=False,
+            )
+        except Exception as err:  # pylint: disable=broad-exception-caught
+            # the error is reported by wait(), the worker keeps serving the next runs
+            with self._lock:
+                self._metrics["nb_failed_batches"] += 1
+                self._errors.append((batch, err))
+        else:
+            with self._lock:
+                self._metrics["nb_directories"] += len(batch)
+                self._metrics["nb_batches"] += 1
+        finally:
+            with self._lock:
+                self._metrics["transfer_seconds"] += time.monotonic() - start
+
+    def _work(self) -> None:
+        carried = None
+        while True:
+            transfer = carried if carried is not None else self._queue.get()
+            if transfer is _STOP:
+                self._queue.task_done()
+                return
+            batch, carried = self._next_batch(first=transfer)
+            self._transfer(batch=batch)
+            for _ in batch:
+                self._queue.task_done()
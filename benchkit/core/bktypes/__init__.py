@@ -24,3 +24,20 @@ Argv = Sequence[str] | str
 
 RecordResult = Vars | list[Vars]
 """Benchmark collection result: either a single measurement record or list of records."""
+
+
+def merge_fields(record: RecordResult, fields: Vars) -> RecordResult:
+    """
+    Merge fields into a record, or into each record of a list of records. The fields already
+    present in a record are kept.
+
+    Args:
+        record: Record (or list of records) to complete.
+        fields: Fields to add.
+
+    Returns:
+        The completed record (or list of records).
+    """
+    if isinstance(record, list):
+        return [merge_fields(record=r, fields=fields) for r in record]
+    return fields | record
@@ -15,7 +15,7 @@ from dataclasses import dataclass, field
 from pathlib import Path
 
 from benchkit.core.bktypes import Vars
-from benchkit.core.bktypes.execfn import ExecOutput
+from benchkit.core.bktypes.execfn import ExecOutput, ResourceUsage
 
 
 @dataclass(frozen=True)
@@ -59,7 +59,17 @@ class RunResult:
 
     Attributes:
         outputs: List of ExecOutput objects from commands executed during the run phase.
-                 Each ExecOutput captures stdout, stderr, return code, and timing information.
+                 Each ExecOutput captures stdout, stderr, return code, timing information, and
+                 resource usage.
     """
 
     outputs: list[ExecOutput]
+
+    def resource_usage(self) -> ResourceUsage | None:
+        """
+        Get the total resource usage of the commands executed during the run phase.
+
+        Returns:
+            The aggregated resource usage, None if it was not collected for any command.
+        """
+        return ResourceUsage.total(o.rusage for o in self.outputs if o.rusage is not None)
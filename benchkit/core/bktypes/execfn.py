@@ -4,6 +4,7 @@
 Execution function protocol and adapters for running commands.
 
 This module defines:
+- ResourceUsage: Dataclass capturing the kernel resource usage of a command
 - ExecOutput: Dataclass capturing the result of command execution
 - ExecFn: Protocol defining the execution interface used by benchmarks
 - shell2exec: Adapter converting platform shell functions to ExecFn protocol
@@ -12,15 +13,112 @@ The ExecFn protocol provides a clean, synchronous API for benchmark authors whil
 allowing the framework to handle platform-specific details internally.
 """
 
-from dataclasses import dataclass
+import resource
+import subprocess
+from contextlib import nullcontext
+from dataclasses import dataclass, fields
 from pathlib import Path
-from typing import Protocol, Sequence
+from typing import Iterable, Protocol, Sequence
 
-from benchkit.core.bktypes import Argv, Env
+from benchkit.communication import CommunicationLayer
+from benchkit.core.bktypes import Argv, Env, RecordResult, merge_fields
 from benchkit.core.bktypes.shellfn import ShellFn
+from benchkit.results.streamparser import StreamParser, shell_streamed
 from benchkit.utils.misc import TimeMeasure
 
 
+@dataclass(frozen=True)
+class ResourceUsage:
+    """
+    Kernel resource usage of a command, as reported by `os.wait4` when reaping it.
+
+    Attributes:
+        user_cpu_s: CPU time spent in user mode, in seconds.
+        system_cpu_s: CPU time spent in kernel mode, in seconds.
+        max_rss_kib: Maximum resident set size, in KiB.
+        voluntary_context_switches: Number of voluntary context switches (blocking waits).
+        involuntary_context_switches: Number of involuntary context switches (preemptions).
+        minor_page_faults: Number of page faults serviced without I/O.
+        major_page_faults: Number of page faults that required I/O.
+        block_input_ops: Number of block input operations.
+        block_output_ops: Number of block output operations.
+    """
+
+    user_cpu_s: float
+    system_cpu_s: float
+    max_rss_kib: int
+    voluntary_context_switches: int
+    involuntary_context_switches: int
+    minor_page_faults: int
+    major_page_faults: int
+    block_input_ops: int
+    block_output_ops: int
+
+    @classmethod
+    def from_rusage(cls, rusage: resource.struct_rusage) -> "ResourceUsage":
+        """
+        Create a ResourceUsage from the structure returned by `os.wait4`.
+
+        Args:
+            rusage: Resource usage structure of the reaped process.
+
+        Returns:
+            The resource usage of the process.
+        """
+        return cls(
+            user_cpu_s=rusage.ru_utime,
+            system_cpu_s=rusage.ru_stime,
+            max_rss_kib=rusage.ru_maxrss,
+            voluntary_context_switches=rusage.ru_nvcsw,
+            involuntary_context_switches=rusage.ru_nivcsw,
+            minor_page_faults=rusage.ru_minflt,
+            major_page_faults=rusage.ru_majflt,
+            block_input_ops=rusage.ru_inblock,
+            block_output_ops=rusage.ru_oublock,
+        )
+
+    @classmethod
+    def total(cls, usages: Iterable["ResourceUsage"]) -> "ResourceUsage | None":
+        """
+        Aggregate the resource usage of several commands run one after the other: times and
+        counters are summed, the maximum resident set size is the largest one.
+
+        Args:
+            usages: Resource usages to aggregate.
+
+        Returns:
+            The aggregated resource usage, None if there is none to aggregate.
+        """
+        usages = list(usages)
+        if not usages:
+            return None
+        totals = {f.name: sum(getattr(u, f.name) for u in usages) for f in fields(cls)}
+        totals["max_rss_kib"] = max(u.max_rss_kib for u in usages)
+        return cls(**totals)
+
+    def as_record(self) -> dict[str, float | int]:
+        """
+        Get the resource usage as record fields, prefixed with `rusage/`.
+
+        Returns:
+            Dictionary of record fields, mergeable into a RecordResult.
+        """
+        return {f"rusage/{f.name}": getattr(self, f.name) for f in fields(self)}
+
+    def merged_into(self, record: RecordResult) -> RecordResult:
+        """
+        Merge the resource usage into a record, or into each record of a list of records. The
+        fields already present in a record are kept.
+
+        Args:
+            record: Record (or list of records) to complete.
+
+        Returns:
+            The completed record (or list of records).
+        """
+        return merge_fields(record=record, fields=self.as_record())
+
+
 @dataclass(frozen=True)
 class ExecOutput:
     """
@@ -39,6 +137,9 @@ class ExecOutput:
         duration_s: Elapsed execution time in seconds (None if not measured).
         stdout_path: Path where stdout was written (None if not saved to file).
         stderr_path: Path where stderr was written (None if not saved to file).
+        records: Records of the stream parser fed with stdout (None without stream parser).
+        rusage: Kernel resource usage of the command (None if not collected, e.g. for commands
+                run on a remote host).
     """
 
     argv: Sequence[str]
@@ -50,6 +151,8 @@ class ExecOutput:
     duration_s: float | None = None
     stdout_path: Path | None = None
     stderr_path: Path | None = None
+    records: RecordResult | None = None
+    rusage: ResourceUsage | None = None
 
 
 class ExecFn(Protocol):
@@ -75,6 +178,7 @@ class ExecFn(Protocol):
         output_is_log: bool = False,
         ignore_ret_codes: tuple[int, ...] = (),
         ignore_any_error_code: bool = False,
+        stream_parser: StreamParser | None = None,
     ) -> ExecOutput:
         """
         Execute a command and return its output.
@@ -84,11 +188,13 @@ class ExecFn(Protocol):
             cwd: Working directory for command execution.
             env: Environment variables (None = inherit current environment).
             timeout_s: Maximum execution time in seconds (None = no timeout).
-            record_dir: Directory to save output files (None = don't save).
+            record_dir: Directory to save stdout and stderr files (None = don't save).
             print_output: Whether to print output to console in real-time.
             output_is_log: Whether to treat output as log messages.
             ignore_ret_codes: Tuple of return codes to treat as success.
             ignore_any_error_code: If True, treat all return codes as success.
+            stream_parser: Parser fed with each line of stdout while the command runs; its
+                records are returned in ExecOutput.records and stdout is then not kept.
 
         Returns:
             ExecOutput containing command results and metadata.
@@ -106,6 +212,11 @@ def shell2exec(shell_fun: ShellFn) -> ExecFn:
     Creates an adapter that wraps a platform-specific shell function, adding timing
     measurement and transforming the result into an ExecOutput object.
 
+    When the shell function is the `shell` method of a communication layer that implements
+    `shell_capture` (local and SSH hosts), the command is run through it to capture stderr
+    separately, the actual return code, and the resource usage of local commands. Otherwise, stderr
+    is empty and the return code is 0 unless the shell function raised an error.
+
     Args:
         shell_fun: Platform-specific shell execution function to wrap.
 
@@ -122,6 +233,12 @@ def shell2exec(shell_fun: ShellFn) -> ExecFn:
         hello
     """
 
+    comm = getattr(shell_fun, "__self__", None)
+    can_capture = (
+        isinstance(comm, CommunicationLayer)
+        and type(comm).shell_capture is not CommunicationLayer.shell_capture
+    )
+
     def exec_fun(
         argv: Argv,
         cwd: Path | None = None,
@@ -132,27 +249,94 @@ def shell2exec(shell_fun: ShellFn) -> ExecFn:
         output_is_log: bool = False,
         ignore_ret_codes: tuple[int, ...] = (),
         ignore_any_error_code: bool = False,
+        stream_parser: StreamParser | None = None,
     ) -> ExecOutput:
-        with TimeMeasure() as tm:
-            out = shell_fun(
-                command=argv,
-                current_dir=cwd,
-                environment=env,
-                timeout=timeout_s,
-                print_output=print_output,
-                output_is_log=output_is_log,
-                ignore_ret_codes=ignore_ret_codes,
-                ignore_any_error_code=ignore_any_error_code,
-            )
+        stdout_path, stderr_path = _record_paths(record_dir=record_dir)
+        stdout_record = nullcontext() if stdout_path is None else open(stdout_path, "w")
+        with stdout_record as stdout_file:
+
+            def output_callback(line: str) -> None:
+                if stdout_file is not None:
+                    stdout_file.write(line)
+                if stream_parser is not None:
+                    stream_parser.feed_line(line=line)
+
+            with TimeMeasure() as tm:
+                if can_capture:
+                    captured = comm.shell_capture(
+                        command=argv,
+                        current_dir=cwd,
+                        environment=env,
+                        timeout=timeout_s,
+                        print_output=print_output,
+                        output_is_log=output_is_log,
+                        output_callback=output_callback,
+                        keep_output=stream_parser is None,
+                    )
+                else:
+                    captured = None
+                    out = _shell(
+                        shell_fun=shell_fun,
+                        stream_parser=stream_parser,
+                        command=argv,
+                        current_dir=cwd,
+                        environment=env,
+                        timeout=timeout_s,
+                        print_output=print_output,
+                        output_is_log=output_is_log,
+                        ignore_ret_codes=ignore_ret_codes,
+                        ignore_any_error_code=ignore_any_error_code,
+                    )
+                    if stdout_file is not None:
+                        stdout_file.write(out)
+
+        if captured is None:
+            stdout, stderr, returncode, rusage = out, "", 0, None
+            stderr_path = None
+        else:
+            stdout, stderr, returncode = captured.stdout, captured.stderr, captured.returncode
+            rusage = None if captured.rusage is None else ResourceUsage.from_rusage(captured.rusage)
+            if stderr_path is not None:
+                stderr_path.write_text(stderr)
+            if returncode and not ignore_any_error_code and returncode not in ignore_ret_codes:
+                raise subprocess.CalledProcessError(
+                    returncode=returncode,
+                    cmd=argv,
+                    output=stdout,
+                    stderr=stderr,
+                )
+
         result = ExecOutput(
             argv=argv,
             cwd=cwd,
             env=env,
-            stdout=out,
-            stderr="",
-            returncode=0,
+            stdout=stdout,
+            stderr=stderr,
+            returncode=returncode,
             duration_s=tm.duration_seconds,
+            stdout_path=stdout_path,
+            stderr_path=stderr_path,
+            records=None if stream_parser is None else stream_parser.records(),
+            rusage=rusage,
         )
         return result
 
     return exec_fun
+
+
+def _shell(
+    shell_fun: ShellFn,
+    stream_parser: StreamParser | None,
+    **shell_kwargs,
+) -> str:
+    if stream_parser is None:
+        return shell_fun(**shell_kwargs)
+    return shell_streamed(shell_fun=shell_fun, stream_parser=stream_parser, **shell_kwargs)
+
+
+def _record_paths(record_dir: Path | None) -> tuple[Path | None, Path | None]:
+    if record_dir is None:
+        return None, None
+    record_dir.mkdir(parents=True, exist_ok=True)
+    index = len(list(record_dir.glob("exec-*.stdout")))
+    return record_dir / f"exec-{index}.stdout", record_dir / f"exec-{index}.stderr"
@@ -23,6 +23,7 @@ from benchkit.core.bktypes import RecordResult, Vars
 from benchkit.core.validatebench import validate_benchmark
 from benchkit.engine.executor import LocalExecutor
 from benchkit.engine.stepper import Stepper
+from benchkit.helpers.linux.cgroup import CgroupSandbox
 from benchkit.platforms import get_current_platform
 from benchkit.utils.logging import get_logger
 
@@ -38,6 +39,8 @@ class RunOnceEngine:
     - If fetch is missing, you must provide fetch_result explicitly or the
       benchmark must not need it (build/run must not rely on ctx.fetch_result).
     - Similarly for build.
+    - With a sandbox, the run phase is placed in a transient cgroup whose resource accounting
+      (`cgroup/*` fields) completes the record.
     """
 
     executor = LocalExecutor()
@@ -49,6 +52,7 @@ class RunOnceEngine:
         args: Vars,
         duration_s: int | None = None,
         record_dir: Path | None = None,
+        sandbox: CgroupSandbox | None = None,
     ) -> RecordResult:
         log = get_logger("engine.runonce")
         validate_benchmark(bench=bench)
@@ -56,7 +60,7 @@ class RunOnceEngine:
         platform = get_current_platform()
 
         log.debug("Starting benchmark.")
-        stepper = Stepper(bench=bench, platform=platform)
+        stepper = Stepper(bench=bench, platform=platform, sandbox=sandbox)
         log.debug("Fetching...")
         session = stepper.fetch(args=args, record_dir=record_dir)
         log.debug("Building...")
@@ -92,6 +96,7 @@ def run_once(
     args: Vars,
     duration_s: int | None = None,
     record_dir: Path | None = None,
+    sandbox: CgroupSandbox | None = None,
 ) -> RecordResult:
     engine = RunOnceEngine()
     result = engine.run_once(
@@ -99,5 +104,6 @@ def run_once(
         args=args,
         duration_s=duration_s,
         record_dir=record_dir,
+        sandbox=sandbox,
     )
     return result
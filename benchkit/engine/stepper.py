@@ -19,15 +19,21 @@ Separation of concerns:
 - Stepper: binding + context construction + step-level validation + execution
 """
 
+import dataclasses
 import inspect
 from dataclasses import dataclass
 from pathlib import Path
 from typing import Callable
 
 from benchkit.core.benchmark import Benchmark
-from benchkit.core.bktypes import RecordResult, Vars
+from benchkit.core.bktypes import RecordResult, Vars, merge_fields
 from benchkit.core.bktypes.callresults import BuildResult, FetchResult, RunResult
 from benchkit.core.bktypes.contexts import BuildContext, CollectContext, FetchContext, RunContext
+from benchkit.helpers.linux.cgroup import (
+    CPU_MAX_VARIABLE,
+    MEMORY_MAX_VARIABLE,
+    CgroupSandbox,
+)
 from benchkit.platforms import Platform
 
 
@@ -54,6 +60,7 @@ class StepSession:
 
     run_ctx: RunContext | None = None
     run_result: RunResult | None = None
+    sandbox_result: Vars | None = None
 
     collect_ctx: CollectContext | None = None
     record_result: RecordResult | None = None
@@ -100,6 +107,7 @@ def _get_step_args(
 class Stepper:
     bench: Benchmark
     platform: Platform
+    sandbox: CgroupSandbox | None = None
 
     def fetch(
         self,
@@ -171,7 +179,23 @@ class Stepper:
             default_args=default_args,
             duration_s=duration_s,
         )
-        run_result = run_ctx.call(self.bench.run)
+        run_cgroup = None
+        exec_fn = run_ctx.exec
+        if self.sandbox is not None:
+            # the commands of the run phase share one cgroup, limited by the campaign variables
+            run_cgroup = self.sandbox.create(
+                cpu_max=args.get(CPU_MAX_VARIABLE),
+                memory_max=args.get(MEMORY_MAX_VARIABLE),
+            )
+            run_ctx = dataclasses.replace(run_ctx, exec=run_cgroup.wrap_exec(exec_fn=exec_fn))
+
+        try:
+            run_result = run_ctx.call(self.bench.run)
+        finally:
+            sandbox_result = None if run_cgroup is None else run_cgroup.finish()
+        # the next phases run outside of the (removed) cgroup
+        run_ctx = dataclasses.replace(run_ctx, exec=exec_fn)
+
         result = StepSession(
             fetch_ctx=session.fetch_ctx,
             fetch_result=session.fetch_result,
@@ -179,6 +203,7 @@ class Stepper:
             build_result=session.build_result,
             run_ctx=run_ctx,
             run_result=run_result,
+            sandbox_result=sandbox_result,
         )
         return result
 
@@ -204,6 +229,13 @@ class Stepper:
         if do_collect:
             collect_result = self.bench.collect(ctx=collect_ctx, **collect_args)
 
+        # the resource usage of the run commands completes the record, collected fields win
+        rusage = session.run_result.resource_usage() if session.run_result is not None else None
+        if rusage is not None:
+            collect_result = rusage.merged_into(record=collect_result)
+        if session.sandbox_result:
+            collect_result = merge_fields(record=collect_result, fields=session.sandbox_result)
+
         result = StepSession(
             fetch_ctx=session.fetch_ctx,
             fetch_result=session.fetch_result,
@@ -211,6 +243,7 @@ class Stepper:
             build_result=session.build_result,
             run_ctx=session.run_ctx,
             run_result=session.run_result,
+            sandbox_result=session.sandbox_result,
             collect_ctx=collect_ctx,
             record_result=collect_result,
         )
@@ -0,0 +1,380 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Run sandbox based on cgroup v2: each run is placed in its own transient cgroup, created directly in
+the cgroup filesystem of the target host, which gives:
+- a precise accounting of the resources used by the whole process tree of the run (CPU time and
+  throttling, peak memory, block I/O, CPU pressure), read after the run into result columns;
+- optional CPU and memory limits, given as campaign variables (`cgroup_cpu_max`, a number of CPUs,
+  and `cgroup_memory_max`, in bytes or with a K/M/G suffix);
+- a reliable kill of everything the run spawned, with `cgroup.kill`.
+
+The cgroups of the runs are created under a parent cgroup (`/sys/fs/cgroup/benchkit` by default).
+Creating them and moving processes into them requires either root privileges (`privileged=True`
+uses sudo for the writes to the cgroup filesystem) or a parent cgroup delegated to the user of
+benchkit, e.g. by running benchkit in `systemd-run --user --scope -p Delegate=yes`.
+"""
+
+import subprocess
+import time
+import uuid
+from pathlib import PurePosixPath
+from typing import Dict, Iterable, List, Optional
+
+from benchkit.communication import CommunicationLayer
+from benchkit.core.bktypes import Argv
+from benchkit.core.bktypes.execfn import ExecFn, ExecOutput
+
+CGROUP_ROOT = "/sys/fs/cgroup"
+DEFAULT_PARENT = f"{CGROUP_ROOT}/benchkit"
+CPU_MAX_VARIABLE = "cgroup_cpu_max"
+MEMORY_MAX_VARIABLE = "cgroup_memory_max"
+CPU_PERIOD_USEC = 100_000
+STAT_FILES = ("cpu.stat", "memory.peak", "memory.events", "io.stat", "cpu.pressure")
+
+_ENTER_SCRIPT = """\
+#!/bin/sh
+# usage: {name} <cgroup> <command> [args...]
+echo $$ | {tee} "$1/cgroup.procs" >/dev/null || exit 125
+shift
+exec "$@"
+"""
+
+
+def parse_flat_keyed(content: str) -> Dict[str, int]:
+    """
+    Parse a flat keyed cgroup file (`key value` per line, e.g. `cpu.stat`).
+
+    Args:
+        content (str): the content of the file.
+
+    Returns:
+        Dict[str, int]: the values by key.
+    """
+    result = {}
+    for line in content.splitlines():
+        fields = line.split()
+        if 2 == len(fields):
+            result[fields[0]] = int(fields[1])
+    return result
+
+
+def parse_nested_keyed(content: str) -> Dict[str, Dict[str, float]]:
+    """
+    Parse a nested keyed cgroup file (`key subkey=value ...` per line, e.g. `io.stat` or
+    `cpu.pressure`).
+
+    Args:
+        content (str): the content of the file.
+
+    Returns:
+        Dict[str, Dict[str, float]]: the values by subkey, by key.
+    """
+    result = {}
+    for line in content.splitlines():
+        key, *pairs = line.split()
+        result[key] = {k: float(v) for k, v in (pair.split("=", 1) for pair in pairs)}
+    return result
+
+
+def parse_stats(contents: Dict[str, Optional[str]]) -> Dict[str, float | int]:
+    """
+    Convert the statistic files of a cgroup into result columns, prefixed with `cgroup/`. The files
+    missing on the host (depending on its kernel version and enabled controllers) are skipped.
+
+    Args:
+        contents (Dict[str, Optional[str]]): the content of the files of `STAT_FILES`, by file
+                                             name, None if the file could not be read.
+
+    Returns:
+        Dict[str, float | int]: the result columns.
+    """
+    result = {}
+
+    if (cpu_stat := contents.get("cpu.stat")) is not None:
+        cpu = parse_flat_keyed(content=cpu_stat)
+        for key, column in [
+            ("usage_usec", "cpu_usage_s"),
+            ("user_usec", "cpu_user_s"),
+            ("system_usec", "cpu_system_s"),
+            ("throttled_usec", "cpu_throttled_s"),
+        ]:
+            if key in cpu:
+                result[f"cgroup/{column}"] = cpu[key] / 1e6
+        if "nr_throttled" in cpu:
+            result["cgroup/cpu_nr_throttled"] = cpu["nr_throttled"]
+
+    if (memory_peak := contents.get("memory.peak")) is not None and memory_peak.strip():
+        result["cgroup/memory_peak_bytes"] = int(memory_peak)
+
+    if (memory_events := contents.get("memory.events")) is not None:
+        events = parse_flat_keyed(content=memory_events)
+        if "oom_kill" in events:
+            result["cgroup/memory_oom_kills"] = events["oom_kill"]
+
+    if (io_stat := contents.get("io.stat")) is not None:
+        devices = parse_nested_keyed(content=io_stat).values()
+        for key in ["rbytes", "wbytes", "rios", "wios"]:
+            result[f"cgroup/io_{key}"] = int(sum(device.get(key, 0) for device in devices))
+
+    if (cpu_pressure := contents.get("cpu.pressure")) is not None:
+        for kind, values in parse_nested_keyed(content=cpu_pressure).items():
+            if "total" in values:
+                result[f"cgroup/cpu_pressure_{kind}_s"] = values["total"] / 1e6
+
+    return result
+
+
+def cpu_max_value(nb_cpus: float) -> str:
+    """
+    Get the value of `cpu.max` limiting a cgroup to the given number of CPUs.
+
+    Args:
+        nb_cpus (float): the number of CPUs (possibly fractional).
+
+    Returns:
+        str: the value of `cpu.max`.
+    """
+    return f"{int(float(nb_cpus) * CPU_PERIOD_USEC)} {CPU_PERIOD_USEC}"
+
+
+class RunCgroup:
+    """
+    Transient cgroup of one run.
+    """
+
+    def __init__(
+        self,
+        sandbox: "CgroupSandbox",
+        path: str,
+    ) -> None:
+        self._sandbox = sandbox
+        self.path = path
+
+    def command_prefix(self) -> List[str]:
+        """
+        Get the prefix making a command run in the cgroup.
+
+        Returns:
+            List[str]: the prefix of the command.
+        """
+        return ["sh", self._sandbox.enter_script_path, self.path]
+
+    def wrap(self, argv: Argv) -> List[str]:
+        """
+        Make the given command run in the cgroup.
+
+        Args:
+            argv (Argv): the command, a string is run by `sh -c`.
+
+        Returns:
+            List[str]: the command running in the cgroup.
+        """
+        if isinstance(argv, str):
+            argv = ["sh", "-c", argv]
+        return self.command_prefix() + list(argv)
+
+    def wrap_exec(self, exec_fn: ExecFn) -> ExecFn:
+        """
+        Make an execution function run its commands in the cgroup.
+
+        Args:
+            exec_fn (ExecFn): the execution function.
+
+        Returns:
+            ExecFn: the execution function running its commands in the cgroup.
+        """
+
+        def sandboxed_exec(*, argv: Argv, **kwargs) -> ExecOutput:
+            return exec_fn(argv=self.wrap(argv=argv), **kwargs)
+
+        return sandboxed_exec
+
+    def kill(self) -> None:
+        """
+        Kill all the processes of the cgroup.
+        """
+        self._sandbox.kill(path=self.path)
+
+    def stats(self) -> Dict[str, float | int]:
+        """
+        Read the resource accounting of the cgroup.
+
+        Returns:
+            Dict[str, float | int]: the result columns (see `parse_stats`).
+        """
+        return self._sandbox.stats(path=self.path)
+
+    def finish(self) -> Dict[str, float | int]:
+        """
+        Kill the remaining processes of the cgroup, read its resource accounting and remove it.
+
+        Returns:
+            Dict[str, float | int]: the result columns (see `parse_stats`).
+        """
+        self.kill()
+        result = self.stats()
+        self._sandbox.remove(path=self.path)
+        return result
+
+
+class CgroupSandbox:
+    """
+    Creates the transient cgroups of the runs on a host.
+    """
+
+    def __init__(
+        self,
+        comm: CommunicationLayer,
+        parent: str = DEFAULT_PARENT,
+        privileged: bool = False,
+        controllers: Iterable[str] = ("cpu", "memory", "io"),
+    ) -> None:
+        """
+        Args:
+            comm (CommunicationLayer):
+                communication layer of the host where the runs happen.
+            parent (str, optional):
+                parent cgroup of the cgroups of the runs.
+                Defaults to DEFAULT_PARENT.
+            privileged (bool, optional):
+                whether to write to the cgroup filesystem with sudo.
+                Defaults to False.
+            controllers (Iterable[str], optional):
+                controllers to enable for the cgroups of the runs.
+                Defaults to ("cpu", "memory", "io").
+        """
+        self._comm = comm
+        self._parent = parent
+        self._privileged = privileged
+        self._controllers = list(controllers)
+        self._ready = False
+        self.enter_script_path = ""
+
+    def _sudo(self) -> List[str]:
+        return ["sudo"] if self._privileged else []
+
+    def _write(self, path: str, value: str) -> None:
+        self._comm.write_content_to_file(
+            content=value,
+            output_filename=path,
+            privileged=self._privileged,
+        )
+
+    def _setup(self) -> None:
+        if self._ready:
+            return
+
+        self._comm.shell(
+            command=self._sudo() + ["mkdir", "-p", self._parent],
+            print_input=False,
+            print_output=False,
+        )
+        subtree_control = f"{self._parent}/cgroup.subtree_control"
+        for controller in self._controllers:
+            try:
+                self._write(path=subtree_control, value=f"+{controller}")
+            except (OSError, subprocess.CalledProcessError):
+                # not available in the parent (not enabled in its own parent, or not supported)
+                print(f"[WARNING] cgroup controller {controller} not available", flush=True)
+
+        script_dir = f"/tmp/benchkit-{self._comm.current_user()}"
+        self.enter_script_path = f"{script_dir}/cgroup-enter.sh"
+        self._comm.makedirs(path=script_dir, exist_ok=True)
+        self._comm.write_content_to_file(
+            content=_ENTER_SCRIPT.format(
+                name=PurePosixPath(self.enter_script_path).name,
+                tee="sudo tee" if self._privileged else "tee",
+            ),
+            output_filename=self.enter_script_path,
+        )
+        self._ready = True
+
+    def create(
+        self,
+        cpu_max: Optional[float] = None,
+        memory_max: Optional[int | str] = None,
+    ) -> RunCgroup:
+        """
+        Create the cgroup of a run.
+
+        Args:
+            cpu_max (Optional[float], optional):
+                if not None, number of CPUs (possibly fractional) the run can use.
+                Defaults to None.
+            memory_max (Optional[int | str], optional):
+                if not None, memory the run can use, in bytes or with a K/M/G suffix.
+                Defaults to None.
+
+        Returns:
+            RunCgroup: the cgroup of the run.
+        """
+        self._setup()
+        path = f"{self._parent}/run-{uuid.uuid4().hex[:12]}"
+        self._comm.shell(
+            command=self._sudo() + ["mkdir", path],
+            print_input=False,
+            print_output=False,
+        )
+        if cpu_max is not None:
+            self._write(path=f"{path}/cpu.max", value=cpu_max_value(nb_cpus=cpu_max))
+        if memory_max is not None:
+            self._write(path=f"{path}/memory.max", value=str(memory_max))
+        return RunCgroup(sandbox=self, path=path)
+
+    def kill(self, path: str, timeout_s: float = 5.0) -> None:
+        """
+        Kill all the processes of the given cgroup and wait for them to exit.
+
+        Args:
+            path (str): path of the cgroup.
+            timeout_s (float, optional): maximum number of seconds to wait for the processes to
+                                         exit. Defaults to 5.0.
+        """
+        procs = self._comm.read_files(paths=[f"{path}/cgroup.procs"])[f"{path}/cgroup.procs"]
+        if not procs or not procs.strip():
+            return
+        try:
+            self._write(path=f"{path}/cgroup.kill", value="1")
+        except (OSError, subprocess.CalledProcessError):
+            # no cgroup.kill before Linux 5.14
+            self._comm.shell(
+                command=self._sudo() + ["kill", "-9"] + procs.split(),
+                print_input=False,
+                print_output=False,
+                ignore_any_error_code=True,
+            )
+
+        deadline = time.monotonic() + timeout_s
+        while time.monotonic() < deadline:
+            events = self._comm.read_files(paths=[f"{path}/cgroup.events"])[f"{path}/cgroup.events"]
+            if events is None or 0 == parse_flat_keyed(content=events).get("populated", 0):
+                break
+            time.sleep(0.05)
+
+    def stats(self, path: str) -> Dict[str, float | int]:
+        """
+        Read the resource accounting of the given cgroup, in one round trip.
+
+        Args:
+            path (str): path of the cgroup.
+
+        Returns:
+            Dict[str, float | int]: the result columns (see `parse_stats`).
+        """
+        contents = self._comm.read_files(paths=[f"{path}/{name}" for name in STAT_FILES])
+        return parse_stats(contents={name: contents[f"{path}/{name}"] for name in STAT_FILES})
+
+    def remove(self, path: str) -> None:
+        """
+        Remove the given (empty) cgroup.
+
+        Args:
+            path (str): path of the cgroup.
+        """
+        self._comm.shell(
+            command=self._sudo() + ["rmdir", path],
+            print_input=False,
+            print_output=False,
+            ignore_any_error_code=True,
+        )
@@ -17,11 +17,13 @@ import json
 import os
 import pathlib
 import sys
-from typing import Any, Dict, List, Protocol
+from typing import Any, Dict, List, Optional, Protocol
 
 import numpy as np
 from numpy import floating, mean
 
+from benchkit.results.store import ResultStore
+from benchkit.results.threads import pivot_thread_columns, threads_csv_path
 from benchkit.utils.misc import get_benchkit_temp_folder_str
 from benchkit.utils.types import PathType
 
@@ -41,6 +43,29 @@ else:
 
     _LIBRARIES_ENABLED = True
 
+# text values interpreted as NaN by pandas when reading a CSV file with the default options
+_NA_VALUES = (
+    "",
+    "#N/A",
+    "#N/A N/A",
+    "#NA",
+    "-1.#IND",
+    "-1.#QNAN",
+    "-NaN",
+    "-nan",
+    "1.#IND",
+    "1.#QNAN",
+    "<NA>",
+    "N/A",
+    "NA",
+    "NULL",
+    "NaN",
+    "None",
+    "n/a",
+    "nan",
+    "null",
+)
+
 
 class DataframeProcessor(Protocol):
     """
@@ -260,6 +285,7 @@ def _get_speedup_data(
 def _read_csv(
     csv_pathname: PathType,
     nan_replace: bool,
+    pivot_threads: bool = True,
 ):
     result = pd.read_csv(
         csv_pathname,
@@ -268,6 +294,10 @@ def _read_csv(
         engine="python",
         keep_default_na=nan_replace,  # when True, input values "None" are interpreted as "NaN"
     )
+    threads_pathname = threads_csv_path(csv_path=csv_pathname)
+    if pivot_threads and threads_pathname.is_file():
+        threads_df = pd.read_csv(threads_pathname, sep=";")
+        result = pivot_thread_columns(df=result, threads_df=threads_df)
     return result
 
 
@@ -277,6 +307,7 @@ def generate_chart_from_single_csv(
     output_dir: PathType = f"{get_benchkit_temp_folder_str()}/figs",
     nan_replace: bool = True,
     process_dataframe: DataframeProcessor = identical_dataframe,
+    pivot_threads: bool = True,
     **kwargs,
 ) -> None:
     """
@@ -296,6 +327,10 @@ def generate_chart_from_single_csv(
         process_dataframe (DataframeProcessor, optional):
             function to process the dataframe to apply a transformation before plotting.
             Defaults to identical_dataframe.
+        pivot_threads (bool, optional):
+            whether to add back the per-thread columns of a campaign with the long layout of the
+            thread columns, read from its per-thread table.
+            Defaults to True.
     """
     if not _LIBRARIES_ENABLED:
         _print_warning()
@@ -303,7 +338,11 @@ def generate_chart_from_single_csv(
 
     df = None
     try:
-        df = _read_csv(csv_pathname=csv_pathname, nan_replace=nan_replace)
+        df = _read_csv(
+            csv_pathname=csv_pathname,
+            nan_replace=nan_replace,
+            pivot_threads=pivot_threads,
+        )
     except pd.errors.EmptyDataError:
         pass
 
@@ -327,6 +366,7 @@ def generate_chart_from_multiple_csvs(
     ylabel: str | None = None,
     nan_replace: bool = True,
     process_dataframe: DataframeProcessor = identical_dataframe,
+    pivot_threads: bool = True,
     **kwargs,
 ) -> None:
     """
@@ -351,12 +391,20 @@ def generate_chart_from_multiple_csvs(
         process_dataframe (DataframeProcessor, optional):
             function to process the dataframe to apply a transformation before plotting.
             Defaults to identical_dataframe.
+        pivot_threads (bool, optional):
+            whether to add back the per-thread columns of the campaigns with the long layout of
+            the thread columns, read from their per-thread tables.
+            Defaults to True.
     """
     if not _LIBRARIES_ENABLED:
         _print_warning()
         return
 
-    global_dataframe = get_global_dataframe(csv_pathnames=csv_pathnames, nan_replace=nan_replace)
+    global_dataframe = get_global_dataframe(
+        csv_pathnames=csv_pathnames,
+        nan_replace=nan_replace,
+        pivot_threads=pivot_threads,
+    )
 
     _generate_chart_from_df(
         df=global_dataframe,
@@ -369,6 +417,73 @@ def generate_chart_from_multiple_csvs(
     )
 
 
+def generate_chart_from_store(
+    store_path: PathType,
+    plot_name: str | List[str],
+    tables: Optional[List[str]] = None,
+    output_dir: PathType = f"{get_benchkit_temp_folder_str()}/figs",
+    xlabel: str | None = None,
+    ylabel: str | None = None,
+    nan_replace: bool = True,
+    process_dataframe: DataframeProcessor = identical_dataframe,
+    pivot_threads: bool = True,
+    **kwargs,
+) -> None:
+    """
+    Generate a chart from the results of campaigns recorded in a results store.
+
+    Args:
+        store_path (PathType):
+            path to the SQLite database of the results store.
+        plot_name (str | List[str]):
+            name of the (Seaborn) plot to generate.
+        tables (Optional[List[str]], optional):
+            tables of the campaigns to plot. If None, all the campaigns of the store are plotted.
+            Defaults to None.
+        output_dir (PathType, optional):
+            path to the directory where to output the chart.
+            Defaults to "/tmp/benchkit-[USERNAME]/figs".
+        xlabel (str | None, optional):
+            label of the x-axis.
+            Defaults to None.
+        ylabel (str | None, optional):
+            label of the y-axis. Defaults to None.
+        nan_replace (bool, optional):
+            whether to replace None, empty strings, etc. by NaN values, as when parsing a CSV
+            file.
+            Defaults to True.
+        process_dataframe (DataframeProcessor, optional):
+            function to process the dataframe to apply a transformation before plotting.
+            Defaults to identical_dataframe.
+        pivot_threads (bool, optional):
+            whether to add back the per-thread columns of the campaigns with the long layout of
+            the thread columns, read from their per-thread tables.
+            Defaults to True.
+    """
+    if not _LIBRARIES_ENABLED:
+        _print_warning()
+        return
+
+    df = get_dataframe_from_store(
+        store_path=store_path,
+        tables=tables,
+        nan_replace=nan_replace,
+        pivot_threads=pivot_threads,
+    )
+    if df is None:
+        return  # empty store, no chart to generate
+
+    _generate_chart_from_df(
+        df=df,
+        process_dataframe=process_dataframe,
+        plot_name=plot_name,
+        output_dir=output_dir,
+        xlabel=xlabel,
+        ylabel=ylabel,
+        **kwargs,
+    )
+
+
 def generate_chart_from_multiple_jsons(
     json_pathnames: List[List[PathType]],
     plot_name: str | List[str],
@@ -422,6 +537,7 @@ def generate_chart_from_multiple_jsons(
 def get_global_dataframe(
     csv_pathnames: List[PathType],
     nan_replace: bool = True,
+    pivot_threads: bool = True,
 ) -> DataFrame:
     if not _LIBRARIES_ENABLED:
         _print_warning()
@@ -430,12 +546,73 @@ def get_global_dataframe(
     dataframes = [
         df
         for p in csv_pathnames
-        if (df := _read_csv(csv_pathname=p, nan_replace=nan_replace)) is not None
+        if (df := _read_csv(csv_pathname=p, nan_replace=nan_replace, pivot_threads=pivot_threads))
+        is not None
     ]
     result = pd.concat(dataframes)
     return result
 
 
+def get_dataframe_from_store(
+    store_path: PathType,
+    tables: Optional[List[str]] = None,
+    nan_replace: bool = True,
+    pivot_threads: bool = True,
+) -> Optional[DataFrame]:
+    """
+    Load the results of campaigns recorded in a results store, with their typed columns.
+
+    Args:
+        store_path (PathType):
+            path to the SQLite database of the results store.
+        tables (Optional[List[str]], optional):
+            tables of the campaigns to load. If None, all the campaigns of the store are loaded.
+            Defaults to None.
+        nan_replace (bool, optional):
+            whether to replace the text values None, empty strings, etc. by NaN values, as when
+            parsing a CSV file. Missing values are NaN in any case.
+            Defaults to True.
+        pivot_threads (bool, optional):
+            whether to add back the per-thread columns of the campaigns with the long layout of
+            the thread columns, read from their per-thread tables.
+            Defaults to True.
+
+    Returns:
+        Optional[DataFrame]: the results of the campaigns, None if there are none.
+    """
+    if not _LIBRARIES_ENABLED:
+        _print_warning()
+        return None
+    if not pathlib.Path(store_path).is_file():
+        return None
+
+    store = ResultStore(path=store_path)
+    try:
+        if tables is None:
+            tables = store.tables()
+        dataframes = []
+        for table in tables:
+            if not store.columns(table=table):
+                continue
+            query = f'SELECT * FROM "{table}" ORDER BY rowid'
+            df = pd.read_sql_query(query, store.connection())
+            if nan_replace:
+                df = df.replace(list(_NA_VALUES), np.nan)
+            threads_table = f"{table}_threads"
+            if pivot_threads and store.columns(table=threads_table):
+                threads_df = pd.read_sql_query(
+                    f'SELECT * FROM "{threads_table}"', store.connection()
+                )
+                df = pivot_thread_columns(df=df, threads_df=threads_df)
+            dataframes.append(df)
+    finally:
+        store.close()
+
+    if not dataframes:
+        return None
+    return pd.concat(dataframes)
+
+
 def _process_json(
     json_path: PathType,
 ) -> Dict[str, int]:
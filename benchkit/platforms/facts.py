@@ -0,0 +1,265 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Snapshot of the facts of a platform that do not change while it is running: number of CPUs,
+isolated CPUs, topology, kernel, boot arguments, lscpu information (including the cache sizes).
+
+The facts are collected with a single shell command (one round-trip over SSH instead of one per
+fact), and persisted on disk, per hostname, with the boot identifier of the host. Later campaigns
+on the same host reuse them after checking that the host did not reboot since, which only reads
+the boot identifier.
+"""
+
+import json
+import os
+import pathlib
+from dataclasses import asdict, dataclass, field
+from subprocess import CalledProcessError
+from typing import Dict, Optional, Tuple
+
+from benchkit.communication import CommunicationLayer
+from benchkit.platforms.utils import parse_cpu_topology, parse_list_ranges
+from benchkit.utils.lscpu import parse_lscpu_json
+from benchkit.utils.misc import get_benchkit_temp_folder_str
+from benchkit.utils.types import PathType
+
+_FACTS_VERSION = 1
+_SECTION_PREFIX = "@@benchkit-fact "
+_BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+# each section is printed after its marker, failing commands leave their section empty
+_PROBES = {
+    "boot_id": f"cat {_BOOT_ID_PATH}",
+    "nproc": "nproc --all",
+    "isolated": "cat /sys/devices/system/cpu/isolated",
+    "uname_a": "uname -a",
+    "uname_r": "uname -r",
+    "uname_m": "uname -m",
+    "cmdline": "cat /proc/cmdline",
+    "lscpu": "lscpu -J",
+    "topology": "lscpu --parse=CPU,NODE,CACHE",
+}
+
+
+@dataclass(frozen=True)
+class PlatformFacts:
+    """
+    Facts of a platform, valid until it reboots.
+    """
+
+    boot_id: str
+    nb_cpus: Optional[int]
+    isolated_cpus: Tuple[int, ...]
+    kernel: str
+    kernel_release: str
+    architecture: str
+    boot_args: str
+    lscpu: Dict[str, str] = field(default_factory=dict)
+    cpu_topology: Dict[int, Tuple[int, int]] = field(default_factory=dict)
+
+    @property
+    def cache_sizes(self) -> Dict[str, str]:
+        """
+        Get the sizes of the caches reported by lscpu.
+
+        Returns:
+            Dict[str, str]: the size of each cache level (e.g. "L1d", "L3").
+        """
+        return {
+            key.split(" ")[0]: value
+            for key, value in self.lscpu.items()
+            if key.endswith("cache:") and key.startswith("L")
+        }
+
+    def to_json(self) -> Dict:
+        """
+        Convert the facts into a JSON-serializable dictionary.
+
+        Returns:
+            Dict: the facts.
+        """
+        result = asdict(self)
+        result["cpu_topology"] = {str(cpu): list(t) for cpu, t in self.cpu_topology.items()}
+        return result
+
+    @classmethod
+    def from_json(cls, data: Dict) -> "PlatformFacts":
+        """
+        Build the facts from a dictionary returned by `to_json`.
+
+        Args:
+            data (Dict): the facts.
+
+        Returns:
+            PlatformFacts: the facts.
+        """
+        data = dict(data)
+        data["isolated_cpus"] = tuple(data["isolated_cpus"])
+        data["cpu_topology"] = {int(c): tuple(t) for c, t in data["cpu_topology"].items()}
+        return cls(**data)
+
+
+def _probe_command() -> str:
+    return "; ".join(
+        f"echo '{_SECTION_PREFIX}{name}'; {command} 2>/dev/null"
+        for name, command in _PROBES.items()
+    )
+
+
+def parse_facts(probe_output: str) -> PlatformFacts:
+    """
+    Parse the output of the probe command into platform facts.
+
+    Args:
+        probe_output (str): output of the probe command.
+
+    Returns:
+        PlatformFacts: the facts of the platform.
+    """
+    sections: Dict[str, str] = {}
+    name = None
+    lines = []
+    for line in probe_output.splitlines() + [_SECTION_PREFIX]:
+        if line.startswith(_SECTION_PREFIX):
+            if name is not None:
+                sections[name] = "\n".join(lines).strip()
+            name = line[len(_SECTION_PREFIX) :].strip()
+            lines = []
+        else:
+            lines.append(line)
+
+    nproc = sections.get("nproc", "")
+    try:
+        lscpu = parse_lscpu_json(lscpu_output=sections.get("lscpu", ""))
+    except (ValueError, KeyError, TypeError):
+        lscpu = {}
+
+    return PlatformFacts(
+        boot_id=sections.get("boot_id", ""),
+        nb_cpus=int(nproc) if nproc.isdigit() else None,
+        isolated_cpus=tuple(sorted(parse_list_ranges(list_ranges=sections.get("isolated", "")))),
+        kernel=sections.get("uname_a", ""),
+        kernel_release=sections.get("uname_r", ""),
+        architecture=sections.get("uname_m", ""),
+        boot_args=sections.get("cmdline", ""),
+        lscpu=lscpu,
+        cpu_topology=parse_cpu_topology(lscpu_output=sections.get("topology", "")),
+    )
+
+
+def probe_facts(comm_layer: CommunicationLayer) -> PlatformFacts:
+    """
+    Collect the facts of the platform with a single shell command.
+
+    Args:
+        comm_layer (CommunicationLayer): communication layer of the platform.
+
+    Returns:
+        PlatformFacts: the facts of the platform.
+    """
+    output = comm_layer.shell(
+        command=["sh", "-c", _probe_command()],
+        print_input=False,
+        print_output=False,
+        ignore_any_error_code=True,
+    )
+    return parse_facts(probe_output=output)
+
+
+def get_boot_id(comm_layer: CommunicationLayer) -> str:
+    """
+    Get the identifier of the current boot of the platform, that changes when it reboots.
+
+    Args:
+        comm_layer (CommunicationLayer): communication layer of the platform.
+
+    Returns:
+        str: the boot identifier, empty if it is not available.
+    """
+    try:
+        return comm_layer.read_file(_BOOT_ID_PATH).strip()
+    except (FileNotFoundError, CalledProcessError):
+        return ""
+
+
+def default_facts_dir() -> pathlib.Path:
+    """
+    Get the default directory where the facts of the platforms are persisted.
+
+    Returns:
+        pathlib.Path: the directory of the persisted facts.
+    """
+    return pathlib.Path(get_benchkit_temp_folder_str()) / "platform-facts"
+
+
+def _facts_path(facts_dir: PathType, hostname: str) -> pathlib.Path:
+    return pathlib.Path(facts_dir) / f"{hostname}.json"
+
+
+def load_facts(
+    comm_layer: CommunicationLayer,
+    hostname: str,
+    facts_dir: Optional[PathType] = None,
+) -> PlatformFacts:
+    """
+    Load the facts of a platform persisted on disk if the platform did not reboot since they were
+    collected, otherwise collect and persist them.
+    The facts of a platform without boot identifier are never persisted.
+
+    Args:
+        comm_layer (CommunicationLayer):
+            communication layer of the platform.
+        hostname (str):
+            hostname of the platform.
+        facts_dir (Optional[PathType], optional):
+            directory of the persisted facts. If None, `default_facts_dir()` is used.
+            Defaults to None.
+
+    Returns:
+        PlatformFacts: the facts of the platform.
+    """
+    facts_path = _facts_path(
+        facts_dir=default_facts_dir() if facts_dir is None else facts_dir,
+        hostname=hostname,
+    )
+
+    if facts_path.is_file():
+        try:
+            with open(facts_path) as facts_file:
+                data = json.load(facts_file)
+            if _FACTS_VERSION == data.pop("version", None):
+                facts = PlatformFacts.from_json(data=data)
+                if facts.boot_id and facts.boot_id == get_boot_id(comm_layer=comm_layer):
+                    return facts
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+
+    facts = probe_facts(comm_layer=comm_layer)
+    if facts.boot_id:
+        facts_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = facts_path.with_name(f"{facts_path.name}.{os.getpid()}.tmp")
+        with open(tmp_path, "w") as facts_file:
+            json.dump({"version": _FACTS_VERSION, **facts.to_json()}, facts_file)
+        os.replace(tmp_path, facts_path)
+    return facts
+
+
+def forget_facts(
+    hostname: str,
+    facts_dir: Optional[PathType] = None,
+) -> None:
+    """
+    Remove the persisted facts of a platform, e.g. after changing its configuration.
+
+    Args:
+        hostname (str):
+            hostname of the platform.
+        facts_dir (Optional[PathType], optional):
+            directory of the persisted facts. If None, `default_facts_dir()` is used.
+            Defaults to None.
+    """
+    facts_path = _facts_path(
+        facts_dir=default_facts_dir() if facts_dir is None else facts_dir,
+        hostname=hostname,
+    )
+    facts_path.unlink(missing_ok=True)
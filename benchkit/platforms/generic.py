@@ -4,10 +4,12 @@
 Module for the representation of generic platforms that can be derived into actual platforms.
 """
 
-from typing import List
+from subprocess import CalledProcessError
+from typing import List, Optional
 
 from benchkit.communication import CommunicationLayer
 from benchkit.platforms import evenorder
+from benchkit.platforms.facts import PlatformFacts, forget_facts, get_boot_id, load_facts
 from benchkit.platforms.utils import (
     get_nb_cpus_active,
     get_nb_cpus_isolated,
@@ -30,6 +32,8 @@ class Platform:
         self._architecture = None
         self._lscpu = None
         self._nb_hyperthreads_per_core = None
+        self._facts: Optional[PlatformFacts] = None
+        self._facts_unavailable = False
 
     @property
     def comm(self) -> CommunicationLayer:
@@ -42,9 +46,47 @@ class Platform:
         """
         return self._comm_layer
 
+    def facts(self, revalidate: bool = False) -> Optional[PlatformFacts]:
+        """
+        Get the snapshot of the facts of the platform (CPUs, topology, kernel, boot arguments,
+        lscpu information), collected once and persisted across campaigns until the platform
+        reboots.
+
+        Args:
+            revalidate (bool, optional):
+                whether to check that the platform did not reboot since the facts were collected
+                by this instance, e.g. at the start of a new campaign.
+                Defaults to False.
+
+        Returns:
+            Optional[PlatformFacts]:
+                the facts of the platform, None if they cannot be collected on this platform.
+        """
+        if self._facts is not None and revalidate:
+            if self._facts.boot_id != get_boot_id(comm_layer=self.comm):
+                self.invalidate_facts()
+        if self._facts is None and not self._facts_unavailable:
+            try:
+                self._facts = load_facts(comm_layer=self.comm, hostname=self.hostname)
+            except (CalledProcessError, OSError, NotImplementedError):
+                self._facts_unavailable = True
+        return self._facts
+
+    def invalidate_facts(self) -> None:
+        """
+        Forget the facts of the platform, in memory and on disk, so that they are collected again.
+        """
+        self._facts = None
+        self._facts_unavailable = False
+        self._lscpu = None
+        self._nb_hyperthreads_per_core = None
+        forget_facts(hostname=self.hostname)
+
     def _get_lscpu(self) -> lscpu.LsCpu:
         if self._lscpu is None:
-            self._lscpu = lscpu.LsCpu(comm_layer=self.comm)
+            facts = self.facts()
+            info_dict = facts.lscpu if facts is not None and facts.lscpu else None
+            self._lscpu = lscpu.LsCpu(comm_layer=self.comm, info_dict=info_dict)
         return self._lscpu
 
     def nb_cpus_per_cache_partition(self) -> int:
@@ -102,6 +144,9 @@ class Platform:
         Returns:
             str: the architecture of the platform.
         """
+        facts = self.facts()
+        if facts is not None and facts.architecture:
+            return facts.architecture
         if self._architecture is None:
             self._architecture = self.comm.shell(
                 "uname -m",
@@ -119,6 +164,9 @@ class Platform:
         Returns:
             int: the total number of CPUs of the platform.
         """
+        facts = self.facts()
+        if facts is not None and facts.nb_cpus is not None:
+            return facts.nb_cpus
         result = get_nb_cpus_total(comm_layer=self.comm)
         return result
 
@@ -130,6 +178,9 @@ class Platform:
             int: the number of CPUs of the platform that are active (not isolated).
         """
         # does not count the isolated CPUs in the count
+        facts = self.facts()
+        if facts is not None and facts.nb_cpus is not None:
+            return facts.nb_cpus - len(facts.isolated_cpus)
         result = get_nb_cpus_active(comm_layer=self.comm)
         return result
 
@@ -141,6 +192,9 @@ class Platform:
             int: the number of CPUs of the platform that are isolated (not active).
         """
         # does *only* count the isolated CPUs in the count
+        facts = self.facts()
+        if facts is not None and facts.nb_cpus is not None:
+            return len(facts.isolated_cpus)
         result = get_nb_cpus_isolated(comm_layer=self.comm)
         return result
 
@@ -288,6 +342,9 @@ class Platform:
         Returns:
             str: identifier of the kernel running currently on the platform.
         """
+        facts = self.facts()
+        if facts is not None and facts.kernel_release:
+            return facts.kernel_release
         output = self.comm.shell(command="uname -r", print_output=False)
         result = output.strip()
         return result
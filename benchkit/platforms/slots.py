@@ -0,0 +1,194 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+CPU slots: disjoint sets of CPUs of a platform that can each host one benchmark instance.
+Slots are used by the parallel runner to execute several records of the same campaign at the
+same time, each instance being pinned on its own slot, and by the parallel campaign suites to
+run each campaign on its own partition of the platform topology.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+from benchkit.platforms.generic import Platform
+from benchkit.platforms.utils import get_cpu_topology, get_cpus_isolated
+
+SLOT_PINNINGS = ("taskset", "numactl", "none")
+PARTITION_DOMAINS = ("numa", "cache", "cpu")
+
+
+@dataclass(frozen=True)
+class CpuSlot:
+    """
+    Disjoint set of CPUs reserved to execute a single benchmark instance.
+
+    Attributes:
+        slot_id: identifier of the slot, from 0 to the number of slots minus one.
+        cpus: identifiers of the CPUs of the slot.
+        nodes: identifiers of the NUMA nodes the memory of the slot is bound to, if any.
+    """
+
+    slot_id: int
+    cpus: Tuple[int, ...]
+    nodes: Tuple[int, ...] = ()
+
+    def cpu_list_str(self) -> str:
+        """
+        Return the list of CPUs of the slot in the format expected by taskset and numactl.
+
+        Returns:
+            str: the comma-separated list of CPUs of the slot.
+        """
+        return ",".join(str(cpu) for cpu in self.cpus)
+
+    def command_prefix(self, pinning: str) -> List[str]:
+        """
+        Return the command prefix that pins a command on the CPUs of the slot.
+
+        Args:
+            pinning (str):
+                utility to use to pin the command, one of "taskset", "numactl" or "none".
+
+        Raises:
+            ValueError: if the pinning utility is not supported.
+
+        Returns:
+            List[str]: the command prefix, formatted like a SplitCommand.
+        """
+        match pinning:
+            case "taskset":
+                return ["taskset", "--cpu-list", self.cpu_list_str()]
+            case "numactl":
+                membind = (
+                    [f"--membind={','.join(str(n) for n in self.nodes)}"] if self.nodes else []
+                )
+                return ["numactl", f"--physcpubind={self.cpu_list_str()}"] + membind
+            case "none":
+                return []
+            case _:
+                raise ValueError(f"Unknown slot pinning: {pinning}")
+
+
+def get_cpu_slots(
+    platform: Platform,
+    cpus_per_slot: int,
+    nb_slots: int | None = None,
+) -> List[CpuSlot]:
+    """
+    Partition the active (not isolated) CPUs of the platform into disjoint slots.
+    Adjacent CPU identifiers are grouped together in the same slot.
+
+    Args:
+        platform (Platform):
+            platform to partition.
+        cpus_per_slot (int):
+            number of CPUs in each slot.
+        nb_slots (int | None, optional):
+            maximum number of slots to return. If None, as many slots as the platform can host are
+            returned.
+            Defaults to None.
+
+    Raises:
+        ValueError: if the platform cannot host a single slot of the requested size.
+
+    Returns:
+        List[CpuSlot]: the disjoint slots of the platform.
+    """
+    if cpus_per_slot < 1:
+        raise ValueError(f"Invalid number of CPUs per slot: {cpus_per_slot}")
+
+    isolated_cpus = get_cpus_isolated(comm_layer=platform.comm)
+    active_cpus = [cpu for cpu in range(platform.nb_cpus()) if cpu not in isolated_cpus]
+
+    max_nb_slots = len(active_cpus) // cpus_per_slot
+    if nb_slots is not None:
+        max_nb_slots = min(max_nb_slots, nb_slots)
+
+    if max_nb_slots < 1:
+        raise ValueError(
+            f"Platform {platform.hostname} cannot host a slot of {cpus_per_slot} CPUs "
+            f"({len(active_cpus)} active CPUs)."
+        )
+
+    slots = [
+        CpuSlot(
+            slot_id=slot_id,
+            cpus=tuple(active_cpus[slot_id * cpus_per_slot : (slot_id + 1) * cpus_per_slot]),
+        )
+        for slot_id in range(max_nb_slots)
+    ]
+    return slots
+
+
+def get_cpu_partitions(
+    platform: Platform,
+    nb_partitions: int,
+    domain: str = "numa",
+) -> List[CpuSlot]:
+    """
+    Partition the active (not isolated) CPUs of the platform into disjoint partitions of the same
+    size, aligned on the given topology domain: a partition is either made of whole domains (NUMA
+    nodes or last-level cache groups), or contained in a single domain, so that co-running
+    benchmarks do not share more resources than intended.
+
+    Args:
+        platform (Platform):
+            platform to partition.
+        nb_partitions (int):
+            number of partitions.
+        domain (str, optional):
+            topology domain the partitions are aligned on, one of "numa", "cache" or "cpu" (no
+            alignment). With "numa", the memory of each partition is bound to its NUMA nodes.
+            Defaults to "numa".
+
+    Raises:
+        ValueError:
+            if the domain is unknown, or the active CPUs cannot be split into partitions of the
+            same size aligned on the domain.
+
+    Returns:
+        List[CpuSlot]: the disjoint partitions of the platform.
+    """
+    if domain not in PARTITION_DOMAINS:
+        raise ValueError(f"Unknown partition domain: {domain}")
+
+    isolated_cpus = get_cpus_isolated(comm_layer=platform.comm)
+    topology = get_cpu_topology(comm_layer=platform.comm)
+    if not topology:
+        # conservative assumption, as in Platform.nb_cache_partitions: one cache per CPU
+        topology = {cpu: (0, cpu) for cpu in range(platform.nb_cpus())}
+    active_cpus = sorted(
+        (cpu for cpu in topology if cpu not in isolated_cpus),
+        key=lambda cpu: (topology[cpu], cpu),
+    )
+
+    cpus_per_partition = len(active_cpus) // nb_partitions if nb_partitions > 0 else 0
+    if cpus_per_partition < 1:
+        raise ValueError(
+            f"Platform {platform.hostname} cannot be split into {nb_partitions} partitions "
+            f"({len(active_cpus)} active CPUs)."
+        )
+
+    domain_index = PARTITION_DOMAINS.index(domain)
+    cpu_domains = {cpu: (topology[cpu] + (cpu,))[domain_index] for cpu in active_cpus}
+    domain_sizes = {}
+    for cpu_domain in cpu_domains.values():
+        domain_sizes[cpu_domain] = domain_sizes.get(cpu_domain, 0) + 1
+
+    partitions = []
+    for partition_id in range(nb_partitions):
+        cpus = active_cpus[
+            partition_id * cpus_per_partition : (partition_id + 1) * cpus_per_partition
+        ]
+        domains = {cpu_domains[cpu] for cpu in cpus}
+        whole_domains = sum(domain_sizes[d] for d in domains) == len(cpus)
+        if len(domains) > 1 and not whole_domains:
+            raise ValueError(
+                f"Platform {platform.hostname}: partition {partition_id} of {cpus_per_partition} "
+                f'CPUs would span parts of several "{domain}" domains, use another number of '
+                f"partitions or domain."
+            )
+        nodes = tuple(sorted({topology[cpu][0] for cpu in cpus})) if "numa" == domain else ()
+        partitions.append(CpuSlot(slot_id=partition_id, cpus=tuple(cpus), nodes=nodes))
+
+    return partitions
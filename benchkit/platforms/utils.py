@@ -5,12 +5,22 @@ Utilities related to platform modules.
 """
 
 import os
-from typing import Set
+from subprocess import CalledProcessError
+from typing import Dict, Set, Tuple
 
 from benchkit.communication import CommunicationLayer
 
 
-def _parse_list_ranges(list_ranges: str) -> Set[int]:
+def parse_list_ranges(list_ranges: str) -> Set[int]:
+    """
+    Parse a list of ranges of identifiers, in the format of the kernel (e.g. "0-3,8,10-11").
+
+    Args:
+        list_ranges (str): the list of ranges.
+
+    Returns:
+        Set[int]: the identifiers in the ranges.
+    """
     result_set = set()
 
     elements = list_ranges.split(",")
@@ -79,23 +89,84 @@ def get_nb_cpus_total(comm_layer: CommunicationLayer) -> int:
     return result1
 
 
-def get_nb_cpus_isolated(comm_layer: CommunicationLayer) -> int:
-    """Get the number of CPUs that are currently isolated on the provided host.
+def get_cpus_isolated(comm_layer: CommunicationLayer) -> Set[int]:
+    """Get the identifiers of the CPUs that are currently isolated on the provided host.
 
     Args:
         comm_layer (CommunicationLayer): communication layer of the provided host.
 
     Returns:
-        int: the number of CPUs that are currently isolated on the provided host.
+        Set[int]: the identifiers of the CPUs that are currently isolated on the provided host.
     """
     # Some operating systems might not provide this information
     try:
         isolated_str = comm_layer.read_file("/sys/devices/system/cpu/isolated").strip()
     except FileNotFoundError:
-        return 0
+        return set()
+
+    isolated_cpus = parse_list_ranges(list_ranges=isolated_str)
 
-    isolated_cpus = _parse_list_ranges(list_ranges=isolated_str)
+    return isolated_cpus
+
+
+def get_cpu_topology(comm_layer: CommunicationLayer) -> Dict[int, Tuple[int, int]]:
+    """Get the NUMA node and the last-level cache of each CPU of the provided host.
+    An empty mapping is returned when the information is not available.
+
+    Args:
+        comm_layer (CommunicationLayer): communication layer of the provided host.
+
+    Returns:
+        Dict[int, Tuple[int, int]]:
+            the identifiers of the NUMA node and of the last-level cache of each CPU.
+    """
+    try:
+        output = comm_layer.shell(
+            command="lscpu --parse=CPU,NODE,CACHE",
+            print_input=False,
+            print_output=False,
+        )
+    except (FileNotFoundError, CalledProcessError):
+        output = ""
 
+    return parse_cpu_topology(lscpu_output=output)
+
+
+def parse_cpu_topology(lscpu_output: str) -> Dict[int, Tuple[int, int]]:
+    """Parse the output of "lscpu --parse=CPU,NODE,CACHE".
+
+    Args:
+        lscpu_output (str): the output of the command.
+
+    Returns:
+        Dict[int, Tuple[int, int]]:
+            the identifiers of the NUMA node and of the last-level cache of each CPU.
+    """
+    topology = {}
+    for line in lscpu_output.splitlines():
+        if not line.strip() or line.startswith("#"):
+            continue
+        cpu_str, node_str, cache_str = (line.split(",", 2) + ["", ""])[:3]
+        cpu = int(cpu_str)
+        node = int(node_str) if node_str.isdigit() else 0
+        # caches are listed from L1 to the last level, separated by colons
+        last_level_cache_str = cache_str.replace(",", ":").split(":")[-1]
+        cache = int(last_level_cache_str) if last_level_cache_str.isdigit() else cpu
+        topology[cpu] = (node, cache)
+
+    return topology
+
+
+def get_nb_cpus_isolated(comm_layer: CommunicationLayer) -> int:
+    """Get the number of CPUs that are currently isolated on the provided host.
+
+    Args:
+        comm_layer (CommunicationLayer): communication layer of the provided host.
+
+    Returns:
+        int: the number of CPUs that are currently isolated on the provided host.
+    """
+    isolated_cpus = get_cpus_isolated(comm_layer=comm_layer)
     return len(isolated_cpus)
 
 
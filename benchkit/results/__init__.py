@@ -0,0 +1,5 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Management of the results produced by the benchmarks of a campaign.
+"""
@@ -0,0 +1,239 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Adaptive number of repetitions of a record: the record is repeated until the confidence interval
+of the mean of a target metric is tight enough, instead of a fixed number of times.
+"""
+
+import math
+import random
+import statistics
+from dataclasses import dataclass
+from typing import Sequence, Tuple
+
+CI_METHODS = ("t", "bootstrap")
+
+
+def _betacf(a: float, b: float, x: float) -> float:
+    # continued fraction of the incomplete beta function (modified Lentz's method)
+    tiny = 1e-300
+    qab = a + b
+    qap = a + 1.0
+    qam = a - 1.0
+    c = 1.0
+    d = 1.0 - qab * x / qap
+    d = 1.0 / (d if abs(d) > tiny else tiny)
+    h = d
+    for m in range(1, 301):
+        m2 = 2 * m
+        aa = m * (b - m) * x / ((qam + m2) * (a + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        h *= d * c
+        aa = -(a + m) * (qab + m) * x / ((a + m2) * (qap + m2))
+        d = 1.0 + aa * d
+        d = 1.0 / (d if abs(d) > tiny else tiny)
+        c = 1.0 + aa / c
+        c = c if abs(c) > tiny else tiny
+        delta = d * c
+        h *= delta
+        if abs(delta - 1.0) < 1e-12:
+            break
+    return h
+
+
+def _regularized_incomplete_beta(a: float, b: float, x: float) -> float:
+    if x <= 0.0:
+        return 0.0
+    if x >= 1.0:
+        return 1.0
+    log_front = (
+        math.lgamma(a + b)
+        - math.lgamma(a)
+        - math.lgamma(b)
+        + a * math.log(x)
+        + b * math.log(1.0 - x)
+    )
+    front = math.exp(log_front)
+    if x < (a + 1.0) / (a + b + 2.0):
+        return front * _betacf(a, b, x) / a
+    return 1.0 - front * _betacf(b, a, 1.0 - x) / b
+
+
+def t_cdf(t: float, df: int) -> float:
+    """
+    Cumulative distribution function of the Student's t-distribution.
+
+    Args:
+        t (float): value of the variable.
+        df (int): degrees of freedom.
+
+    Returns:
+        float: the probability that the variable is lower than or equal to t.
+    """
+    tail = 0.5 * _regularized_incomplete_beta(df / 2.0, 0.5, df / (df + t * t))
+    return 1.0 - tail if t >= 0 else tail
+
+
+def t_quantile(p: float, df: int) -> float:
+    """
+    Quantile function (inverse of the cumulative distribution function) of the Student's
+    t-distribution, computed by bisection.
+
+    Args:
+        p (float): probability, strictly between 0 and 1.
+        df (int): degrees of freedom.
+
+    Returns:
+        float: the value t such that the probability of the variable being lower is p.
+    """
+    if p < 0.5:
+        return -t_quantile(1.0 - p, df)
+    low, high = 0.0, 1.0
+    while t_cdf(high, df) < p:
+        high *= 2.0
+    for _ in range(100):
+        middle = (low + high) / 2.0
+        if t_cdf(middle, df) < p:
+            low = middle
+        else:
+            high = middle
+    return (low + high) / 2.0
+
+
+def confidence_interval(
+    values: Sequence[float],
+    confidence: float = 0.95,
+    method: str = "t",
+    nb_resamples: int = 1000,
+) -> Tuple[float, float]:
+    """
+    Compute the confidence interval of the mean of the given values.
+
+    Args:
+        values (Sequence[float]):
+            sample of values, at least 2.
+        confidence (float, optional):
+            confidence level of the interval.
+            Defaults to 0.95.
+        method (str, optional):
+            "t" for the interval based on the Student's t-distribution, "bootstrap" for the
+            percentile bootstrap interval.
+            Defaults to "t".
+        nb_resamples (int, optional):
+            number of resamples of the bootstrap method.
+            Defaults to 1000.
+
+    Raises:
+        ValueError: if the method is unknown or there are less than 2 values.
+
+    Returns:
+        Tuple[float, float]: the lower and upper bounds of the interval.
+    """
+    if method not in CI_METHODS:
+        raise ValueError(f"Unknown confidence interval method: {method}")
+    nb_values = len(values)
+    if nb_values < 2:
+        raise ValueError("At least 2 values are required to compute a confidence interval")
+
+    mean = statistics.fmean(values)
+    alpha = 1.0 - confidence
+
+    if "t" == method:
+        sem = statistics.stdev(values) / math.sqrt(nb_values)
+        half_width = t_quantile(1.0 - alpha / 2.0, nb_values - 1) * sem
+        return mean - half_width, mean + half_width
+
+    # fixed seed, so that the decision to stop is reproducible for the same values
+    rng = random.Random(0)
+    means = sorted(statistics.fmean(rng.choices(values, k=nb_values)) for _ in range(nb_resamples))
+    low_index = int(math.floor(alpha / 2.0 * (nb_resamples - 1)))
+    high_index = int(math.ceil((1.0 - alpha / 2.0) * (nb_resamples - 1)))
+    return means[low_index], means[high_index]
+
+
+@dataclass(frozen=True)
+class AdaptiveRuns:
+    """
+    Stopping rule of the adaptive repetitions of a record.
+
+    The record is repeated at least `min_runs` times and at most `nb_runs` times (the number of
+    runs of the campaign), until the width of the confidence interval of the mean of `metric`,
+    relative to the mean, is at most `relative_ci_width`.
+
+    Attributes:
+        metric (str): name of the result column the confidence interval is computed on.
+        relative_ci_width (float): target width of the interval, relative to the mean.
+        min_runs (int): minimum number of runs of each record, at least 2.
+        confidence (float): confidence level of the interval.
+        method (str): method used to compute the interval, "t" or "bootstrap".
+    """
+
+    metric: str
+    relative_ci_width: float = 0.05
+    min_runs: int = 3
+    confidence: float = 0.95
+    method: str = "t"
+
+    def __post_init__(self) -> None:
+        if self.method not in CI_METHODS:
+            raise ValueError(f"Unknown confidence interval method: {self.method}")
+        if self.min_runs < 2:
+            raise ValueError("Adaptive runs require at least 2 runs per record")
+        if not 0.0 < self.confidence < 1.0:
+            raise ValueError(f"Invalid confidence level: {self.confidence}")
+        if self.relative_ci_width <= 0.0:
+            raise ValueError(
+                f"Invalid relative confidence interval width: {self.relative_ci_width}"
+            )
+
+    def column_names(self) -> Tuple[str, str, str]:
+        """
+        Return the names of the columns where the confidence interval is recorded.
+
+        Returns:
+            Tuple[str, str, str]: the names of the lower bound, upper bound and relative width.
+        """
+        return (
+            f"{self.metric}_ci_low",
+            f"{self.metric}_ci_high",
+            f"{self.metric}_ci_rel_width",
+        )
+
+    def evaluate(self, values: Sequence[float]) -> Tuple[float, float, float]:
+        """
+        Compute the confidence interval of the mean of the values of the metric measured so far.
+
+        Args:
+            values (Sequence[float]): values of the metric, one per run.
+
+        Returns:
+            Tuple[float, float, float]:
+                the lower bound, upper bound and relative width of the interval (NaN if there
+                are not enough values or the mean is zero).
+        """
+        if len(values) < 2:
+            return math.nan, math.nan, math.nan
+        low, high = confidence_interval(
+            values=values,
+            confidence=self.confidence,
+            method=self.method,
+        )
+        mean = statistics.fmean(values)
+        relative_width = (high - low) / abs(mean) if mean else math.nan
+        return low, high, relative_width
+
+    def is_converged(self, nb_runs_done: int, relative_width: float) -> bool:
+        """
+        Return whether the record can stop being repeated.
+
+        Args:
+            nb_runs_done (int): number of runs of the record done so far.
+            relative_width (float): relative width of the current confidence interval.
+
+        Returns:
+            bool: whether the interval is tight enough after the minimum number of runs.
+        """
+        return nb_runs_done >= self.min_runs and relative_width <= self.relative_ci_width
@@ -0,0 +1,260 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Index of the results already recorded in the CSV output file of a campaign, used to skip the runs
+that are already done when a campaign is continued.
+
+Each recorded run is represented by a canonical and hashable key made of the values of its
+parameters (experiment name, constants, variables) and of its repetition number. The set of keys is
+built once when the campaign starts and persisted in a sidecar index file next to the CSV file, with
+the offset up to which the CSV file was parsed. Continuing the campaign later only parses the lines
+appended to the CSV file since then.
+
+Optionally, the values of one result column (e.g. the target metric of the adaptive repetitions)
+are kept for each recorded run.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from benchkit.utils.misc import CSV_SEPARATOR
+from benchkit.utils.types import PathType
+
+ResultKey = Tuple[str | None, ...]
+
+_INDEX_VERSION = 2
+_INDEX_SUFFIX = ".index"
+_HEAD_SIZE = 4096
+
+
+def str_param(value: List[Any] | Any) -> str:
+    """
+    Convert the value of a parameter into its string representation in the result index.
+
+    Args:
+        value (List[Any] | Any): value of the parameter.
+
+    Returns:
+        str: string representation of the value.
+    """
+    if isinstance(value, list):
+        return f'[{", ".join(map(str, value))}]'
+    return str(value)
+
+
+class ResultCache:
+    """
+    Set of the keys of the results already recorded in a CSV output file, with O(1) membership
+    checks.
+    """
+
+    def __init__(
+        self,
+        csv_path: PathType,
+        key_columns: Iterable[str],
+        value_column: Optional[str] = None,
+    ) -> None:
+        """
+        Create an empty result cache. Call `load()` to fill it with the recorded results.
+
+        Args:
+            csv_path (PathType):
+                path of the CSV output file of the campaign.
+            key_columns (Iterable[str]):
+                names of the columns that identify a run (parameters and repetition number).
+            value_column (Optional[str], optional):
+                name of the result column whose values are kept for each recorded run, see
+                `values()`. If None, no value is kept.
+                Defaults to None.
+        """
+        self._csv_path = pathlib.Path(csv_path)
+        self._index_path = pathlib.Path(f"{csv_path}{_INDEX_SUFFIX}")
+        self._key_columns = list(dict.fromkeys(key_columns))
+        self._value_column = value_column
+
+        self._columns: List[str] = []
+        self._active_columns: List[str] = []
+        self._keys: Set[ResultKey] = set()
+        self._values: Dict[ResultKey, List[str]] = {}
+        self._offset = 0
+
+    @property
+    def index_path(self) -> pathlib.Path:
+        """
+        Get the path of the sidecar index file.
+
+        Returns:
+            pathlib.Path: the path of the sidecar index file.
+        """
+        return self._index_path
+
+    @property
+    def has_header(self) -> bool:
+        """
+        Return whether the CSV output file already contains a header line.
+
+        Returns:
+            bool: whether the CSV output file already contains a header line.
+        """
+        return bool(self._columns)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, execution_parameters: Dict[str, str]) -> bool:
+        return self.key(execution_parameters=execution_parameters) in self._keys
+
+    def key(self, execution_parameters: Dict[str, str]) -> ResultKey:
+        """
+        Compute the canonical key of a run, given its stringified execution parameters.
+        Only the columns present in the CSV header are considered.
+
+        Args:
+            execution_parameters (Dict[str, str]): parameters of the run, including "rep".
+
+        Returns:
+            ResultKey: the canonical key of the run.
+        """
+        return tuple(execution_parameters.get(column) for column in self._active_columns)
+
+    def values(self, execution_parameters: Dict[str, str]) -> List[str]:
+        """
+        Return the recorded values of the value column for the given run, one per result line.
+
+        Args:
+            execution_parameters (Dict[str, str]): parameters of the run, including "rep".
+
+        Returns:
+            List[str]:
+                the values of the run, empty if the run is not recorded, if it has no such column
+                or if the cache has no value column.
+        """
+        return list(self._values.get(self.key(execution_parameters=execution_parameters), []))
+
+    def _add_value(self, key: ResultKey, record: Dict[str, Any]) -> None:
+        if self._value_column is None:
+            return
+        value = record.get(self._value_column)
+        if value is not None and "" != value:
+            self._values.setdefault(key, []).append(str(value))
+
+    def load(self) -> None:
+        """
+        Load the recorded results: restore the sidecar index if it is still valid, then parse the
+        lines appended to the CSV file since the index was saved, and save the updated index.
+        """
+        if not self._csv_path.is_file():
+            return
+
+        self._load_index()
+        self._parse_csv()
+        self._save_index()
+
+    def load_runs(
+        self,
+        columns: List[str],
+        runs: Iterable[Dict[str, str]],
+        run_rows: Optional[Iterable[List[Dict[str, Any]]]] = None,
+    ) -> None:
+        """
+        Load the recorded results from the given runs instead of parsing the CSV file, e.g. the
+        finished runs replayed from the journal of the campaign. The sidecar index is not used.
+
+        Args:
+            columns (List[str]):
+                columns of the CSV header, empty if no row was recorded.
+            runs (Iterable[Dict[str, str]]):
+                stringified execution parameters of the runs.
+            run_rows (Optional[Iterable[List[Dict[str, Any]]]], optional):
+                result rows of each run, in the same order as `runs`, to take the values of the
+                value column from.
+                Defaults to None.
+        """
+        self._set_columns(columns=columns)
+        runs = list(runs)
+        self._keys = {self.key(execution_parameters=run) for run in runs}
+        self._values = {}
+        if run_rows is not None:
+            for run, rows in zip(runs, run_rows):
+                key = self.key(execution_parameters=run)
+                for row in rows:
+                    self._add_value(key=key, record=row)
+
+    def _set_columns(self, columns: List[str]) -> None:
+        self._columns = columns
+        self._active_columns = [column for column in self._key_columns if column in columns]
+
+    def _csv_head_digest(self) -> str:
+        with open(self._csv_path, "rb") as csv_file:
+            head = csv_file.read(min(self._offset, _HEAD_SIZE))
+        return hashlib.sha1(head).hexdigest()
+
+    def _load_index(self) -> None:
+        if not self._index_path.is_file():
+            return
+
+        try:
+            with open(self._index_path, "r") as index_file:
+                index = json.load(index_file)
+        except (OSError, ValueError):
+            return
+
+        valid = (
+            index.get("version") == _INDEX_VERSION
+            and index.get("key_columns") == self._key_columns
+            and index.get("value_column") == self._value_column
+            and index.get("offset", 0) <= self._csv_path.stat().st_size
+        )
+        if not valid:
+            return
+
+        self._offset = index["offset"]
+        if index.get("head_digest") != self._csv_head_digest():
+            self._offset = 0
+            return
+
+        self._set_columns(columns=index["columns"])
+        self._keys = {tuple(key) for key in index["keys"]}
+        self._values = {tuple(key): values for key, values in index["values"]}
+
+    def _parse_csv(self) -> None:
+        with open(self._csv_path, "rb") as csv_file:
+            csv_file.seek(self._offset)
+            content = csv_file.read()
+
+        # only consume complete lines, a run might be writing the last one:
+        end = content.rfind(b"\n") + 1
+        lines = content[:end].decode().splitlines()
+        self._offset += end
+
+        for raw_line in lines:
+            line = raw_line.strip()
+            if not line or line.startswith("#"):
+                continue
+            values = line.split(CSV_SEPARATOR)
+            if not self._columns:
+                self._set_columns(columns=values)
+                continue
+            record = dict(zip(self._columns, values))
+            key = tuple(record.get(column) for column in self._active_columns)
+            self._keys.add(key)
+            self._add_value(key=key, record=record)
+
+    def _save_index(self) -> None:
+        index = {
+            "version": _INDEX_VERSION,
+            "key_columns": self._key_columns,
+            "value_column": self._value_column,
+            "columns": self._columns,
+            "offset": self._offset,
+            "head_digest": self._csv_head_digest(),
+            "keys": list(self._keys),
+            "values": list(self._values.items()),
+        }
+        tmp_path = self._index_path.with_name(f"{self._index_path.name}.tmp")
+        with open(tmp_path, "w") as index_file:
+            json.dump(index, index_file, separators=(",", ":"))
+        os.replace(tmp_path, self._index_path)
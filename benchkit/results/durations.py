@@ -0,0 +1,276 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Model of the duration of a single run of a record, learned from the results of previous campaigns
+of the same benchmark. It is used to estimate the duration of campaigns that do not have a fixed
+benchmark duration, and to schedule the longest runs first in the parallel runner.
+"""
+
+import csv
+import json
+import math
+import pathlib
+import statistics
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+from benchkit.utils.misc import CSV_SEPARATOR
+from benchkit.utils.types import PathType
+
+RUN_DURATION_COLUMN = "run_duration_seconds"
+
+_RIDGE = 1e-6
+
+
+def _to_float(value: Any) -> Optional[float]:
+    try:
+        result = float(value)
+    except (TypeError, ValueError):
+        return None
+    return result if math.isfinite(result) else None
+
+
+def _read_csv_rows(csv_path: pathlib.Path) -> Iterator[Dict[str, str]]:
+    with open(csv_path, newline="") as csv_file:
+        lines = (line for line in csv_file if line.strip() and not line.startswith("#"))
+        header_line = next(lines, None)
+        if header_line is None:
+            return
+        header = header_line.rstrip("\n").split(CSV_SEPARATOR)
+        # skip the files written without the duration of the runs without parsing them
+        if RUN_DURATION_COLUMN not in header:
+            return
+        yield from csv.DictReader(lines, fieldnames=header, delimiter=CSV_SEPARATOR)
+
+
+def _read_json_rows(json_path: pathlib.Path) -> Iterator[Dict[str, Any]]:
+    with open(json_path) as json_file:
+        lines = json.load(json_file)
+    yield from (line for line in lines if isinstance(line, dict))
+
+
+def load_duration_history(
+    paths: Iterable[PathType],
+    benchmark_name: str,
+) -> List[Dict[str, Any]]:
+    """
+    Load the result lines of previous campaigns of the given benchmark that contain the duration
+    of their run.
+
+    Args:
+        paths (Iterable[PathType]):
+            CSV result files, `experiment_results.json` files of record data directories, or
+            directories whose CSV result files are all loaded. Missing paths and unreadable files
+            are ignored.
+        benchmark_name (str):
+            name of the benchmark, the lines of other benchmarks are ignored.
+
+    Returns:
+        List[Dict[str, Any]]: the result lines of the benchmark.
+    """
+    files = []
+    for path in paths:
+        path = pathlib.Path(path)
+        if path.is_dir():
+            files.extend(sorted(path.glob("*.csv")))
+        elif path.is_file():
+            files.append(path)
+
+    result = []
+    for file_path in files:
+        read_rows = _read_json_rows if ".json" == file_path.suffix else _read_csv_rows
+        try:
+            rows = list(read_rows(file_path))
+        except (OSError, UnicodeDecodeError, ValueError, csv.Error):
+            continue
+        result.extend(
+            row
+            for row in rows
+            if row.get("benchmark_name") == benchmark_name and RUN_DURATION_COLUMN in row
+        )
+    return result
+
+
+def _solve(matrix: List[List[float]], vector: List[float]) -> List[float]:
+    # Gauss-Jordan elimination with partial pivoting, the systems are small (one unknown per
+    # feature) and regularized, hence never singular.
+    size = len(vector)
+    augmented = [row[:] + [value] for row, value in zip(matrix, vector)]
+    for col in range(size):
+        pivot = max(range(col, size), key=lambda r: abs(augmented[r][col]))
+        augmented[col], augmented[pivot] = augmented[pivot], augmented[col]
+        pivot_value = augmented[col][col]
+        augmented[col] = [value / pivot_value for value in augmented[col]]
+        for row in range(size):
+            if row != col and augmented[row][col]:
+                factor = augmented[row][col]
+                augmented[row] = [
+                    value - factor * pivot_row_value
+                    for value, pivot_row_value in zip(augmented[row], augmented[col])
+                ]
+    return [row[-1] for row in augmented]
+
+
+class DurationModel:
+    """
+    Regression model of the duration of a single run from the variables of its record.
+
+    The logarithm of the duration is fitted by least squares as a linear function of the logarithm
+    of the numeric variables (so that power laws such as `duration ~ size / nb_threads` are
+    captured) and of the one-hot encoding of the other variables. Records that were already
+    measured are predicted by the median of their measured durations, and the median of all the
+    measured durations is used when the regression cannot be fitted.
+
+    Only the variables that took several values in the measured runs are informative: the
+    prediction of a record does not depend on the other ones.
+    """
+
+    def __init__(self, variable_names: Sequence[str]) -> None:
+        self._variable_names = list(variable_names)
+        self._samples: List[Tuple[Dict[str, str], float]] = []
+        self._fitted = False
+        self._known: Dict[Tuple[str, ...], float] = {}
+        self._median = None
+        self._numeric_names: List[str] = []
+        self._levels: Dict[str, List[str]] = {}
+        self._coefficients: List[float] = []
+
+    @property
+    def nb_samples(self) -> int:
+        """
+        Number of measured runs the model is learned from.
+
+        Returns:
+            int: the number of measured runs.
+        """
+        return len(self._samples)
+
+    def add(self, record: Dict[str, Any], duration_seconds: float) -> None:
+        """
+        Add a measured run to the model.
+
+        Args:
+            record (Dict[str, Any]): variables of the record of the run.
+            duration_seconds (float): measured duration of the run.
+        """
+        if duration_seconds <= 0.0 or not math.isfinite(duration_seconds):
+            return
+        values = {name: str(record.get(name)) for name in self._variable_names}
+        self._samples.append((values, duration_seconds))
+        self._fitted = False
+
+    def add_results_lines(self, results_lines: Iterable[Dict[str, Any]]) -> None:
+        """
+        Add the runs of the given result lines to the model. The lines of a multi-line run share
+        the same duration, hence only the first line of each run is kept.
+
+        Args:
+            results_lines (Iterable[Dict[str, Any]]): result lines with a duration column.
+        """
+        previous_key = None
+        for line in results_lines:
+            duration_seconds = _to_float(line.get(RUN_DURATION_COLUMN))
+            if duration_seconds is None:
+                continue
+            key = tuple(str(line.get(name)) for name in self._variable_names)
+            run_key = (key, line.get("rep"), duration_seconds)
+            if run_key != previous_key:
+                self.add(record=line, duration_seconds=duration_seconds)
+            previous_key = run_key
+
+    def informative_variable_names(self) -> List[str]:
+        """
+        Names of the variables the predicted duration of a record depends on, i.e. the ones that
+        took several values in the measured runs.
+
+        Returns:
+            List[str]: the names of the informative variables.
+        """
+        if not self._fitted:
+            self.fit()
+        return [n for n in self._variable_names if n in self._numeric_names or n in self._levels]
+
+    def _key(self, values: Dict[str, str]) -> Tuple[str, ...]:
+        return tuple(
+            values[n] for n in self._variable_names if n in self._numeric_names or n in self._levels
+        )
+
+    def _features(self, values: Dict[str, str]) -> List[float]:
+        features = [1.0]
+        for name in self._numeric_names:
+            number = _to_float(values[name])
+            features.append(math.log(number) if number is not None and number > 0.0 else 0.0)
+        for name, levels in self._levels.items():
+            features.extend(1.0 if values[name] == level else 0.0 for level in levels[1:])
+        return features
+
+    def fit(self) -> None:
+        """
+        Fit the model on the runs added so far. It is called by `predict` when needed.
+        """
+        self._fitted = True
+        self._known = {}
+        self._median = None
+        self._coefficients = []
+        if not self._samples:
+            return
+
+        self._numeric_names = []
+        self._levels = {}
+        for name in self._variable_names:
+            observed = sorted({values[name] for values, _ in self._samples})
+            if len(observed) < 2:
+                continue
+            numbers = [_to_float(value) for value in observed]
+            if all(number is not None and number > 0.0 for number in numbers):
+                self._numeric_names.append(name)
+            else:
+                self._levels[name] = observed
+
+        by_record: Dict[Tuple[str, ...], List[float]] = {}
+        for values, duration_seconds in self._samples:
+            by_record.setdefault(self._key(values), []).append(duration_seconds)
+        self._known = {key: statistics.median(durations) for key, durations in by_record.items()}
+        self._median = statistics.median(d for _, d in self._samples)
+
+        rows = [self._features(values) for values, _ in self._samples]
+        targets = [math.log(duration_seconds) for _, duration_seconds in self._samples]
+        nb_features = len(rows[0])
+        if len(rows) < nb_features:
+            return
+
+        normal_matrix = [
+            [sum(row[i] * row[j] for row in rows) for j in range(nb_features)]
+            for i in range(nb_features)
+        ]
+        for i in range(1, nb_features):
+            normal_matrix[i][i] += _RIDGE
+        normal_vector = [
+            sum(row[i] * target for row, target in zip(rows, targets)) for i in range(nb_features)
+        ]
+        self._coefficients = _solve(matrix=normal_matrix, vector=normal_vector)
+
+    def predict(self, record: Dict[str, Any]) -> Optional[float]:
+        """
+        Predict the duration of a single run of the given record.
+
+        Args:
+            record (Dict[str, Any]): variables of the record.
+
+        Returns:
+            Optional[float]: the predicted duration in seconds, None if no run was measured.
+        """
+        if not self._fitted:
+            self.fit()
+        if self._median is None:
+            return None
+
+        values = {name: str(record.get(name)) for name in self._variable_names}
+        key = self._key(values)
+        if key in self._known:
+            return self._known[key]
+        if not self._coefficients:
+            return self._median
+
+        features = self._features(values)
+        log_duration = sum(c * f for c, f in zip(self._coefficients, features))
+        return math.exp(min(log_duration, 700.0))
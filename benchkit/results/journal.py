@@ -0,0 +1,386 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Write-ahead journal of the progress of a campaign.
+
+The journal is an append-only JSON Lines file next to the CSV output file (`<csv>.journal`), with
+one event per line:
+  - {"event": "started", "id": ..., "run": {...}}: a run (repetition of a record) started, with its
+    stringified execution parameters,
+  - {"event": "row", "id": ..., "row": {...}}: a result row of the run,
+  - {"event": "finished", "id": ...}: the run finished, its rows are complete,
+  - {"event": "comment", "line": "# ..."}: a comment line of the CSV output file.
+The rows and the end of a run are appended at once, before the rows are written to the CSV file,
+and synchronized to the storage device according to the same policy as the CSV file.
+
+The journal is the source of truth of a campaign: continuing a campaign reads the finished runs
+from the journal instead of parsing the CSV file (values containing the separator do not matter),
+the runs that were started but not finished are run again, and the CSV file can be regenerated
+from the journal with `regenerate_csv()`. The rows are journaled in the wide layout of the
+per-thread columns (see `benchkit.results.threads`), and split again when the CSV file of a campaign
+with the long layout is regenerated.
+"""
+
+import json
+import os
+import pathlib
+import uuid
+from typing import Any, Dict, Iterator, List, Optional
+
+from benchkit.results.sink import FSYNC_POLICIES, remove_torn_line
+from benchkit.results.threads import (
+    THREAD_COLUMNS_LAYOUTS,
+    THREADS_COLUMNS,
+    split_thread_columns,
+    threads_csv_path,
+)
+from benchkit.utils.misc import CSV_SEPARATOR
+from benchkit.utils.types import PathType
+
+JOURNAL_SUFFIX = ".journal"
+
+
+def journal_path(csv_path: PathType) -> pathlib.Path:
+    """
+    Return the path of the journal of the campaign whose CSV output file is given.
+
+    Args:
+        csv_path (PathType): path of the CSV output file of the campaign.
+
+    Returns:
+        pathlib.Path: the path of the journal.
+    """
+    return pathlib.Path(f"{csv_path}{JOURNAL_SUFFIX}")
+
+
+def _read_events(path: pathlib.Path) -> Iterator[Dict[str, Any]]:
+    with open(path, "rb") as journal_file:
+        for raw_line in journal_file:
+            # a torn last line (without newline) is the end of an event that was never written
+            if not raw_line.endswith(b"\n"):
+                return
+            try:
+                event = json.loads(raw_line)
+            except ValueError:
+                continue
+            if isinstance(event, dict):
+                yield event
+
+
+class CampaignJournal:
+    """
+    Append-only writer of the journal of a campaign.
+    Each event is appended with a single write, so that the instances of the parallel runner
+    (forked after the journal is opened) can share it.
+    """
+
+    def __init__(
+        self,
+        path: PathType,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+    ) -> None:
+        """
+        Create a journal writer. The file is opened with `open()` (or when entering the context).
+
+        Args:
+            path (PathType):
+                path of the journal.
+            fsync_policy (str, optional):
+                when to synchronize the journal to the storage device, one of "run", "rows" or
+                "exit" (see `ResultSink`).
+                Defaults to "run".
+            fsync_rows (int, optional):
+                number of rows between two synchronizations, with the "rows" policy.
+                Defaults to 100.
+
+        Raises:
+            ValueError: if the policy is unknown or the number of rows is not positive.
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        if fsync_rows < 1:
+            raise ValueError(f"Invalid number of rows between fsync: {fsync_rows}")
+
+        self._path = pathlib.Path(path)
+        self._fsync_policy = fsync_policy
+        self._fsync_rows = fsync_rows
+
+        self._fd: Optional[int] = None
+        self._nb_unsynced_rows = 0
+        self._unsynced = False
+
+    def __enter__(self) -> "CampaignJournal":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def path(self) -> pathlib.Path:
+        """
+        Get the path of the journal.
+
+        Returns:
+            pathlib.Path: the path of the journal.
+        """
+        return self._path
+
+    def open(self) -> None:
+        """
+        Open the journal in append mode, after removing its torn last event if any.
+        """
+        if self._fd is not None:
+            return
+        remove_torn_line(path=self._path)
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def close(self) -> None:
+        """
+        Synchronize the journal to the storage device and close it.
+        """
+        if self._fd is None:
+            return
+        try:
+            if self._unsynced:
+                os.fsync(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+            self._unsynced = False
+
+    def _append(self, events: List[Dict[str, Any]]) -> None:
+        data = "".join(f"{json.dumps(e, default=str, separators=(',', ':'))}\n" for e in events)
+        view = memoryview(data.encode())
+        while view:
+            nb_written = os.write(self._fd, view)
+            view = view[nb_written:]
+        self._unsynced = True
+
+    def comment(self, line: str) -> None:
+        """
+        Record a comment line of the CSV output file.
+
+        Args:
+            line (str): the comment line, starting with "#".
+        """
+        self._append(events=[{"event": "comment", "line": line}])
+
+    def run_started(self, execution_parameters: Dict[str, str]) -> str:
+        """
+        Record the start of a run.
+
+        Args:
+            execution_parameters (Dict[str, str]): stringified parameters of the run.
+
+        Returns:
+            str: the identifier of the run in the journal, to give to `run_finished()`.
+        """
+        run_id = uuid.uuid4().hex
+        self._append(events=[{"event": "started", "id": run_id, "run": execution_parameters}])
+        return run_id
+
+    def run_finished(
+        self,
+        run_id: str,
+        rows: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Record the result rows and the end of a run, and synchronize the journal if the policy
+        requires it.
+
+        Args:
+            run_id (str): identifier of the run returned by `run_started()`.
+            rows (List[Dict[str, Any]]): result rows of the run.
+        """
+        events = [{"event": "row", "id": run_id, "row": row} for row in rows]
+        events.append({"event": "finished", "id": run_id})
+        self._append(events=events)
+
+        self._nb_unsynced_rows += len(rows)
+        if "run" == self._fsync_policy or (
+            "rows" == self._fsync_policy and self._nb_unsynced_rows >= self._fsync_rows
+        ):
+            os.fsync(self._fd)
+            self._nb_unsynced_rows = 0
+            self._unsynced = False
+
+
+class JournalReplay:
+    """
+    State of a campaign, replayed from its journal.
+    """
+
+    def __init__(self) -> None:
+        self.comments: List[str] = []
+        self.finished_runs: List[Dict[str, str]] = []
+        self.interrupted_runs: List[Dict[str, str]] = []
+        self.rows: List[Dict[str, Any]] = []
+        self.run_rows: Dict[str, List[Dict[str, Any]]] = {}
+
+    @classmethod
+    def load(cls, path: PathType) -> "JournalReplay":
+        """
+        Replay the given journal.
+
+        Args:
+            path (PathType): path of the journal.
+
+        Returns:
+            JournalReplay: the state of the campaign, empty if the journal does not exist.
+        """
+        result = cls()
+        path = pathlib.Path(path)
+        if not path.is_file():
+            return result
+
+        started: Dict[str, Dict[str, str]] = {}
+        pending_rows: Dict[str, List[Dict[str, Any]]] = {}
+        for event in _read_events(path=path):
+            kind = event.get("event")
+            run_id = event.get("id")
+            if "comment" == kind:
+                result.comments.append(event.get("line", "#"))
+            elif "started" == kind:
+                started[run_id] = event.get("run", {})
+                pending_rows[run_id] = []
+            elif "row" == kind and run_id in pending_rows:
+                pending_rows[run_id].append(event.get("row", {}))
+            elif "finished" == kind and run_id in started:
+                result.finished_runs.append(started.pop(run_id))
+                result.run_rows[run_id] = pending_rows.pop(run_id)
+                result.rows.extend(result.run_rows[run_id])
+        # the interrupted runs that were run again when the campaign was continued are done
+        finished = {json.dumps(run, sort_keys=True) for run in result.finished_runs}
+        result.interrupted_runs = [
+            run for run in started.values() if json.dumps(run, sort_keys=True) not in finished
+        ]
+        return result
+
+    @property
+    def columns(self) -> List[str]:
+        """
+        Get the columns of the CSV header: the columns of the result rows in order of appearance,
+        the "thread_*" columns last.
+
+        Returns:
+            List[str]: the columns of the CSV header, empty if no row was recorded.
+        """
+        columns = list(dict.fromkeys(column for row in self.rows for column in row))
+        left = [column for column in columns if not column.startswith("thread_")]
+        right = [column for column in columns if column.startswith("thread_")]
+        return left + right
+
+
+def seed_journal(
+    journal: PathType,
+    csv_path: PathType,
+) -> int:
+    """
+    Create the journal of a campaign from its CSV output file, when the CSV file was written
+    without a journal (e.g. by a previous version of benchkit), so that the runs it records are
+    not run again when the campaign is continued. Each result row is recorded as a finished run.
+    Nothing is done if the journal already has events or if the CSV file does not exist.
+
+    Args:
+        journal (PathType): path of the journal.
+        csv_path (PathType): path of the CSV output file.
+
+    Returns:
+        int: the number of result rows recorded in the journal.
+    """
+    journal = pathlib.Path(journal)
+    csv_path = pathlib.Path(csv_path)
+    if (journal.is_file() and journal.stat().st_size > 0) or not csv_path.is_file():
+        return 0
+
+    tmp_path = journal.with_name(f"{journal.name}.tmp")
+    tmp_path.unlink(missing_ok=True)
+    nb_rows = 0
+    columns: List[str] = []
+    with (
+        open(csv_path, "r") as csv_file,
+        CampaignJournal(path=tmp_path, fsync_policy="exit") as tmp_journal,
+    ):
+        for raw_line in csv_file:
+            # a torn last line is a row that was never completely written
+            if not raw_line.endswith("\n"):
+                break
+            line = raw_line.rstrip("\n")
+            if not line.strip():
+                continue
+            if line.startswith("#"):
+                tmp_journal.comment(line)
+                continue
+            values = line.split(CSV_SEPARATOR)
+            if not columns:
+                columns = values
+                continue
+            row = dict(zip(columns, values))
+            run_id = tmp_journal.run_started(execution_parameters=row)
+            tmp_journal.run_finished(run_id=run_id, rows=[row])
+            nb_rows += 1
+    os.replace(tmp_path, journal)
+    return nb_rows
+
+
+def _write_lines(path: pathlib.Path, lines: List[str]) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w") as output_file:
+        output_file.writelines(f"{line}\n" for line in lines)
+    os.replace(tmp_path, path)
+
+
+def regenerate_csv(
+    journal: PathType,
+    csv_path: PathType,
+    thread_columns: str = "wide",
+) -> int:
+    """
+    Write the CSV output file of a campaign from its journal: its comments, then the rows of the
+    finished runs. The runs that were interrupted are not included.
+
+    Args:
+        journal (PathType): path of the journal.
+        csv_path (PathType): path of the CSV file to (over)write.
+        thread_columns (str, optional):
+            layout of the per-thread columns of the campaign. With the "long" layout, the per-thread
+            table next to the CSV file is (over)written too.
+            Defaults to "wide".
+
+    Raises:
+        ValueError: if the layout of the per-thread columns is unknown.
+
+    Returns:
+        int: the number of result rows written.
+    """
+    if thread_columns not in THREAD_COLUMNS_LAYOUTS:
+        raise ValueError(f"Unknown layout of the thread columns: {thread_columns}")
+
+    replay = JournalReplay.load(path=journal)
+    csv_path = pathlib.Path(csv_path)
+    rows = replay.rows
+    columns = replay.columns
+
+    if "long" == thread_columns:
+        rows = []
+        thread_lines = [CSV_SEPARATOR.join(THREADS_COLUMNS)]
+        for run_id, run_rows in replay.run_rows.items():
+            result_rows, thread_rows = split_thread_columns(rows=run_rows, run_id=run_id)
+            rows.extend(result_rows)
+            thread_lines.extend(
+                CSV_SEPARATOR.join(str(thread_row[c]) for c in THREADS_COLUMNS)
+                for thread_row in thread_rows
+            )
+        columns = list(dict.fromkeys(column for row in rows for column in row))
+        _write_lines(path=threads_csv_path(csv_path=csv_path), lines=thread_lines)
+
+    lines = list(replay.comments)
+    if columns:
+        lines.append(CSV_SEPARATOR.join(columns))
+        lines.extend(
+            CSV_SEPARATOR.join(str(row.get(column, "")) for column in columns) for row in rows
+        )
+    _write_lines(path=csv_path, lines=lines)
+    return len(rows)
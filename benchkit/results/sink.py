@@ -0,0 +1,223 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Buffered writer of the CSV output file of a campaign.
+
+The file is kept open for the whole campaign, and the lines of a run are buffered and written with
+a single append at the end of the run, so that a run never leaves a partial row behind it. How often
+the written data is synchronized to the storage device (fsync) is configured with a policy:
+  - "run": after each run,
+  - "rows": every time at least `fsync_rows` rows were written since the last synchronization,
+  - "exit": only when the sink is closed.
+A torn last line, left by a crash of a previous execution of the campaign, is removed when the sink
+is opened.
+"""
+
+import os
+import pathlib
+from typing import Callable, List, Optional
+
+from benchkit.utils.types import PathType
+
+FSYNC_POLICIES = ("run", "rows", "exit")
+
+
+def remove_torn_line(path: PathType) -> bool:
+    """
+    Remove the torn last line of an append-only text file, left by a crash while it was written.
+
+    Args:
+        path (PathType): path of the file.
+
+    Returns:
+        bool: whether a torn line was removed.
+    """
+    path = pathlib.Path(path)
+    if not path.is_file():
+        return False
+
+    with open(path, "rb+") as output_file:
+        size = output_file.seek(0, os.SEEK_END)
+        if 0 == size:
+            return False
+        output_file.seek(size - 1)
+        if b"\n" == output_file.read(1):
+            return False
+
+        # look for the end of the last complete line, reading the file backwards:
+        end = size
+        while end > 0:
+            start = max(0, end - 4096)
+            output_file.seek(start)
+            chunk = output_file.read(end - start)
+            newline = chunk.rfind(b"\n")
+            if newline >= 0:
+                end = start + newline + 1
+                break
+            end = start
+        output_file.truncate(end)
+    return True
+
+
+class ResultSink:
+    """
+    Append-only writer of the CSV output file of a campaign, that batches lines and synchronizes
+    them to the storage device according to the given policy.
+    """
+
+    def __init__(
+        self,
+        path: PathType,
+        fsync_policy: str = "run",
+        fsync_rows: int = 100,
+        comment_callback: Optional[Callable[[str], None]] = None,
+    ) -> None:
+        """
+        Create a result sink. The file is opened with `open()` (or when entering the context).
+
+        Args:
+            path (PathType):
+                path of the CSV output file.
+            fsync_policy (str, optional):
+                when to synchronize the file to the storage device, one of "run", "rows" or
+                "exit".
+                Defaults to "run".
+            fsync_rows (int, optional):
+                number of rows between two synchronizations, with the "rows" policy.
+                Defaults to 100.
+            comment_callback (Optional[Callable[[str], None]], optional):
+                function called with each comment line ("# ...") when it is written, used to
+                record the comments in the journal of the campaign.
+                Defaults to None.
+
+        Raises:
+            ValueError: if the policy is unknown or the number of rows is not positive.
+        """
+        if fsync_policy not in FSYNC_POLICIES:
+            raise ValueError(f"Unknown fsync policy: {fsync_policy}")
+        if fsync_rows < 1:
+            raise ValueError(f"Invalid number of rows between fsync: {fsync_rows}")
+
+        self._path = pathlib.Path(path)
+        self._fsync_policy = fsync_policy
+        self._fsync_rows = fsync_rows
+        self._comment_callback = comment_callback
+
+        self._fd: Optional[int] = None
+        self._buffer: List[str] = []
+        self._nb_unsynced_rows = 0
+        self._unsynced = False
+
+    def __enter__(self) -> "ResultSink":
+        self.open()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.close()
+
+    @property
+    def path(self) -> pathlib.Path:
+        """
+        Get the path of the output file.
+
+        Returns:
+            pathlib.Path: the path of the output file.
+        """
+        return self._path
+
+    @property
+    def is_open(self) -> bool:
+        """
+        Return whether the sink is open.
+
+        Returns:
+            bool: whether the sink is open.
+        """
+        return self._fd is not None
+
+    def open(self) -> None:
+        """
+        Open the output file in append mode, after removing its torn last line if any.
+        """
+        if self.is_open:
+            return
+        if remove_torn_line(path=self._path):
+            print(f'[WARNING] Removed a torn line at the end of "{self._path}"')
+        self._fd = os.open(self._path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+
+    def close(self) -> None:
+        """
+        Write the pending lines, synchronize the file to the storage device and close it.
+        """
+        if not self.is_open:
+            return
+        try:
+            self.flush()
+            if self._unsynced:
+                self.sync()
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def write(self, text: str) -> int:
+        """
+        Buffer raw text, so that the sink can be used as the file of `print()`.
+
+        Args:
+            text (str): text to buffer.
+
+        Returns:
+            int: the number of buffered characters.
+        """
+        self._buffer.append(text)
+        return len(text)
+
+    def write_line(self, line: str) -> None:
+        """
+        Buffer a result row.
+
+        Args:
+            line (str): row to buffer, without the trailing newline.
+        """
+        self._buffer.append(f"{line}\n")
+        self._nb_unsynced_rows += 1
+
+    def flush(self) -> None:
+        """
+        Write the buffered text to the file, with a single append when possible.
+        """
+        if not self._buffer:
+            return
+        text = "".join(self._buffer)
+        self._buffer.clear()
+        if self._comment_callback is not None:
+            for line in text.splitlines():
+                if line.startswith("#"):
+                    self._comment_callback(line)
+        data = text.encode()
+
+        view = memoryview(data)
+        while view:
+            nb_written = os.write(self._fd, view)
+            view = view[nb_written:]
+        self._unsynced = True
+
+    def sync(self) -> None:
+        """
+        Synchronize the written content of the file to the storage device.
+        """
+        os.fsync(self._fd)
+        self._nb_unsynced_rows = 0
+        self._unsynced = False
+
+    def end_run(self) -> None:
+        """
+        Write the lines of the run that just finished and synchronize the file if the policy
+        requires it.
+        """
+        nb_rows = self._nb_unsynced_rows
+        self.flush()
+        if "run" == self._fsync_policy or (
+            "rows" == self._fsync_policy and nb_rows >= self._fsync_rows
+        ):
+            self.sync()
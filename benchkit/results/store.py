@@ -0,0 +1,290 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Embedded store of the results of campaigns, as an indexed SQLite database.
+
+Each campaign has its own table, named after its CSV output file, with typed columns (INTEGER,
+REAL or TEXT, inferred from the first value recorded in the column) and an index on the variables
+of the campaign. Columns are added when new ones appear. The database is written in addition to
+the CSV output file, which is kept for compatibility, and loading the results of a campaign does not
+need to parse any text.
+"""
+
+import csv
+import math
+import os
+import pathlib
+import re
+import sqlite3
+from typing import Any, Dict, Iterable, List, Optional, Sequence
+
+from benchkit.utils.misc import CSV_SEPARATOR
+from benchkit.utils.types import PathType
+
+_CAMPAIGNS_TABLE = "benchkit_campaigns"
+
+
+def _quote(name: str) -> str:
+    escaped = name.replace('"', '""')
+    return f'"{escaped}"'
+
+
+def _typed_value(value: Any) -> Any:
+    if value is None or isinstance(value, (int, float)):
+        return value
+    text = str(value)
+    # only the values written back identically are converted, e.g. "007", "1e3" or "nan" are kept
+    for convert in (int, float):
+        try:
+            converted = convert(text)
+        except ValueError:
+            continue
+        if str(converted) == text and (convert is int or math.isfinite(converted)):
+            return converted
+    return text
+
+
+def _column_type(value: Any) -> str:
+    value = _typed_value(value)
+    if isinstance(value, int):
+        return "INTEGER"
+    if isinstance(value, float):
+        return "REAL"
+    return "TEXT"
+
+
+def table_name(csv_path: PathType) -> str:
+    """
+    Return the name of the table of the campaign whose CSV output file is given.
+
+    Args:
+        csv_path (PathType): path of the CSV output file of the campaign.
+
+    Returns:
+        str: the name of the table.
+    """
+    return re.sub(r"\W", "_", pathlib.Path(csv_path).stem)
+
+
+class ResultStore:
+    """
+    SQLite database of the results of campaigns.
+    A connection is opened per process, so that the store can be shared by the instances of the
+    parallel runner.
+    """
+
+    def __init__(self, path: PathType) -> None:
+        """
+        Create a result store. The database is created when the first rows are inserted.
+
+        Args:
+            path (PathType): path of the SQLite database.
+        """
+        self._path = pathlib.Path(path)
+        self._connection: Optional[sqlite3.Connection] = None
+        self._pid = None
+        self._columns: Dict[str, List[str]] = {}
+
+    @property
+    def path(self) -> pathlib.Path:
+        """
+        Get the path of the SQLite database.
+
+        Returns:
+            pathlib.Path: the path of the SQLite database.
+        """
+        return self._path
+
+    def connection(self) -> sqlite3.Connection:
+        """
+        Get the connection to the database of the current process, opening it if needed.
+
+        Returns:
+            sqlite3.Connection: the connection to the database.
+        """
+        if self._connection is None or self._pid != os.getpid():
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            self._connection = sqlite3.connect(self._path, timeout=60.0)
+            self._connection.execute("PRAGMA journal_mode=WAL")
+            self._connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_CAMPAIGNS_TABLE} "
+                "(table_name TEXT PRIMARY KEY, experiment_name TEXT, benchmark_name TEXT)"
+            )
+            self._pid = os.getpid()
+            self._columns = {}
+        return self._connection
+
+    def close(self) -> None:
+        """
+        Close the connection of the current process.
+        """
+        if self._connection is not None and self._pid == os.getpid():
+            self._connection.close()
+        self._connection = None
+        self._pid = None
+
+    def tables(self) -> List[str]:
+        """
+        Return the tables of the campaigns recorded in the store.
+
+        Returns:
+            List[str]: the names of the tables, in creation order.
+        """
+        if not self._path.is_file():
+            return []
+        cursor = self.connection().execute(f"SELECT table_name FROM {_CAMPAIGNS_TABLE}")
+        return [row[0] for row in cursor]
+
+    def columns(self, table: str) -> List[str]:
+        """
+        Return the columns of the table of a campaign.
+
+        Args:
+            table (str): name of the table.
+
+        Returns:
+            List[str]: the names of the columns, empty if the table does not exist.
+        """
+        if table not in self._columns:
+            cursor = self.connection().execute(f"PRAGMA table_info({_quote(table)})")
+            self._columns[table] = [row[1] for row in cursor]
+        return self._columns[table]
+
+    def _prepare_table(
+        self,
+        table: str,
+        rows: List[Dict[str, Any]],
+        index_columns: Sequence[str],
+        register: bool,
+    ) -> List[str]:
+        connection = self.connection()
+        columns = self.columns(table=table)
+        first_values: Dict[str, Any] = {}
+        for row in rows:
+            for column, value in row.items():
+                if value is not None:
+                    first_values.setdefault(column, value)
+        new_columns = list(dict.fromkeys(c for row in rows for c in row if c not in columns))
+        if new_columns:
+            # another process might have added the columns in the meantime
+            self._columns.pop(table, None)
+            columns = self.columns(table=table)
+            new_columns = [c for c in new_columns if c not in columns]
+        if not new_columns:
+            return columns
+
+        definitions = [f"{_quote(c)} {_column_type(first_values.get(c))}" for c in new_columns]
+        if not columns:
+            connection.execute(
+                f"CREATE TABLE IF NOT EXISTS {_quote(table)} ({', '.join(definitions)})"
+            )
+            first_row = rows[0]
+            if register:
+                connection.execute(
+                    f"INSERT OR IGNORE INTO {_CAMPAIGNS_TABLE} VALUES (?, ?, ?)",
+                    (table, first_row.get("experiment_name"), first_row.get("benchmark_name")),
+                )
+        else:
+            for definition in definitions:
+                connection.execute(f"ALTER TABLE {_quote(table)} ADD COLUMN {definition}")
+        columns = columns + new_columns
+        self._columns[table] = columns
+
+        indexed = [c for c in index_columns if c in columns]
+        if indexed:
+            connection.execute(
+                f"CREATE INDEX IF NOT EXISTS {_quote(f'{table}_variables')} "
+                f"ON {_quote(table)} ({', '.join(_quote(c) for c in indexed)})"
+            )
+        return columns
+
+    def insert_rows(
+        self,
+        table: str,
+        rows: Iterable[Dict[str, Any]],
+        index_columns: Sequence[str] = (),
+        register: bool = True,
+    ) -> None:
+        """
+        Insert result rows in the table of a campaign, in a single transaction. The table, its
+        missing columns and its index are created if needed.
+
+        Args:
+            table (str):
+                name of the table.
+            rows (Iterable[Dict[str, Any]]):
+                result rows to insert.
+            index_columns (Sequence[str], optional):
+                columns of the index of the table (the variables of the campaign), used when the
+                index is created.
+                Defaults to ().
+            register (bool, optional):
+                whether the table is the table of a campaign, listed by `tables()`, rather than an
+                auxiliary table (e.g. the per-thread values of a campaign).
+                Defaults to True.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+
+        connection = self.connection()
+        with connection:
+            columns = self._prepare_table(
+                table=table,
+                rows=rows,
+                index_columns=index_columns,
+                register=register,
+            )
+            placeholders = ", ".join("?" for _ in columns)
+            connection.executemany(
+                f"INSERT INTO {_quote(table)} VALUES ({placeholders})",
+                [tuple(_typed_value(row.get(c)) for c in columns) for row in rows],
+            )
+
+    def read_rows(self, table: str, **filters: Any) -> List[Dict[str, Any]]:
+        """
+        Read the result rows of a campaign.
+
+        Args:
+            table (str): name of the table.
+            **filters (Any): values of columns the rows must have, e.g. `nb_threads=4`.
+
+        Returns:
+            List[Dict[str, Any]]: the matching rows, in insertion order.
+        """
+        columns = self.columns(table=table)
+        if not columns:
+            return []
+
+        query = f"SELECT * FROM {_quote(table)}"
+        conditions = [f"{_quote(c)} = ?" for c in filters]
+        if conditions:
+            query += f" WHERE {' AND '.join(conditions)}"
+        query += " ORDER BY rowid"
+        cursor = self.connection().execute(query, [_typed_value(v) for v in filters.values()])
+        return [dict(zip(columns, row)) for row in cursor]
+
+    def export_csv(
+        self,
+        table: str,
+        csv_path: PathType,
+    ) -> int:
+        """
+        Export the table of a campaign to a CSV file in the format of the CSV output files. The
+        values containing the separator, quotes or line breaks are quoted, so that the file parses
+        back.
+
+        Args:
+            table (str): name of the table.
+            csv_path (PathType): path of the CSV file to (over)write.
+
+        Returns:
+            int: the number of exported rows.
+        """
+        columns = self.columns(table=table)
+        rows = self.read_rows(table=table)
+        with open(csv_path, "w", newline="") as csv_file:
+            writer = csv.writer(csv_file, delimiter=CSV_SEPARATOR, lineterminator="\n")
+            writer.writerow(columns)
+            writer.writerows(["" if row[c] is None else row[c] for c in columns] for row in rows)
+        return len(rows)
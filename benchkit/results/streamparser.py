@@ -0,0 +1,149 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Incremental parsing of the output of benchmark commands.
+
+Benchmarks that print one line per operation or per interval (e.g. cyclictest, sysbench with
+`--report-interval`, memtier) can provide a stream parser: it is fed with each line of the output
+while the command runs, and produces interval records and final aggregates, so that the complete
+output does not need to be kept in memory and split again afterwards.
+"""
+
+import inspect
+import re
+import statistics
+from typing import Any, Callable, Dict, List, Pattern
+
+RecordValues = Dict[str, Any]
+
+
+class StreamParser:
+    """
+    Incremental parser of the output of a benchmark command, fed line by line.
+    Subclasses implement `feed_line()`, record intervals with `add_interval()` and may override
+    `aggregates()`.
+    """
+
+    def __init__(self) -> None:
+        self.intervals: List[RecordValues] = []
+
+    def feed_line(self, line: str) -> None:
+        """
+        Parse one line of the output.
+
+        Args:
+            line (str): the line, with its end of line if it has one.
+        """
+        raise NotImplementedError
+
+    def feed(self, output: str) -> None:
+        """
+        Parse a complete output, for the commands whose output could not be streamed.
+
+        Args:
+            output (str): the output of the command.
+        """
+        for line in output.splitlines(keepends=True):
+            self.feed_line(line=line)
+
+    def add_interval(self, record: RecordValues) -> None:
+        """
+        Record the values of one interval (or operation) of the output.
+
+        Args:
+            record (RecordValues): values of the interval.
+        """
+        self.intervals.append(record)
+
+    def aggregates(self) -> RecordValues:
+        """
+        Compute the aggregated values of the whole output, once it is completely parsed.
+
+        Returns:
+            RecordValues: the aggregated values.
+        """
+        return {}
+
+    def records(self) -> RecordValues | List[RecordValues]:
+        """
+        Return the record results of the parsed output: one line per interval with the aggregates,
+        or only the aggregates if there is no interval.
+
+        Returns:
+            RecordValues | List[RecordValues]: the record results.
+        """
+        aggregates = self.aggregates()
+        if not self.intervals:
+            return aggregates
+        return [aggregates | interval for interval in self.intervals]
+
+
+def _number(value: str) -> Any:
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+class RegexIntervalParser(StreamParser):
+    """
+    Stream parser recording an interval for each line matching a regular expression, with the
+    named groups of the match as values (converted to numbers when possible).
+    The aggregates are the number of intervals and the mean of each numeric value
+    (`<name>_mean`).
+    """
+
+    def __init__(self, pattern: str | Pattern[str]) -> None:
+        """
+        Args:
+            pattern (str | Pattern[str]): regular expression with named groups.
+        """
+        super().__init__()
+        self._pattern = re.compile(pattern)
+
+    def feed_line(self, line: str) -> None:
+        match = self._pattern.search(line)
+        if match is not None:
+            self.add_interval(
+                record={k: _number(v) for k, v in match.groupdict().items() if v is not None}
+            )
+
+    def aggregates(self) -> RecordValues:
+        result: RecordValues = {"nb_intervals": len(self.intervals)}
+        names = dict.fromkeys(k for interval in self.intervals for k in interval)
+        for name in names:
+            values = [
+                v
+                for interval in self.intervals
+                if isinstance(v := interval.get(name), (int, float))
+            ]
+            if values:
+                result[f"{name}_mean"] = statistics.fmean(values)
+        return result
+
+
+def shell_streamed(
+    shell_fun: Callable[..., str],
+    stream_parser: StreamParser,
+    **kwargs,
+) -> str:
+    """
+    Run a command with a shell function, feeding its output to the stream parser while it runs.
+    Shell functions that cannot stream the output (without `output_callback` argument) return it
+    once complete, and it is then fed to the parser.
+
+    Args:
+        shell_fun (Callable[..., str]): shell function (e.g. `platform.comm.shell`).
+        stream_parser (StreamParser): the parser to feed.
+        **kwargs: arguments of the shell function.
+
+    Returns:
+        str: the output of the command, empty if it was streamed to the parser.
+    """
+    if "output_callback" in inspect.signature(shell_fun).parameters:
+        return shell_fun(output_callback=stream_parser.feed_line, **kwargs)
+    output = shell_fun(**kwargs)
+    stream_parser.feed(output=output)
+    return output
@@ -0,0 +1,105 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Layout of the per-thread result columns (`thread_0`, `thread_1`, ...).
+
+In the "wide" layout (the default), the per-thread values are columns of the result rows, and the
+CSV header is padded with `thread_*` columns up to the maximum number of threads of the platform.
+In the "long" layout, the result rows do not have per-thread columns: each row gets a `run_id` and a
+`run_line` column, and the per-thread values are written in a separate table with one row per
+thread, `run_id;run_line;thread_id;value`, next to the CSV output file (`<name>.threads.csv`).
+`pivot_thread_columns()` turns the long layout back into the wide one.
+"""
+
+import pathlib
+import re
+from typing import Any, Dict, List, Tuple
+
+from benchkit.utils.types import PathType
+
+THREAD_COLUMNS_LAYOUTS = ("wide", "long")
+THREADS_CSV_SUFFIX = ".threads.csv"
+
+RUN_ID_COLUMN = "run_id"
+RUN_LINE_COLUMN = "run_line"
+THREAD_ID_COLUMN = "thread_id"
+THREAD_VALUE_COLUMN = "value"
+THREADS_COLUMNS = [RUN_ID_COLUMN, RUN_LINE_COLUMN, THREAD_ID_COLUMN, THREAD_VALUE_COLUMN]
+
+_THREAD_COLUMN_RE = re.compile(r"thread_(\d+)")
+
+
+def threads_csv_path(csv_path: PathType) -> pathlib.Path:
+    """
+    Return the path of the per-thread table of the given CSV output file, in the long layout.
+
+    Args:
+        csv_path (PathType): path of the CSV output file.
+
+    Returns:
+        pathlib.Path: the path of the per-thread table.
+    """
+    csv_path = pathlib.Path(csv_path)
+    return csv_path.with_name(f"{csv_path.stem}{THREADS_CSV_SUFFIX}")
+
+
+def split_thread_columns(
+    rows: List[Dict[str, Any]],
+    run_id: str,
+) -> Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+    """
+    Split the result rows of a run into rows without per-thread columns and per-thread rows.
+
+    Args:
+        rows (List[Dict[str, Any]]): result rows of the run, in the wide layout.
+        run_id (str): identifier of the run.
+
+    Returns:
+        Tuple[List[Dict[str, Any]], List[Dict[str, Any]]]:
+            the result rows with the `run_id` and `run_line` columns instead of the per-thread
+            columns, and the per-thread rows.
+    """
+    result_rows = []
+    thread_rows = []
+    for run_line, row in enumerate(rows):
+        result_row = {}
+        for column, value in row.items():
+            match = _THREAD_COLUMN_RE.fullmatch(column)
+            if match is None:
+                result_row[column] = value
+            else:
+                thread_rows.append(
+                    {
+                        RUN_ID_COLUMN: run_id,
+                        RUN_LINE_COLUMN: run_line,
+                        THREAD_ID_COLUMN: int(match.group(1)),
+                        THREAD_VALUE_COLUMN: value,
+                    }
+                )
+        result_row[RUN_ID_COLUMN] = run_id
+        result_row[RUN_LINE_COLUMN] = run_line
+        result_rows.append(result_row)
+    return result_rows, thread_rows
+
+
+def pivot_thread_columns(df, threads_df):
+    """
+    Add the per-thread columns (`thread_0`, `thread_1`, ...) of the long layout back to the result
+    rows. The dataframes are pandas dataframes, pandas is not imported by this module.
+
+    Args:
+        df (DataFrame): result rows, with the `run_id` and `run_line` columns.
+        threads_df (DataFrame): per-thread rows.
+
+    Returns:
+        DataFrame: the result rows with the per-thread columns, in the wide layout.
+    """
+    keys = [RUN_ID_COLUMN, RUN_LINE_COLUMN]
+    wide = threads_df.pivot_table(
+        index=keys,
+        columns=THREAD_ID_COLUMN,
+        values=THREAD_VALUE_COLUMN,
+        aggfunc="first",
+    )
+    wide.columns = [f"thread_{thread_id}" for thread_id in wide.columns]
+    return df.merge(wide.reset_index(), on=keys, how="left")
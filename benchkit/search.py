@@ -0,0 +1,421 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Search strategies exploring a space of variables to find the best performing records, instead of
+running all the combinations of a cartesian product.
+
+A strategy proposes records round by round: the benchmark runs the records of a round, reports the
+results of each record to the strategy, then asks for the records of the next round, until the
+strategy returns no record. Every evaluated record is written to the CSV output file of the
+campaign, with the round in the `search_round` column.
+"""
+
+import itertools
+import math
+import random
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from benchkit.results.cache import str_param
+
+SearchRecord = Dict[str, Any]
+SearchConfig = Tuple[int, ...]
+
+SEARCH_ROUND_COLUMN = "search_round"
+
+
+class SearchStrategy:
+    """
+    Base class of the search strategies over a space given as the values of each variable.
+    """
+
+    def __init__(
+        self,
+        variables: Dict[str, Iterable[Any]],
+        metric: str,
+        maximize: bool = True,
+        seed: int = 0,
+    ) -> None:
+        """
+        Create a search strategy.
+
+        Args:
+            variables (Dict[str, Iterable[Any]]):
+                values of each variable, the search space being their cartesian product.
+            metric (str):
+                name of the result column to optimize.
+            maximize (bool, optional):
+                whether the metric is maximized (e.g. throughput) or minimized (e.g. latency).
+                Defaults to True.
+            seed (int, optional):
+                seed of the random choices of the strategy.
+                Defaults to 0.
+        """
+        dimensions = {name: list(values) for name, values in variables.items()}
+        self._dimensions = {name: values for name, values in dimensions.items() if values}
+        self._metric = metric
+        self._maximize = maximize
+        self._rng = random.Random(seed)
+
+        self._round = -1
+        self._pending: Dict[Tuple[str, ...], SearchConfig] = {}
+        self._round_scores: Dict[SearchConfig, float] = {}
+        self._history: List[Tuple[int, SearchConfig, float]] = []
+
+    @property
+    def metric(self) -> str:
+        """
+        Get the name of the optimized metric.
+
+        Returns:
+            str: the name of the optimized metric.
+        """
+        return self._metric
+
+    def variables(self) -> Dict[str, List[Any]]:
+        """
+        Return the values of each variable of the search space.
+
+        Returns:
+            Dict[str, List[Any]]: the values of each variable of the search space.
+        """
+        return {name: list(values) for name, values in self._dimensions.items()}
+
+    def variable_names(self) -> List[str]:
+        """
+        Return the names of the variables of the search space.
+
+        Returns:
+            List[str]: the names of the variables of the search space.
+        """
+        return list(self._dimensions)
+
+    def space_size(self) -> int:
+        """
+        Return the number of points of the search space.
+
+        Returns:
+            int: the number of points of the search space.
+        """
+        return math.prod(len(values) for values in self._dimensions.values())
+
+    def max_nb_records(self) -> int:
+        """
+        Return the maximum number of records the strategy evaluates, used to estimate the duration
+        of the campaign.
+
+        Returns:
+            int: the maximum number of records the strategy evaluates.
+        """
+        raise NotImplementedError
+
+    def benchmark_duration_seconds(self, default: Optional[int]) -> Optional[int]:
+        """
+        Return the duration of each run of the current round.
+
+        Args:
+            default (Optional[int]): duration of the runs configured in the campaign.
+
+        Returns:
+            Optional[int]: the duration of each run of the current round.
+        """
+        return default
+
+    def next_records(self) -> List[SearchRecord]:
+        """
+        Close the current round and return the records of the next one. Records of the current
+        round whose results were not reported (e.g. invalid records) are scored as failed.
+
+        Returns:
+            List[SearchRecord]: the records to evaluate, empty when the search is over.
+        """
+        for config in self._pending.values():
+            self._score(config=config, value=math.nan)
+        self._pending.clear()
+
+        self._round += 1
+        configs = self._next_configs()
+        self._round_scores = {}
+
+        records = []
+        for config in configs:
+            record = self._config_to_record(config=config)
+            self._pending[self._record_key(record=record)] = config
+            record[SEARCH_ROUND_COLUMN] = self._round
+            records.append(record)
+        return records
+
+    def report(
+        self,
+        record: SearchRecord,
+        results_lines: List[Dict[str, Any]],
+    ) -> None:
+        """
+        Report the results of a record of the current round. The score of the record is the mean
+        of the metric over all the result lines (of all its runs).
+
+        Args:
+            record (SearchRecord): the evaluated record.
+            results_lines (List[Dict[str, Any]]): the result lines of the record.
+        """
+        config = self._pending.pop(self._record_key(record=record), None)
+        if config is None:
+            return
+
+        values = []
+        for line in results_lines:
+            try:
+                values.append(float(line[self._metric]))
+            except (KeyError, TypeError, ValueError):
+                pass
+        value = sum(values) / len(values) if values else math.nan
+        self._score(config=config, value=value)
+
+    def best(self) -> Optional[Tuple[SearchRecord, float]]:
+        """
+        Return the best record evaluated so far, in the last round it was evaluated in.
+
+        Returns:
+            Optional[Tuple[SearchRecord, float]]: the best record and its score, if any.
+        """
+        last_scores = {config: value for _, config, value in self._history}
+        valid = [(value, config) for config, value in last_scores.items() if not math.isnan(value)]
+        if not valid:
+            return None
+        value, config = max(valid) if self._maximize else min(valid)
+        return self._config_to_record(config=config), value
+
+    def _next_configs(self) -> List[SearchConfig]:
+        raise NotImplementedError
+
+    def _score(self, config: SearchConfig, value: float) -> None:
+        self._round_scores[config] = value
+        self._history.append((self._round, config, value))
+
+    def _loss(self, value: float) -> float:
+        # lower is better, failed evaluations are the worst
+        if math.isnan(value):
+            return math.inf
+        return -value if self._maximize else value
+
+    def _all_configs(self) -> Iterable[SearchConfig]:
+        return itertools.product(*(range(len(values)) for values in self._dimensions.values()))
+
+    def _random_config(self) -> SearchConfig:
+        return tuple(self._rng.randrange(len(values)) for values in self._dimensions.values())
+
+    def _config_to_record(self, config: SearchConfig) -> SearchRecord:
+        return {
+            name: values[index] for (name, values), index in zip(self._dimensions.items(), config)
+        }
+
+    def _record_key(self, record: SearchRecord) -> Tuple[str, ...]:
+        return tuple(str_param(record[name]) for name in self._dimensions)
+
+
+class SuccessiveHalving(SearchStrategy):
+    """
+    Successive halving: all the candidate records are first evaluated with a short run duration,
+    then only the best 1/eta fraction is evaluated again with a run duration eta times longer, and
+    so on until a single record remains or the maximum duration is reached.
+    """
+
+    def __init__(
+        self,
+        variables: Dict[str, Iterable[Any]],
+        metric: str,
+        min_duration_seconds: int,
+        maximize: bool = True,
+        eta: int = 3,
+        max_duration_seconds: Optional[int] = None,
+        nb_candidates: Optional[int] = None,
+        seed: int = 0,
+    ) -> None:
+        """
+        Create a successive halving search.
+
+        Args:
+            variables (Dict[str, Iterable[Any]]):
+                values of each variable, the search space being their cartesian product.
+            metric (str):
+                name of the result column to optimize.
+            min_duration_seconds (int):
+                duration of the runs of the first round.
+            maximize (bool, optional):
+                whether the metric is maximized or minimized.
+                Defaults to True.
+            eta (int, optional):
+                reduction factor of the number of records and growth factor of the duration
+                between two rounds.
+                Defaults to 3.
+            max_duration_seconds (Optional[int], optional):
+                if given, duration of the runs above which no further round is started.
+                Defaults to None.
+            nb_candidates (Optional[int], optional):
+                if given, number of records sampled at random from the space for the first round.
+                Otherwise, all the records of the space are candidates.
+                Defaults to None.
+            seed (int, optional):
+                seed of the sampling of the candidates.
+                Defaults to 0.
+
+        Raises:
+            ValueError: if eta is lower than 2 or the minimum duration is not positive.
+        """
+        super().__init__(variables=variables, metric=metric, maximize=maximize, seed=seed)
+        if eta < 2:
+            raise ValueError(f"Successive halving requires eta >= 2, got {eta}")
+        if min_duration_seconds <= 0:
+            raise ValueError(f"Invalid minimum duration: {min_duration_seconds}")
+
+        self._min_duration_seconds = min_duration_seconds
+        self._max_duration_seconds = max_duration_seconds
+        self._eta = eta
+
+        configs = list(self._all_configs())
+        if nb_candidates is not None and nb_candidates < len(configs):
+            configs = self._rng.sample(configs, nb_candidates)
+        self._candidates = configs
+
+    def max_nb_records(self) -> int:
+        total = 0
+        nb_configs = len(self._candidates)
+        duration = self._min_duration_seconds
+        while nb_configs >= 1:
+            total += nb_configs
+            if nb_configs == 1 or self._exceeds_max_duration(duration=duration * self._eta):
+                break
+            nb_configs = math.ceil(nb_configs / self._eta)
+            duration *= self._eta
+        return total
+
+    def benchmark_duration_seconds(self, default: Optional[int]) -> Optional[int]:
+        return self._min_duration_seconds * self._eta ** max(self._round, 0)
+
+    def _exceeds_max_duration(self, duration: int) -> bool:
+        return self._max_duration_seconds is not None and duration > self._max_duration_seconds
+
+    def _next_configs(self) -> List[SearchConfig]:
+        if 0 == self._round:
+            return list(self._candidates)
+
+        previous = self._candidates
+        if len(previous) <= 1:
+            return []
+        if self._exceeds_max_duration(duration=self.benchmark_duration_seconds(default=None)):
+            return []
+
+        nb_survivors = math.ceil(len(previous) / self._eta)
+        ranked = sorted(previous, key=lambda c: self._loss(self._round_scores.get(c, math.nan)))
+        self._candidates = ranked[:nb_survivors]
+        return list(self._candidates)
+
+
+class TreeParzenEstimator(SearchStrategy):
+    """
+    Sequential model-based optimization with a tree-structured Parzen estimator (TPE) over
+    discrete variables: after a few random records, the evaluated records are split into good and
+    bad ones, and the next record is the candidate that maximizes the ratio of the likelihoods of
+    its values among the good and the bad records.
+    """
+
+    def __init__(
+        self,
+        variables: Dict[str, Iterable[Any]],
+        metric: str,
+        maximize: bool = True,
+        nb_trials: int = 50,
+        nb_startup_trials: int = 10,
+        gamma: float = 0.25,
+        nb_candidates: int = 24,
+        seed: int = 0,
+    ) -> None:
+        """
+        Create a TPE search.
+
+        Args:
+            variables (Dict[str, Iterable[Any]]):
+                values of each variable, the search space being their cartesian product.
+            metric (str):
+                name of the result column to optimize.
+            maximize (bool, optional):
+                whether the metric is maximized or minimized.
+                Defaults to True.
+            nb_trials (int, optional):
+                number of records to evaluate (bounded by the size of the space).
+                Defaults to 50.
+            nb_startup_trials (int, optional):
+                number of records evaluated at random before the estimator is used.
+                Defaults to 10.
+            gamma (float, optional):
+                fraction of the evaluated records considered as good.
+                Defaults to 0.25.
+            nb_candidates (int, optional):
+                number of candidates sampled from the good distribution at each trial.
+                Defaults to 24.
+            seed (int, optional):
+                seed of the random choices.
+                Defaults to 0.
+        """
+        super().__init__(variables=variables, metric=metric, maximize=maximize, seed=seed)
+        self._nb_trials = min(nb_trials, self.space_size())
+        self._nb_startup_trials = nb_startup_trials
+        self._gamma = gamma
+        self._nb_candidates = nb_candidates
+        self._evaluated: Dict[SearchConfig, float] = {}
+
+    def max_nb_records(self) -> int:
+        return self._nb_trials
+
+    def _score(self, config: SearchConfig, value: float) -> None:
+        super()._score(config=config, value=value)
+        self._evaluated[config] = value
+
+    def _next_configs(self) -> List[SearchConfig]:
+        if len(self._evaluated) >= self._nb_trials:
+            return []
+
+        if len(self._evaluated) < self._nb_startup_trials:
+            candidates = [self._random_config() for _ in range(self._nb_candidates)]
+            config = next((c for c in candidates if c not in self._evaluated), None)
+        else:
+            config = self._suggest()
+
+        if config is None:
+            # fall back on the first record not evaluated yet
+            config = next(c for c in self._all_configs() if c not in self._evaluated)
+        return [config]
+
+    def _suggest(self) -> Optional[SearchConfig]:
+        ranked = sorted(self._evaluated, key=lambda c: self._loss(self._evaluated[c]))
+        nb_good = max(1, math.ceil(self._gamma * len(ranked)))
+        good, bad = ranked[:nb_good], ranked[nb_good:]
+
+        sizes = [len(values) for values in self._dimensions.values()]
+        good_weights = [self._parzen(configs=good, dim=d, size=s) for d, s in enumerate(sizes)]
+        bad_weights = [self._parzen(configs=bad, dim=d, size=s) for d, s in enumerate(sizes)]
+
+        best_config = None
+        best_ratio = -math.inf
+        for _ in range(self._nb_candidates):
+            config = tuple(
+                self._rng.choices(range(size), weights=weights)[0]
+                for size, weights in zip(sizes, good_weights)
+            )
+            if config in self._evaluated:
+                continue
+            ratio = sum(
+                math.log(good_weights[d][index]) - math.log(bad_weights[d][index])
+                for d, index in enumerate(config)
+            )
+            if ratio > best_ratio:
+                best_config, best_ratio = config, ratio
+        return best_config
+
+    @staticmethod
+    def _parzen(configs: List[SearchConfig], dim: int, size: int) -> List[float]:
+        # categorical distribution of the values of a dimension, with a uniform prior
+        counts = [1.0] * size
+        for config in configs:
+            counts[config[dim]] += 1.0
+        total = sum(counts)
+        return [count / total for count in counts]
@@ -4,10 +4,12 @@
 Interactions with a shell.
 """
 
+import dataclasses
 import subprocess
 import sys
 from typing import Iterable, Optional
 
+from benchkit.shell.streaming import LineCallback, StreamedOutput, stream_process
 from benchkit.shell.utils import get_args, print_header
 from benchkit.utils.types import Command, Environment, PathType
 
@@ -81,6 +83,7 @@ def shell_out(
     output_is_log: bool = False,
     ignore_ret_codes: Iterable[int] = (),
     ignore_any_error_code: bool = False,
+    output_callback: Optional[LineCallback] = None,
 ) -> str:
     """
     Run a shell command on the host system.
@@ -126,7 +129,9 @@ def shell_out(
             Defaults to None.
         output_is_log (bool, optional):
             whether the output of this command is logging and should be outputted as such, line by
-            line (e.g. cmake or make command).
+            line (e.g. cmake or make command). The standard output and error are then streamed
+            concurrently (see `benchkit.shell.streaming`), and only the standard output is
+            returned.
             Defaults to False.
         ignore_ret_codes (Iterable[int], optional):
             collection of error return codes to ignore if they are triggered.
@@ -135,11 +140,17 @@ def shell_out(
             Defaults to ().
         ignore_any_error_code (bool, optional):
             whether to error any error code returned by the command.
+        output_callback (Optional[LineCallback], optional):
+            if not None, function called with each line of the standard output while the command
+            runs. The output is then only given to the callback, and not returned.
+            Defaults to None.
 
     Raises:
         subprocess.CalledProcessError:
             if the command exited with a non-zero exit code that is not ignored in
             `ignore_ret_codes`.
+        subprocess.TimeoutExpired:
+            if the command did not complete before the timeout.
 
     Returns:
         str: the output of the shell command that completed successfully.
@@ -158,50 +169,43 @@ def shell_out(
         remote_host=None,
     )
 
-    if output_is_log:
-
-        def flush_outlines():
-            raw_outline = process.stdout.readline()
-            while raw_outline:
-                outline = raw_outline.decode()
-                print(outline, end="")
-                outlines.append(outline)
-                raw_outline = process.stdout.readline()
-
-        outlines = []
-        with (
-            subprocess.Popen(
-                arguments,
-                shell=shell,
-                cwd=current_dir,
-                env=environment,
-                stdout=subprocess.PIPE,
-            )
-            if std_input is None
-            else subprocess.Popen(
-                arguments,
-                shell=shell,
-                cwd=current_dir,
-                env=environment,
-                stdout=subprocess.PIPE,
-                stdin=std_input,
-                text=True,
-            )
-        ) as process:
-            retcode = process.poll()
-            while retcode is None:
-                flush_outlines()
-                retcode = process.poll()
-            flush_outlines()
-        output = "".join(outlines)
+    if output_is_log or output_callback is not None:
+
+        def stdout_callback(line: str) -> None:
+            if output_is_log:
+                print(line, end="")
+            if output_callback is not None:
+                output_callback(line)
+
+        process = subprocess.Popen(
+            arguments,
+            shell=shell,
+            cwd=current_dir,
+            env=environment,
+            stdin=None if std_input is None else subprocess.PIPE,
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE if output_is_log else None,
+        )
+        streamed = stream_process(
+            process=process,
+            std_input=std_input,
+            timeout=timeout,
+            stdout_callback=stdout_callback,
+            stderr_callback=lambda line: print(line, end="", file=sys.stderr),
+            keep_output=output_callback is None,
+        )
+        output = streamed.stdout
 
         sys.stdout.flush()
         sys.stderr.flush()
 
-        if retcode:
+        retcode = streamed.returncode
+        if retcode and not ignore_any_error_code and retcode not in ignore_ret_codes:
             raise subprocess.CalledProcessError(
                 retcode,
                 process.args,
+                output=output,
+                stderr=streamed.stderr,
             )
     else:
         try:
@@ -244,6 +248,138 @@ def shell_out(
     return output
 
 
+def shell_capture(
+    command: Command,
+    std_input: Optional[str] = None,
+    current_dir: Optional[PathType] = None,
+    environment: Environment = None,
+    print_input: bool = True,
+    print_output: bool = True,
+    print_env: bool = True,
+    print_curdir: bool = True,
+    print_shell_cmd: bool = False,
+    print_file_shell_cmd: bool = True,
+    timeout: Optional[int] = None,
+    output_is_log: bool = False,
+    output_callback: Optional[LineCallback] = None,
+    keep_output: bool = True,
+    collect_rusage: bool = True,
+) -> StreamedOutput:
+    """
+    Run a shell command on the host system and capture its standard output and error separately,
+    its return code and the resources it used.
+    Unlike `shell_out`, a non-zero return code does not raise an error.
+
+    Args:
+        command (Command):
+            the command to run.
+        std_input (Optional[str], optional):
+            input to feed to the command.
+            Defaults to None.
+        current_dir (Optional[PathType], optional):
+            directory where to run the command. If None, the current directory is used.
+            Defaults to None.
+        environment (Environment, optional):
+            environment variables to pass to the command.
+            Defaults to None.
+        print_input (bool, optional):
+            whether to print the command.
+            Defaults to True.
+        print_output (bool, optional):
+            whether to print the output after the command completes.
+            Defaults to True.
+        print_env (bool, optional):
+            whether to print the environment variables when they are defined.
+            Defaults to True.
+        print_curdir (bool, optional):
+            whether to print the current directory if provided.
+            Defaults to True.
+        print_shell_cmd (bool, optional):
+            whether to print the complete shell command, ready to be copy-pasted in a terminal.
+            Defaults to False.
+        print_file_shell_cmd (bool, optional):
+            whether to print the shell command in a log file
+            (`/tmp/benchkit-[USERNAME]/benchkit.sh`).
+            Defaults to True.
+        timeout (Optional[int], optional):
+            if not None, the command is killed if it did not complete after `timeout` seconds.
+            Defaults to None.
+        output_is_log (bool, optional):
+            whether to print the output lines while the command runs.
+            Defaults to False.
+        output_callback (Optional[LineCallback], optional):
+            if not None, function called with each line of the standard output while the command
+            runs.
+            Defaults to None.
+        keep_output (bool, optional):
+            whether to keep the standard output to return it.
+            Defaults to True.
+        collect_rusage (bool, optional):
+            whether to collect the resources used by the command (see `stream_process`).
+            Defaults to True.
+
+    Raises:
+        subprocess.TimeoutExpired:
+            if the command did not complete before the timeout.
+
+    Returns:
+        StreamedOutput: the return code, the standard output and error and the resource usage of
+                        the command.
+    """
+    arguments = get_args(command)
+    print_header(
+        arguments=arguments,
+        current_dir=current_dir,
+        environment=environment,
+        print_input=print_input,
+        print_env=print_env,
+        print_curdir=print_curdir,
+        print_shell_cmd=print_shell_cmd,
+        print_file_shell_cmd=print_file_shell_cmd,
+        asynced=False,
+        remote_host=None,
+    )
+
+    def stdout_callback(line: str) -> None:
+        if output_is_log:
+            print(line, end="")
+        if output_callback is not None:
+            output_callback(line)
+
+    process = subprocess.Popen(
+        arguments,
+        cwd=current_dir,
+        env=environment,
+        stdin=None if std_input is None else subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+    # without keeping the output, the standard error is still kept from its lines
+    stderr_lines = []
+    captured = stream_process(
+        process=process,
+        std_input=std_input,
+        timeout=timeout,
+        stdout_callback=stdout_callback,
+        stderr_callback=None if keep_output else stderr_lines.append,
+        keep_output=keep_output,
+        collect_rusage=collect_rusage,
+    )
+    if not keep_output:
+        captured = dataclasses.replace(captured, stderr="".join(stderr_lines))
+    sys.stdout.flush()
+
+    if print_output and not output_is_log:
+        if "" != captured.stdout.strip():
+            print("[OUT]")
+            print(captured.stdout.strip())
+        if "" != captured.stderr.strip():
+            print("[ERR]")
+            print(captured.stderr.strip())
+
+    return captured
+
+
 def shell_interactive(
     command: Command,
     current_dir: Optional[PathType] = None,
@@ -2,13 +2,19 @@
 # SPDX-License-Identifier: MIT
 """
 Interactions with asynchronous shells.
+
+The handles of asynchronous processes can be awaited in an asyncio event loop: their completion is
+notified by a pidfd of the process (or a thread waiting for it when pidfds are not available), so
+that several coroutines (e.g. command attachments) can follow the same process from one event loop
+instead of polling it each in their own loop.
 """
 
+import asyncio
 import os
 import signal
 import subprocess
 import sys
-from typing import Iterable, Optional
+from typing import AsyncIterator, Awaitable, Iterable, Optional
 
 from benchkit.platforms import Platform, get_current_platform
 from benchkit.shell.utils import get_args, print_header
@@ -93,6 +99,105 @@ class AsyncProcess:
         else:
             self._platform.comm.signal(pid=pid, signal_code=signal_code)
 
+    def __await__(self):
+        return self.wait_async().__await__()
+
+    async def _wait_exit(self) -> int:
+        returncode = self._process.poll()
+        if returncode is not None:
+            return returncode
+
+        loop = asyncio.get_running_loop()
+        try:
+            pidfd = os.pidfd_open(self._process.pid)
+        except ProcessLookupError:
+            return self._process.wait()
+        except (AttributeError, OSError):
+            # no pidfd support (non-Linux or kernel < 5.3), a thread waits for the process
+            return await loop.run_in_executor(None, self._process.wait)
+
+        exited = loop.create_future()
+        loop.add_reader(pidfd, lambda: exited.done() or exited.set_result(None))
+        try:
+            await exited
+        finally:
+            loop.remove_reader(pidfd)
+            os.close(pidfd)
+        return self._process.wait()
+
+    async def wait_async(self, timeout: Optional[float] = None) -> None:
+        """
+        Wait for the process to complete without blocking the event loop, possibly with timeout.
+        If the waiting task is cancelled, the process and all the processes of its group are
+        killed.
+
+        Args:
+            timeout (Optional[float], optional):
+                if not None, number of seconds to wait before timing out.
+                Defaults to None.
+
+        Raises:
+            subprocess.TimeoutExpired: if the process did not complete before the timeout (it is
+                                       not killed then).
+            AsyncProcess.AsyncProcessError: if the process ended with a non-zero exit code.
+        """
+        try:
+            await asyncio.wait_for(self._wait_exit(), timeout=timeout)
+        except asyncio.TimeoutError as err:
+            raise subprocess.TimeoutExpired(cmd=self.command, timeout=timeout) from err
+        except asyncio.CancelledError:
+            if self._process.poll() is None:
+                self.kill()
+            raise
+        self.wait()
+
+    async def wait_finished(self, timeout: float) -> bool:
+        """
+        Wait at most the given time for the process to complete, without blocking the event loop.
+
+        Args:
+            timeout (float): number of seconds to wait.
+
+        Returns:
+            bool: whether the process has finished its execution.
+        """
+        try:
+            await asyncio.wait_for(self._wait_exit(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return False
+        return True
+
+    async def stdout_lines(self, poll_seconds: float = 0.05) -> AsyncIterator[str]:
+        """
+        Iterate over the lines of the standard output of the process, as it writes them, until the
+        process completes.
+        The output file of the process is read again when the process completes or at the given
+        period, whichever comes first.
+
+        Args:
+            poll_seconds (float, optional):
+                period at which to read the output file while the process runs.
+                Defaults to 0.05.
+
+        Yields:
+            AsyncIterator[str]: the lines of the standard output, without their line terminator.
+        """
+        with open(self._stdout_path, "r") as stdout_file:
+            pending = ""
+            finished = False
+            while True:
+                chunk = stdout_file.read()
+                if chunk:
+                    *lines, pending = (pending + chunk).split("\n")
+                    for line in lines:
+                        yield line
+                elif finished:
+                    break
+                else:
+                    finished = await self.wait_finished(timeout=poll_seconds)
+            if pending:
+                yield pending
+
     def premature_exitcode(self) -> int | None:
         """
         Returns the return code of the process if the process exited prematurely
@@ -199,8 +304,12 @@ class AsyncProcess:
         # Kill asynchronous process and all processes on the same group id
         # As we create a new group id for each background process, this will kill its children
 
-        # If using a remote call, kill the remote process
-        if self._platform.comm.remote_host is not None:
+        # If using a remote call, kill the remote process: exactly with the remote agent, otherwise
+        # found through the connection of its SSH process
+        comm = self._platform.comm
+        if comm.remote_host is not None and not comm.kill_remote_process(
+            process_handle=self._process
+        ):
             remote_pid = self.find_matching_ssh(self._process.pid)
             self.kill_remote_process_hierarchy(remote_pid)
 
@@ -324,6 +433,24 @@ def shell_async(
     return process
 
 
+def run_concurrently(awaitables: Iterable[Awaitable]) -> None:
+    """
+    Run the given awaitables (e.g. coroutines of command attachments) concurrently in one event
+    loop, until all of them complete.
+
+    Args:
+        awaitables (Iterable[Awaitable]): the awaitables to run.
+    """
+    awaitables = list(awaitables)
+    if not awaitables:
+        return
+
+    async def gather() -> None:
+        await asyncio.gather(*awaitables)
+
+    asyncio.run(gather())
+
+
 def _flush() -> None:
     sys.stdout.flush()
     sys.stderr.flush()
@@ -0,0 +1,328 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Event-driven streaming of the output of a process.
+
+The standard output and the standard error of the process are read concurrently with a selector,
+as soon as data is available and without busy waiting. Complete lines are given to callbacks while
+the process runs, and the output is kept in a buffer that stays in memory up to a threshold and
+spills to a temporary file beyond it.
+The process can be reaped with `os.wait4` to also get the resources it used.
+"""
+
+import codecs
+import os
+import resource
+import select
+import selectors
+import subprocess
+import tempfile
+import time
+from dataclasses import dataclass
+from typing import IO, Callable, Dict, List, Optional, Tuple
+
+from benchkit.utils.types import PathType
+
+LineCallback = Callable[[str], None]
+
+DEFAULT_SPILL_THRESHOLD = 64 * 1024 * 1024
+_READ_SIZE = 64 * 1024
+# longer partial lines are given to the callbacks without waiting for their end
+_MAX_LINE_LENGTH = 1024 * 1024
+
+
+class SpillBuffer:
+    """
+    Text buffer kept in memory up to a threshold (in characters), then spilled to a temporary file.
+    """
+
+    def __init__(
+        self,
+        spill_threshold: Optional[int] = DEFAULT_SPILL_THRESHOLD,
+        spill_dir: Optional[PathType] = None,
+    ) -> None:
+        """
+        Args:
+            spill_threshold (Optional[int], optional):
+                size of the content kept in memory before spilling to a file. If None, the content
+                is always kept in memory.
+                Defaults to DEFAULT_SPILL_THRESHOLD.
+            spill_dir (Optional[PathType], optional):
+                directory of the temporary file. If None, the default temporary directory is used.
+                Defaults to None.
+        """
+        self._spill_threshold = spill_threshold
+        self._spill_dir = spill_dir
+        self._chunks: List[str] = []
+        self._size = 0
+        self._file: Optional[IO[str]] = None
+
+    @property
+    def spilled(self) -> bool:
+        """
+        Whether the content was spilled to a file.
+
+        Returns:
+            bool: whether the content was spilled to a file.
+        """
+        return self._file is not None
+
+    def write(self, text: str) -> None:
+        """
+        Append text to the buffer.
+
+        Args:
+            text (str): the text to append.
+        """
+        if self._file is not None:
+            self._file.write(text)
+            return
+
+        self._chunks.append(text)
+        self._size += len(text)
+        if self._spill_threshold is not None and self._size > self._spill_threshold:
+            self._file = tempfile.TemporaryFile(
+                mode="w+",
+                encoding="utf-8",
+                prefix="benchkit-output-",
+                dir=self._spill_dir,
+            )
+            self._file.writelines(self._chunks)
+            self._chunks = []
+
+    def getvalue(self) -> str:
+        """
+        Get the whole content of the buffer.
+
+        Returns:
+            str: the content of the buffer.
+        """
+        if self._file is None:
+            return "".join(self._chunks)
+        self._file.flush()
+        self._file.seek(0)
+        content = self._file.read()
+        self._file.seek(0, os.SEEK_END)
+        return content
+
+    def close(self) -> None:
+        """
+        Release the content of the buffer, removing its temporary file if any.
+        """
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._chunks = []
+        self._size = 0
+
+
+@dataclass(frozen=True)
+class StreamedOutput:
+    """
+    Result of a process whose output was streamed.
+    """
+
+    returncode: int
+    stdout: str
+    stderr: str
+    rusage: Optional[resource.struct_rusage] = None
+
+
+class _LineReader:
+    def __init__(
+        self,
+        callback: Optional[LineCallback],
+        buffer: Optional[SpillBuffer],
+    ) -> None:
+        self._decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+        self._callback = callback
+        self._buffer = buffer
+        self._partial = ""
+
+    def feed(
+        self,
+        data: bytes,
+        final: bool = False,
+    ) -> None:
+        text = self._decoder.decode(data, final=final)
+        if self._buffer is not None:
+            self._buffer.write(text)
+        if self._callback is None:
+            return
+
+        *lines, self._partial = (self._partial + text).split("\n")
+        for line in lines:
+            self._callback(f"{line}\n")
+        if self._partial and (final or len(self._partial) > _MAX_LINE_LENGTH):
+            self._callback(self._partial)
+            self._partial = ""
+
+
+def _kill(process: subprocess.Popen) -> None:
+    process.kill()
+    process.wait()
+
+
+def _wait_rusage(
+    process: subprocess.Popen,
+    timeout: Optional[float],
+) -> Tuple[int, Optional[resource.struct_rusage]]:
+    if timeout is not None:
+        try:
+            pidfd = os.pidfd_open(process.pid)
+        except (AttributeError, OSError):
+            return process.wait(timeout=timeout), None
+        try:
+            readable, _, _ = select.select([pidfd], [], [], timeout)
+        finally:
+            os.close(pidfd)
+        if not readable:
+            raise subprocess.TimeoutExpired(cmd=process.args, timeout=timeout)
+
+    try:
+        _, status, rusage = os.wait4(process.pid, 0)
+    except ChildProcessError:
+        # already reaped by the subprocess module
+        return process.wait(), None
+    process.returncode = os.waitstatus_to_exitcode(status)
+    return process.returncode, rusage
+
+
+def stream_process(
+    process: subprocess.Popen,
+    std_input: Optional[str] = None,
+    timeout: Optional[float] = None,
+    stdout_callback: Optional[LineCallback] = None,
+    stderr_callback: Optional[LineCallback] = None,
+    keep_output: bool = True,
+    spill_threshold: Optional[int] = DEFAULT_SPILL_THRESHOLD,
+    collect_rusage: bool = False,
+) -> StreamedOutput:
+    """
+    Stream the output of a process until it terminates.
+    The pipes of the process must be opened in binary mode (`stdout=subprocess.PIPE`,
+    `stderr=subprocess.PIPE` and `stdin=subprocess.PIPE` to give `std_input`); the standard output
+    and error not redirected to a pipe are not streamed.
+
+    Args:
+        process (subprocess.Popen):
+            the process to stream.
+        std_input (Optional[str], optional):
+            input to feed to the process.
+            Defaults to None.
+        timeout (Optional[float], optional):
+            if not None, the process is killed if it did not terminate after `timeout` seconds.
+            Defaults to None.
+        stdout_callback (Optional[LineCallback], optional):
+            function called with each line of the standard output (with its end of line), as soon
+            as it is complete.
+            Defaults to None.
+        stderr_callback (Optional[LineCallback], optional):
+            function called with each line of the standard error.
+            Defaults to None.
+        keep_output (bool, optional):
+            whether to keep the output to return it. If False, the output is only given to the
+            callbacks and the memory used does not depend on the size of the output.
+            Defaults to True.
+        spill_threshold (Optional[int], optional):
+            size of the output of each stream kept in memory while the process runs, the rest is
+            spilled to a temporary file. If None, the output is always kept in memory.
+            Defaults to DEFAULT_SPILL_THRESHOLD.
+        collect_rusage (bool, optional):
+            whether to reap the process with `os.wait4` to return the resources it used (CPU times,
+            maximum resident set size, context switches, page faults, block I/O). The resources
+            are not collected if the process cannot be waited with a timeout without polling (no
+            pidfd support).
+            Defaults to False.
+
+    Raises:
+        subprocess.TimeoutExpired:
+            if the process did not terminate before the timeout, after killing it.
+
+    Returns:
+        StreamedOutput: the return code, the output and, if collected, the resource usage of the
+                        process.
+    """
+    buffers: Dict[int, SpillBuffer] = {}
+    readers: Dict[int, _LineReader] = {}
+    deadline = None if timeout is None else time.monotonic() + timeout
+    input_data = b"" if std_input is None else std_input.encode()
+    input_offset = 0
+
+    def collect(fd: Optional[int]) -> str:
+        return buffers[fd].getvalue() if fd in buffers else ""
+
+    pipes = [(process.stdout, stdout_callback), (process.stderr, stderr_callback)]
+    stdout_fd, stderr_fd = (None if pipe is None else pipe.fileno() for pipe, _ in pipes)
+    try:
+        with selectors.DefaultSelector() as selector:
+            for pipe, callback in pipes:
+                if pipe is None:
+                    continue
+                buffer = SpillBuffer(spill_threshold=spill_threshold) if keep_output else None
+                if buffer is not None:
+                    buffers[pipe.fileno()] = buffer
+                readers[pipe.fileno()] = _LineReader(callback=callback, buffer=buffer)
+                selector.register(pipe, selectors.EVENT_READ)
+            if process.stdin is not None:
+                if input_data:
+                    selector.register(process.stdin, selectors.EVENT_WRITE)
+                else:
+                    process.stdin.close()
+
+            while selector.get_map():
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    _kill(process)
+                    raise subprocess.TimeoutExpired(
+                        cmd=process.args,
+                        timeout=timeout,
+                        output=collect(stdout_fd),
+                        stderr=collect(stderr_fd),
+                    )
+
+                for key, _ in selector.select(timeout=remaining):
+                    if key.fileobj is process.stdin:
+                        chunk = input_data[input_offset : input_offset + select.PIPE_BUF]
+                        try:
+                            input_offset += os.write(key.fd, chunk)
+                        except BrokenPipeError:
+                            input_offset = len(input_data)
+                        if input_offset >= len(input_data):
+                            selector.unregister(key.fileobj)
+                            process.stdin.close()
+                        continue
+
+                    data = os.read(key.fd, _READ_SIZE)
+                    if data:
+                        readers[key.fd].feed(data=data)
+                    else:
+                        readers[key.fd].feed(data=b"", final=True)
+                        selector.unregister(key.fileobj)
+                        key.fileobj.close()
+
+        remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+        try:
+            if collect_rusage:
+                returncode, rusage = _wait_rusage(process=process, timeout=remaining)
+            else:
+                returncode, rusage = process.wait(timeout=remaining), None
+        except subprocess.TimeoutExpired as err:
+            _kill(process)
+            err.output = collect(stdout_fd)
+            err.stderr = collect(stderr_fd)
+            raise
+
+        return StreamedOutput(
+            returncode=returncode,
+            stdout=collect(stdout_fd),
+            stderr=collect(stderr_fd),
+            rusage=rusage,
+        )
+    except BaseException:
+        if process.poll() is None:
+            _kill(process)
+        raise
+    finally:
+        for buffer in buffers.values():
+            buffer.close()
@@ -0,0 +1,240 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Content-addressed cache of build artifacts, shared by campaigns.
+
+A build is identified by a key computed from everything that determines its output (benchmark
+class, build variables, source revision, compiler, environment, ...). The artifacts of a build are
+copied into a local store under this key after the build, and copied back instead of rebuilding
+when the same key is requested again. The least recently used entries are evicted when the store
+exceeds its maximum size.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import time
+from typing import Any, Dict, List, Sequence
+
+from benchkit.utils.types import PathType
+
+DEFAULT_MAX_SIZE_BYTES = 10 * 1024**3
+
+# environment variables that usually change the output of a build:
+BUILD_ENV_VARS = ("CC", "CXX", "CFLAGS", "CXXFLAGS", "CPPFLAGS", "LDFLAGS", "PATH")
+
+_META_FILENAME = "meta.json"
+_ARTIFACTS_DIRNAME = "artifacts"
+
+
+def _path_size(path: pathlib.Path) -> int:
+    if path.is_symlink() or not path.is_dir():
+        return path.lstat().st_size
+    return sum(
+        (pathlib.Path(dirpath) / filename).lstat().st_size
+        for dirpath, _, filenames in os.walk(path)
+        for filename in filenames
+    )
+
+
+def _remove_path(path: pathlib.Path) -> None:
+    if path.is_dir() and not path.is_symlink():
+        shutil.rmtree(path)
+    elif path.exists() or path.is_symlink():
+        path.unlink()
+
+
+def _copy_path(source: pathlib.Path, destination: pathlib.Path) -> None:
+    if source.is_dir() and not source.is_symlink():
+        shutil.copytree(source, destination, symlinks=True)
+    else:
+        shutil.copy2(source, destination, follow_symlinks=False)
+
+
+class BuildCache:
+    """
+    Local store of build artifacts indexed by the key of the build, with LRU eviction by size.
+    """
+
+    def __init__(
+        self,
+        cache_dir: PathType,
+        max_size_bytes: int = DEFAULT_MAX_SIZE_BYTES,
+    ) -> None:
+        """
+        Create a build cache.
+
+        Args:
+            cache_dir (PathType):
+                directory of the store, created if it does not exist.
+            max_size_bytes (int, optional):
+                maximum total size of the stored artifacts, in bytes.
+                Defaults to DEFAULT_MAX_SIZE_BYTES (10 GiB).
+        """
+        self._cache_dir = pathlib.Path(cache_dir)
+        self._max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def cache_dir(self) -> pathlib.Path:
+        """
+        Get the directory of the store.
+
+        Returns:
+            pathlib.Path: the directory of the store.
+        """
+        return self._cache_dir
+
+    @staticmethod
+    def compute_key(identity: Dict[str, Any]) -> str:
+        """
+        Compute the key of a build from its identity.
+
+        Args:
+            identity (Dict[str, Any]):
+                everything that determines the output of the build. Values are converted to
+                strings.
+
+        Returns:
+            str: the key of the build.
+        """
+        canonical = json.dumps(identity, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def restore(
+        self,
+        key: str,
+        artifacts: Sequence[PathType],
+    ) -> bool:
+        """
+        Restore the artifacts of the build with the given key, replacing the current content of
+        the artifact paths. Count a hit or a miss.
+
+        Args:
+            key (str): key of the build.
+            artifacts (Sequence[PathType]): paths of the artifacts of the build.
+
+        Returns:
+            bool: whether the artifacts were found in the store and restored.
+        """
+        entry_dir = self._cache_dir / key
+        if not self._is_complete(entry_dir=entry_dir, artifacts=artifacts):
+            self.misses += 1
+            return False
+
+        for index, artifact in enumerate(artifacts):
+            artifact_path = pathlib.Path(artifact)
+            _remove_path(artifact_path)
+            artifact_path.parent.mkdir(parents=True, exist_ok=True)
+            _copy_path(entry_dir / _ARTIFACTS_DIRNAME / str(index), artifact_path)
+
+        # the modification time of the metadata is the last use of the entry:
+        os.utime(entry_dir / _META_FILENAME)
+        self.hits += 1
+        return True
+
+    def store(
+        self,
+        key: str,
+        artifacts: Sequence[PathType],
+        identity: Dict[str, Any],
+    ) -> None:
+        """
+        Store the artifacts of the build with the given key, then evict the least recently used
+        entries if the store is too large.
+
+        Args:
+            key (str): key of the build.
+            artifacts (Sequence[PathType]): paths of the artifacts of the build.
+            identity (Dict[str, Any]): identity of the build the key was computed from.
+        """
+        artifact_paths = [pathlib.Path(a) for a in artifacts]
+        missing = [str(a) for a in artifact_paths if not a.exists() and not a.is_symlink()]
+        if missing:
+            print(f"[WARNING] Build artifacts not found, not cached: {', '.join(missing)}")
+            return
+
+        entry_dir = self._cache_dir / key
+        tmp_dir = self._cache_dir / f".{key}.tmp-{os.getpid()}"
+        _remove_path(tmp_dir)
+        (tmp_dir / _ARTIFACTS_DIRNAME).mkdir(parents=True)
+
+        for index, artifact_path in enumerate(artifact_paths):
+            _copy_path(artifact_path, tmp_dir / _ARTIFACTS_DIRNAME / str(index))
+
+        meta = {
+            "artifacts": [str(a) for a in artifact_paths],
+            "identity": identity,
+            "size_bytes": _path_size(tmp_dir / _ARTIFACTS_DIRNAME),
+            "created": time.time(),
+        }
+        with open(tmp_dir / _META_FILENAME, "w") as meta_file:
+            json.dump(meta, meta_file, default=str)
+
+        try:
+            os.rename(tmp_dir, entry_dir)
+        except OSError:
+            # another campaign may have stored the same build concurrently, keep the first one,
+            # but replace a stale or partial entry, moving it away first so that the entry is
+            # always either the old one or the new one:
+            if self._is_complete(entry_dir=entry_dir, artifacts=artifacts):
+                _remove_path(tmp_dir)
+            else:
+                stale_dir = self._cache_dir / f".{key}.stale-{os.getpid()}"
+                _remove_path(stale_dir)
+                try:
+                    os.rename(entry_dir, stale_dir)
+                    os.rename(tmp_dir, entry_dir)
+                except OSError:
+                    _remove_path(tmp_dir)
+                _remove_path(stale_dir)
+
+        self.evict()
+
+    def evict(self) -> List[str]:
+        """
+        Remove the least recently used entries until the store fits its maximum size.
+
+        Returns:
+            List[str]: the keys of the removed entries.
+        """
+        entries = []
+        for entry_dir in self._cache_dir.iterdir():
+            meta_path = entry_dir / _META_FILENAME
+            meta = self._read_meta(entry_dir=entry_dir)
+            if meta is None:
+                continue
+            entries.append((meta_path.stat().st_mtime, meta["size_bytes"], entry_dir))
+
+        total_size = sum(size for _, size, _ in entries)
+        evicted = []
+        for _, size, entry_dir in sorted(entries):
+            if total_size <= self._max_size_bytes:
+                break
+            _remove_path(entry_dir)
+            total_size -= size
+            evicted.append(entry_dir.name)
+        return evicted
+
+    @classmethod
+    def _is_complete(cls, entry_dir: pathlib.Path, artifacts: Sequence[PathType]) -> bool:
+        # the entry holds the given artifact paths, in the same order, and all their copies
+        meta = cls._read_meta(entry_dir=entry_dir)
+        if meta is None or meta.get("artifacts") != [str(pathlib.Path(a)) for a in artifacts]:
+            return False
+        return all(
+            (entry_dir / _ARTIFACTS_DIRNAME / str(index)).exists()
+            or (entry_dir / _ARTIFACTS_DIRNAME / str(index)).is_symlink()
+            for index in range(len(artifacts))
+        )
+
+    @staticmethod
+    def _read_meta(entry_dir: pathlib.Path) -> Dict[str, Any] | None:
+        try:
+            with open(entry_dir / _META_FILENAME, "r") as meta_file:
+                return json.load(meta_file)
+        except (OSError, ValueError):
+            return None
@@ -8,21 +8,34 @@ TODO move into helpers/linux.
 
 import json
 import re
-from typing import Optional, Tuple
+from typing import Dict, Optional, Tuple
 
 from benchkit.communication import CommunicationLayer
 
 
+def parse_lscpu_json(lscpu_output: str) -> Dict[str, str]:
+    """
+    Parse the output of "lscpu -J".
+
+    Args:
+        lscpu_output (str): the output of the command.
+
+    Returns:
+        Dict[str, str]: the value of each field of the output.
+    """
+    lscpu_json = json.loads(lscpu_output)
+    lscpu_dict = {e["field"]: e["data"] for e in lscpu_json["lscpu"]}
+
+    return lscpu_dict
+
+
 def _gen_lscpu_dict(comm_layer: CommunicationLayer):
     lscpu_output = comm_layer.shell(
         command="lscpu -J",
         print_input=False,
         print_output=False,
     )
-    lscpu_json = json.loads(lscpu_output)
-    lscpu_dict = {e["field"]: e["data"] for e in lscpu_json["lscpu"]}
-
-    return lscpu_dict
+    return parse_lscpu_json(lscpu_output=lscpu_output)
 
 
 class LsCpu:
@@ -33,8 +46,11 @@ class LsCpu:
     def __init__(
         self,
         comm_layer: CommunicationLayer,
+        info_dict: Optional[Dict[str, str]] = None,
     ):
-        self._info_dict = _gen_lscpu_dict(comm_layer=comm_layer)
+        if info_dict is None:
+            info_dict = _gen_lscpu_dict(comm_layer=comm_layer)
+        self._info_dict = info_dict
 
     def get(self, key: str) -> str:
         """
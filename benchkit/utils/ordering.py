@@ -0,0 +1,127 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Cost-aware ordering of the records of a campaign.
+Changing the value of some variables between two consecutive records has a cost (rebuilding the
+benchmark, restarting a server, rebooting into another kernel, etc.). Given the switch cost of each
+variable, the records are reordered to minimize the total cost of the transitions.
+"""
+
+from typing import Any, Dict, Iterable, List
+
+Record = Dict[str, Any]
+SwitchCosts = Dict[str, float]
+
+
+def transition_cost(
+    previous: Record,
+    record: Record,
+    switch_costs: SwitchCosts,
+) -> float:
+    """
+    Return the cost of running the given record right after the previous one.
+
+    Args:
+        previous (Record): record run before.
+        record (Record): record run next.
+        switch_costs (SwitchCosts): cost of changing the value of each variable.
+
+    Returns:
+        float: the sum of the switch costs of the variables whose value changes.
+    """
+    return sum(
+        cost for name, cost in switch_costs.items() if previous.get(name) != record.get(name)
+    )
+
+
+def total_transition_cost(
+    records: Iterable[Record],
+    switch_costs: SwitchCosts,
+) -> float:
+    """
+    Return the total cost of the transitions when running the records in the given order.
+    The first record is free, as the state before the campaign is unknown.
+
+    Args:
+        records (Iterable[Record]): records, in running order.
+        switch_costs (SwitchCosts): cost of changing the value of each variable.
+
+    Returns:
+        float: the total cost of the transitions.
+    """
+    result = 0.0
+    previous = None
+    for record in records:
+        if previous is not None:
+            result += transition_cost(
+                previous=previous,
+                record=record,
+                switch_costs=switch_costs,
+            )
+        previous = record
+    return result
+
+
+def _group_by_value(records: List[Record], name: str) -> List[List[Record]]:
+    groups: Dict[Any, List[Record]] = {}
+    for record in records:
+        groups.setdefault(repr(record.get(name)), []).append(record)
+    return list(groups.values())
+
+
+def _order(
+    records: List[Record],
+    names: List[str],
+    previous: Record | None,
+) -> List[Record]:
+    if not names or len(records) < 2:
+        return records
+
+    name, inner_names = names[0], names[1:]
+    groups = _group_by_value(records=records, name=name)
+    if previous is not None:
+        # run the groups backward when the previous record has the value of the last one
+        previous_value = previous.get(name)
+        if groups[-1][0].get(name) == previous_value != groups[0][0].get(name):
+            groups.reverse()
+
+    result = []
+    for group in groups:
+        result.extend(
+            _order(
+                records=group,
+                names=inner_names,
+                previous=result[-1] if result else previous,
+            )
+        )
+    return result
+
+
+def order_records(
+    records: Iterable[Record],
+    switch_costs: SwitchCosts,
+) -> List[Record]:
+    """
+    Reorder the records to minimize the total cost of the transitions.
+
+    The records are grouped by the value of the most expensive variable, then recursively by the
+    next ones in decreasing cost order, so that the most expensive variables change as rarely as
+    possible. The groups of a variable are run backward when it keeps the value of the variable
+    unchanged from the previous record. On a cartesian product, this is the reflected (Gray code)
+    order in which consecutive records differ by a single variable, the cheapest one most of the
+    time.
+    Variables without a switch cost keep their original relative order.
+
+    Args:
+        records (Iterable[Record]): records to order.
+        switch_costs (SwitchCosts): cost of changing the value of each variable.
+
+    Returns:
+        List[Record]: the reordered records.
+    """
+    names = sorted(
+        (name for name, cost in switch_costs.items() if cost > 0),
+        key=lambda name: switch_costs[name],
+        reverse=True,
+    )
+    return _order(records=list(records), names=names, previous=None)
@@ -0,0 +1,49 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""Unit tests for the cost-aware ordering of records."""
+
+import unittest
+
+from benchkit.utils.ordering import order_records, total_transition_cost
+from benchkit.utils.variables import cartesian_product
+
+
+class TestOrdering(unittest.TestCase):
+    """
+    Unit tests for the cost-aware ordering of records.
+    """
+
+    def test_transition_cost(self):
+        """Test the total cost of the transitions"""
+        records = [{"a": 1, "b": 1}, {"a": 1, "b": 2}, {"a": 2, "b": 1}, {"a": 2, "b": 1}]
+        self.assertEqual(0.0, total_transition_cost(records=[], switch_costs={"a": 10}))
+        self.assertEqual(
+            12.0, total_transition_cost(records=records, switch_costs={"a": 10, "b": 1})
+        )
+
+    def test_gray_code_order(self):
+        """Test that consecutive records of a cartesian product differ by a single variable"""
+        records = list(
+            cartesian_product({"b": [1, 2, 3], "a": [1, 2, 3], "c": [0, 1], "d": [7, 8]})
+        )
+        switch_costs = {"a": 10, "b": 1, "c": 0.5}
+
+        ordered = order_records(records=records, switch_costs=switch_costs)
+        self.assertCountEqual(records, ordered)
+        self.assertEqual(
+            2 * 10 + 3 * 2 * 1 + 3 * 3 * 0.5,
+            total_transition_cost(records=ordered, switch_costs=switch_costs),
+        )
+        self.assertEqual([1, 1, 1, 1, 1, 1], [r["a"] for r in ordered[:6]])
+        # the variables without cost keep their original order:
+        self.assertEqual([7, 8], [r["d"] for r in ordered[:2]])
+
+    def test_no_cost(self):
+        """Test that the order is kept without switch costs"""
+        records = list(cartesian_product({"a": [1, 2], "b": [1, 2]}))
+        self.assertEqual(records, order_records(records=records, switch_costs={}))
+        self.assertEqual(records, order_records(records=records, switch_costs={"a": 0}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -5,7 +5,7 @@
 import unittest
 from typing import Any, Iterable, List
 
-from benchkit.utils.variables import cartesian_product, list_groupby
+from benchkit.utils.variables import RecordSpace, cartesian_product, list_groupby
 from benchkit.utils.variables import list_groupby_from_multi_index_groupby as list_from_migb
 from benchkit.utils.variables import multi_index_groupby
 
@@ -153,6 +153,47 @@ class TestVariables(unittest.TestCase):
         }
         self.assertEqual(multi_index_groupby(["b", "c", "a"], cart), migb_bca)
 
+    def test_record_space(self):
+        """Test the lazy record space."""
+        d = {"a": [1, 2, 3], "b": [4], "c": [5, 6], "d": []}
+        space = RecordSpace(d)
+        self.assertEqual(list(space), list(cartesian_product(d)))
+        self.assertEqual(space.variable_names(), ["a", "b", "c"])
+        self.assertEqual(space.nb_combinations(), 6)
+        self.assertEqual(space.count(), 6)
+        self.assertEqual(space.count(predicate=lambda r: r["a"] > 1, variables_names=["a"]), 4)
+        self.assertEqual(space.total(value=lambda r: r["a"]), 12)
+        self.assertEqual(space.total(value=lambda r: r["a"], variables_names=["a"]), 12)
+
+        def filter_func(record):
+            return record["a"] != 2 or record["c"] != 5
+
+        space = RecordSpace(d, filter_func=filter_func)
+        records = list(filter(filter_func, cartesian_product(d)))
+        self.assertEqual(list(space), records)
+        self.assertEqual(space.nb_combinations(), 6)
+        self.assertEqual(space.count(), 5)
+        self.assertEqual(space.count(predicate=lambda r: r["a"] > 1, variables_names=["a"]), 3)
+        self.assertEqual(space.total(value=lambda r: r["a"], variables_names=["a"]), 10)
+        self.assertFalse(space.is_empty())
+        self.assertTrue(RecordSpace(d, filter_func=lambda _: False).is_empty())
+
+        space = RecordSpace({})
+        self.assertEqual(list(space), [{}])
+        self.assertEqual(space.nb_combinations(), 1)
+        self.assertEqual(space.count(), 1)
+        self.assertEqual(space.count(predicate=lambda r: True, variables_names=["a"]), 1)
+
+    def test_record_space_groupby(self):
+        """Test that grouping a record space is equivalent to grouping its records."""
+        d = {"a": [1, 2, 3], "b": [4, 7], "c": [5, 6]}
+        for filter_func in [None, lambda r: r["a"] != 2 or r["b"] != 4]:
+            space = RecordSpace(d, filter_func=filter_func)
+            records = list(space)
+            for names in [[], ["a"], ["c", "a"], ["b", "c"], ["e", "a"]]:
+                space_gb = [(group, list(sub)) for group, sub in list_groupby(names, space)]
+                self.assertEqual(space_gb, list(list_groupby(names, records)))
+
 
 if __name__ == "__main__":
     unittest.main()
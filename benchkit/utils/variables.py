@@ -3,10 +3,13 @@
 """
 Multi-index-group-by data structure to convert list of records with common (build or run) variables
 into a hierarchical structure.
+Lazy record space to iterate over (and group) the records of a cartesian product without
+materializing them.
 """
 
 import itertools
-from typing import Any, Dict, Iterable, Iterator, List, Tuple
+import math
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
 
 MultiIndexGroupby = Dict[str, Any] | List[Dict[str, Any]]
 ListGroupby = List[Tuple[Dict[str, Any], List[Dict[str, Any]]]]
@@ -33,6 +36,172 @@ def cartesian_product(variables: Dict[str, Iterable[Any]]) -> Iterator[Dict[str,
     return product_gen
 
 
+class RecordSpace:
+    """
+    Lazy space of records, defined as the cartesian product of the values of its variables
+    (dimensions), optionally filtered. Records are generated on the fly when the space is iterated,
+    so that the memory used does not depend on the size of the space.
+    """
+
+    def __init__(
+        self,
+        variables: Dict[str, Iterable[Any]],
+        filter_func: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    ) -> None:
+        """
+        Create a record space.
+
+        Args:
+            variables (Dict[str, Iterable[Any]]):
+                values of each variable. Variables without values are ignored, as in
+                `cartesian_product`.
+            filter_func (Optional[Callable[[Dict[str, Any]], bool]], optional):
+                if given, only the records for which this function returns True belong to the
+                space.
+                Defaults to None.
+        """
+        dimensions = {name: list(values) for name, values in variables.items()}
+        self._dimensions = {name: values for name, values in dimensions.items() if values}
+        self._filter_func = filter_func
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        records = cartesian_product(self._dimensions)
+        if self._filter_func is not None:
+            records = filter(self._filter_func, records)
+        return records
+
+    def __repr__(self) -> str:
+        return f"RecordSpace({self._dimensions})"
+
+    def variable_names(self) -> List[str]:
+        """
+        Return the names of the variables of the space.
+
+        Returns:
+            List[str]: the names of the variables of the space.
+        """
+        return list(self._dimensions)
+
+    def nb_combinations(self) -> int:
+        """
+        Return the number of combinations of the variable values, before filtering.
+
+        Returns:
+            int: the number of combinations of the variable values.
+        """
+        # the empty product has one (empty) record, as the cartesian product
+        return math.prod(len(values) for values in self._dimensions.values())
+
+    def is_empty(self) -> bool:
+        """
+        Return whether the space contains no record.
+
+        Returns:
+            bool: whether the space contains no record.
+        """
+        return next(iter(self), None) is None
+
+    def count(
+        self,
+        predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+        variables_names: Optional[Iterable[str]] = None,
+    ) -> int:
+        """
+        Count the records of the space that satisfy the given predicate.
+        When the space is not filtered and the predicate only depends on the given variables, only
+        the combinations of these variables are enumerated, and the count is multiplied by the
+        number of values of the other variables.
+
+        Args:
+            predicate (Optional[Callable[[Dict[str, Any]], bool]], optional):
+                predicate that the counted records satisfy. If None, all the records are counted.
+                Defaults to None.
+            variables_names (Optional[Iterable[str]], optional):
+                names of the only variables the predicate depends on. If None, the predicate can
+                depend on all the variables.
+                Defaults to None.
+
+        Returns:
+            int: the number of records that satisfy the predicate.
+        """
+        if self._filter_func is not None or variables_names is None:
+            if predicate is None:
+                if self._filter_func is None:
+                    return self.nb_combinations()
+                return sum(1 for _ in self)
+            return sum(1 for record in self if predicate(record))
+
+        names = set(variables_names)
+        projected = {n: v for n, v in self._dimensions.items() if n in names}
+        factor = math.prod(len(v) for n, v in self._dimensions.items() if n not in names)
+        if predicate is None:
+            return math.prod(len(v) for v in projected.values()) * factor
+        nb_valid = sum(1 for record in cartesian_product(projected) if predicate(record))
+        return nb_valid * factor
+
+    def total(
+        self,
+        value: Callable[[Dict[str, Any]], float],
+        variables_names: Optional[Iterable[str]] = None,
+    ) -> float:
+        """
+        Sum the given value over the records of the space.
+        When the space is not filtered and the value only depends on the given variables, only the
+        combinations of these variables are enumerated, each value being multiplied by the number
+        of values of the other variables, as in `count`.
+
+        Args:
+            value (Callable[[Dict[str, Any]], float]):
+                value of a record.
+            variables_names (Optional[Iterable[str]], optional):
+                names of the only variables the value depends on. If None, the value can depend on
+                all the variables.
+                Defaults to None.
+
+        Returns:
+            float: the sum of the values of the records.
+        """
+        if self._filter_func is not None or variables_names is None:
+            return sum(value(record) for record in self)
+
+        names = set(variables_names)
+        projected = {n: v for n, v in self._dimensions.items() if n in names}
+        factor = math.prod(len(v) for n, v in self._dimensions.items() if n not in names)
+        return sum(value(record) for record in cartesian_product(projected)) * factor
+
+    def groupby(
+        self,
+        variables_names: Iterable[str],
+    ) -> Iterator[Tuple[Dict[str, Any], "RecordSpace"]]:
+        """
+        Group the records of the space by the values of the given variables, in the same way as
+        `list_groupby`. The groups are obtained by enumerating the combinations of the grouping
+        variables first, each group being the sub-space where these variables are fixed, so no
+        record is materialized. Groups come in the order of the values of the grouping variables
+        and empty groups are skipped.
+
+        Args:
+            variables_names (Iterable[str]): names of the variables to group by.
+
+        Yields:
+            Iterator[Tuple[Dict[str, Any], RecordSpace]]:
+                the values of the grouping variables (None if the variable is not part of the
+                space) and the sub-space of the corresponding records.
+        """
+        vn = list(variables_names)
+        grouping = {n: self._dimensions[n] for n in vn if n in self._dimensions}
+
+        for group_values in itertools.product(*grouping.values()):
+            fixed = dict(zip(grouping.keys(), group_values))
+            sub_space = RecordSpace(
+                variables={n: [fixed[n]] if n in fixed else v for n, v in self._dimensions.items()},
+                filter_func=self._filter_func,
+            )
+            if sub_space.is_empty():
+                continue
+            yield {n: fixed.get(n) for n in vn}, sub_space
+
+
 def multi_index_groupby(
     variables_names: Iterable[str],
     bench_variables: Iterable[Dict[str, Any]],
@@ -114,6 +283,7 @@ def list_groupby(
 ) -> ListGroupby:
     """
     Return the list groupby from the benchmark variables.
+    When the benchmark variables are a record space, the groups are sub-spaces generated lazily.
 
     Args:
         variables_names (Iterable[str]): names of the variables.
@@ -123,5 +293,7 @@ def list_groupby(
         ListGroupby: the list groupby from the benchmark variables.
     """
     vn = list(variables_names)
+    if isinstance(bench_variables, RecordSpace):
+        return bench_variables.groupby(vn)
     migb = multi_index_groupby(vn, bench_variables)
     return list_groupby_from_multi_index_groupby(migb, vn)
@@ -12,6 +12,7 @@ import pandas as pd
 
 from benchkit.charts.analyses import cross_sect
 from benchkit.charts.dataframes import get_comments_parameters, get_dataframe
+from benchkit.results.threads import THREADS_CSV_SUFFIX
 from benchkit.utils.types import PathType
 
 # TODO COPIED FROM CNA REPL
@@ -33,7 +34,7 @@ def get_dataset(results_path: PathType) -> pd.DataFrame:
     csv_paths = [
         pathlib.Path(results_path) / pathlib.Path(f)
         for f in os.listdir(results_path)
-        if f.endswith(".csv")
+        if f.endswith(".csv") and not f.endswith(THREADS_CSV_SUFFIX)
     ]
     dataframes = []
 
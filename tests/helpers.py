@@ -0,0 +1,168 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Helpers shared by the unit tests of the campaign runners.
+"""
+
+import pathlib
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+from benchkit.benchmark import Benchmark, PostRunHook, RecordResult
+from benchkit.platforms import Platform
+from benchkit.results.streamparser import StreamParser
+from benchkit.utils.misc import CSV_SEPARATOR
+from benchkit.utils.types import PathType
+
+RunFunction = Callable[["FakeBench", Dict[str, Any]], str]
+ParseFunction = Callable[["FakeBench", str], RecordResult | List[RecordResult]]
+
+
+class FakeBench(Benchmark):
+    """
+    Benchmark whose run and parsing are given as functions, to test the campaign runners without
+    building or running a real benchmark. The values of the run variables of every run are
+    recorded in `runs`.
+    """
+
+    def __init__(
+        self,
+        run_var_names: Iterable[str] = ("name",),
+        build_var_names: Iterable[str] = (),
+        run_fun: Optional[RunFunction] = None,
+        parse_fun: Optional[ParseFunction] = None,
+        stream_parser_fun: Optional[Callable[[], StreamParser]] = None,
+        post_run_hooks: Iterable[PostRunHook] = (),
+        platform: Optional[Platform] = None,
+    ) -> None:
+        """
+        Create a fake benchmark.
+
+        Args:
+            run_var_names (Iterable[str], optional):
+                names of the run variables.
+                Defaults to ("name",).
+            build_var_names (Iterable[str], optional):
+                names of the build variables.
+                Defaults to ().
+            run_fun (Optional[RunFunction], optional):
+                function executing a run, given the benchmark and the run variables, and returning
+                the output of the run. If None, the output is the value of the first run variable.
+                Defaults to None.
+            parse_fun (Optional[ParseFunction], optional):
+                function parsing the output of a run into results, given the benchmark and the
+                output. If None, the output is recorded in the "out" column.
+                Defaults to None.
+            stream_parser_fun (Optional[Callable[[], StreamParser]], optional):
+                factory of the stream parser of the runs, if the output is parsed incrementally.
+                Defaults to None.
+            post_run_hooks (Iterable[PostRunHook], optional):
+                hooks called after each run.
+                Defaults to ().
+            platform (Optional[Platform], optional):
+                platform to run the benchmark on, the current platform if None.
+                Defaults to None.
+        """
+        super().__init__(
+            command_wrappers=[],
+            command_attachments=[],
+            shared_libs=[],
+            pre_run_hooks=[],
+            post_run_hooks=list(post_run_hooks),
+        )
+        if platform is not None:
+            self.platform = platform
+        self._run_var_names = list(run_var_names)
+        self._build_var_names = list(build_var_names)
+        self._run_fun = run_fun
+        self._parse_fun = parse_fun
+        self._stream_parser_fun = stream_parser_fun
+        self.runs: List[Any] = []
+
+    @property
+    def bench_src_path(self) -> pathlib.Path:
+        return pathlib.Path(".")
+
+    def get_build_var_names(self) -> List[str]:
+        return self._build_var_names
+
+    def get_run_var_names(self) -> List[str]:
+        return self._run_var_names
+
+    def build_bench(self, **_kwargs) -> None:
+        pass
+
+    def get_stream_parser(self, **kwargs) -> Optional[StreamParser]:
+        if self._stream_parser_fun is None:
+            return super().get_stream_parser(**kwargs)
+        return self._stream_parser_fun()
+
+    def single_run(self, **kwargs) -> str:
+        run_variables = {name: kwargs[name] for name in self._run_var_names}
+        self.runs.append(next(iter(run_variables.values()), None))
+        if self._run_fun is None:
+            return str(self.runs[-1])
+        return self._run_fun(self, run_variables)
+
+    def parse_output_to_results(self, command_output: str, **_kwargs):
+        if self._parse_fun is None:
+            return {"out": command_output}
+        return self._parse_fun(self, command_output)
+
+    def configure(
+        self,
+        csv_output_path: PathType,
+        variables: Iterable[Dict[str, Any]],
+        nb_runs: int = 1,
+        **kwargs,
+    ) -> "FakeBench":
+        """
+        Configure the benchmark with the defaults of the tests.
+
+        Args:
+            csv_output_path (PathType): path of the CSV output file.
+            variables (Iterable[Dict[str, Any]]): records of the campaign.
+            nb_runs (int, optional): number of runs of each record. Defaults to 1.
+            **kwargs: other arguments of `configure_variables()`.
+
+        Returns:
+            FakeBench: the benchmark itself.
+        """
+        arguments = {
+            "experiment_name": "test",
+            "benchmark_name": "fakebench",
+            "base_data_dir": None,
+            "benchmark_duration_seconds": None,
+            "constants": None,
+            "pretty_variables": None,
+            "debug": False,
+            "gdb": False,
+            "duration_history": [],
+        }
+        arguments.update(kwargs)
+        self.configure_variables(
+            csv_output_path=csv_output_path,
+            nb_runs=nb_runs,
+            variables=list(variables),
+            **arguments,
+        )
+        return self
+
+
+def read_csv_rows(csv_path: PathType) -> List[Dict[str, str]]:
+    """
+    Read the result rows of a CSV output file, skipping the comment lines.
+
+    Args:
+        csv_path (PathType): path of the CSV output file.
+
+    Returns:
+        List[Dict[str, str]]: the rows, indexed by the columns of the header.
+    """
+    lines = [
+        line.split(CSV_SEPARATOR)
+        for line in pathlib.Path(csv_path).read_text().splitlines()
+        if line and not line.startswith("#")
+    ]
+    if not lines:
+        return []
+    return [dict(zip(lines[0], line)) for line in lines[1:]]
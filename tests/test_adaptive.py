@@ -0,0 +1,106 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the adaptive number of repetitions.
+"""
+
+import math
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.results.adaptive import AdaptiveRuns, confidence_interval, t_quantile
+from benchkit.results.journal import JournalReplay, journal_path
+from tests.helpers import FakeBench
+
+
+def _parse_throughput(bench: FakeBench, output: str):
+    # "stable" converges after the minimum number of runs, "noisy" never converges
+    nb_runs = len(bench.runs)
+    if "stable" == output:
+        return {"throughput": 100.0 + 0.01 * nb_runs}
+    return {"throughput": 50.0 if nb_runs % 2 else 150.0}
+
+
+class TestAdaptiveRuns(unittest.TestCase):
+    """Unit tests for the confidence intervals and the stopping rule."""
+
+    def test_t_quantile(self):
+        """Test the quantiles of the Student's t-distribution against reference values."""
+        references = {1: 12.7062, 2: 4.3027, 5: 2.5706, 10: 2.2281, 30: 2.0423}
+        for df, expected in references.items():
+            self.assertAlmostEqual(expected, t_quantile(0.975, df), places=3)
+        self.assertAlmostEqual(-t_quantile(0.95, 4), t_quantile(0.05, 4))
+
+    def test_confidence_interval(self):
+        """Test the t-based and bootstrap confidence intervals."""
+        values = [1.0, 2.0, 3.0, 4.0, 5.0]
+        low, high = confidence_interval(values=values)
+        self.assertAlmostEqual(3.0 - 2.7764 * math.sqrt(2.5 / 5), low, places=3)
+        self.assertAlmostEqual(3.0 + 2.7764 * math.sqrt(2.5 / 5), high, places=3)
+
+        low, high = confidence_interval(values=values, method="bootstrap")
+        self.assertTrue(1.0 <= low < 3.0 < high <= 5.0)
+
+        with self.assertRaises(ValueError):
+            confidence_interval(values=[1.0])
+
+    def test_stopping_rule(self):
+        """Test when a record stops being repeated."""
+        adaptive_runs = AdaptiveRuns(metric="throughput", relative_ci_width=0.05, min_runs=3)
+
+        low, high, rel_width = adaptive_runs.evaluate(values=[100.0])
+        self.assertTrue(math.isnan(low) and math.isnan(high) and math.isnan(rel_width))
+
+        _, _, rel_width = adaptive_runs.evaluate(values=[100.0, 100.1])
+        self.assertFalse(adaptive_runs.is_converged(nb_runs_done=2, relative_width=rel_width))
+        _, _, rel_width = adaptive_runs.evaluate(values=[100.0, 100.1, 100.05])
+        self.assertTrue(adaptive_runs.is_converged(nb_runs_done=3, relative_width=rel_width))
+        _, _, rel_width = adaptive_runs.evaluate(values=[50.0, 150.0, 100.0])
+        self.assertFalse(adaptive_runs.is_converged(nb_runs_done=3, relative_width=rel_width))
+
+        with self.assertRaises(ValueError):
+            AdaptiveRuns(metric="throughput", min_runs=1)
+
+    def test_continue_campaign(self):
+        """Test that continuing a campaign reuses the values of the recorded runs."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = pathlib.Path(tmp_dir) / "results.csv"
+
+            def run(continuing: bool) -> FakeBench:
+                benchmark = FakeBench(parse_fun=_parse_throughput)
+                benchmark.configure(
+                    csv_output_path=csv_path,
+                    variables=[{"name": "stable"}, {"name": "noisy"}],
+                    nb_runs=6,
+                    adaptive_runs=AdaptiveRuns(metric="throughput", min_runs=3),
+                )
+                benchmark.run(other_campaigns_seconds=0, barrier=None, continuing=continuing)
+                return benchmark
+
+            benchmark = run(continuing=False)
+            self.assertEqual(3 * ["stable"] + 6 * ["noisy"], benchmark.runs)
+            self.assertEqual(9, benchmark.total_nb_runs())
+
+            # the converged record is not repeated again
+            benchmark = run(continuing=True)
+            self.assertEqual([], benchmark.runs)
+            self.assertEqual(9, benchmark.total_nb_runs())
+
+            # simulate a crash after the 4th run of the noisy record
+            journal = journal_path(csv_path=csv_path)
+            lines = journal.read_text().splitlines(keepends=True)
+            finished = [i for i, line in enumerate(lines) if '"finished"' in line]
+            journal.write_text("".join(lines[: finished[6] + 1]))
+
+            benchmark = run(continuing=True)
+            self.assertEqual(["noisy", "noisy"], benchmark.runs)
+            rows = JournalReplay.load(path=journal).rows
+            self.assertEqual(
+                [1, 2, 3, 4, 5, 6],
+                sorted(row["nb_reps"] for row in rows if "noisy" == row["name"]),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,180 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the remote agent of the communication layers.
+"""
+
+import os
+import pathlib
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+import unittest
+from typing import List
+
+from benchkit.communication import CommunicationLayer, SSHCommLayer
+from benchkit.communication.agent import AgentCallError, RemoteAgent, agent_argv
+from benchkit.communication.utils import remote_shell_command
+from benchkit.shell.shell import shell_out
+
+
+class AgentCommLayer(CommunicationLayer):
+    """Communication layer running its helper operations in a local agent."""
+
+    def __init__(self, argv: List[str]) -> None:
+        super().__init__()
+        self.argv = argv
+        self.nb_shells = 0
+
+    def shell(self, command, **kwargs) -> str:
+        self.nb_shells += 1
+        return shell_out(command=command, **kwargs)
+
+    def _agent_argv(self) -> List[str] | None:
+        return self.argv
+
+
+class LocalSSHCommLayer(SSHCommLayer):
+    """SSH communication layer whose "remote" commands and agent run on the local host."""
+
+    def __init__(self) -> None:
+        super().__init__(host="localhost", environment=None, multiplexing=False, agent=True)
+
+    @staticmethod
+    def _get_ssh_info(host: str):
+        return {}
+
+    @staticmethod
+    def _is_in_ssh_config(host: str) -> bool:
+        return True
+
+    def _remote_shell_command(self, remote_command, remote_current_dir=None, **_kwargs):
+        return ["sh", "-c", remote_shell_command(remote_command, remote_current_dir)]
+
+    def _agent_argv(self) -> List[str] | None:
+        return agent_argv(python=sys.executable)
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat", "r") as stat_file:
+            return stat_file.read().rsplit(")", 1)[1].split()[0] not in "ZX"
+    except OSError:
+        return False
+
+
+class TestRemoteAgent(unittest.TestCase):
+    """Unit tests for the remote agent."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = pathlib.Path(self.tmp_dir.name)
+        self.agent = RemoteAgent(argv=agent_argv(python=sys.executable))
+
+    def tearDown(self):
+        self.agent.close()
+        self.tmp_dir.cleanup()
+
+    def test_comm_layer(self):
+        """Test that the filesystem helpers of a communication layer use its agent, or fall back."""
+        comm = AgentCommLayer(argv=agent_argv(python=sys.executable))
+        new_dir = self.path / "a b" / "c"
+        comm.makedirs(path=new_dir, exist_ok=True)
+        self.assertTrue(comm.isdir(path=new_dir))
+        self.assertFalse(comm.isfile(path=new_dir))
+        (new_dir / "x.txt").write_text("x'$y")
+        self.assertEqual(
+            {str(new_dir / "x.txt"): "x'$y"}, comm.read_files(paths=[new_dir / "x.txt"])
+        )
+        self.assertEqual([new_dir / "x.txt"], comm.glob(pattern=new_dir / "*.txt"))
+        self.assertEqual(4, comm.stat_paths(paths=[new_dir / "x.txt"])[str(new_dir / "x.txt")].size)
+        self.assertIsNotNone(comm.which(cmd="sh"))
+        comm.remove(path=self.path / "a b", recursive=True)
+        self.assertFalse((self.path / "a b").exists())
+        self.assertEqual(0, comm.nb_shells)
+        comm.close_session()
+
+        comm = AgentCommLayer(argv=["false"])
+        self.assertIsNone(comm.remote_agent())
+        self.assertTrue(comm.isdir(path=self.path))
+        self.assertEqual(1, comm.nb_shells)
+
+    def test_remote_process(self):
+        """Test that the background commands of a remote host are sampled by the agent."""
+        comm = LocalSSHCommLayer()
+        script = (
+            "import threading, time; "
+            "[threading.Thread(target=time.sleep, args=(30,)).start() for _ in '123']; "
+            "time.sleep(30)"
+        )
+        process = comm.background_subprocess(
+            command=[sys.executable, "-c", script],
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+            cwd=self.path,
+            env=None,
+        )
+        try:
+            deadline = time.monotonic() + 10
+            nb_threads = 0
+            while nb_threads < 4 and time.monotonic() < deadline:
+                time.sleep(0.05)
+                try:
+                    nb_threads = comm.get_process_nb_threads(process_handle=process)
+                except NotImplementedError:
+                    pass
+            self.assertEqual(4, nb_threads)
+            self.assertIn(comm.get_process_status(process_handle=process), "RS")
+            self.assertEqual([], list(self.path.iterdir()))
+
+            self.assertTrue(comm.kill_remote_process(process_handle=process))
+            self.assertEqual(-signal.SIGTERM, process.wait(timeout=10))
+        finally:
+            if process.poll() is None:
+                os.killpg(process.pid, signal.SIGKILL)
+                process.wait()
+        self.assertEqual("X", comm.get_process_status(process_handle=process))
+        comm.close_session()
+
+    def test_files(self):
+        """Test the streaming of files and the errors of the operations."""
+        data = os.urandom(3000)
+        (self.path / "data.bin").write_bytes(data)
+        chunks = list(self.agent.stream_file(path=self.path / "data.bin", chunk_size=1024))
+        self.assertEqual([1024, 1024, 952], [len(chunk) for chunk in chunks])
+        self.assertEqual(data, b"".join(chunks))
+
+        with self.assertRaises(FileNotFoundError):
+            self.agent.read_bytes(path=self.path / "missing")
+        with self.assertRaises(AgentCallError):
+            self.agent.call("unknown")
+        self.assertEqual(1, self.agent.call("ping")["version"])
+
+    def test_processes(self):
+        """Test the sampling and exact kill of process trees."""
+        process = subprocess.Popen(
+            ["sh", "-c", "setsid sleep 30 & sleep 30 & echo started; wait"],
+            stdout=subprocess.PIPE,
+            start_new_session=True,
+        )
+        self.assertEqual(b"started\n", process.stdout.readline())
+        process.stdout.close()
+
+        samples = self.agent.sample(pids=[process.pid, 2**22 + 1])
+        self.assertEqual(1, samples[process.pid]["nb_threads"])
+        self.assertIn(samples[process.pid]["state"], "RSD")
+        self.assertIsNone(samples[2**22 + 1])
+
+        tree = self.agent.kill_tree(pid=process.pid, signal_code=signal.SIGKILL)
+        self.assertEqual(3, len(tree))
+        self.assertEqual(-signal.SIGKILL, process.wait(timeout=5))
+        deadline = time.monotonic() + 5
+        while any(_is_running(p) for p in tree) and time.monotonic() < deadline:
+            time.sleep(0.05)
+        self.assertFalse(any(_is_running(p) for p in tree))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,108 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module to test awaiting asynchronous processes in an asyncio event loop.
+"""
+
+import asyncio
+import pathlib
+import subprocess
+import tempfile
+import time
+import unittest
+
+from benchkit.platforms import get_current_platform
+from benchkit.shell.shellasync import AsyncProcess, run_concurrently, shell_async
+
+
+def _is_running(pid: int) -> bool:
+    try:
+        with open(f"/proc/{pid}/stat", "r") as stat_file:
+            state = stat_file.read().rsplit(")", 1)[1].split()[0]
+    except FileNotFoundError:
+        return False
+    return state not in ("Z", "X")
+
+
+class TestAsyncProcessAio(unittest.TestCase):
+    """Unit tests for the asyncio API of asynchronous processes."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self.tmp_dir.name)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _shell_async(self, script: str) -> AsyncProcess:
+        return shell_async(
+            command=["sh", "-c", script],
+            stdout_path=self.tmp_path / "out.txt",
+            stderr_path=self.tmp_path / "err.txt",
+            platform=get_current_platform(),
+            print_input=False,
+            print_file_shell_cmd=False,
+        )
+
+    def test_await(self):
+        """Test awaiting processes, their error codes and timeouts."""
+        process = self._shell_async(script="sleep 0.1; echo done")
+        asyncio.run(process.wait_async())
+        self.assertEqual("done\n", process.output())
+
+        process = self._shell_async(script="exit 3")
+        with self.assertRaises(AsyncProcess.AsyncProcessError):
+            asyncio.run(process.wait_async())
+
+        process = self._shell_async(script="sleep 5")
+
+        async def waits():
+            self.assertFalse(await process.wait_finished(timeout=0.05))
+            with self.assertRaises(subprocess.TimeoutExpired):
+                await process.wait_async(timeout=0.05)
+
+        asyncio.run(waits())
+        self.assertFalse(process.is_finished())
+        process.kill()
+
+    def test_concurrent(self):
+        """Test that concurrent waits are driven by one event loop."""
+        processes = [self._shell_async(script="sleep 0.3") for _ in range(3)]
+
+        async def waiter(process):
+            await process
+
+        start = time.monotonic()
+        run_concurrently(awaitables=[waiter(p) for p in processes])
+        self.assertLess(time.monotonic() - start, 0.8)
+        self.assertTrue(all(p.is_finished() for p in processes))
+
+    def test_cancel(self):
+        """Test that cancelling a wait kills the process group."""
+        process = self._shell_async(script="sleep 30 & echo $!; wait")
+
+        async def cancelled_wait():
+            task = asyncio.create_task(process.wait_async())
+            await asyncio.sleep(0.1)
+            task.cancel()
+            with self.assertRaises(asyncio.CancelledError):
+                await task
+
+        asyncio.run(cancelled_wait())
+        self.assertTrue(process.is_finished())
+        sleep_pid = int((self.tmp_path / "out.txt").read_text())
+        time.sleep(0.1)
+        self.assertFalse(_is_running(pid=sleep_pid))
+
+    def test_stdout_lines(self):
+        """Test streaming the output lines of a process."""
+        process = self._shell_async(script="echo a; sleep 0.1; echo b; printf c")
+
+        async def lines():
+            return [line async for line in process.stdout_lines(poll_seconds=1)]
+
+        self.assertEqual(["a", "b", "c"], asyncio.run(lines()))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,96 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the batched filesystem operations of the communication layers.
+"""
+
+import os
+import pathlib
+import tempfile
+import unittest
+from typing import List
+
+from benchkit.communication import CommunicationLayer, LocalCommLayer
+from benchkit.shell.shell import shell_out
+
+
+class ShCommLayer(CommunicationLayer):
+    """Communication layer running its helper commands in a local `sh` session."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.nb_shells = 0
+
+    def shell(self, command, **kwargs) -> str:
+        self.nb_shells += 1
+        return shell_out(command=command, **kwargs)
+
+    def _session_argv(self) -> List[str] | None:
+        return ["sh"]
+
+
+class TestBatchOperations(unittest.TestCase):
+    """Unit tests for the batched filesystem operations."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        root = pathlib.Path(self.tmp_dir.name)
+        (root / "perf-stat-a.txt").write_text("a,1\nb,2\n")
+        (root / "perf-stat-b.txt").write_text("no trailing newline")
+        (root / "empty.txt").write_text("")
+        (root / "sub dir").mkdir()
+        self.root = root
+        self.paths = [
+            str(root / "perf-stat-a.txt"),
+            str(root / "perf-stat-b.txt"),
+            str(root / "empty.txt"),
+            str(root / "sub dir"),
+            str(root / "missing.txt"),
+        ]
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _check(self, comm):
+        stats = comm.stat_paths(paths=self.paths)
+        self.assertEqual(
+            [True, True, True, True, False],
+            [stats[p].exists for p in self.paths],
+        )
+        self.assertEqual([8, 19, 0], [stats[p].size for p in self.paths[:3]])
+        self.assertTrue(stats[self.paths[0]].is_file)
+        self.assertTrue(stats[self.paths[3]].is_dir)
+        self.assertEqual(int(os.stat(self.paths[0]).st_mtime), int(stats[self.paths[0]].mtime))
+
+        contents = comm.read_files(paths=self.paths)
+        self.assertEqual(
+            ["a,1\nb,2\n", "no trailing newline", "", None, None],
+            [contents[p] for p in self.paths],
+        )
+
+        self.assertEqual(
+            [pathlib.Path(p) for p in self.paths[:2]],
+            comm.glob(pattern=self.root / "perf-stat-*"),
+        )
+        self.assertEqual([], comm.glob(pattern=self.root / "nothing-*"))
+        self.assertEqual([], comm.glob(pattern=self.root / "missing-dir" / "*"))
+        self.assertEqual({}, comm.read_files(paths=[]))
+
+    def test_local(self):
+        """Test the in-process operations of the local communication layer."""
+        self._check(comm=LocalCommLayer())
+
+    def test_scripts(self):
+        """Test the scripts run by the other communication layers, in a local shell session."""
+        comm = ShCommLayer()
+        try:
+            self._check(comm=comm)
+            self.assertEqual(0, comm.nb_shells)
+            with self.assertRaises(ValueError):
+                comm.glob(pattern=self.root / "*" / "a.txt")
+        finally:
+            comm.close_session()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,101 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the cache of build artifacts.
+"""
+
+import os
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.utils.buildcache import BuildCache
+
+
+class TestBuildCache(unittest.TestCase):
+    """Unit tests for the build cache."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        tmp_path = pathlib.Path(self._tmp_dir.name)
+        self.store_dir = tmp_path / "store"
+        self.build_dir = tmp_path / "build"
+        self.binary = tmp_path / "bench.bin"
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _build(self, content: str) -> None:
+        self.build_dir.mkdir(exist_ok=True)
+        (self.build_dir / "lib.so").write_text(content * 100)
+        self.binary.write_text(content)
+
+    def test_key(self):
+        """Test that the key only depends on the content of the identity."""
+        key = BuildCache.compute_key({"a": 1, "b": ["x", 2]})
+        self.assertEqual(key, BuildCache.compute_key({"b": ["x", 2], "a": 1}))
+        self.assertNotEqual(key, BuildCache.compute_key({"a": 2, "b": ["x", 2]}))
+
+    def test_store_restore(self):
+        """Test that stored artifacts are restored in place."""
+        cache = BuildCache(cache_dir=self.store_dir)
+        artifacts = [self.build_dir, self.binary]
+
+        self.assertFalse(cache.restore(key="k1", artifacts=artifacts))
+        self._build(content="v1")
+        cache.store(key="k1", artifacts=artifacts, identity={"v": 1})
+
+        self._build(content="v2")
+        (self.build_dir / "stale.o").write_text("stale")
+        self.assertTrue(cache.restore(key="k1", artifacts=artifacts))
+        self.assertEqual("v1", self.binary.read_text())
+        self.assertEqual(["lib.so"], os.listdir(self.build_dir))
+        self.assertEqual((1, 1), (cache.hits, cache.misses))
+
+    def test_artifact_paths(self):
+        """Test that an entry is only restored to the artifact paths it was stored from."""
+        cache = BuildCache(cache_dir=self.store_dir)
+        self._build(content="v1")
+        cache.store(key="k1", artifacts=[self.build_dir, self.binary], identity={})
+
+        self.assertFalse(cache.restore(key="k1", artifacts=[self.binary, self.build_dir]))
+        self.assertEqual("v1" * 100, (self.build_dir / "lib.so").read_text())
+        self.assertFalse(cache.restore(key="k1", artifacts=[self.binary]))
+
+    def test_replace_partial_entry(self):
+        """Test that a partial entry is replaced when the build is stored again."""
+        cache = BuildCache(cache_dir=self.store_dir)
+        artifacts = [self.build_dir, self.binary]
+        self._build(content="v1")
+        cache.store(key="k1", artifacts=artifacts, identity={})
+        (self.store_dir / "k1" / "artifacts" / "1").unlink()
+        self.assertFalse(cache.restore(key="k1", artifacts=artifacts))
+
+        self._build(content="v2")
+        cache.store(key="k1", artifacts=artifacts, identity={})
+        self.binary.write_text("v3")
+        self.assertTrue(cache.restore(key="k1", artifacts=artifacts))
+        self.assertEqual("v2", self.binary.read_text())
+        self.assertEqual(["k1"], os.listdir(self.store_dir))
+
+    def test_lru_eviction(self):
+        """Test that the least recently used entries are evicted above the maximum size."""
+        cache = BuildCache(cache_dir=self.store_dir, max_size_bytes=500)
+        artifacts = [self.build_dir, self.binary]
+
+        self._build(content="v1")
+        cache.store(key="k1", artifacts=artifacts, identity={})
+        self._build(content="v2")
+        cache.store(key="k2", artifacts=artifacts, identity={})
+
+        # k1 becomes the most recently used entry:
+        os.utime(self.store_dir / "k2" / "meta.json", (0, 0))
+        self.assertTrue(cache.restore(key="k1", artifacts=artifacts))
+
+        self._build(content="v3")
+        cache.store(key="k3", artifacts=artifacts, identity={})
+        self.assertEqual(["k1", "k3"], sorted(os.listdir(self.store_dir)))
+
+
+if __name__ == "__main__":
+    unittest.main()
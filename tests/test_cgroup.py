@@ -0,0 +1,112 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the cgroup v2 run sandbox, on a simulated cgroup filesystem.
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.communication import LocalCommLayer
+from benchkit.core.bktypes.callresults import RunResult
+from benchkit.core.bktypes.contexts import RunContext
+from benchkit.engine.stepper import Stepper
+from benchkit.helpers.linux.cgroup import CgroupSandbox, parse_stats
+from benchkit.platforms import get_current_platform
+
+_CPU_STAT = """usage_usec 2500000
+user_usec 2000000
+system_usec 500000
+nr_periods 10
+nr_throttled 4
+throttled_usec 300000
+"""
+_IO_STAT = """8:0 rbytes=4096 wbytes=8192 rios=1 wios=2 dbytes=0 dios=0
+8:16 rbytes=4096 wbytes=0 rios=1 wios=0 dbytes=0 dios=0
+"""
+_CPU_PRESSURE = """some avg10=0.00 avg60=0.00 avg300=0.00 total=1500000
+full avg10=0.00 avg60=0.00 avg300=0.00 total=500000
+"""
+
+
+class EchoBench:
+    """Benchmark whose run phase executes one command."""
+
+    def run(self, ctx: RunContext) -> RunResult:
+        return RunResult(outputs=[ctx.exec(argv=["echo", "hello"])])
+
+    def collect(self, ctx) -> dict:
+        return {"output": ctx.run_result.outputs[0].stdout.strip()}
+
+
+class TestCgroupSandbox(unittest.TestCase):
+    """Unit tests for the cgroup v2 run sandbox."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.parent = pathlib.Path(self.tmp_dir.name) / "benchkit"
+        self.sandbox = CgroupSandbox(comm=LocalCommLayer(), parent=str(self.parent))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_parse_stats(self):
+        """Test the conversion of the statistic files into result columns."""
+        stats = parse_stats(
+            contents={
+                "cpu.stat": _CPU_STAT,
+                "memory.peak": "1048576\n",
+                "memory.events": "low 0\nhigh 0\nmax 3\noom 1\noom_kill 1\n",
+                "io.stat": _IO_STAT,
+                "cpu.pressure": _CPU_PRESSURE,
+            }
+        )
+        self.assertEqual(2.5, stats["cgroup/cpu_usage_s"])
+        self.assertEqual(0.3, stats["cgroup/cpu_throttled_s"])
+        self.assertEqual(4, stats["cgroup/cpu_nr_throttled"])
+        self.assertEqual(1048576, stats["cgroup/memory_peak_bytes"])
+        self.assertEqual(1, stats["cgroup/memory_oom_kills"])
+        self.assertEqual(8192, stats["cgroup/io_rbytes"])
+        self.assertEqual(2, stats["cgroup/io_wios"])
+        self.assertEqual(1.5, stats["cgroup/cpu_pressure_some_s"])
+        self.assertEqual({}, parse_stats(contents={"cpu.stat": None, "memory.peak": None}))
+
+    def test_run_cgroup(self):
+        """Test the limits of a run cgroup and that its commands enter it."""
+        run_cgroup = self.sandbox.create(cpu_max=1.5, memory_max="512M")
+        path = pathlib.Path(run_cgroup.path)
+        self.assertEqual(self.parent, path.parent)
+        self.assertEqual("150000 100000", (path / "cpu.max").read_text())
+        self.assertEqual("512M", (path / "memory.max").read_text())
+        self.assertTrue((self.parent / "cgroup.subtree_control").is_file())
+
+        output = LocalCommLayer().shell(
+            command=run_cgroup.wrap(argv="echo $$"),
+            print_input=False,
+            print_output=False,
+        )
+        self.assertEqual(output.strip(), (path / "cgroup.procs").read_text().strip())
+
+        (path / "cpu.stat").write_text(_CPU_STAT)
+        stats = run_cgroup.finish()
+        self.assertEqual("1", (path / "cgroup.kill").read_text())
+        self.assertEqual(2.5, stats["cgroup/cpu_usage_s"])
+
+    def test_stepper(self):
+        """Test that the run phase of the engine is sandboxed and its accounting recorded."""
+        stepper = Stepper(bench=EchoBench(), platform=get_current_platform(), sandbox=self.sandbox)
+        session = stepper.fetch(args={})
+        session = stepper.build(session=session, args={})
+        session = stepper.run(session=session, args={"cgroup_cpu_max": 2}, duration_s=None)
+        session = stepper.collect(session=session, args={})
+
+        run_dirs = list(self.parent.glob("run-*"))
+        self.assertEqual(1, len(run_dirs))
+        self.assertEqual("200000 100000", (run_dirs[0] / "cpu.max").read_text())
+        self.assertEqual("1", (run_dirs[0] / "cgroup.kill").read_text())
+        self.assertEqual("hello", session.record_result["output"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,98 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the model of the duration of the runs.
+"""
+
+import json
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.results.durations import (
+    RUN_DURATION_COLUMN,
+    DurationModel,
+    load_duration_history,
+)
+
+
+def _duration(size: int, nb_threads: int, lock: str) -> float:
+    return size / nb_threads * (2.0 if "mutex" == lock else 1.0) / 100
+
+
+class TestDurationModel(unittest.TestCase):
+    """Unit tests for the duration model."""
+
+    def test_load_history(self):
+        """Test that the lines with a duration of the same benchmark are loaded."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            tmp_path = pathlib.Path(tmp_dir)
+            (tmp_path / "new.csv").write_text(
+                "# comment\n"
+                f"benchmark_name;size;{RUN_DURATION_COLUMN}\n"
+                "bench;10;0.1\n"
+                "other;10;0.1\n"
+                "bench;20;0.2\n"
+            )
+            (tmp_path / "old.csv").write_text("benchmark_name;size\nbench;10\n")
+            json_path = tmp_path / "experiment_results.json"
+            json_path.write_text(
+                json.dumps([{"benchmark_name": "bench", "size": 40, RUN_DURATION_COLUMN: 0.4}])
+            )
+
+            lines = load_duration_history(
+                paths=[tmp_path, json_path, tmp_path / "missing.csv"],
+                benchmark_name="bench",
+            )
+            self.assertEqual(["10", "20", 40], [line["size"] for line in lines])
+
+    def test_predict(self):
+        """Test the prediction of measured and unseen records."""
+        model = DurationModel(variable_names=["size", "nb_threads", "lock"])
+        self.assertIsNone(model.predict(record={"size": 10, "nb_threads": 1, "lock": "mutex"}))
+
+        lines = [
+            {
+                "size": str(s),
+                "nb_threads": str(t),
+                "lock": k,
+                RUN_DURATION_COLUMN: _duration(s, t, k),
+            }
+            for s in (10, 20, 40)
+            for t in (1, 2, 4)
+            for k in ("mutex", "spin")
+        ]
+        # the lines of a multi-line run are counted once
+        model.add_results_lines(results_lines=lines + lines[-1:])
+        self.assertEqual(18, model.nb_samples)
+
+        record = {"size": 20, "nb_threads": 2, "lock": "mutex"}
+        self.assertAlmostEqual(_duration(**record), model.predict(record=record))
+        for record in [
+            {"size": 160, "nb_threads": 8, "lock": "spin"},
+            {"size": 5, "nb_threads": 1, "lock": "mutex"},
+        ]:
+            self.assertAlmostEqual(_duration(**record), model.predict(record=record), places=4)
+
+    def test_predict_without_regression(self):
+        """Test that the median duration is used when the regression cannot be fitted."""
+        model = DurationModel(variable_names=["size", "lock"])
+        model.add(record={"size": 10, "lock": "mutex"}, duration_seconds=1.0)
+        model.add(record={"size": 20, "lock": "spin"}, duration_seconds=3.0)
+        model.add(record={"size": 20, "lock": "spin"}, duration_seconds=0.0)
+        self.assertEqual(2, model.nb_samples)
+        self.assertEqual(2.0, model.predict(record={"size": 40, "lock": "mutex"}))
+        self.assertEqual(3.0, model.predict(record={"size": 20, "lock": "spin"}))
+
+    def test_informative_variables(self):
+        """Test that the prediction only depends on the variables that took several values."""
+        model = DurationModel(variable_names=["size", "lock", "host"])
+        model.add(record={"size": 10, "lock": "mutex", "host": "a"}, duration_seconds=1.0)
+        model.add(record={"size": 20, "lock": "mutex", "host": "a"}, duration_seconds=2.0)
+        self.assertEqual(["size"], model.informative_variable_names())
+        self.assertEqual(2.0, model.predict(record={"size": 20, "lock": "spin", "host": "b"}))
+        self.assertEqual(2.0, model.predict(record={"size": 20}))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,109 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the outputs of the commands executed through `shell2exec`.
+"""
+
+import pathlib
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from benchkit.core.bktypes.execfn import ResourceUsage, shell2exec
+from benchkit.platforms import get_current_platform
+from benchkit.results.streamparser import RegexIntervalParser, StreamParser
+
+_SCRIPT = "import sys; sum(range(3_000_000)); print('out'); print('err', file=sys.stderr)"
+
+
+class TestExecFn(unittest.TestCase):
+    """Unit tests for the outputs of executed commands."""
+
+    def setUp(self):
+        self.exec_fn = shell2exec(get_current_platform().comm.shell)
+
+    def test_capture(self):
+        """Test the capture of stderr, return code, resource usage and output files."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            record_dir = pathlib.Path(tmp_dir) / "record"
+            output = self.exec_fn(
+                argv=[sys.executable, "-c", f"{_SCRIPT}; sys.exit(3)"],
+                record_dir=record_dir,
+                ignore_ret_codes=(3,),
+            )
+            self.assertEqual("out\n", output.stdout)
+            self.assertEqual("err\n", output.stderr)
+            self.assertEqual(3, output.returncode)
+            self.assertEqual("out\n", output.stdout_path.read_text())
+            self.assertEqual("err\n", output.stderr_path.read_text())
+
+            self.assertIsNotNone(output.rusage)
+            self.assertGreater(output.rusage.user_cpu_s + output.rusage.system_cpu_s, 0)
+            self.assertGreater(output.rusage.max_rss_kib, 0)
+
+            output = self.exec_fn(argv=["true"], record_dir=record_dir)
+            self.assertEqual(record_dir / "exec-1.stdout", output.stdout_path)
+
+        with self.assertRaises(subprocess.CalledProcessError) as context:
+            self.exec_fn(argv=[sys.executable, "-c", f"{_SCRIPT}; sys.exit(3)"])
+        self.assertEqual("err\n", context.exception.stderr)
+
+    def test_stream_parser(self):
+        """Test that stderr is kept when stdout is given to a stream parser."""
+        output = self.exec_fn(
+            argv=[sys.executable, "-c", _SCRIPT],
+            stream_parser=RegexIntervalParser(pattern=r"(?P<word>out)"),
+        )
+        self.assertEqual("", output.stdout)
+        self.assertEqual("err\n", output.stderr)
+        self.assertEqual(1, len(output.records))
+
+    def test_parser_error(self):
+        """Test that an error of the stream parser is raised, without running the command again."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            runs_path = pathlib.Path(tmp_dir) / "runs"
+            with self.assertRaises(NotImplementedError):
+                self.exec_fn(
+                    argv=["sh", "-c", f"echo run >> {runs_path}; echo out"],
+                    stream_parser=StreamParser(),
+                )
+            self.assertEqual("run\n", runs_path.read_text())
+
+    def test_fallback(self):
+        """Test shell functions that cannot capture the details of the command."""
+
+        def shell_fun(command, **_kwargs):
+            return "out\n"
+
+        output = shell2exec(shell_fun)(argv=["anything"])
+        self.assertEqual(("out\n", "", 0), (output.stdout, output.stderr, output.returncode))
+        self.assertIsNone(output.rusage)
+
+    def test_resource_usage(self):
+        """Test the aggregation of resource usages and their merge into records."""
+        usage = ResourceUsage(
+            user_cpu_s=1.0,
+            system_cpu_s=0.5,
+            max_rss_kib=100,
+            voluntary_context_switches=1,
+            involuntary_context_switches=2,
+            minor_page_faults=3,
+            major_page_faults=0,
+            block_input_ops=0,
+            block_output_ops=8,
+        )
+        total = ResourceUsage.total([usage, usage])
+        self.assertEqual(2.0, total.user_cpu_s)
+        self.assertEqual(100, total.max_rss_kib)
+        self.assertIsNone(ResourceUsage.total([]))
+
+        record = usage.merged_into(record={"throughput": 5, "rusage/max_rss_kib": 1})
+        self.assertEqual(5, record["throughput"])
+        self.assertEqual(1, record["rusage/max_rss_kib"])
+        self.assertEqual(1.0, record["rusage/user_cpu_s"])
+        self.assertEqual(2, len(usage.merged_into(record=[{}, {}])))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,91 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the cached snapshot of the facts of a platform.
+"""
+
+import json
+import tempfile
+import unittest
+from typing import List
+
+from benchkit.platforms.facts import load_facts, parse_facts
+
+_LSCPU = {
+    "lscpu": [
+        {"field": "Thread(s) per core:", "data": "2"},
+        {"field": "L1d cache:", "data": "128 KiB (4 instances)"},
+        {"field": "L3 cache:", "data": "8 MiB (1 instance)"},
+    ]
+}
+
+
+def _probe_output(boot_id: str) -> str:
+    sections = {
+        "boot_id": boot_id,
+        "nproc": "8",
+        "isolated": "2-3,6",
+        "uname_a": "Linux host 6.1.0 #1 SMP x86_64 GNU/Linux",
+        "uname_r": "6.1.0",
+        "uname_m": "x86_64",
+        "cmdline": "BOOT_IMAGE=/vmlinuz isolcpus=2-3,6",
+        "lscpu": json.dumps(_LSCPU),
+        "topology": "# CPU,Node,Cache\n0,0,0:0:0:0\n1,0,1:1:1:0\n",
+    }
+    return "".join(f"@@benchkit-fact {name}\n{value}\n" for name, value in sections.items())
+
+
+class CommMock:
+    """Mock for the communication layer, counting the probes."""
+
+    def __init__(self, boot_id: str) -> None:
+        self.boot_id = boot_id
+        self.nb_probes = 0
+
+    def shell(self, command: List[str], **_kwargs) -> str:
+        assert "@@benchkit-fact" in command[-1]
+        self.nb_probes += 1
+        return _probe_output(boot_id=self.boot_id)
+
+    def read_file(self, path: str) -> str:
+        assert path.endswith("boot_id")
+        return f"{self.boot_id}\n"
+
+
+class TestPlatformFacts(unittest.TestCase):
+    """Unit tests for the platform facts."""
+
+    def test_parse(self):
+        """Test the parsing of the output of the probe."""
+        facts = parse_facts(probe_output=_probe_output(boot_id="b1"))
+        self.assertEqual("b1", facts.boot_id)
+        self.assertEqual(8, facts.nb_cpus)
+        self.assertEqual((2, 3, 6), facts.isolated_cpus)
+        self.assertEqual("6.1.0", facts.kernel_release)
+        self.assertEqual("2", facts.lscpu["Thread(s) per core:"])
+        self.assertEqual(
+            {"L1d": "128 KiB (4 instances)", "L3": "8 MiB (1 instance)"}, facts.cache_sizes
+        )
+        self.assertEqual({0: (0, 0), 1: (0, 0)}, facts.cpu_topology)
+
+        facts = parse_facts(probe_output="@@benchkit-fact nproc\n@@benchkit-fact lscpu\n")
+        self.assertIsNone(facts.nb_cpus)
+        self.assertEqual({}, facts.lscpu)
+
+    def test_persisted_until_reboot(self):
+        """Test that the facts are persisted and collected again after a reboot."""
+        with tempfile.TemporaryDirectory() as facts_dir:
+            comm = CommMock(boot_id="b1")
+            first = load_facts(comm_layer=comm, hostname="host", facts_dir=facts_dir)
+            second = load_facts(comm_layer=comm, hostname="host", facts_dir=facts_dir)
+            self.assertEqual(1, comm.nb_probes)
+            self.assertEqual(first, second)
+
+            comm.boot_id = "b2"
+            third = load_facts(comm_layer=comm, hostname="host", facts_dir=facts_dir)
+            self.assertEqual(2, comm.nb_probes)
+            self.assertEqual("b2", third.boot_id)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,86 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the execution of a campaign on a fleet of platforms.
+"""
+
+import pathlib
+import tempfile
+import unittest
+from subprocess import CalledProcessError
+
+from benchkit.communication import LocalCommLayer
+from benchkit.platforms.generic import Platform
+from tests.helpers import FakeBench, read_csv_rows
+
+
+class FlakyCommLayer(LocalCommLayer):
+    """Local communication layer with a given hostname, that is lost after some commands."""
+
+    def __init__(self, hostname: str, nb_commands_before_lost: int) -> None:
+        super().__init__()
+        self._hostname = hostname
+        self._nb_commands_left = nb_commands_before_lost
+
+    def hostname(self) -> str:
+        return self._hostname
+
+    def shell(self, command, **kwargs) -> str:
+        self._nb_commands_left -= 1
+        if self._nb_commands_left < 0:
+            raise CalledProcessError(255, command)
+        return super().shell(command, **kwargs)
+
+
+def _echo(bench: FakeBench, run_variables) -> str:
+    return bench.platform.comm.shell(
+        command=["echo", f"{run_variables['x']}"],
+        print_input=False,
+        print_output=False,
+    )
+
+
+def _parse_echo(_bench: FakeBench, output: str):
+    return {"out": output.strip()}
+
+
+class TestFleet(unittest.TestCase):
+    """Unit tests for the fleet runner."""
+
+    def test_lost_platform(self):
+        """Test that every run is executed once, the runs of a lost platform being re-queued."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = pathlib.Path(tmp_dir) / "results.csv"
+            fleet = [
+                Platform(comm_layer=FlakyCommLayer(hostname="h0", nb_commands_before_lost=1000)),
+                Platform(comm_layer=FlakyCommLayer(hostname="h1", nb_commands_before_lost=1000)),
+                Platform(comm_layer=FlakyCommLayer(hostname="h2", nb_commands_before_lost=2)),
+            ]
+            benchmark = FakeBench(
+                run_var_names=["x"],
+                build_var_names=["opt"],
+                run_fun=_echo,
+                parse_fun=_parse_echo,
+            )
+            benchmark.configure(
+                csv_output_path=csv_path,
+                variables=[{"opt": opt, "x": x} for opt in ("O2", "O3") for x in range(6)],
+                nb_runs=2,
+                constants={"hostname": "main"},
+                fleet=fleet,
+            )
+            benchmark.run(other_campaigns_seconds=0, barrier=None, continuing=False)
+
+            rows = read_csv_rows(csv_path=csv_path)
+            self.assertIn("hostname", rows[0])
+            runs = sorted((row["opt"], row["x"], row["rep"]) for row in rows)
+            expected = sorted(
+                (o, str(x), str(r)) for o in ("O2", "O3") for x in range(6) for r in (1, 2)
+            )
+            self.assertEqual(expected, runs)
+            self.assertEqual({"h0", "h1", "h2"}, {row["hostname"] for row in rows})
+            self.assertEqual(2, sum(1 for row in rows if "h2" == row["hostname"]))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the write-ahead journal of the progress of a campaign.
+"""
+
+import pathlib
+import tempfile
+import unittest
+from typing import Optional
+
+from benchkit.campaign import CampaignCartesianProduct
+from benchkit.results.journal import (
+    CampaignJournal,
+    JournalReplay,
+    journal_path,
+    regenerate_csv,
+)
+from benchkit.results.threads import threads_csv_path
+from tests.helpers import FakeBench
+
+
+def _counting_bench() -> FakeBench:
+    return FakeBench(parse_fun=lambda bench, output: {"out": f"{output};{len(bench.runs)}"})
+
+
+def _threads_bench() -> FakeBench:
+    return FakeBench(
+        parse_fun=lambda bench, output: {"out": output, "thread_0": 1, "thread_1": len(bench.runs)}
+    )
+
+
+class TestJournal(unittest.TestCase):
+    """Unit tests for the campaign journal."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self._tmp_dir.name) / "results.csv"
+        self.journal_path = journal_path(csv_path=self.csv_path)
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_replay(self):
+        """Test that only the finished runs are replayed, and a torn event is ignored."""
+        with CampaignJournal(path=self.journal_path) as journal:
+            journal.comment("# comment")
+            first = journal.run_started(execution_parameters={"x": "1", "rep": "1"})
+            second = journal.run_started(execution_parameters={"x": "2", "rep": "1"})
+            journal.run_finished(run_id=first, rows=[{"x": 1, "thread_0": 3, "y": "a;b"}])
+        with open(self.journal_path, "a") as journal_file:
+            journal_file.write(f'{{"event":"finished","id":"{second}"')
+
+        replay = JournalReplay.load(path=self.journal_path)
+        self.assertEqual(["# comment"], replay.comments)
+        self.assertEqual([{"x": "1", "rep": "1"}], replay.finished_runs)
+        self.assertEqual([{"x": "2", "rep": "1"}], replay.interrupted_runs)
+        self.assertEqual(["x", "y", "thread_0"], replay.columns)
+
+        # the torn event is removed when the journal is opened again
+        with CampaignJournal(path=self.journal_path) as journal:
+            journal.run_finished(run_id=second, rows=[{"x": 2, "y": "c"}])
+        replay = JournalReplay.load(path=self.journal_path)
+        self.assertEqual([], replay.interrupted_runs)
+
+        self.assertEqual(2, regenerate_csv(journal=self.journal_path, csv_path=self.csv_path))
+        self.assertEqual(
+            "# comment\nx;y;thread_0\n1;a;b;3\n2;c;\n",
+            self.csv_path.read_text(),
+        )
+
+    def _run(
+        self,
+        benchmark: FakeBench,
+        continuing: bool,
+        names=("a;b", "c"),
+        thread_columns: str = "wide",
+        journal: bool = True,
+    ) -> None:
+        benchmark.configure(
+            csv_output_path=self.csv_path,
+            variables=[{"name": name} for name in names],
+            nb_runs=2,
+            experiment_name="journal",
+            thread_columns=thread_columns,
+            journal=journal,
+        )
+        benchmark.run(other_campaigns_seconds=0, barrier=None, continuing=continuing)
+
+    def test_continue_campaign(self):
+        """Test that continuing a campaign runs again the interrupted runs only."""
+        benchmark = _counting_bench()
+        self._run(benchmark=benchmark, continuing=False)
+        self.assertEqual(4, len(benchmark.runs))
+
+        # simulate a crash during the last run
+        lines = self.journal_path.read_text().splitlines(keepends=True)
+        finished = max(i for i, line in enumerate(lines) if '"finished"' in line)
+        self.journal_path.write_text("".join(lines[:finished]))
+
+        benchmark = _counting_bench()
+        self._run(benchmark=benchmark, continuing=True)
+        self.assertEqual(["c"], benchmark.runs)
+
+        replay = JournalReplay.load(path=self.journal_path)
+        self.assertEqual(4, len(replay.finished_runs))
+        self.assertEqual([], replay.interrupted_runs)
+
+    def test_continue_csv_without_journal(self):
+        """Test that continuing a campaign whose CSV file has no journal does not run it again."""
+        benchmark = _counting_bench()
+        # the values do not contain the separator, the CSV file without journal can be parsed
+        self._run(benchmark=benchmark, continuing=False, names=("a", "c"))
+        self.journal_path.unlink()
+        nb_lines = len(self.csv_path.read_text().splitlines())
+
+        for _ in range(2):
+            benchmark = _counting_bench()
+            self._run(benchmark=benchmark, continuing=True, names=("a", "c"))
+            self.assertEqual([], benchmark.runs)
+        self.assertEqual(4, len(JournalReplay.load(path=self.journal_path).finished_runs))
+        rows = [line for line in self.csv_path.read_text().splitlines() if not line.startswith("#")]
+        self.assertEqual(5, len(rows))
+        self.assertLess(nb_lines, len(self.csv_path.read_text().splitlines()))
+
+    def test_regenerate_long_layout(self):
+        """Test that the CSV files of the long layout of the thread columns are regenerated."""
+        self._run(
+            benchmark=_threads_bench(), continuing=False, names=("a", "c"), thread_columns="long"
+        )
+        threads_path = threads_csv_path(csv_path=self.csv_path)
+        expected = (self._rows(), threads_path.read_text())
+        self.assertEqual(9, len(expected[1].splitlines()))
+        self.csv_path.unlink()
+        threads_path.unlink()
+
+        self.assertEqual(
+            4,
+            regenerate_csv(
+                journal=self.journal_path, csv_path=self.csv_path, thread_columns="long"
+            ),
+        )
+        self.assertEqual(expected, (self._rows(), threads_path.read_text()))
+
+    def test_disabled_journal(self):
+        """Test that no journal is written when it is disabled, continuing from the CSV file."""
+        benchmark = _counting_bench()
+        self._run(benchmark=benchmark, continuing=False, names=("a", "c"), journal=False)
+        self.assertEqual(4, len(benchmark.runs))
+        self.assertFalse(self.journal_path.exists())
+
+        benchmark = _counting_bench()
+        self._run(benchmark=benchmark, continuing=True, names=("a", "c"), journal=False)
+        self.assertEqual([], benchmark.runs)
+        self.assertFalse(self.journal_path.exists())
+        self.assertEqual(5, len(self._rows()))
+
+    def test_campaign_regenerate_csv(self):
+        """Test that a campaign regenerates its CSV output file from its journal."""
+        campaign = CampaignCartesianProduct(
+            name="journal",
+            benchmark=_counting_bench(),
+            nb_runs=2,
+            variables={"name": ["a;b", "c"]},
+            constants=None,
+            debug=False,
+            gdb=False,
+            enable_data_dir=False,
+            results_dir=pathlib.Path(self._tmp_dir.name),
+        )
+        campaign.run()
+        csv_path = campaign.csv_output_abs_path()
+        expected = self._rows(csv_path=csv_path)
+        csv_path.write_text(csv_path.read_text()[:-10])
+
+        self.assertEqual(4, campaign.regenerate_csv())
+        self.assertEqual(expected, self._rows(csv_path=csv_path))
+
+        journal_path(csv_path=csv_path).unlink()
+        with self.assertRaises(FileNotFoundError):
+            campaign.regenerate_csv()
+
+    def _rows(self, csv_path: Optional[pathlib.Path] = None):
+        csv_path = self.csv_path if csv_path is None else csv_path
+        return [line for line in csv_path.read_text().splitlines() if not line.startswith("#")]
+
+
+if __name__ == "__main__":
+    unittest.main()
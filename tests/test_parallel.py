@@ -0,0 +1,86 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the parallel runner of the records, on the CPU slots of the platform.
+"""
+
+import json
+import os
+import pathlib
+import tempfile
+import time
+import unittest
+
+from benchkit.communication import LocalCommLayer
+from benchkit.platforms.generic import Platform
+from tests.helpers import FakeBench, read_csv_rows
+
+
+def _sleep(_bench: FakeBench, run_variables) -> str:
+    start = time.monotonic()
+    if "bad" == run_variables["name"]:
+        raise RuntimeError("bad record")
+    time.sleep(30 if run_variables["name"].startswith("slow") else 0.2)
+    return json.dumps({"pid": os.getpid(), "start": start, "end": time.monotonic()})
+
+
+def _parse_times(_bench: FakeBench, output: str):
+    return json.loads(output)
+
+
+class TestParallelRunner(unittest.TestCase):
+    """End-to-end tests of the parallel runner."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self._tmp_dir.name) / "results.csv"
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def _run(self, names, nb_runs: int = 1, **kwargs) -> FakeBench:
+        platform = Platform(comm_layer=LocalCommLayer())
+        platform.nb_cpus = lambda: 8
+        benchmark = FakeBench(run_fun=_sleep, parse_fun=_parse_times, platform=platform)
+        benchmark.configure(
+            csv_output_path=self.csv_path,
+            variables=[{"name": name} for name in names],
+            nb_runs=nb_runs,
+            parallel_slots=0,
+            slot_pinning="none",
+            **kwargs,
+        )
+        benchmark.run(other_campaigns_seconds=0, barrier=None, continuing=False)
+        return benchmark
+
+    def test_all_runs(self):
+        """Test that every run is recorded once, the runs being executed concurrently."""
+        names = [f"r{i}" for i in range(6)]
+        self._run(names=names, nb_runs=2)
+
+        rows = read_csv_rows(csv_path=self.csv_path)
+        self.assertEqual(
+            sorted((name, str(rep)) for name in names for rep in (1, 2)),
+            sorted((row["name"], row["rep"]) for row in rows),
+        )
+        self.assertLess(1, len({row["pid"] for row in rows}))
+        intervals = sorted((float(row["start"]), float(row["end"])) for row in rows)
+        self.assertTrue(any(s2 < e1 for (_, e1), (s2, _) in zip(intervals, intervals[1:])))
+
+    def test_stop_on_first_finish(self):
+        """Test that the other instances are stopped as soon as the first one finishes."""
+        start = time.monotonic()
+        self._run(names=["fast", "slow", "slow2"], stop_on_first_finish=True)
+        self.assertLess(time.monotonic() - start, 20)
+        self.assertEqual(["fast"], [row["name"] for row in read_csv_rows(csv_path=self.csv_path)])
+
+    def test_failed_run(self):
+        """Test that a failed instance makes the campaign fail, after the others finished."""
+        with self.assertRaises(RuntimeError):
+            self._run(names=["r0", "bad", "r1"])
+        rows = read_csv_rows(csv_path=self.csv_path)
+        self.assertEqual(["r0", "r1"], sorted(row["name"] for row in rows))
+
+
+if __name__ == "__main__":
+    unittest.main()
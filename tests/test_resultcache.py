@@ -0,0 +1,115 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the index of recorded results used to continue campaigns.
+"""
+
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.results.cache import ResultCache
+
+CSV_CONTENT = """# benchmark_campaign_name: test
+# nb_runs: 2
+experiment_name;benchmark_name;host;a;c;rep;duration
+test;bench;myhost;1;21;1;0.5
+test;bench;myhost;1;21;2;0.6
+test;bench;myhost;2;22;1;0.7
+"""
+
+
+def _params(a: int, c: int, rep: int) -> dict:
+    return {
+        "experiment_name": "test",
+        "benchmark_name": "bench",
+        "host": "myhost",
+        "a": str(a),
+        "c": str(c),
+        "rep": str(rep),
+    }
+
+
+class TestResultCache(unittest.TestCase):
+    """Unit tests for the result cache."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self._tmp_dir.name) / "results.csv"
+        self.csv_path.write_text(CSV_CONTENT)
+        self.key_columns = ["experiment_name", "host", "a", "c", "d", "rep"]
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_membership(self):
+        """Test the lookup of recorded and missing executions."""
+        cache = ResultCache(csv_path=self.csv_path, key_columns=self.key_columns)
+        cache.load()
+
+        self.assertTrue(cache.has_header)
+        self.assertEqual(3, len(cache))
+        self.assertIn(_params(a=1, c=21, rep=1), cache)
+        self.assertIn(_params(a=1, c=21, rep=2), cache)
+        self.assertIn(_params(a=2, c=22, rep=1), cache)
+        self.assertNotIn(_params(a=2, c=22, rep=2), cache)
+        self.assertNotIn(_params(a=1, c=22, rep=1), cache)
+
+    def test_missing_csv(self):
+        """Test the cache of a campaign that has not started yet."""
+        cache = ResultCache(csv_path=self.csv_path.with_name("none.csv"), key_columns=["rep"])
+        cache.load()
+        self.assertFalse(cache.has_header)
+        self.assertEqual(0, len(cache))
+
+    def test_sidecar_index(self):
+        """Test that the sidecar index is reused and only new lines are parsed."""
+        cache = ResultCache(csv_path=self.csv_path, key_columns=self.key_columns)
+        cache.load()
+        self.assertTrue(cache.index_path.is_file())
+
+        with open(self.csv_path, "a") as csv_file:
+            csv_file.write("test;bench;myhost;2;22;2;0.8\n")
+            csv_file.write("test;bench;myhost;3;2")  # torn line being written
+
+        cache = ResultCache(csv_path=self.csv_path, key_columns=self.key_columns)
+        cache.load()
+        self.assertEqual(4, len(cache))
+        self.assertIn(_params(a=2, c=22, rep=2), cache)
+
+        # an index built for other key columns is discarded:
+        cache = ResultCache(csv_path=self.csv_path, key_columns=["a", "rep"])
+        cache.load()
+        self.assertEqual(4, len(cache))
+        self.assertIn({"a": "2", "rep": "2"}, cache)
+
+    def test_rewritten_csv(self):
+        """Test that the sidecar index is discarded when the CSV file is replaced."""
+        cache = ResultCache(csv_path=self.csv_path, key_columns=self.key_columns)
+        cache.load()
+
+        self.csv_path.write_text(CSV_CONTENT.replace("myhost", "other0") + "\n" * 64)
+        cache = ResultCache(csv_path=self.csv_path, key_columns=self.key_columns)
+        cache.load()
+        self.assertEqual(3, len(cache))
+        self.assertNotIn(_params(a=1, c=21, rep=1), cache)
+
+    def test_values(self):
+        """Test the values kept for each recorded run, restored from the sidecar index."""
+        for _ in range(2):
+            cache = ResultCache(
+                csv_path=self.csv_path,
+                key_columns=self.key_columns,
+                value_column="duration",
+            )
+            cache.load()
+            self.assertEqual(["0.6"], cache.values(_params(a=1, c=21, rep=2)))
+            self.assertEqual([], cache.values(_params(a=2, c=22, rep=2)))
+
+        cache = ResultCache(csv_path=self.csv_path, key_columns=self.key_columns)
+        cache.load()
+        self.assertEqual([], cache.values(_params(a=1, c=21, rep=2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,62 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the buffered writer of the CSV output file.
+"""
+
+import os
+import pathlib
+import tempfile
+import unittest
+from unittest import mock
+
+from benchkit.results.sink import ResultSink
+
+
+class TestResultSink(unittest.TestCase):
+    """Unit tests for the result sink."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.csv_path = pathlib.Path(self._tmp_dir.name) / "results.csv"
+
+    def tearDown(self):
+        self._tmp_dir.cleanup()
+
+    def test_batched_run(self):
+        """Test that the lines of a run are written at once when the run ends."""
+        with ResultSink(path=self.csv_path) as sink:
+            print("# comment", file=sink)
+            sink.write_line("a;b")
+            sink.write_line("1;2")
+            self.assertEqual("", self.csv_path.read_text())
+            sink.end_run()
+            self.assertEqual("# comment\na;b\n1;2\n", self.csv_path.read_text())
+            sink.write_line("3;4")
+        self.assertEqual("# comment\na;b\n1;2\n3;4\n", self.csv_path.read_text())
+
+    def test_fsync_policy(self):
+        """Test when the file is synchronized depending on the policy."""
+        expected_nb_syncs = {"run": 4, "rows": 2, "exit": 1}
+        for policy, nb_syncs in expected_nb_syncs.items():
+            with mock.patch("os.fsync", wraps=os.fsync) as fsync:
+                with ResultSink(path=self.csv_path, fsync_policy=policy, fsync_rows=5) as sink:
+                    for run_id in range(4):
+                        sink.write_line(f"{run_id};1")
+                        sink.write_line(f"{run_id};2")
+                        sink.end_run()
+                self.assertEqual(nb_syncs, fsync.call_count, policy)
+
+        with self.assertRaises(ValueError):
+            ResultSink(path=self.csv_path, fsync_policy="never")
+
+    def test_torn_line(self):
+        """Test that a torn last line is removed when the sink is opened."""
+        self.csv_path.write_text("a;b\n1;2\n3;")
+        with ResultSink(path=self.csv_path) as sink:
+            sink.write_line("5;6")
+        self.assertEqual("a;b\n1;2\n5;6\n", self.csv_path.read_text())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,90 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the embedded store of the results of campaigns.
+"""
+
+import csv
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.results.store import ResultStore, table_name
+from benchkit.utils.misc import CSV_SEPARATOR
+
+
+class TestResultStore(unittest.TestCase):
+    """Unit tests for the results store."""
+
+    def setUp(self):
+        self._tmp_dir = tempfile.TemporaryDirectory()
+        self.tmp_path = pathlib.Path(self._tmp_dir.name)
+        self.store = ResultStore(path=self.tmp_path / "results.sqlite")
+
+    def tearDown(self):
+        self.store.close()
+        self._tmp_dir.cleanup()
+
+    def _column_types(self, table: str) -> list:
+        cursor = self.store.connection().execute(f'PRAGMA table_info("{table}")')
+        return [row[2] for row in cursor]
+
+    def test_typed_rows(self):
+        """Test that the rows are stored with typed and added columns, and indexed."""
+        table = table_name(csv_path="results/benchmark_host_lock-1_20240101_120000_000000.csv")
+        self.assertEqual("benchmark_host_lock_1_20240101_120000_000000", table)
+        self.assertEqual([], self.store.tables())
+
+        self.store.insert_rows(
+            table=table,
+            rows=[
+                {"experiment_name": "e", "nb_threads": 1, "lock": "a;b", "throughput": "1.5"},
+                {"experiment_name": "e", "nb_threads": "2", "lock": "mcs", "throughput": 3.0},
+            ],
+            index_columns=["nb_threads", "lock", "rep"],
+        )
+        self.store.insert_rows(
+            table=table,
+            rows=[{"experiment_name": "e", "nb_threads": 4, "lock": "mcs", "rep": 1}],
+        )
+
+        self.assertEqual([table], self.store.tables())
+        self.assertEqual(
+            ["experiment_name", "nb_threads", "lock", "throughput", "rep"],
+            self.store.columns(table=table),
+        )
+        rows = self.store.read_rows(table=table, lock="mcs")
+        self.assertEqual([2, 4], [row["nb_threads"] for row in rows])
+        self.assertEqual([3.0, None], [row["throughput"] for row in rows])
+        self.assertEqual(1.5, self.store.read_rows(table=table, nb_threads="1")[0]["throughput"])
+
+        cursor = self.store.connection().execute(
+            f'EXPLAIN QUERY PLAN SELECT * FROM "{table}" WHERE nb_threads = 2'
+        )
+        self.assertIn("USING INDEX", " ".join(str(row) for row in cursor))
+
+        # the values that are not written back identically as numbers are kept as text
+        self.store.insert_rows(
+            table="identifiers",
+            rows=[{"id": v} for v in ("007", "1e3", "nan", "12")],
+        )
+        self.assertEqual(["TEXT"], self._column_types(table="identifiers"))
+        rows = self.store.read_rows(table="identifiers")
+        self.assertEqual(["007", "1e3", "nan", "12"], [row["id"] for row in rows])
+
+        csv_path = self.tmp_path / "export.csv"
+        self.assertEqual(3, self.store.export_csv(table=table, csv_path=csv_path))
+        self.assertEqual(
+            "experiment_name;nb_threads;lock;throughput;rep\n"
+            'e;1;"a;b";1.5;\n'
+            "e;2;mcs;3.0;\n"
+            "e;4;mcs;;1\n",
+            csv_path.read_text(),
+        )
+        with open(csv_path, newline="") as csv_file:
+            exported = list(csv.DictReader(csv_file, delimiter=CSV_SEPARATOR))
+        self.assertEqual(["a;b", "mcs", "mcs"], [row["lock"] for row in exported])
+
+
+if __name__ == "__main__":
+    unittest.main()
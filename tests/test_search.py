@@ -0,0 +1,88 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the search strategies.
+"""
+
+import unittest
+
+from benchkit.search import SEARCH_ROUND_COLUMN, SuccessiveHalving, TreeParzenEstimator
+
+SPACE = {"threads": list(range(1, 13)), "batch": [1, 8, 32, 128], "empty": []}
+
+
+def _throughput(record) -> float:
+    return -((record["threads"] - 6) ** 2) - (record["batch"] - 32) ** 2 / 100
+
+
+def _run(search, objective=_throughput):
+    rounds = []
+    records = search.next_records()
+    while records:
+        rounds.append(records)
+        for record in records:
+            search.report(record=record, results_lines=[{"thr": objective(record)}])
+        records = search.next_records()
+    return rounds
+
+
+class TestSearch(unittest.TestCase):
+    """Unit tests for the search strategies."""
+
+    def test_successive_halving(self):
+        """Test the rounds and durations of successive halving."""
+        search = SuccessiveHalving(variables=SPACE, metric="thr", min_duration_seconds=2, eta=4)
+        self.assertEqual(search.variable_names(), ["threads", "batch"])
+        self.assertEqual(search.max_nb_records(), 48 + 12 + 3 + 1)
+
+        durations = []
+        rounds = []
+        records = search.next_records()
+        while records:
+            durations.append(search.benchmark_duration_seconds(default=None))
+            rounds.append(records)
+            for record in records:
+                search.report(record=record, results_lines=[{"thr": _throughput(record)}])
+            records = search.next_records()
+
+        self.assertEqual([len(r) for r in rounds], [48, 12, 3, 1])
+        self.assertEqual(durations, [2, 8, 32, 128])
+        self.assertEqual([r[0][SEARCH_ROUND_COLUMN] for r in rounds], [0, 1, 2, 3])
+        self.assertEqual(rounds[-1], [{"threads": 6, "batch": 32, SEARCH_ROUND_COLUMN: 3}])
+        self.assertEqual(search.best(), ({"threads": 6, "batch": 32}, 0.0))
+
+    def test_successive_halving_max_duration(self):
+        """Test that no round exceeds the maximum duration and unreported records fail."""
+        search = SuccessiveHalving(
+            variables=SPACE,
+            metric="latency",
+            maximize=False,
+            min_duration_seconds=1,
+            max_duration_seconds=5,
+            nb_candidates=10,
+        )
+        self.assertEqual(search.max_nb_records(), 10 + 4)
+        rounds = _run(search, objective=lambda r: r["threads"])
+        self.assertEqual([len(r) for r in rounds], [10, 4])
+
+        search = SuccessiveHalving(variables=SPACE, metric="thr", min_duration_seconds=1)
+        records = search.next_records()
+        search.report(record=records[0], results_lines=[{"thr": 1.0}])
+        self.assertEqual(search.next_records()[0]["threads"], records[0]["threads"])
+
+    def test_tpe(self):
+        """Test that TPE evaluates distinct records and finds a good one."""
+        search = TreeParzenEstimator(variables=SPACE, metric="thr", nb_trials=30)
+        rounds = _run(search)
+        records = [(r[0]["threads"], r[0]["batch"]) for r in rounds]
+        self.assertEqual(len(records), 30)
+        self.assertEqual(len(set(records)), 30)
+        _, best_value = search.best()
+        self.assertGreaterEqual(best_value, -1.0)
+
+        search = TreeParzenEstimator(variables={"a": [1, 2, 3]}, metric="thr", nb_trials=10)
+        self.assertEqual(len(_run(search, objective=lambda r: r["a"])), 3)
+
+
+if __name__ == "__main__":
+    unittest.main()
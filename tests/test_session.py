@@ -0,0 +1,77 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the persistent shell session of the communication layers.
+"""
+
+import pathlib
+import subprocess
+import tempfile
+import unittest
+from typing import List
+
+from benchkit.communication import CommunicationLayer
+from benchkit.communication.session import ShellSession
+from benchkit.shell.shell import shell_out
+
+
+class SessionCommLayer(CommunicationLayer):
+    """Communication layer running its helper commands in a local session."""
+
+    def __init__(self, session_argv: List[str]) -> None:
+        super().__init__()
+        self.session_argv = session_argv
+        self.nb_shells = 0
+
+    def shell(self, command, **kwargs) -> str:
+        self.nb_shells += 1
+        return shell_out(command=command, **kwargs)
+
+    def _session_argv(self) -> List[str] | None:
+        return self.session_argv
+
+
+class TestShellSession(unittest.TestCase):
+    """Unit tests for the persistent shell session."""
+
+    def test_session(self):
+        """Test the return codes, outputs and isolation of the commands of a session."""
+        session = ShellSession(argv=["sh"])
+        try:
+            self.assertEqual((3, "a\n"), session.run(command="echo a; exit 3"))
+            self.assertEqual((0, "a b|"), session.run(command=["printf", "%s|", "a b"]))
+            self.assertEqual((0, "/\n"), session.run(command="cd / && pwd"))
+            with tempfile.TemporaryDirectory() as tmp_dir:
+                self.assertEqual(
+                    (0, f"{pathlib.Path(tmp_dir).resolve()}\n"),
+                    session.run(command="pwd -P", current_dir=tmp_dir),
+                )
+            self.assertNotEqual("/\n", session.run(command="pwd")[1])
+
+            with self.assertRaises(subprocess.TimeoutExpired):
+                session.run(command="sleep 5", timeout=0.2)
+            self.assertEqual((0, "again\n"), session.run(command="echo again"))
+        finally:
+            session.close()
+
+    def test_comm_layer(self):
+        """Test that the helpers of a communication layer use its session, or fall back."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            comm = SessionCommLayer(session_argv=["sh"])
+            new_dir = pathlib.Path(tmp_dir) / "a" / "b"
+            comm.makedirs(path=new_dir, exist_ok=True)
+            self.assertTrue(comm.isdir(path=new_dir))
+            self.assertFalse(comm.isfile(path=new_dir))
+            self.assertIsNotNone(comm.which(cmd="sh"))
+            self.assertIsNone(comm.which(cmd="benchkit-no-such-command"))
+            self.assertEqual(0, comm.nb_shells)
+            comm.close_session()
+
+            comm = SessionCommLayer(session_argv=["true"])
+            self.assertTrue(comm.isdir(path=new_dir))
+            self.assertTrue(comm.isdir(path=new_dir))
+            self.assertEqual(2, comm.nb_shells)
+
+
+if __name__ == "__main__":
+    unittest.main()
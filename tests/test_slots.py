@@ -0,0 +1,107 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the partitioning of platforms into CPU slots.
+"""
+
+import unittest
+
+from benchkit.platforms.slots import CpuSlot, get_cpu_partitions, get_cpu_slots
+
+
+class CommMock:
+    """Mock for the communication layer, only providing the isolated CPUs and the topology."""
+
+    def __init__(self, isolated: str, lscpu: str) -> None:
+        self._isolated = isolated
+        self._lscpu = lscpu
+
+    def read_file(self, path: str) -> str:
+        assert path.endswith("isolated")
+        return self._isolated
+
+    def shell(self, command: str, **_kwargs) -> str:
+        assert command.startswith("lscpu")
+        return self._lscpu
+
+
+class PlatformMock:
+    """Mock for a platform with the given number of CPUs."""
+
+    def __init__(self, nb_cpus: int, isolated: str = "", lscpu: str = "") -> None:
+        self._nb_cpus = nb_cpus
+        self.comm = CommMock(isolated=isolated, lscpu=lscpu)
+        self.hostname = "mock"
+
+    def nb_cpus(self) -> int:
+        return self._nb_cpus
+
+
+class TestSlots(unittest.TestCase):
+    """Unit tests for CPU slots."""
+
+    def test_get_cpu_slots(self):
+        """Test the partitioning of the CPUs in slots."""
+        slots = get_cpu_slots(platform=PlatformMock(nb_cpus=8), cpus_per_slot=3)
+        self.assertEqual(slots, [CpuSlot(0, (0, 1, 2)), CpuSlot(1, (3, 4, 5))])
+
+        slots = get_cpu_slots(platform=PlatformMock(nb_cpus=8), cpus_per_slot=1, nb_slots=2)
+        self.assertEqual(slots, [CpuSlot(0, (0,)), CpuSlot(1, (1,))])
+
+    def test_get_cpu_slots_isolated(self):
+        """Test that isolated CPUs are never part of a slot."""
+        slots = get_cpu_slots(platform=PlatformMock(nb_cpus=6, isolated="1-2,4"), cpus_per_slot=1)
+        self.assertEqual(slots, [CpuSlot(0, (0,)), CpuSlot(1, (3,)), CpuSlot(2, (5,))])
+
+        with self.assertRaises(ValueError):
+            get_cpu_slots(platform=PlatformMock(nb_cpus=6, isolated="1-5"), cpus_per_slot=2)
+
+    def test_command_prefix(self):
+        """Test the pinning command prefixes."""
+        slot = CpuSlot(slot_id=1, cpus=(4, 5))
+        self.assertEqual(slot.command_prefix("taskset"), ["taskset", "--cpu-list", "4,5"])
+        self.assertEqual(slot.command_prefix("numactl"), ["numactl", "--physcpubind=4,5"])
+        self.assertEqual(slot.command_prefix("none"), [])
+        with self.assertRaises(ValueError):
+            slot.command_prefix("cgroup")
+
+        slot = CpuSlot(slot_id=1, cpus=(4, 5), nodes=(1,))
+        self.assertEqual(
+            slot.command_prefix("numactl"), ["numactl", "--physcpubind=4,5", "--membind=1"]
+        )
+
+    def test_get_cpu_partitions(self):
+        """Test the partitioning of the topology, with interleaved NUMA nodes."""
+        # 2 NUMA nodes with 2 L3 caches each, the CPUs of a node being interleaved with the other
+        lscpu = "# CPU,Node,,L1d,L1i,L2,L3\n" + "".join(
+            f"{cpu},{cpu % 2},,{cpu},{cpu},{cpu},{cpu % 2 * 2 + cpu // 4}\n" for cpu in range(8)
+        )
+        platform = PlatformMock(nb_cpus=8, lscpu=lscpu)
+
+        partitions = get_cpu_partitions(platform=platform, nb_partitions=2, domain="numa")
+        self.assertEqual(
+            partitions, [CpuSlot(0, (0, 2, 4, 6), (0,)), CpuSlot(1, (1, 3, 5, 7), (1,))]
+        )
+        partitions = get_cpu_partitions(platform=platform, nb_partitions=4, domain="cache")
+        self.assertEqual([p.cpus for p in partitions], [(0, 2), (4, 6), (1, 3), (5, 7)])
+        partitions = get_cpu_partitions(platform=platform, nb_partitions=1, domain="cache")
+        self.assertEqual(partitions[0].cpus, (0, 2, 4, 6, 1, 3, 5, 7))
+
+        partitions = get_cpu_partitions(platform=platform, nb_partitions=3, domain="cache")
+        self.assertEqual([p.cpus for p in partitions], [(0, 2), (4, 6), (1, 3)])
+
+        # with CPU 0 isolated, the first partition would take part of the second cache
+        platform = PlatformMock(nb_cpus=8, isolated="0", lscpu=lscpu)
+        with self.assertRaises(ValueError):
+            get_cpu_partitions(platform=platform, nb_partitions=3, domain="cache")
+        partitions = get_cpu_partitions(platform=platform, nb_partitions=3, domain="cpu")
+        self.assertEqual([p.cpus for p in partitions], [(2, 4), (6, 1), (3, 5)])
+
+        # without topology information, each CPU is its own cache
+        platform = PlatformMock(nb_cpus=4, isolated="0")
+        partitions = get_cpu_partitions(platform=platform, nb_partitions=3, domain="cache")
+        self.assertEqual([p.cpus for p in partitions], [(1,), (2,), (3,)])
+
+
+if __name__ == "__main__":
+    unittest.main()
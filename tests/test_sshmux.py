@@ -0,0 +1,144 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the pool of SSH master connections.
+"""
+
+import threading
+import unittest
+from contextlib import ExitStack
+from unittest.mock import patch
+
+from benchkit.communication.sshmux import SSHMasterPool
+
+
+class FakeMasterPool(SSHMasterPool):
+    """Pool of master connections that are simulated instead of started with ssh."""
+
+    def __init__(self, can_connect: bool = True, **kwargs) -> None:
+        super().__init__(host="bench-host", **kwargs)
+        self.can_connect = can_connect
+        self.alive = set()
+        self.connected = threading.Event()
+        self.connected.set()
+
+    def _start_master(self, master) -> bool:
+        self.connected.wait(timeout=5)
+        if not self.can_connect:
+            return False
+        self.alive.add(master.control_path)
+        return True
+
+    def _ssh_control(self, master, operation: str) -> bool:
+        if "exit" == operation:
+            self.alive.discard(master.control_path)
+        return master.control_path in self.alive
+
+
+class TestSSHMasterPool(unittest.TestCase):
+    """Unit tests for the pool of SSH master connections."""
+
+    @staticmethod
+    def _use_channel(pool: SSHMasterPool) -> str:
+        with pool.channel() as options:
+            return options[0]
+
+    def test_channels(self):
+        """Test that concurrent commands share masters up to their number of channels."""
+        pool = FakeMasterPool(max_channels=2, max_masters=2, check_period_seconds=0)
+        with ExitStack() as stack:
+            paths = [stack.enter_context(pool.channel())[0] for _ in range(4)]
+            self.assertEqual(2, len(set(paths)))
+            self.assertEqual([2, 2], sorted(paths.count(path) for path in set(paths)))
+            self.assertEqual(2, pool.metrics()["nb_connections"])
+
+            # all the channels are used: the next command waits for one to be released
+            waiting = threading.Thread(target=lambda: paths.append(self._use_channel(pool)))
+            waiting.start()
+            waiting.join(timeout=0.2)
+            self.assertTrue(waiting.is_alive())
+        waiting.join(timeout=5)
+        self.assertFalse(waiting.is_alive())
+        self.assertEqual(2, len(set(paths)))
+
+        with pool.channel() as options:
+            self.assertIn("-oControlMaster=no", options)
+        self.assertEqual(2, pool.metrics()["nb_connections"])
+
+        pool.alive.clear()
+        with pool.channel():
+            pass
+        metrics = pool.metrics()
+        self.assertEqual(3, metrics["nb_connections"])
+        self.assertEqual(1, metrics["nb_reconnections"])
+        self.assertEqual(7, metrics["nb_channels"])
+
+        pool.close()
+        self.assertEqual(set(), pool.alive)
+
+    def test_long_lived_channels(self):
+        """Test that the channels of the long-lived commands are counted until released."""
+        pool = FakeMasterPool(max_channels=2, max_masters=1)
+        options = [pool.options(), pool.options()]
+        self.assertEqual(options[0], options[1])
+        # all the channels are used: a long-lived command uses its own connection
+        self.assertEqual([], pool.options())
+
+        waiting = threading.Thread(target=lambda: self._use_channel(pool))
+        waiting.start()
+        waiting.join(timeout=0.2)
+        self.assertTrue(waiting.is_alive())
+        pool.release(ssh_options=options.pop())
+        waiting.join(timeout=5)
+        self.assertFalse(waiting.is_alive())
+
+        self.assertEqual(options[0], pool.options())
+        metrics = pool.metrics()
+        self.assertEqual(1, metrics["nb_connections"])
+        self.assertEqual(4, metrics["nb_channels"])
+        self.assertEqual(1, metrics["nb_fallback_channels"])
+
+    def test_connect_without_lock(self):
+        """Test that a master connection being started does not block the other commands."""
+        pool = FakeMasterPool(max_channels=1, max_masters=2)
+        pool.connected.clear()
+        paths = []
+        connecting = threading.Thread(target=lambda: paths.append(self._use_channel(pool)))
+        connecting.start()
+        waiting = threading.Thread(target=lambda: paths.append(self._use_channel(pool)))
+        waiting.start()
+        waiting.join(timeout=0.2)
+        self.assertTrue(connecting.is_alive())
+        self.assertEqual(0, pool.metrics()["nb_connections"])
+
+        pool.connected.set()
+        for thread in (connecting, waiting):
+            thread.join(timeout=5)
+            self.assertFalse(thread.is_alive())
+        self.assertEqual(2, len(set(paths)))
+
+    def test_connect_timeout(self):
+        """Test that the master connections are started with a connection timeout."""
+        pool = SSHMasterPool(host="bench-host", connect_timeout_seconds=3)
+        with patch("benchkit.communication.sshmux.subprocess.run") as run:
+            run.return_value.returncode = 0
+            with pool.channel() as options:
+                self.assertIn("-oControlMaster=no", options)
+        argv = run.call_args_list[0].args[0]
+        self.assertIn("-M", argv)
+        self.assertIn("-oConnectTimeout=3", argv)
+        pool.close()
+
+    def test_fallback(self):
+        """Test that commands use their own connection when no master can be started."""
+        pool = FakeMasterPool(can_connect=False)
+        with pool.channel() as options:
+            self.assertEqual([], options)
+        self.assertEqual([], pool.options())
+        metrics = pool.metrics()
+        self.assertEqual(1, metrics["nb_failed_connections"])
+        self.assertEqual(2, metrics["nb_fallback_channels"])
+
+
+if __name__ == "__main__":
+    unittest.main()
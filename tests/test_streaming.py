@@ -0,0 +1,94 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the event-driven streaming of the output of processes.
+"""
+
+import subprocess
+import sys
+import unittest
+
+from benchkit.shell.shell import shell_out
+from benchkit.shell.streaming import SpillBuffer, stream_process
+
+_SCRIPT = """
+import sys
+for i in range(3):
+    print(f"out {i}", flush=True)
+    print(f"err {i}", file=sys.stderr, flush=True)
+sys.stdout.write(sys.stdin.read())
+"""
+
+
+def _popen(script: str) -> subprocess.Popen:
+    return subprocess.Popen(
+        [sys.executable, "-c", script],
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+    )
+
+
+class TestStreaming(unittest.TestCase):
+    """Unit tests for the streaming of the output of processes."""
+
+    def test_stream(self):
+        """Test that both streams are captured and given line by line to the callbacks."""
+        out_lines = []
+        err_lines = []
+        result = stream_process(
+            process=_popen(script=_SCRIPT),
+            std_input="no newline" * 10000,
+            stdout_callback=out_lines.append,
+            stderr_callback=err_lines.append,
+            spill_threshold=16,
+        )
+        self.assertEqual(0, result.returncode)
+        self.assertEqual(["out 0\n", "out 1\n", "out 2\n", "no newline" * 10000], out_lines)
+        self.assertEqual(["err 0\n", "err 1\n", "err 2\n"], err_lines)
+        self.assertEqual("".join(out_lines), result.stdout)
+        self.assertEqual("err 0\nerr 1\nerr 2\n", result.stderr)
+
+        result = stream_process(process=_popen(script=_SCRIPT), keep_output=False)
+        self.assertEqual(("", ""), (result.stdout, result.stderr))
+
+    def test_spill(self):
+        """Test that the buffer spills to a file beyond its threshold."""
+        buffer = SpillBuffer(spill_threshold=4)
+        buffer.write("abc")
+        self.assertFalse(buffer.spilled)
+        buffer.write("def")
+        buffer.write("g")
+        self.assertTrue(buffer.spilled)
+        self.assertEqual("abcdefg", buffer.getvalue())
+        buffer.write("h")
+        self.assertEqual("abcdefgh", buffer.getvalue())
+        buffer.close()
+
+    def test_timeout(self):
+        """Test that the process is killed after the timeout."""
+        process = _popen(script="import time; print('started', flush=True); time.sleep(30)")
+        with self.assertRaises(subprocess.TimeoutExpired) as context:
+            stream_process(process=process, timeout=0.5)
+        self.assertEqual("started\n", context.exception.output)
+        self.assertIsNotNone(process.poll())
+
+    def test_shell_out_log(self):
+        """Test the log mode of `shell_out`."""
+        output = shell_out(
+            command=[sys.executable, "-c", "print('a'); print('b'); exit(3)"],
+            print_input=False,
+            output_is_log=True,
+            ignore_ret_codes=(3,),
+        )
+        self.assertEqual("a\nb\n", output)
+        with self.assertRaises(subprocess.CalledProcessError):
+            shell_out(
+                command=[sys.executable, "-c", "exit(4)"],
+                print_input=False,
+                output_is_log=True,
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()
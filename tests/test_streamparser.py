@@ -0,0 +1,93 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the incremental parsing of the output of benchmark commands.
+"""
+
+import csv
+import pathlib
+import sys
+import tempfile
+import unittest
+
+from benchkit.core.bktypes.execfn import shell2exec
+from benchkit.platforms import get_current_platform
+from benchkit.results.streamparser import RegexIntervalParser, shell_streamed
+from benchkit.utils.misc import CSV_SEPARATOR
+from tests.helpers import FakeBench
+
+_INTERVAL_PATTERN = r"\[ (?P<time>\d+)s \] tps: (?P<tps>[\d.]+)"
+_SCRIPT = "for t in range(1, 4): print(f'[ {t}s ] tps: {100 * t}.5', flush=True)"
+
+
+def _run_intervals(bench: FakeBench, _run_variables) -> str:
+    command = [sys.executable, "-c", _SCRIPT]
+    return bench.run_bench_command(
+        run_command=command,
+        wrapped_run_command=command,
+        current_dir=".",
+        environment=None,
+        wrapped_environment=None,
+        print_output=False,
+    )
+
+
+def _parse_intervals(_bench: FakeBench, _output: str):
+    raise AssertionError("the output must be parsed by the stream parser")
+
+
+class TestStreamParser(unittest.TestCase):
+    """Unit tests for the stream parsers."""
+
+    def test_regex_parser(self):
+        """Test the intervals and aggregates of the regex parser, streamed or not."""
+        parser = RegexIntervalParser(pattern=_INTERVAL_PATTERN)
+        output = shell_streamed(
+            shell_fun=get_current_platform().comm.shell,
+            stream_parser=parser,
+            command=[sys.executable, "-c", _SCRIPT],
+            print_input=False,
+        )
+        self.assertEqual("", output)
+        records = parser.records()
+        self.assertEqual(3, len(records))
+        self.assertEqual(
+            {"nb_intervals": 3, "time_mean": 2.0, "tps_mean": 200.5, "time": 1, "tps": 100.5},
+            records[0],
+        )
+        self.assertEqual({"time": 2, "tps": 200.5}, parser.intervals[1])
+
+        def shell_fun(command, **_kwargs):
+            return "noise\n[ 1s ] tps: 3\n"
+
+        parser = RegexIntervalParser(pattern=_INTERVAL_PATTERN)
+        shell_streamed(shell_fun=shell_fun, stream_parser=parser, command=[])
+        self.assertEqual([{"time": 1, "tps": 3}], parser.intervals)
+
+        exec_output = shell2exec(get_current_platform().comm.shell)(
+            argv=[sys.executable, "-c", _SCRIPT],
+            stream_parser=RegexIntervalParser(pattern=_INTERVAL_PATTERN),
+        )
+        self.assertEqual("", exec_output.stdout)
+        self.assertEqual(3, len(exec_output.records))
+
+    def test_benchmark(self):
+        """Test that the records of a benchmark come from its stream parser."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = pathlib.Path(tmp_dir) / "results.csv"
+            benchmark = FakeBench(
+                run_var_names=["nb_threads"],
+                run_fun=_run_intervals,
+                parse_fun=_parse_intervals,
+                stream_parser_fun=lambda: RegexIntervalParser(pattern=_INTERVAL_PATTERN),
+            )
+            benchmark.configure(csv_output_path=csv_path, variables=[{"nb_threads": 1}])
+            benchmark.run(other_campaigns_seconds=0, barrier=None, continuing=False)
+            lines = [line for line in csv_path.read_text().splitlines() if not line.startswith("#")]
+            rows = list(csv.DictReader(lines, delimiter=CSV_SEPARATOR))
+            self.assertEqual(["100.5", "200.5", "300.5"], [row["tps"] for row in rows])
+            self.assertEqual({"200.5"}, {row["tps_mean"] for row in rows})
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,74 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the suites of campaigns running in parallel on partitions of the platform.
+"""
+
+import pathlib
+import tempfile
+import time
+import unittest
+
+from benchkit.campaign import CampaignCartesianProduct, CampaignSuite
+from benchkit.communication import LocalCommLayer
+from benchkit.platforms.generic import Platform
+from tests.helpers import FakeBench, read_csv_rows
+
+# 2 NUMA nodes of 4 CPUs, each with its own last-level cache
+_LSCPU = "# CPU,Node,Cache\n" + "".join(f"{cpu},{cpu // 4},{cpu},{cpu // 4}\n" for cpu in range(8))
+
+
+class TopologyCommLayer(LocalCommLayer):
+    """Local communication layer faking the topology of a platform with 8 CPUs."""
+
+    def shell(self, command, **kwargs) -> str:
+        if isinstance(command, str) and command.startswith("lscpu"):
+            return _LSCPU
+        return super().shell(command, **kwargs)
+
+
+def _sleep(_bench: FakeBench, run_variables) -> str:
+    time.sleep(0.1)
+    return str(run_variables["name"])
+
+
+class TestCampaignSuite(unittest.TestCase):
+    """Unit tests for the suites of campaigns."""
+
+    def test_partitioned_suite(self):
+        """Test that the campaigns of a suite run concurrently, each on its own partition."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            campaigns = []
+            for name in ("first", "second"):
+                platform = Platform(comm_layer=TopologyCommLayer())
+                platform.nb_cpus = lambda: 8
+                campaigns.append(
+                    CampaignCartesianProduct(
+                        name=name,
+                        benchmark=FakeBench(run_fun=_sleep, platform=platform),
+                        nb_runs=2,
+                        variables={"name": ["a", "b", "c"]},
+                        constants=None,
+                        debug=False,
+                        gdb=False,
+                        enable_data_dir=False,
+                        results_dir=pathlib.Path(tmp_dir),
+                    )
+                )
+            suite = CampaignSuite(campaigns=campaigns)
+            suite.run_suite(parallel=True, partition_domain="numa", partition_pinning="none")
+
+            partitions = []
+            for csv_path in suite.result_csv_paths:
+                rows = read_csv_rows(csv_path=csv_path)
+                self.assertEqual(
+                    sorted((name, str(rep)) for name in "abc" for rep in (1, 2)),
+                    sorted((row["name"], row["rep"]) for row in rows),
+                )
+                self.assertEqual(1, len({row["cpu_partition_cpus"] for row in rows}))
+                partitions.append((rows[0]["cpu_partition"], rows[0]["cpu_partition_cpus"]))
+            self.assertEqual([("0", "0,1,2,3"), ("1", "4,5,6,7")], sorted(partitions))
+
+
+if __name__ == "__main__":
+    unittest.main()
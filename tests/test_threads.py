@@ -0,0 +1,87 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the long layout of the per-thread result columns.
+"""
+
+import importlib.util
+import pathlib
+import tempfile
+import unittest
+
+from benchkit.results.threads import (
+    pivot_thread_columns,
+    split_thread_columns,
+    threads_csv_path,
+)
+from benchkit.utils.misc import CSV_SEPARATOR
+from tests.helpers import FakeBench
+
+
+def _parse_threads(_bench: FakeBench, output: str):
+    nb_threads = int(output)
+    result = {"global_count": 10 * nb_threads}
+    result.update({f"thread_{t}": 10 + t for t in range(nb_threads)})
+    return result
+
+
+class TestThreadColumns(unittest.TestCase):
+    """Unit tests for the layouts of the per-thread columns."""
+
+    def test_split(self):
+        """Test that the per-thread columns are moved to per-thread rows."""
+        rows, thread_rows = split_thread_columns(
+            rows=[{"a": 1, "thread_0": 5, "thread_1": 6}, {"a": 2, "thread_0": 7}],
+            run_id="r",
+        )
+        self.assertEqual(
+            [{"a": 1, "run_id": "r", "run_line": 0}, {"a": 2, "run_id": "r", "run_line": 1}],
+            rows,
+        )
+        self.assertEqual(
+            [("r", 0, 0, 5), ("r", 0, 1, 6), ("r", 1, 0, 7)],
+            [tuple(row.values()) for row in thread_rows],
+        )
+
+    def test_long_layout(self):
+        """Test the output files of a campaign with the long layout."""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            csv_path = pathlib.Path(tmp_dir) / "results.csv"
+            benchmark = FakeBench(run_var_names=["nb_threads"], parse_fun=_parse_threads)
+            benchmark.configure(
+                csv_output_path=csv_path,
+                variables=[{"nb_threads": 1}, {"nb_threads": 3}],
+                thread_columns="long",
+            )
+            benchmark.run(other_campaigns_seconds=0, barrier=None, continuing=False)
+
+            header = next(
+                line for line in csv_path.read_text().splitlines() if not line.startswith("#")
+            )
+            self.assertNotIn("thread_0", header.split(CSV_SEPARATOR))
+            self.assertIn("run_id", header.split(CSV_SEPARATOR))
+
+            threads_path = threads_csv_path(csv_path=csv_path)
+            self.assertEqual(pathlib.Path(tmp_dir) / "results.threads.csv", threads_path)
+            lines = threads_path.read_text().splitlines()
+            self.assertEqual("run_id;run_line;thread_id;value", lines[0])
+            self.assertEqual(
+                ["0;10", "0;10", "1;11", "2;12"],
+                [line.split(CSV_SEPARATOR, 2)[-1] for line in lines[1:]],
+            )
+
+            if importlib.util.find_spec("pandas") is None:
+                return
+            import pandas as pd
+
+            df = pivot_thread_columns(
+                df=pd.read_csv(csv_path, sep=";", comment="#"),
+                threads_df=pd.read_csv(threads_path, sep=";"),
+            )
+            self.assertEqual([10.0, 10.0], list(df["thread_0"]))
+            self.assertTrue(pd.isna(df["thread_2"].iloc[0]))
+            self.assertEqual(12.0, df["thread_2"].iloc[1])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,114 @@
+# Copyright (C) 2023 Huawei Technologies Co., Ltd. All rights reserved.
+# SPDX-License-Identifier: MIT
+"""
+Module for testing the pipelined transfer of the record data back to the host.
+"""
+
+import pathlib
+import tempfile
+import threading
+import unittest
+
+from benchkit.benchmark import Benchmark
+from benchkit.communication import LocalCommLayer
+from benchkit.communication.transfer import ArtifactTransfer, TransferError, TransferQueue
+
+
+class GatedCommLayer(LocalCommLayer):
+    """Local communication layer whose first archive waits to be released, recording batches."""
+
+    def __init__(self) -> None:
+        super().__init__()
+        self.gate = threading.Event()
+        self.batches = []
+
+    def copy_archive_to_host(self, source_root, relative_paths, destination_root, **kwargs):
+        self.gate.wait(timeout=10)
+        self.batches.append(list(relative_paths))
+        super().copy_archive_to_host(source_root, relative_paths, destination_root, **kwargs)
+
+
+class TestTransferQueue(unittest.TestCase):
+    """Unit tests for the pipelined transfer of the record data."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.source = pathlib.Path(self.tmp_dir.name) / "target"
+        self.destination = pathlib.Path(self.tmp_dir.name) / "host"
+        for run_id in range(1, 5):
+            run_dir = self.source / "results" / f"run-{run_id}"
+            run_dir.mkdir(parents=True)
+            (run_dir / "perf.data").write_bytes(bytes(range(256)) * 64)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def _submit(self, transfers: TransferQueue, run_id: int) -> None:
+        transfers.submit(
+            source_root=self.source,
+            relative_path=f"results/run-{run_id}",
+            destination_root=self.destination,
+        )
+
+    def test_batches(self):
+        """Test that the directories waiting for their transfer are sent in one archive."""
+        comm = GatedCommLayer()
+        with TransferQueue(comm=comm, policy=ArtifactTransfer(compression_level=3)) as transfers:
+            for run_id in range(1, 5):
+                self._submit(transfers=transfers, run_id=run_id)
+            comm.gate.set()
+
+        self.assertEqual(4, sum(len(batch) for batch in comm.batches))
+        self.assertLess(len(comm.batches), 4)
+        for run_id in range(1, 5):
+            relative_path = pathlib.Path("results") / f"run-{run_id}" / "perf.data"
+            self.assertEqual(16384, (self.destination / relative_path).stat().st_size)
+            self.assertFalse((self.source / relative_path).exists())
+        metrics = transfers.metrics()
+        self.assertEqual(4, metrics["nb_directories"])
+        self.assertEqual(len(comm.batches), metrics["nb_batches"])
+
+    def test_failure(self):
+        """Test that failed transfers are kept on the target and reported when closing."""
+        transfers = TransferQueue(comm=LocalCommLayer(), policy=ArtifactTransfer(max_batch=1))
+        self._submit(transfers=transfers, run_id=1)
+        transfers.submit(
+            source_root=self.source,
+            relative_path="results/run-9",
+            destination_root=self.destination,
+        )
+        with self.assertRaises(TransferError):
+            transfers.close()
+        self.assertTrue((self.destination / "results" / "run-1" / "perf.data").is_file())
+        self.assertEqual(1, transfers.metrics()["nb_failed_batches"])
+        with self.assertRaises(ValueError):
+            self._submit(transfers=transfers, run_id=2)
+
+    def test_post_run_hooks(self):
+        """Test that the pipelined transfers are rejected with post-run hooks."""
+        benchmark = Benchmark(
+            command_wrappers=[],
+            command_attachments=[],
+            shared_libs=[],
+            pre_run_hooks=[],
+            post_run_hooks=[lambda **_kwargs: None],
+        )
+        with self.assertRaises(ValueError):
+            benchmark.configure_variables(
+                experiment_name="transfer",
+                benchmark_name="benchmark",
+                csv_output_path=self.destination / "results.csv",
+                base_data_dir=None,
+                benchmark_duration_seconds=None,
+                nb_runs=1,
+                constants=None,
+                variables=[{}],
+                pretty_variables=None,
+                debug=False,
+                gdb=False,
+                artifact_transfer=ArtifactTransfer(),
+            )
+
+
+if __name__ == "__main__":
+    unittest.main()